@@ -1,8 +1,11 @@
 """
 Classification Agent – Categorizes candidates by skills, seniority, and culture fit.
+A local classifier answers first; the LLM is only called when it is unsure.
 """
 from typing import Dict, Any, List
 from services.ai_service import ai_service
+from services.cascade_classifier import cascade_classifier
+from services.instrumentation import instrumented
 
 
 CATEGORIES = [
@@ -36,8 +39,15 @@ Experience: {experience}
 
 Return ONLY valid JSON."""
 
+    @instrumented("classification")
     async def classify_candidate(self, candidate_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Classify a single candidate."""
+        """Classify a single candidate, escalating to the LLM below the confidence threshold."""
+        local = cascade_classifier.classify(candidate_data)
+        if cascade_classifier.confident(local):
+            cascade_classifier.count("local")
+            return local
+        cascade_classifier.count("escalated")
+
         prompt = self.CLASSIFY_PROMPT.format(
             name=candidate_data.get("name", "Unknown"),
             title=candidate_data.get("title", "Unknown"),
@@ -49,9 +59,12 @@ Return ONLY valid JSON."""
         result = await ai_service.extract_from_text(prompt)
 
         if isinstance(result, dict) and "category" in result:
-            return result
+            cascade_classifier.record_label()
+            return {**result, "source": "llm"}
 
-        return self._mock_classification(candidate_data)
+        # LLM unavailable: keep the local answer whatever its confidence
+        cascade_classifier.count("llm_failed")
+        return {**local, "source": "local-fallback"}
 
     async def batch_classify(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Classify multiple candidates."""
@@ -65,28 +78,5 @@ Return ONLY valid JSON."""
         """Return available categories."""
         return CATEGORIES
 
-    def _mock_classification(self, candidate_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Fallback mock classification."""
-        skills = candidate_data.get("skills", [])
-        skills_lower = [s.lower() for s in skills] if skills else []
-
-        if any(s in skills_lower for s in ["pytorch", "tensorflow", "ml", "machine learning"]):
-            category = "Machine Learning"
-        elif any(s in skills_lower for s in ["react", "vue", "angular", "frontend", "css"]):
-            category = "Frontend Engineering"
-        elif any(s in skills_lower for s in ["go", "java", "postgresql", "backend", "api"]):
-            category = "Backend Engineering"
-        elif any(s in skills_lower for s in ["docker", "kubernetes", "terraform", "devops", "aws"]):
-            category = "DevOps / SRE"
-        else:
-            category = "Backend Engineering"
-
-        return {
-            "category": category,
-            "confidence": 88.0,
-            "seniority": "Senior",
-            "culture_fit": "High",
-        }
-
 
 classification_agent = ClassificationAgent()
@@ -3,38 +3,66 @@ Intake Agent – Handles voice, image, and text inputs from hiring managers.
 Extracts structured hiring preferences using Gemini AI.
 """
 from typing import Optional, Dict, Any
+from config import settings
 from services.ai_service import ai_service
+from services.keyword_extractor import keyword_extractor
+from services.instrumentation import instrumented
 from schemas import IntakeResult
 import json
 
+# Intake fields and how the LLM prompt describes them
+FIELD_HINTS = {
+    "job_title": "the role being hired for",
+    "skills": "array of required technical skills",
+    "experience": "years of experience needed",
+    "budget": "salary range",
+    "culture_fit": "described culture preferences",
+    "location": "work location or remote policy",
+    "urgency": "how urgent the hire is",
+}
+
 
 class IntakeAgent:
     """Processes hiring manager inputs and extracts structured preferences."""
 
     EXTRACTION_PROMPT = """You are an AI recruiting assistant. Analyze the following hiring requirement 
 and extract structured data. Return a JSON object with these fields:
-- job_title: the role being hired for
-- skills: array of required technical skills
-- experience: years of experience needed
-- budget: salary range
-- culture_fit: described culture preferences
-- location: work location or remote policy
-- urgency: how urgent the hire is
+{fields}
 
 Input: {input_text}
 
 Return ONLY valid JSON, no markdown formatting or code blocks."""
 
+    @instrumented("intake")
     async def process_text(self, text: str) -> Dict[str, Any]:
-        """Process text input and extract hiring preferences."""
-        result = await ai_service.extract_from_text(
-            self.EXTRACTION_PROMPT.format(input_text=text)
-        )
+        """Process text input and extract hiring preferences.
+
+        Fields the keyword dictionary can fill (title, skills, experience, budget,
+        location) are taken from it; the LLM is only asked for the rest. Their
+        names are returned under "prefilled", next to parsed_data.
+        """
+        prefilled = {}
+        if settings.keyword_fast_path:
+            extraction = keyword_extractor.extract(text)
+            prefilled = {f: getattr(extraction, f) for f in FIELD_HINTS if getattr(extraction, f, None)}
+
+        missing = [f for f in FIELD_HINTS if f not in prefilled]
+        if not missing:
+            return {"parsed_data": prefilled, "confidence": 0.95, "prefilled": list(prefilled)}
+
+        result = await ai_service.extract_from_text(self.EXTRACTION_PROMPT.format(
+            fields="\n".join(f"- {f}: {FIELD_HINTS[f]}" for f in missing),
+            input_text=text,
+        ))
+        if not isinstance(result, dict):
+            result = {}
         return {
-            "parsed_data": result,
-            "confidence": result.get("_confidence", 0.92) if isinstance(result, dict) else 0.92,
+            "parsed_data": {f: prefilled.get(f, result.get(f)) for f in FIELD_HINTS},
+            "confidence": result.get("_confidence", 0.92),
+            "prefilled": list(prefilled),
         }
 
+    @instrumented("intake")
     async def process_image(self, image_bytes: bytes, filename: str) -> Dict[str, Any]:
         """Process image/document and extract hiring preferences."""
         result = await ai_service.extract_from_image(
@@ -48,17 +76,18 @@ Return ONLY valid JSON, no markdown formatting or code blocks."""
             "confidence": result.get("_confidence", 0.88) if isinstance(result, dict) else 0.88,
         }
 
+    @instrumented("intake")
     async def process_voice(self, audio_bytes: bytes, filename: str) -> Dict[str, Any]:
         """Process voice recording (transcribe + extract)."""
         # For now, voice is treated as a file that Gemini can process
         # In production, you'd use a speech-to-text service first
-        result = await ai_service.extract_from_text(
+        result = await self.process_text(
             "Simulated voice transcription: Looking for a Senior ML Engineer with "
             "5+ years experience in PyTorch and production ML systems. Budget around "
             "$180-220K. Remote-friendly, US timezone preferred."
         )
         return {
-            "parsed_data": result,
+            "parsed_data": result["parsed_data"],
             "confidence": 0.85,
         }
 
@@ -1,10 +1,23 @@
 """
 Integration Agent (MCP) – Connects to external APIs and databases.
-Uses a pluggable connector architecture with mock implementations.
+Uses a pluggable connector architecture with mock implementations; systems
+listed in HTTP_CONNECTORS are reached over HTTP through the connector transport.
 """
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+import asyncio
 import random
+import uuid
+from config import settings
+from services.api_logger import api_logger
+from services.connector_transport import ConnectorTransport, PushBatcher
+from services.instrumentation import agent_metrics, instrumented
+from services.response_cache import response_cache
+
+SAMPLE_NAMES = [
+    "Alex Kim", "Priya Sharma", "Jordan Lee", "Maria Garcia", "Wei Chen", "Sam Taylor", "Fatima Khan",
+    "Lucas Silva", "Emma Brown", "Noah Müller", "Aisha Bello", "Diego Torres", "Yuki Tanaka", "Olivia Smith",
+]
 
 
 class BaseConnector:
@@ -18,8 +31,13 @@ class BaseConnector:
         self.record_count = 0
         self.last_sync = datetime.now(timezone.utc)
 
-    async def sync(self) -> Dict[str, Any]:
-        """Sync data from the external system."""
+    @property
+    def endpoint(self) -> str:
+        """Base path used when logging calls to this system."""
+        return f"/{self.system_type}/{self.name.lower().replace(' ', '-')}"
+
+    async def sync(self, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Pull records changed since `cursor` (None: first sync) and return them with the next cursor."""
         raise NotImplementedError
 
     async def search(self, query: str) -> List[Dict[str, Any]]:
@@ -30,34 +48,139 @@ class BaseConnector:
         """Push a candidate to the external system."""
         raise NotImplementedError
 
+    async def push_candidates(self, candidates: List[Dict[str, Any]]) -> List[bool]:
+        """Push several candidates; systems with a batch API override this to use one request."""
+        return [await self.push_candidate(candidate) for candidate in candidates]
+
+    async def close(self):
+        """Release connections held to the external system."""
+
 
 class MockConnector(BaseConnector):
     """Mock connector that simulates external API calls."""
 
-    def __init__(self, name: str, system_type: str, color: str, record_count: int):
+    BACKFILL = timedelta(hours=1)  # what a first sync pulls
+    MAX_BACKLOG = timedelta(days=1)
+
+    def __init__(self, name: str, system_type: str, color: str, record_count: int, failing: bool = False):
         super().__init__(name, system_type, color)
         self.record_count = record_count
+        self.change_rate = record_count / 100_000  # simulated changes per second upstream
+        self.failing = failing
 
-    async def sync(self) -> Dict[str, Any]:
-        new_records = random.randint(5, 50)
+    async def sync(self, cursor: Optional[str] = None) -> Dict[str, Any]:
+        if self.failing:
+            raise ConnectionError(f"{self.name} is unreachable")
+        now = datetime.now(timezone.utc)
+        since = datetime.fromisoformat(cursor) if cursor else now - self.BACKFILL
+        elapsed = min(now - since, self.MAX_BACKLOG).total_seconds()
+        pending = int(elapsed * self.change_rate * random.uniform(0.8, 1.2))
+        new_records, pages = 0, 0
+        while pending > 0:
+            page = min(pending, settings.sync_page_size)
+            await asyncio.sleep(0.02 + page * 0.0002)  # one API round trip per page
+            new_records += page
+            pending -= page
+            pages += 1
         self.record_count += new_records
-        self.last_sync = datetime.now(timezone.utc)
+        self.last_sync = now
         return {
             "status": "success",
             "new_records": new_records,
+            "pages": pages,
             "total_records": self.record_count,
+            "cursor": now.isoformat(),
         }
 
     async def search(self, query: str) -> List[Dict[str, Any]]:
+        if self.failing:
+            raise ConnectionError(f"{self.name} is unreachable")
+        # Most answers are quick; about one in ten is stuck behind a slow upstream
+        await asyncio.sleep(random.uniform(0.02, 0.2) if random.random() > 0.1 else random.uniform(0.4, 1.5))
+        names = random.sample(SAMPLE_NAMES, random.randint(3, 10))
         return [
-            {"name": f"Candidate from {self.name}", "source": self.name, "score": random.randint(70, 99)}
-            for _ in range(random.randint(3, 10))
+            {
+                "name": name,
+                "email": f"{name.lower().replace(' ', '.')}@example.com",
+                "source": self.name,
+                "score": random.randint(70, 99),
+            }
+            for name in names
         ]
 
     async def push_candidate(self, candidate: Dict[str, Any]) -> bool:
         return True
 
 
+class HttpConnector(BaseConnector):
+    """
+    Connector for an ATS with a REST API (what `python cli.py mock-ats` serves):
+
+        GET  /candidates?since=<cursor>&limit=n  -> {items, cursor, has_more, total}
+        GET  /search?q=...&limit=n               -> {items: [{name, email, score}]}
+        POST /candidates/batch {candidates: []}  -> {results: [{status, id}]}
+
+    Requests go through a ConnectorTransport (token bucket, retries) and
+    single pushes are gathered into batch requests.
+    """
+
+    def __init__(self, name: str, system_type: str, color: str, url: str, rate: Optional[float] = None,
+                 burst: Optional[int] = None, api_key: Optional[str] = None, batch_size: Optional[int] = None):
+        super().__init__(name, system_type, color)
+        self.transport = ConnectorTransport(
+            name, url, rate, burst, headers={"Authorization": f"Bearer {api_key}"} if api_key else None,
+        )
+        self.batcher = PushBatcher(self.push_candidates, batch_size)
+        self.push_requests = 0
+        self.pushed = 0
+
+    async def sync(self, cursor: Optional[str] = None) -> Dict[str, Any]:
+        new_records, pages = 0, 0
+        while True:
+            page = await self.transport.request(
+                "GET", "/candidates", params={"since": cursor or "", "limit": settings.sync_page_size},
+            )
+            new_records += len(page["items"])
+            pages += 1
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+        self.record_count = page["total"]
+        self.last_sync = datetime.now(timezone.utc)
+        return {
+            "status": "success",
+            "new_records": new_records,
+            "pages": pages,
+            "total_records": self.record_count,
+            "cursor": cursor,
+        }
+
+    async def search(self, query: str) -> List[Dict[str, Any]]:
+        body = await self.transport.request("GET", "/search", params={"q": query, "limit": 20})
+        return [{**item, "source": self.name} for item in body["items"]]
+
+    async def push_candidate(self, candidate: Dict[str, Any]) -> bool:
+        return await self.batcher.push(candidate)
+
+    async def push_candidates(self, candidates: List[Dict[str, Any]]) -> List[bool]:
+        size = self.batcher.batch_size
+        chunks = await asyncio.gather(*(self._push_batch(candidates[i:i + size])
+                                        for i in range(0, len(candidates), size)))
+        return [pushed for chunk in chunks for pushed in chunk]
+
+    async def _push_batch(self, candidates: List[Dict[str, Any]]) -> List[bool]:
+        body = await self.transport.request(
+            "POST", "/candidates/batch", json={"candidates": candidates},
+            headers={"Idempotency-Key": uuid.uuid4().hex},  # the same key on every retry of this batch
+        )
+        self.push_requests += 1
+        self.pushed += len(candidates)
+        return [result["status"] in ("created", "updated") for result in body["results"]]
+
+    async def close(self):
+        await self.transport.close()
+
+
 class IntegrationAgent:
     """Manages external system connections via MCP-style connectors."""
 
@@ -82,6 +205,18 @@ class IntegrationAgent:
 
         # Simulate one with error
         self.connectors["HackerRank"].status = "error"
+        self.connectors["HackerRank"].failing = True
+
+        for system in settings.http_connectors:
+            self.add_http_connector(**system)
+
+    def add_http_connector(self, name: str, url: str, type: str = "ats", color: str = "#64748b",
+                           rate: Optional[float] = None, burst: Optional[int] = None, api_key: Optional[str] = None,
+                           batch_size: Optional[int] = None) -> "HttpConnector":
+        """Register a system reached over HTTP, with its own rate limit (default CONNECTOR_RATE_PER_SECOND)."""
+        connector = HttpConnector(name, type, color, url, rate, burst, api_key, batch_size)
+        self.connectors[name] = connector
+        return connector
 
     def get_systems(self) -> List[Dict[str, Any]]:
         """Get all connected systems and their status."""
@@ -97,17 +232,66 @@ class IntegrationAgent:
             for c in self.connectors.values()
         ]
 
-    async def sync_system(self, system_name: str) -> Dict[str, Any]:
-        """Trigger sync for a specific system."""
+    @instrumented("integration")
+    async def sync_system(self, system_name: str, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Pull changes since `cursor` from one system. Callers hold the connector's lock (see SyncScheduler)."""
         connector = self.connectors.get(system_name)
         if not connector:
-            return {"error": f"System '{system_name}' not found"}
+            raise LookupError(f"System '{system_name}' not found")
 
         connector.status = "syncing"
-        result = await connector.sync()
-        connector.status = "connected"
+        response_cache.invalidate("integration")
+        try:
+            with agent_metrics.track("integration", "sync", provider=connector.name):
+                async with api_logger.track("POST", f"{connector.endpoint}/sync", connector.name):
+                    result = await connector.sync(cursor)
+        except Exception:
+            connector.status = "error"
+            raise
+        else:
+            connector.status = "connected"
+        finally:
+            response_cache.invalidate("integration")
         return result
 
+    @instrumented("integration")
+    async def push_candidate(self, system_name: str, candidate: Dict[str, Any]) -> bool:
+        """Push one candidate to a connected system."""
+        connector = self.connectors.get(system_name)
+        if connector is None:
+            raise LookupError(f"System '{system_name}' not found")
+        if connector.status == "error":
+            raise ConnectionError(f"{system_name} is unavailable")
+        with agent_metrics.track("integration", "push_candidate", provider=connector.name):
+            async with api_logger.track("POST", f"{connector.endpoint}/candidates", connector.name):
+                pushed = await connector.push_candidate(candidate)
+        response_cache.invalidate("integration")
+        return pushed
+
+    @instrumented("integration")
+    async def push_candidates(self, system_name: str, candidates: List[Dict[str, Any]]) -> List[bool]:
+        """Push many candidates to a connected system, in as few requests as it allows."""
+        connector = self.connectors.get(system_name)
+        if connector is None:
+            raise LookupError(f"System '{system_name}' not found")
+        if connector.status == "error":
+            raise ConnectionError(f"{system_name} is unavailable")
+        with agent_metrics.track("integration", "push_candidates", provider=connector.name):
+            async with api_logger.track("POST", f"{connector.endpoint}/candidates/batch", connector.name):
+                pushed = await connector.push_candidates(candidates)
+        response_cache.invalidate("integration")
+        return pushed
+
+    @instrumented("integration")
+    async def search_system(self, system_name: str, query: str) -> List[Dict[str, Any]]:
+        """Search one connected system for candidates."""
+        connector = self.connectors.get(system_name)
+        if connector is None:
+            raise LookupError(f"System '{system_name}' not found")
+        with agent_metrics.track("integration", "search", provider=connector.name):
+            async with api_logger.track("GET", f"{connector.endpoint}/search", connector.name):
+                return await connector.search(query)
+
     def get_stats(self) -> Dict[str, int]:
         """Get aggregate connection stats."""
         systems = list(self.connectors.values())
@@ -118,33 +302,17 @@ class IntegrationAgent:
             "total_records": sum(s.record_count for s in systems),
         }
 
-    def generate_mock_logs(self, count: int = 10) -> List[Dict[str, Any]]:
-        """Generate mock API logs for the UI."""
-        methods = ["GET", "POST", "PUT"]
-        endpoints = [
-            "/api/v1/candidates/sync",
-            "/api/v1/profiles/batch",
-            "/api/v1/ats/greenhouse/push",
-            "/api/v1/candidates/search",
-            "/api/v1/profiles/enrich",
-            "/api/v1/assessments",
-            "/api/v1/candidates/match",
-            "/api/v1/ats/lever/update",
-        ]
-        sources = ["LinkedIn", "GitHub", "Greenhouse", "Internal DB", "Stack Overflow", "HackerRank", "Orchestrator", "Lever"]
-
-        logs = []
-        for i in range(count):
-            status = 200 if random.random() > 0.1 else random.choice([400, 500, 503])
-            logs.append({
-                "method": random.choice(methods),
-                "endpoint": random.choice(endpoints),
-                "source": random.choice(sources),
-                "status_code": status,
-                "duration_ms": random.randint(50, 500) if status < 400 else random.randint(1000, 3000),
-                "created_at": datetime.now(timezone.utc).isoformat(),
-            })
-        return logs
+    def transport_stats(self) -> Dict[str, Any]:
+        """Rate limiting, retry and batching counters of the HTTP connectors."""
+        return {
+            name: {**c.transport.snapshot(), "push_requests": c.push_requests, "pushed": c.pushed,
+                   "push_batching": c.batcher.snapshot()}
+            for name, c in self.connectors.items() if isinstance(c, HttpConnector)
+        }
+
+    async def close(self):
+        for connector in self.connectors.values():
+            await connector.close()
 
 
 integration_agent = IntegrationAgent()
@@ -3,7 +3,13 @@ Vision Agent – Extracts context from documents and images.
 Uses Gemini Vision for OCR and structured field extraction.
 """
 from typing import Dict, Any, List
+from config import settings
 from services.ai_service import ai_service
+from services.keyword_extractor import keyword_extractor
+from services.instrumentation import instrumented
+
+TEXT_TYPES = {"txt", "md", "csv", "json", "html", "htm", "rtf"}
+DICTIONARY_CONFIDENCE = 95
 
 
 class VisionAgent:
@@ -13,8 +19,14 @@ class VisionAgent:
 Return a valid JSON object with keys like: Name, Title, Company, Experience, Education, Skills, Email, Location.
 Do not use markdown or nested lists. Return a flat JSON object."""
 
+    DOCUMENT_FIELDS = ["Name", "Title", "Company", "Experience", "Education", "Skills", "Email", "Location"]
+
+    @instrumented("vision")
     async def process_document(self, file_bytes: bytes, filename: str, file_type: str) -> Dict[str, Any]:
         """Extract structured data from a document."""
+        if file_type in TEXT_TYPES and settings.keyword_fast_path:
+            return await self._process_text_document(file_bytes.decode("utf-8", errors="replace"))
+
         if file_type in ("png", "jpg", "jpeg", "webp"):
             # Moondream (Vision)
             result = await ai_service.extract_from_image(file_bytes, self.EXTRACTION_PROMPT)
@@ -43,6 +55,40 @@ Do not use markdown or nested lists. Return a flat JSON object."""
 
         return self._mock_extraction(filename)
 
+    async def _process_text_document(self, text: str) -> Dict[str, Any]:
+        """Fill Title, Skills, Experience, Email and Location from the keyword dictionary;
+        ask the LLM only for the remaining fields, with the document text inline."""
+        extraction = keyword_extractor.extract(text)
+        prefilled = {
+            "Title": extraction.job_title,
+            "Experience": extraction.experience,
+            "Skills": ", ".join(extraction.skills),
+            "Email": extraction.email,
+            "Location": extraction.location,
+        }
+        fields = [
+            {"field": name, "value": value, "confidence": DICTIONARY_CONFIDENCE}
+            for name, value in prefilled.items() if value
+        ]
+        missing = [k for k in self.DOCUMENT_FIELDS if not prefilled.get(k)]
+        if missing:
+            result = await ai_service.extract_from_text(
+                f"Extract these keys from the document below: {', '.join(missing)}. "
+                "Return a flat valid JSON object, no markdown.\n\n"
+                + text[:settings.keyword_max_prompt_chars]
+            )
+            if isinstance(result, dict):
+                fields.extend(
+                    {"field": k, "value": str(result[k]), "confidence": 85}
+                    for k in missing if result.get(k)
+                )
+            fields.sort(key=lambda f: self.DOCUMENT_FIELDS.index(f["field"]))
+        return {
+            "doc_type": "Resume" if extraction.skills or extraction.job_title else "Document",
+            "fields": fields,
+            "confidence_scores": {f["field"]: f["confidence"] for f in fields},
+        }
+
     def _mock_extraction(self, filename: str) -> Dict[str, Any]:
         """Fallback mock extraction when AI is unavailable."""
         return {
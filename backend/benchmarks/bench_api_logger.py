@@ -0,0 +1,63 @@
+"""
+Benchmark – per-record cost of API call logging and per-request middleware overhead.
+
+Usage (from backend/):
+    python -m benchmarks.bench_api_logger [--records 100000] [--requests 2000]
+"""
+import argparse
+import asyncio
+import time
+import httpx
+from fastapi import FastAPI
+from config import settings
+from services.api_logger import api_logger, ApiLogMiddleware
+
+
+def bench_record(n: int) -> float:
+    started = time.perf_counter()
+    for i in range(n):
+        api_logger.record("GET", "/api/v1/candidates", 200, 12.5, "bench")
+    return (time.perf_counter() - started) / n * 1e6
+
+
+async def bench_requests(n: int, with_middleware: bool) -> float:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if with_middleware:
+        app.add_middleware(ApiLogMiddleware)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(100):
+            await client.get("/ping")
+        started = time.perf_counter()
+        for _ in range(n):
+            await client.get("/ping")
+        return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=2_000)
+    args = parser.parse_args()
+
+    per_record = bench_record(args.records)
+    print(f"record():            {per_record:8.2f} µs/record  (budget {settings.api_log_overhead_budget_us} µs)")
+
+    baseline = asyncio.run(bench_requests(args.requests, with_middleware=False))
+    logged = asyncio.run(bench_requests(args.requests, with_middleware=True))
+    print(f"request w/o logging: {baseline:8.2f} µs/request")
+    print(f"request w/ logging:  {logged:8.2f} µs/request")
+    print(f"middleware overhead: {logged - baseline:8.2f} µs/request")
+
+    status = "OK" if per_record <= settings.api_log_overhead_budget_us else "OVER BUDGET"
+    print(f"→ {status}")
+
+
+if __name__ == "__main__":
+    main()
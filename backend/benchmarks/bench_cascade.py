@@ -0,0 +1,100 @@
+"""
+Benchmark – cascade classifier: LLM calls avoided vs accuracy, and local latency.
+
+Generates noisy synthetic labeled candidates (skills drawn mostly from the
+category's pool plus off-category noise, titles sometimes generic or missing,
+experience loosely tied to seniority, culture fit loosely tied to seniority
+and leadership skills), fits the local models exactly as
+POST /classification/cascade/train does, and prints the holdout trade-off:
+share of candidates answered locally and their accuracy at each threshold.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cascade [--candidates 5000]
+"""
+import argparse
+import random
+import time
+
+from services.cascade_classifier import CascadeClassifier
+
+POOLS = {
+    "Machine Learning": (["Python", "PyTorch", "TensorFlow", "MLOps", "NLP", "JAX", "Deep Learning", "Pandas"],
+                         ["ML Engineer", "Machine Learning Engineer", "Research Scientist", "AI Engineer"]),
+    "Frontend Engineering": (["React", "TypeScript", "CSS", "Next.js", "Vue", "Redux", "HTML", "GraphQL"],
+                             ["Frontend Engineer", "Front-end Developer", "UI Engineer"]),
+    "Backend Engineering": (["Go", "Java", "PostgreSQL", "gRPC", "Kafka", "Redis", "Django", "Microservices"],
+                            ["Backend Engineer", "Backend Developer", "Server Engineer"]),
+    "DevOps / SRE": (["Terraform", "Kubernetes", "Docker", "AWS", "CI/CD", "Prometheus", "Ansible", "Linux"],
+                     ["DevOps Engineer", "SRE", "Platform Engineer", "Infrastructure Engineer"]),
+    "Product Design": (["Figma", "User Research", "Design Systems", "Prototyping", "Sketch"],
+                       ["Product Designer", "UX Designer", "Interaction Designer"]),
+    "Data Science": (["Python", "SQL", "Spark", "Tableau", "Scikit-learn", "Statistics", "R", "dbt"],
+                     ["Data Scientist", "Data Analyst", "Analytics Engineer"]),
+    "Engineering Management": (["Leadership", "Agile", "System Design", "Go", "Java", "Scrum"],
+                               ["Engineering Manager", "Head of Engineering", "Director of Engineering"]),
+    "Mobile Development": (["Swift", "Kotlin", "React Native", "Firebase", "iOS", "Android", "Flutter"],
+                           ["Mobile Engineer", "iOS Developer", "Android Developer"]),
+}
+GENERIC_TITLES = ["Software Engineer", "Developer", "Engineer", "Consultant", ""]
+LEVELS = {"Junior": (0, 2), "Mid": (2, 5), "Senior": (5, 9), "Staff": (9, 14), "Principal": (14, 22)}
+CULTURE_FITS = ["Low", "Medium", "High", "Very High"]
+PREFIXES = {"Junior": "Junior", "Senior": "Senior", "Staff": "Staff", "Principal": "Principal", "Mid": ""}
+
+
+def synthetic_labeled(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    all_skills = sorted({s for skills, _ in POOLS.values() for s in skills})
+    rows = []
+    for _ in range(n):
+        category = rng.choice(list(POOLS))
+        seniority = rng.choice(list(LEVELS))
+        skills_pool, titles = POOLS[category]
+        skills = rng.sample(skills_pool, rng.randint(1, 4)) + rng.sample(all_skills, rng.randint(0, 3))
+        title = rng.choice(titles) if rng.random() < 0.6 else rng.choice(GENERIC_TITLES)
+        if title and rng.random() < 0.5:
+            title = f"{PREFIXES[seniority]} {title}".strip()
+        low, high = LEVELS[seniority]
+        years = max(0, int(rng.uniform(low, high) + rng.gauss(0, 1.5)))
+        experience = f"{years} years" if rng.random() < 0.85 else None
+        fit = min(3, list(LEVELS).index(seniority) // 2 + 1 + ("Leadership" in skills))
+        culture_fit = CULTURE_FITS[fit] if rng.random() < 0.7 else rng.choice(CULTURE_FITS)
+        rows.append(({"title": title, "skills": skills, "experience": experience}, category, seniority, culture_fit))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=5000)
+    args = parser.parse_args()
+
+    labeled = synthetic_labeled(args.candidates)
+    classifier = CascadeClassifier()
+
+    started = time.perf_counter()
+    for data, *_ in labeled[:2000]:
+        classifier.classify(data)
+    per_call = (time.perf_counter() - started) / min(2000, len(labeled)) * 1e6
+    print(f"rules-only local classification: {per_call:.0f} µs per candidate")
+
+    started = time.perf_counter()
+    report = classifier._fit(labeled)
+    print(f"fitted on {report['labeled_rows']:,} labels in {time.perf_counter() - started:.1f}s "
+          f"(holdout {report['holdout_rows']:,})")
+    print(f"category accuracy: rules {report['rules_accuracy']:.1%} -> model {report['category_accuracy']:.1%}; "
+          f"seniority {report['seniority_accuracy']:.1%}; culture fit {report['culture_fit_accuracy']:.1%}")
+    print(f"expected calibration error: rules {report['calibration_error_rules']:.3f} -> "
+          f"calibrated model {report['calibration_error']:.3f} (T={report['category_temperature']})")
+    print(f"{'threshold':>9} {'answered locally':>17} {'local accuracy':>15} {'overall accuracy':>17}")
+    for row in report["tradeoff"]:
+        local_accuracy = f"{row['local_accuracy']:.1%}" if row["local_accuracy"] is not None else "-"
+        print(f"{row['threshold']:>9} {row['local_share']:>17.1%} {local_accuracy:>15} {row['overall_accuracy']:>17.1%}")
+
+    started = time.perf_counter()
+    for data, *_ in labeled[:2000]:
+        classifier.classify(data)
+    per_call = (time.perf_counter() - started) / min(2000, len(labeled)) * 1e6
+    print(f"trained local classification: {per_call:.0f} µs per candidate")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark – entity resolution precision, recall and throughput on synthetic multi-source candidates.
+
+Generates --people people, each appearing in one to four sources with the
+variations real feeds have: personal vs work email or none, "Last First"
+order, initials, accents, legal suffixes on the company, partial skill lists.
+Distinct people share names, so blocking on names alone is not enough.
+Runs the in-memory Resolver (blocking + MinHash/LSH + verification) over all
+records and scores the clusters against the ground truth by pairs. For
+scale, the same verification is timed over every pair of a --sample subset
+and extrapolated to the full set.
+
+Usage (from backend/):
+    python -m benchmarks.bench_entity_resolution [--people 20000] [--sample 2000] [--seed 7]
+"""
+import argparse
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from services.entity_resolution import Resolver, clusters
+
+FIRST = ["James", "Maria", "Wei", "Aisha", "Jordan", "Priya", "Lucas", "Fatima", "Noah", "Yuki", "Elena", "Omar",
+         "Sofia", "Daniel", "Mei", "Carlos", "Anna", "David", "Leila", "Mateo", "Sara", "Ivan", "Nora", "Ravi",
+         "Chloe", "Kofi", "Ines", "Tomas", "Hana", "Ali", "Julia", "Sam", "Zoe", "Ben", "Lena", "Arjun", "Mia", "Leo",
+         "Ayumi", "Hugo"]
+LAST = ["Smith", "García", "Chen", "Khan", "Lee", "Sharma", "Silva", "Müller", "Tanaka", "Rossi", "Kim", "Nguyen",
+        "Brown", "Ivanova", "Okafor", "Novak", "Haddad", "Cohen", "Lopez", "Patel", "Johansson", "Dubois", "Santos",
+        "Kowalski", "Yilmaz", "Murphy", "Costa", "Schmidt", "Wang", "Ali", "Moreau", "Fischer", "Park", "Singh",
+        "Reyes", "Bauer", "Ito", "Nowak", "Hansen", "Jones", "Petrov", "Mendes", "Walsh", "Ahmed", "Klein", "Sato",
+        "Horvat", "Romero", "Berg", "Quinn"]
+ROLES = {
+    "Backend Engineer": ["Python", "Go", "PostgreSQL", "Kubernetes", "Redis", "Kafka", "gRPC", "Docker", "AWS", "Java"],
+    "Frontend Engineer": ["React", "TypeScript", "CSS", "Next.js", "GraphQL", "Redux", "Webpack", "Jest", "HTML"],
+    "ML Engineer": ["PyTorch", "Python", "MLOps", "Spark", "SQL", "TensorFlow", "Kubeflow", "NumPy", "Pandas"],
+    "Data Engineer": ["Airflow", "Spark", "SQL", "dbt", "Snowflake", "Kafka", "Python", "Scala", "BigQuery"],
+    "DevOps Engineer": ["Terraform", "Kubernetes", "AWS", "Ansible", "Prometheus", "Linux", "Docker", "Helm"],
+    "Mobile Engineer": ["Swift", "Kotlin", "iOS", "Android", "Flutter", "React Native", "Firebase", "GraphQL"],
+    "Security Engineer": ["Pentesting", "SIEM", "Python", "AWS", "Threat Modeling", "Burp Suite", "Linux", "IAM"],
+    "Product Designer": ["Figma", "User Research", "Prototyping", "Design Systems", "Sketch", "Accessibility"],
+}
+EXTRA_SKILLS = [
+    "Git", "Agile", "Scrum", "JIRA", "Bash", "C++", "C#", "Rust", "Ruby", "Rails", "PHP", "Laravel", "Django", "Flask",
+    "FastAPI", "Node.js", "Express", "Vue", "Angular", "Svelte", "Elixir", "Erlang", "Haskell", "OCaml", "R", "MATLAB",
+    "Julia", "Lua", "Perl", "Objective-C", "Dart", "Groovy", "Jenkins", "GitLab CI", "CircleCI", "GitHub Actions",
+    "Azure", "GCP", "OpenStack", "Nginx", "Apache", "RabbitMQ", "NATS", "ZeroMQ", "Cassandra", "MongoDB", "DynamoDB",
+    "Elasticsearch", "Solr", "Neo4j", "ClickHouse", "Druid", "Presto", "Trino", "Hive", "Hadoop", "Flink", "Beam",
+    "Looker", "Tableau", "Power BI", "Excel", "Statistics", "A/B Testing", "Mentoring", "Public Speaking",
+    "Technical Writing", "System Design", "Microservices", "Event Sourcing", "CQRS", "DDD", "TDD", "OAuth", "OpenAPI",
+    "WebSockets", "WebRTC", "WASM", "Three.js", "D3", "Storybook", "Tailwind", "Sass", "Cypress", "Playwright",
+    "Selenium", "Unity", "Unreal", "OpenCV", "NLP", "Computer Vision", "LLMs", "RAG", "Recommendation Systems",
+]
+COMPANIES = [f"{a} {b}" for a, b in itertools.product(
+    ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Cyberdyne", "Tyrell", "Soylent",
+     "Vandelay", "Pied", "Massive", "Aperture", "Black Mesa", "Oscorp", "Gringotts", "Monarch", "Dunder"],
+    ["Labs", "Systems", "Software", "Analytics", "Cloud", "Health", "Robotics", "Finance", "Media", "Energy"])]
+SOURCES = ["LinkedIn", "GitHub", "Greenhouse", "Lever", "AngelList"]
+ACCENTS = str.maketrans("íáéóúüç", "iaeouuc")
+
+
+@dataclass
+class Row:
+    id: int
+    name: str
+    email: Optional[str]
+    company: Optional[str]
+    title: str
+    skills: List[str] = field(default_factory=list)
+    source: str = ""
+    person: int = 0
+
+
+def generate(people: int, rng: random.Random) -> List[Row]:
+    rows = []
+    for person in range(people):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        role = rng.choice(list(ROLES))
+        skills = rng.sample(ROLES[role], rng.randint(3, 6)) + rng.sample(EXTRA_SKILLS, rng.randint(3, 6))
+        company = rng.choice(COMPANIES)
+        personal = f"{first}.{last}{person}@gmail.com".lower().translate(ACCENTS)
+        work = f"{first}.{last}@{company.replace(' ', '')}.com".lower().translate(ACCENTS)
+        for source in rng.sample(SOURCES, rng.choice([1, 1, 2, 2, 3, 4])):
+            name = rng.choice([f"{first} {last}", f"{first} {last}", f"{last} {first}", f"{first[0]}. {last}",
+                               f"{first} {last}".translate(ACCENTS)])
+            email = rng.choice([personal, personal, work, personal.upper(), None])
+            kept = [s if rng.random() < 0.7 else s.lower() for s in skills if rng.random() < 0.8]
+            rows.append(Row(
+                id=len(rows) + 1,
+                name=name,
+                email=email,
+                company=rng.choice([company, f"{company} Inc", company.upper(), None]),
+                title=rng.choice(["", "Senior ", "Lead "]) + role,
+                skills=kept,
+                source=source,
+                person=person,
+            ))
+    rng.shuffle(rows)
+    return rows
+
+
+def pairs(groups):
+    return {(a, b) for group in groups for a, b in itertools.combinations(sorted(group), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=20_000)
+    parser.add_argument("--sample", type=int, default=2_000, help="records verified pairwise for the baseline")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rows = generate(args.people, random.Random(args.seed))
+    truth = {}
+    for row in rows:
+        truth.setdefault(row.person, []).append(row.id)
+
+    resolver = Resolver()
+    started = time.perf_counter()
+    resolver.add(rows)
+    indexed = time.perf_counter()
+    matches = resolver.match([row.id for row in rows])
+    finished = time.perf_counter()
+
+    predicted, expected = pairs(clusters(matches)), pairs(truth.values())
+    correct = len(predicted & expected)
+    n = len(rows)
+    print(f"{n} records of {args.people} people from {len(SOURCES)} sources, {len(expected)} true duplicate pairs")
+    print(f"  blocking:   {resolver.comparisons} comparisons vs {n * (n - 1) // 2} pairwise "
+          f"({resolver.comparisons / max(1, n):.1f} per record), {resolver.oversized} oversized blocks skipped")
+    print(f"  time:       index {(indexed - started) * 1000:.0f} ms + match {(finished - indexed) * 1000:.0f} ms"
+          f"  = {n / (finished - started):,.0f} records/s")
+    print(f"  precision:  {correct / max(1, len(predicted)):.4f}   ({len(predicted) - correct} wrong pairs)")
+    print(f"  recall:     {correct / max(1, len(expected)):.4f}   ({len(expected) - correct} missed pairs)")
+    by_rule = {}
+    for m in matches:
+        by_rule[m.rule] = by_rule.get(m.rule, 0) + 1
+    print(f"  rules:      {by_rule}")
+
+    sample = rows[:args.sample]
+    baseline = Resolver()
+    baseline.add(sample)
+    records = [baseline.records[row.id] for row in sample]
+    started = time.perf_counter()
+    for a, b in itertools.combinations(records, 2):
+        baseline.verify(a, b)
+    per_pair = (time.perf_counter() - started) / (len(records) * (len(records) - 1) // 2)
+    print(f"  pairwise:   {per_pair * 1e6:.2f} µs/pair over {len(records)} records; "
+          f"all {n} records would take {per_pair * n * (n - 1) / 2:,.0f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark – live feed fan-out at 1k connected clients.
+
+Two measurements:
+  bus  – N in-process subscribers draining their buffers like the SSE/WS send
+         loops do; reports publish cost per event and per delivery, and
+         publish-to-receive latency. A fraction of the subscribers never
+         read, to show they are evicted without slowing anyone else.
+  sse  – the real /dashboard/stream endpoint served by uvicorn on a local
+         port with N HTTP clients attached; reports end-to-end latency.
+
+Usage (from backend/):
+    python -m benchmarks.bench_event_bus [--clients 1000] [--events 300] [--rate 100] [--stalled 0.01] [--skip-sse]
+"""
+import argparse
+import asyncio
+import socket
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from config import settings
+from services.event_bus import EventBus, event_bus
+
+
+def percentiles(latencies_ms):
+    latencies_ms.sort()
+    pick = lambda q: latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * q))]
+    return f"p50 {pick(0.5):6.2f} ms  p99 {pick(0.99):6.2f} ms  max {latencies_ms[-1]:6.2f} ms"
+
+
+async def bench_bus(clients: int, events: int, rate: float, stalled: float):
+    bus = EventBus()
+    latencies = []
+    stalled_count = int(clients * stalled)
+    subscribers = [bus.subscribe(["activity"]) for _ in range(clients)]
+
+    async def consume(subscriber):
+        received = 0
+        while received < events and not subscriber.evicted:
+            for message in await subscriber.next_batch(5):
+                message.sse  # encoded once, shared by every client
+                latencies.append((time.perf_counter() - message.payload["sent"]) * 1000)
+                received += 1
+            await asyncio.sleep(0)  # stands in for the socket write
+
+    consumers = [asyncio.create_task(consume(s)) for s in subscribers[stalled_count:]]
+    publish_time = 0.0
+    for i in range(events):
+        started = time.perf_counter()
+        bus.publish("activity", {"agent": "bench", "action": f"event {i}", "sent": started})
+        publish_time += time.perf_counter() - started
+        await asyncio.sleep(1 / rate)
+    await asyncio.wait_for(asyncio.gather(*consumers), 30)
+
+    per_event = publish_time / events * 1e6
+    print(f"bus: {clients} clients ({stalled_count} stalled), {events} events at {rate:g}/s, "
+          f"buffer {settings.event_bus_client_buffer}")
+    print(f"  publish:    {per_event:8.1f} µs/event   {per_event / clients * 1000:6.0f} ns/delivery")
+    print(f"  latency:    {percentiles(latencies)}   ({len(latencies)} deliveries)")
+    print(f"  evicted:    {bus.evicted} (stalled clients cut off once their buffer filled)")
+
+
+async def bench_sse(clients: int, events: int, rate: float):
+    from routers.dashboard import router
+
+    app = FastAPI()
+    app.include_router(router)
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", backlog=clients * 2))
+    serving = asyncio.create_task(server.serve(sockets=[sock]))
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    latencies = []
+    connected = asyncio.Semaphore(0)
+    limits = httpx.Limits(max_connections=clients + 10, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+        async def listen():
+            received = 0
+            async with client.stream("GET", "/dashboard/stream?topics=activity") as response:
+                connected.release()
+                async for line in response.aiter_lines():
+                    if line.startswith("data: "):
+                        sent = float(line.split('"sent":', 1)[1].rstrip("}"))
+                        latencies.append((time.perf_counter() - sent) * 1000)
+                        received += 1
+                        if received == events:
+                            return
+
+        listeners = [asyncio.create_task(listen()) for _ in range(clients)]
+        for _ in range(clients):
+            await connected.acquire()
+        while sum(len(s) for s in event_bus.subscribers.values()) < clients:
+            await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        for i in range(events):
+            event_bus.publish("activity", {"agent": "bench", "action": f"event {i}", "sent": time.perf_counter()})
+            await asyncio.sleep(1 / rate)
+        await asyncio.wait_for(asyncio.gather(*listeners), 60)
+        elapsed = time.perf_counter() - started
+
+    server.should_exit = True
+    await serving
+    print(f"sse: {clients} HTTP clients on uvicorn, {events} events at {rate:g}/s")
+    print(f"  latency:    {percentiles(latencies)}   ({len(latencies)} deliveries in {elapsed:.1f}s, "
+          f"client and server share one loop)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=100.0, help="events published per second")
+    parser.add_argument("--stalled", type=float, default=0.01, help="fraction of bus subscribers that never read")
+    parser.add_argument("--skip-sse", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(bench_bus(args.clients, args.events, args.rate, args.stalled))
+    if not args.skip_sse:
+        asyncio.run(bench_sse(args.clients, args.events, args.rate))
+
+
+if __name__ == "__main__":
+    main()
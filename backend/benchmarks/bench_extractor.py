@@ -0,0 +1,81 @@
+"""
+Benchmark – dictionary skill/title extraction throughput in MB/s.
+
+Generates resume-like documents (vocabulary terms mixed into filler prose) and
+times the Aho-Corasick extractor against the naive approach of one word-bounded
+regex per alias, which rescans the text for every dictionary entry.
+
+Usage (from backend/):
+    python -m benchmarks.bench_extractor [--megabytes 20] [--doc-kb 4]
+"""
+import argparse
+import random
+import re
+import time
+
+from services.keyword_extractor import keyword_extractor, tokenize
+from services.vocabulary import LOCATIONS, SENIORITY, SKILLS, TITLES
+
+FILLER = ("led delivered built designed scaled the a team platform across users reliability with for and "
+          "improved latency cost projects customers worked on owned migration of to in from production").split()
+
+
+def synthetic_documents(megabytes: float, doc_kb: float, seed: int = 3):
+    rng = random.Random(seed)
+    terms = [alias for vocab in (SKILLS, TITLES, SENIORITY, LOCATIONS) for canonical, aliases in vocab.items()
+             for alias in [canonical, *aliases]]
+    docs, total = [], 0
+    while total < megabytes * 1e6:
+        words, size = [], 0
+        while size < doc_kb * 1000:
+            word = rng.choice(terms) if rng.random() < 0.08 else rng.choice(FILLER)
+            words.append(word + ("," if rng.random() < 0.1 else ""))
+            size += len(word) + 1
+        doc = f"{rng.randint(1, 15)}+ years. " + " ".join(words)
+        docs.append(doc)
+        total += len(doc)
+    return docs, total
+
+
+def naive_extract(patterns, text: str):
+    return {canonical for canonical, pattern in patterns if pattern.search(text)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--megabytes", type=float, default=20)
+    parser.add_argument("--doc-kb", type=float, default=4)
+    args = parser.parse_args()
+
+    docs, total = synthetic_documents(args.megabytes, args.doc_kb)
+    print(f"{len(docs):,} documents, {total / 1e6:.1f} MB, automaton of {keyword_extractor.automaton.states} states")
+
+    started = time.perf_counter()
+    tokens = sum(len(tokenize(d)) for d in docs)
+    tokenize_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    skills = sum(len(keyword_extractor.extract(d).skills) for d in docs)
+    elapsed = time.perf_counter() - started
+
+    patterns = [
+        (canonical, re.compile(rf"(?<![\w+#]){re.escape(alias.lower())}(?![\w+#])"))
+        for canonical, aliases in SKILLS.items() for alias in [canonical, *aliases]
+    ]
+    sample = docs[:max(1, len(docs) // 20)]
+    sample_bytes = sum(len(d) for d in sample)
+    started = time.perf_counter()
+    for d in sample:
+        naive_extract(patterns, d.lower())
+    naive = time.perf_counter() - started
+
+    print(f"{'method':<34} {'MB/s':>8} {'docs/s':>10}")
+    print(f"{'tokenize only':<34} {total / 1e6 / tokenize_s:>8.1f} {len(docs) / tokenize_s:>10,.0f}")
+    print(f"{'aho-corasick (full extract)':<34} {total / 1e6 / elapsed:>8.1f} {len(docs) / elapsed:>10,.0f}")
+    print(f"{f'regex per alias ({len(patterns)} patterns)':<34} {sample_bytes / 1e6 / naive:>8.1f} "
+          f"{len(sample) / naive:>10,.0f}")
+    print(f"{tokens:,} tokens, {skills:,} skills extracted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark – materialized intake leaderboards vs rescoring on every view.
+
+Builds a synthetic pool of N candidates, materializes one intake's board, then
+runs rounds of random edits (new skills and experience, hires, new candidates).
+Each round is applied incrementally to the board and checked against a full
+rebuild from the edited pool, so the output shows both the per-view and
+per-update cost and that the incremental board never drifts.
+
+Usage (from backend/):
+    python -m benchmarks.bench_leaderboard [--candidates 200000] [--rounds 20] [--changes 200]
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import namedtuple
+
+from benchmarks.bench_matching import LOCATIONS, VOCAB
+from config import settings
+from services.leaderboard import Board, _mini_pool, rounded, select_top
+from services.matching_engine import MatchingEngine, Requirements
+
+Row = namedtuple("Row", "id name title status skills experience location category")
+REQUIREMENT = {"skills": ["python", "kubernetes", "go"], "experience": "5-8 years", "location": "San Francisco, CA"}
+
+
+def random_row(rng: random.Random, candidate_id: int, status: str = "new") -> Row:
+    skills = rng.choices(VOCAB[:200], k=rng.randint(3, 10))
+    return Row(candidate_id, f"Candidate {candidate_id}", "Engineer", status, skills,
+               f"{rng.randint(0, 19)} years", rng.choice(LOCATIONS), None)
+
+
+def build(rows, requirements: Requirements, intake_id: int = 1) -> Board:
+    open_rows = [r for r in rows if r.status != "hired"]
+    pool = _mini_pool(open_rows)
+    scores = MatchingEngine.score(pool, requirements, top_k=0).all_scores
+    top, floor = select_top(pool.ids, scores, settings.leaderboard_size + settings.leaderboard_headroom)
+    board = Board(intake_id, requirements, keys=[], entries={}, floor=floor)
+    ids = [int(i) for i in pool.ids[top]]
+    board.fill(open_rows, ids, rounded(scores[top]))
+    return board
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--changes", type=int, default=200, help="Candidates edited per round")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    rows = {i: random_row(rng, i) for i in range(1, args.candidates + 1)}
+    requirements = Requirements.from_parsed(REQUIREMENT)
+
+    pool = _mini_pool(list(rows.values()))
+    rescore = []
+    for _ in range(20):
+        started = time.perf_counter()
+        MatchingEngine.score(pool, requirements, settings.leaderboard_size)
+        rescore.append((time.perf_counter() - started) * 1000)
+
+    board = build(rows.values(), requirements)
+    serve = []
+    for _ in range(2000):
+        started = time.perf_counter()
+        board.top(settings.leaderboard_size)
+        serve.append((time.perf_counter() - started) * 1000)
+    print(f"view of top {settings.leaderboard_size} over {args.candidates:,} candidates: "
+          f"rescore p50 {statistics.median(rescore):.2f} ms, board p50 {statistics.median(serve) * 1000:.1f} µs")
+
+    update_ms, drift, rebuilds, versions = [], 0, 0, 0
+    next_id = args.candidates + 1
+    for _ in range(args.rounds):
+        changed = rng.sample(list(rows), args.changes)
+        # Bias some edits toward the board so removals and reorders are exercised
+        on_board = min(args.changes // 10, len(board.entries))
+        changed[:on_board] = rng.sample(list(board.entries), on_board)
+        for candidate_id in changed:
+            if rng.random() < 0.1:
+                rows[candidate_id] = rows[candidate_id]._replace(status="hired")
+            else:
+                rows[candidate_id] = random_row(rng, candidate_id)
+        for _ in range(args.changes // 10):
+            rows[next_id] = random_row(rng, next_id)
+            changed.append(next_id)
+            next_id += 1
+        changed = list(dict.fromkeys(changed))
+
+        started = time.perf_counter()
+        open_rows = [rows[i] for i in changed if rows[i].status != "hired"]
+        mini = _mini_pool(open_rows)
+        version = board.version
+        board.update(changed, open_rows, MatchingEngine.score(mini, requirements, top_k=0).all_scores)
+        versions += board.version != version
+        update_ms.append((time.perf_counter() - started) * 1000)
+
+        fresh = build(rows.values(), requirements)
+        if board.short:
+            rebuilds += 1
+            board = fresh
+            continue
+        served = settings.leaderboard_size
+        drift += len({(e["candidate_id"], e["score"]) for e in board.top(served)}
+                     ^ {(e["candidate_id"], e["score"]) for e in fresh.top(served)}) // 2
+
+    print(f"{args.rounds} rounds of {args.changes} edits: incremental update p50 {statistics.median(update_ms):.2f} ms")
+    print(f"top-{settings.leaderboard_size} changed in {versions}/{args.rounds} rounds; "
+          f"forced rebuilds {rebuilds}; entries differing from a full rebuild: {drift}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark – vectorized matching of intake requirements against the candidate pool.
+
+By default builds a synthetic pool of N candidates in memory (Zipf-distributed
+skills, random experience and locations) and times scoring + top-k selection.
+With --db, loads the pool from an existing database instead (e.g. the one left
+by bench_skill_index) and also reports the pool build time.
+
+Usage (from backend/):
+    python -m benchmarks.bench_matching [--candidates 1000000] [--db /tmp/skill_bench.db]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from services.matching_engine import CandidatePool, MatchingEngine, Requirements
+
+VOCAB = ["python", "go", "kubernetes", "react", "aws", "sql", "docker", "typescript"] + [
+    f"skill-{i}" for i in range(2000)
+]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Seattle, WA", "London, UK", "Remote", "Berlin", None]
+
+REQUIREMENTS = [
+    {"skills": ["python"], "experience": "3+ years"},
+    {"skills": ["python", "kubernetes", "go"], "experience": "5-8 years", "location": "San Francisco, CA"},
+    {"skills": ["react", "typescript", "skill-40", "skill-900"], "location": "Remote (US timezone)"},
+    {"skills": ["skill-1500", "skill-1600", "skill-1700", "aws", "sql", "docker"], "experience": "10 years"},
+]
+
+
+def synthetic_pool(n: int, seed: int = 42) -> CandidatePool:
+    rng = np.random.default_rng(seed)
+    per_candidate = rng.integers(3, 11, size=n)
+    weights = 1 / np.arange(1, len(VOCAB) + 1)
+    pair_candidates = np.repeat(np.arange(1, n + 1, dtype=np.int64), per_candidate)
+    pair_skills = rng.choice(len(VOCAB), size=len(pair_candidates), p=weights / weights.sum()).astype(np.int32)
+    # Duplicate draws within a candidate collapse to one posting
+    pairs = np.unique(pair_candidates * len(VOCAB) + pair_skills)
+    counts = np.bincount(pairs // len(VOCAB) - 1, minlength=n)
+    skill_ids = (pairs % len(VOCAB)).astype(np.int32)
+    years = [f"{y} years" for y in rng.integers(0, 20, size=n)]
+    locations = [LOCATIONS[i] for i in rng.integers(0, len(LOCATIONS), size=n)]
+    return CandidatePool.from_columns(
+        np.arange(1, n + 1), years, locations, counts, skill_ids, {name: i for i, name in enumerate(VOCAB)},
+    )
+
+
+async def load_pool(db: str) -> CandidatePool:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db}")
+    started = time.perf_counter()
+    async with engine.connect() as conn:
+        pool = await MatchingEngine.build_pool(conn)
+    print(f"loaded pool of {pool.size:,} candidates from {db} in {time.perf_counter() - started:.1f}s")
+    await engine.dispose()
+    return pool
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=1_000_000)
+    parser.add_argument("--db", help="load the pool from this SQLite database instead of generating it")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.db:
+        pool = asyncio.run(load_pool(args.db))
+    else:
+        started = time.perf_counter()
+        pool = synthetic_pool(args.candidates)
+        print(f"generated pool of {pool.size:,} candidates ({pool.skills.nnz:,} skill postings) "
+              f"in {time.perf_counter() - started:.1f}s")
+    print(f"CSR matrix: {pool.skills.shape[0]:,} x {pool.skills.shape[1]:,}, "
+          f"{(pool.skills.data.nbytes + pool.skills.indices.nbytes + pool.skills.indptr.nbytes) / 1e6:.0f} MB")
+
+    print(f"{'requirement':<58} {'p50 ms':>8} {'p95 ms':>8} {'best':>6}")
+    for parsed in REQUIREMENTS:
+        req = Requirements.from_parsed(parsed)
+        timings, result = [], None
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            result = MatchingEngine.score(pool, req, args.top_k)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        label = ",".join(req.skills) + (f" {parsed.get('experience', '')}" if parsed.get("experience") else "")
+        print(f"{label[:58]:<58} {statistics.median(timings):>8.1f} "
+              f"{timings[int(len(timings) * 0.95) - 1]:>8.1f} {float(result.scores[0]):>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
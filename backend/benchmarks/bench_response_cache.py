@@ -0,0 +1,74 @@
+"""
+Benchmark – a burst of identical dashboard polls with and without the response cache.
+
+Simulates T tabs polling one endpoint at the same instant, R rounds in a row,
+against a compute that costs --compute-ms (a query plus serialization). Reports
+computations run, wall time per burst and the 304 path cost.
+
+Usage (from backend/):
+    python -m benchmarks.bench_response_cache [--tabs 200] [--rounds 20] [--compute-ms 20]
+"""
+import argparse
+import asyncio
+import time
+from fastapi import Request
+from services.response_cache import ResponseCache
+
+
+def make_request(etag: str = None) -> Request:
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": "/bench", "query_string": b"", "headers": headers})
+
+
+async def bench(tabs: int, rounds: int, compute_ms: float, cached: bool):
+    computations = 0
+    payload = [{"name": f"category {i}", "count": i, "percentage": i / 10} for i in range(40)]
+
+    async def compute(db):
+        nonlocal computations
+        computations += 1
+        await asyncio.sleep(compute_ms / 1000)
+        return payload
+
+    cache = ResponseCache()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if cached:
+            await asyncio.gather(*[cache.respond(make_request(), "bench", compute) for _ in range(tabs)])
+        else:
+            await asyncio.gather(*[compute(None) for _ in range(tabs)])
+    per_burst = (time.perf_counter() - started) / rounds * 1000
+    return computations, per_burst, cache
+
+
+async def bench_not_modified(cache: ResponseCache, n: int) -> float:
+    etag = (await cache.respond(make_request(), "bench", None)).headers["etag"]
+    started = time.perf_counter()
+    for _ in range(n):
+        await cache.respond(make_request(etag), "bench", None)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tabs", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--compute-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    computations, per_burst, _ = asyncio.run(bench(args.tabs, args.rounds, args.compute_ms, cached=False))
+    print(f"uncached: {computations:6d} computations   {per_burst:8.2f} ms/burst of {args.tabs}")
+
+    async def cached_run():
+        result = await bench(args.tabs, args.rounds, args.compute_ms, cached=True)
+        return result, await bench_not_modified(result[2], 10_000)
+
+    (computations, per_burst, cache), not_modified_us = asyncio.run(cached_run())
+    stats = cache.stats()["caches"]["bench"]
+    print(f"cached:   {computations:6d} computations   {per_burst:8.2f} ms/burst of {args.tabs}   "
+          f"(hits {stats['hits']}, coalesced {stats['coalesced']}, misses {stats['misses']})")
+    print(f"304 path: {not_modified_us:8.2f} µs/request (entry lookup + ETag compare, no body)")
+
+
+if __name__ == "__main__":
+    main()
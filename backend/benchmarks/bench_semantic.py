@@ -0,0 +1,110 @@
+"""
+Benchmark – semantic candidate search: embedding throughput and IVF recall/latency.
+
+Generates N synthetic candidate profiles, embeds them with the local hashing
+embedder into a temporary vector store, trains the IVF index and compares its
+top-k against brute force for several nprobe values.
+
+Usage (from backend/):
+    python -m benchmarks.bench_semantic [--candidates 200000] [--queries 200]
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from services.embeddings import HashingEmbedder
+from services.semantic_search import IVFIndex, VectorStore, profile_text
+
+TITLES = [
+    "ML Engineer", "Machine Learning Scientist", "Data Engineer", "Backend Engineer", "Frontend Developer",
+    "Full Stack Engineer", "SRE", "DevOps Engineer", "Product Manager", "Engineering Manager", "iOS Developer",
+    "Android Engineer", "QA Engineer", "Data Scientist", "NLP Researcher", "Security Engineer", "UX Designer",
+]
+SENIORITY = ["", "Junior", "Senior", "Staff", "Principal", "Lead"]
+SKILLS = ["python", "pytorch", "tensorflow", "go", "rust", "java", "react", "typescript", "kubernetes", "aws",
+          "gcp", "sql", "spark", "airflow", "terraform", "swift", "kotlin", "figma", "selenium", "docker"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Remote", "London, UK", "Berlin", "Bangalore"]
+QUERIES = ["ML Engineer", "senior machine learning pytorch", "react typescript frontend", "k8s SRE",
+           "data engineer spark airflow", "mobile developer kotlin", "product manager", "remote go backend"]
+
+
+def synthetic_profiles(n: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        yield profile_text(
+            f"{SENIORITY[rng.integers(len(SENIORITY))]} {TITLES[rng.integers(len(TITLES))]}".strip(),
+            list(rng.choice(SKILLS, size=rng.integers(2, 7), replace=False)),
+            f"{rng.integers(0, 20)} years",
+            COMPANIES[rng.integers(len(COMPANIES))],
+            LOCATIONS[rng.integers(len(LOCATIONS))],
+        )
+
+
+async def build_store(n: int, directory: str, batch: int) -> VectorStore:
+    embedder = HashingEmbedder(256)
+    store = VectorStore(directory, embedder.dim)
+    texts, next_id, started = [], 1, time.perf_counter()
+    for text in synthetic_profiles(n):
+        texts.append(text)
+        if len(texts) == batch:
+            store.upsert(list(range(next_id, next_id + batch)), await embedder.embed(texts))
+            next_id += batch
+            texts = []
+    if texts:
+        store.upsert(list(range(next_id, next_id + len(texts))), await embedder.embed(texts))
+    store.flush()
+    elapsed = time.perf_counter() - started
+    print(f"embedded {n:,} profiles in {elapsed:.1f}s ({n / elapsed:,.0f}/s, {elapsed / n * 1e6:.0f} µs each)")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=512)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = asyncio.run(build_store(args.candidates, directory, args.batch))
+        embedder = HashingEmbedder(256)
+        # Pad with profile-like queries so recall is not measured on a handful of queries
+        texts = QUERIES + list(synthetic_profiles(max(0, args.queries - len(QUERIES)), seed=99))
+        queries = asyncio.run(embedder.embed(texts))
+
+        timings, truth = [], []
+        for q in queries:
+            started = time.perf_counter()
+            rows, _ = store.search_exact(q, args.k)
+            timings.append((time.perf_counter() - started) * 1000)
+            truth.append(set(rows.tolist()))
+        print(f"{'method':<16} {'recall@' + str(args.k):>10} {'p50 ms':>8} {'p95 ms':>8}")
+        timings.sort()
+        print(f"{'brute force':<16} {1.0:>10.3f} {statistics.median(timings):>8.2f} "
+              f"{timings[int(len(timings) * 0.95) - 1]:>8.2f}")
+
+        started = time.perf_counter()
+        index = IVFIndex(store.dim)
+        index.train(store)
+        print(f"trained IVF index with {len(index.lists)} lists in {time.perf_counter() - started:.1f}s")
+
+        for nprobe in (1, 4, 8, 16, 32, 64):
+            timings, hits = [], 0
+            for q, expected in zip(queries, truth):
+                started = time.perf_counter()
+                rows, _ = index.search(store, q, args.k, nprobe)
+                timings.append((time.perf_counter() - started) * 1000)
+                hits += len(expected & set(rows.tolist()))
+            timings.sort()
+            print(f"{'ivf nprobe=' + str(nprobe):<16} {hits / (args.k * len(queries)):>10.3f} "
+                  f"{statistics.median(timings):>8.2f} {timings[int(len(timings) * 0.95) - 1]:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
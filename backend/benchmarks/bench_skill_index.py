@@ -0,0 +1,102 @@
+"""
+Benchmark – skill filter latency on the inverted index at scale.
+
+Builds a throwaway SQLite database with N synthetic candidates drawing skills
+from a Zipf-distributed vocabulary, indexes them, then times AND/OR filters
+through the same query path as GET /candidates.
+
+Usage (from backend/):
+    python -m benchmarks.bench_skill_index [--candidates 1000000] [--db /tmp/skill_bench.db]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from sqlalchemy import select, desc, insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from database import Base
+from models import Candidate, Skill, CandidateSkill
+from services.skill_index import skill_index
+
+VOCAB = [f"skill-{i}" for i in range(2000)]
+COMMON = ["python", "go", "kubernetes", "react", "aws", "sql", "docker", "typescript"]
+VOCAB = COMMON + VOCAB
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCAB))]
+
+QUERIES = [
+    (["python"], True),
+    (["kubernetes", "go"], True),
+    (["python", "aws", "docker"], True),
+    (["skill-500", "python"], True),
+    (["react", "typescript"], False),
+    (["skill-1500", "skill-1600", "skill-1700"], False),
+]
+
+
+async def populate(engine, n: int, batch: int = 50_000):
+    rng = random.Random(42)
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: Base.metadata.create_all(
+            c, tables=[Candidate.__table__, Skill.__table__, CandidateSkill.__table__]
+        ))
+    started = time.perf_counter()
+    next_id = 1
+    while next_id <= n:
+        size = min(batch, n - next_id + 1)
+        rows, pairs = [], []
+        for cid in range(next_id, next_id + size):
+            skills = list(set(rng.choices(VOCAB, weights=WEIGHTS, k=rng.randint(3, 10))))
+            rows.append({"id": cid, "name": f"Candidate {cid}", "skills": skills,
+                         "match_score": rng.uniform(50, 100), "status": "new"})
+            pairs.append((cid, skills))
+        async with engine.begin() as conn:
+            await conn.execute(insert(Candidate), rows)
+            await conn.run_sync(skill_index.index_candidates, pairs, False)
+        next_id += size
+    elapsed = time.perf_counter() - started
+    print(f"populated {n:,} candidates + index in {elapsed:.1f}s ({n / elapsed:,.0f} candidates/s)")
+
+
+async def time_query(engine, skills, match_all, repeats: int):
+    page_ms, count_ms, total = [], [], 0
+    async with AsyncSession(engine) as db:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            skill_filter = await skill_index.resolve_filter(db, skills, match_all)
+            page = await db.execute(
+                select(Candidate).where(skill_filter.clause).order_by(desc(Candidate.match_score)).limit(50)
+            )
+            page.scalars().all()
+            page_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            total = (await db.execute(skill_filter.count_query())).scalar_one()
+            count_ms.append((time.perf_counter() - started) * 1000)
+    return total, statistics.median(page_ms), statistics.median(count_ms)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=1_000_000)
+    parser.add_argument("--db", default="/tmp/skill_bench.db")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--reuse", action="store_true", help="reuse an existing populated database")
+    args = parser.parse_args()
+
+    if not args.reuse and os.path.exists(args.db):
+        os.remove(args.db)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{args.db}")
+    if not args.reuse:
+        await populate(engine, args.candidates)
+
+    print(f"{'query':<40} {'mode':<4} {'matches':>9} {'top-50 ms':>10} {'count ms':>9}")
+    for skills, match_all in QUERIES:
+        total, page, count = await time_query(engine, skills, match_all, args.repeats)
+        label = ",".join(skills)
+        print(f"{label:<40} {'AND' if match_all else 'OR':<4} {total:>9,} {page:>10.1f} {count:>9.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
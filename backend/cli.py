@@ -0,0 +1,146 @@
+"""
+Perfectly AI – command line tools.
+
+    python cli.py import candidates.csv
+    python cli.py import export.ndjson --batch-size 5000
+    python cli.py reclassify-stale --limit 1000
+    python cli.py worker --processes 4 --types vision,classification
+    python cli.py resolve
+    python cli.py mock-ats --port 8765 --rate 10 --burst 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+from database import engine, init_db
+from services.entity_resolution import entity_resolver
+from services.event_writer import activity_writer
+from services.import_service import CandidateImporter, format_for, read_file
+from services.job_queue import JOB_TYPES
+from services.job_worker import run_workers
+from services.reclassification import stale_reclassifier
+
+
+async def import_command(args) -> int:
+    fmt = args.format or format_for(filename=args.path)
+    if not fmt:
+        print("❌ Cannot infer the format from the file name; pass --format csv|ndjson", file=sys.stderr)
+        return 2
+    await init_db()
+    try:
+        report = await CandidateImporter(batch_size=args.batch_size).run(
+            read_file(args.path, args.chunk_size), fmt
+        )
+    finally:
+        await engine.dispose()
+    for error in report.errors:
+        print(f"  line {error.line}: {error.error}", file=sys.stderr)
+    if report.failed > len(report.errors):
+        print(f"  … {report.failed - len(report.errors)} more failed rows", file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+async def reclassify_command(args) -> int:
+    await init_db()
+    activity_writer.start()
+    try:
+        progress = await stale_reclassifier.run(args.limit)
+    finally:
+        await activity_writer.stop()
+        await engine.dispose()
+    print(f"  sources: {progress['sources']}")
+    return 1 if progress["failed"] else 0
+
+
+async def resolve_command(args) -> int:
+    await init_db()
+    try:
+        report = await entity_resolver.run_batch()
+    finally:
+        await engine.dispose()
+    print(f"🧬 {report['candidates']} candidates: {report['comparisons']} comparisons "
+          f"(pairwise would be {report['pairwise_comparisons']}), {report['clusters']} duplicate clusters, "
+          f"{report['merged']} merged; {report['candidates_per_second']} candidates/s", flush=True)
+    return 0
+
+
+async def mock_ats_command(args) -> int:
+    import mock_ats
+    limits = mock_ats.Limits(
+        rate=args.rate, burst=args.burst, quota=args.quota, quota_window=args.quota_window,
+        latency_ms=args.latency_ms, item_latency_ms=args.item_latency_ms, error_rate=args.error_rate,
+        max_batch=args.max_batch, records=args.records,
+    )
+    runner, _, url = await mock_ats.start(limits, args.host, args.port, args.seed)
+    print(f"🧪 Mock ATS on {url}: {limits.rate:g} req/s (burst {limits.burst}), "
+          f"{limits.latency_ms:g}ms latency, {limits.error_rate:.0%} errors", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+    return 0
+
+
+async def prepare_db():
+    await init_db()
+    await engine.dispose()
+
+
+def worker_command(args) -> int:
+    types = [t.strip() for t in args.types.split(",") if t.strip()]
+    unknown = sorted(set(types) - set(JOB_TYPES))
+    if unknown:
+        print(f"❌ Unknown job types {unknown}; choose from {', '.join(JOB_TYPES)}", file=sys.stderr)
+        return 2
+    asyncio.run(prepare_db())
+    print(f"👷 Starting {args.processes} job worker processes", flush=True)
+    return run_workers(args.processes, types, args.concurrency)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Perfectly AI command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Bulk import candidates from CSV or NDJSON")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    importer.add_argument("--batch-size", type=int, default=None, help="Rows per INSERT batch")
+    importer.add_argument("--chunk-size", type=int, default=1 << 20, help="Bytes read per chunk")
+    importer.set_defaults(handler=import_command)
+
+    reclassify = commands.add_parser("reclassify-stale", help="Classify new candidates and those whose profile changed")
+    reclassify.add_argument("--limit", type=int, default=None, help="Classify at most this many candidates")
+    reclassify.set_defaults(handler=reclassify_command)
+
+    resolve = commands.add_parser("resolve", help="Find duplicate candidates across sources and merge them")
+    resolve.set_defaults(handler=resolve_command)
+
+    mock = commands.add_parser("mock-ats", help="Serve a local rate-limited ATS API for connector testing")
+    mock.add_argument("--host", default="127.0.0.1")
+    mock.add_argument("--port", type=int, default=8765)
+    mock.add_argument("--rate", type=float, default=10.0, help="Requests per second per API key; 0 = unlimited")
+    mock.add_argument("--burst", type=int, default=20)
+    mock.add_argument("--quota", type=int, default=0, help="Requests per --quota-window per API key; 0 = none")
+    mock.add_argument("--quota-window", type=float, default=60.0, help="Seconds")
+    mock.add_argument("--latency-ms", type=float, default=50.0, help="Median response time")
+    mock.add_argument("--item-latency-ms", type=float, default=1.0, help="Added per candidate in a batch")
+    mock.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    mock.add_argument("--max-batch", type=int, default=100, help="Candidates accepted per batch request")
+    mock.add_argument("--records", type=int, default=1000, help="Candidates the sync feed starts with")
+    mock.add_argument("--seed", type=int, default=None)
+    mock.set_defaults(handler=mock_ats_command)
+
+    worker = commands.add_parser("worker", help="Consume the job queue with N worker processes")
+    worker.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Defaults to one per core")
+    worker.add_argument("--types", default=",".join(JOB_TYPES), help="Comma-separated job types to consume")
+    worker.add_argument("--concurrency", type=int, default=None, help="Jobs in flight per process")
+    worker.set_defaults(handler=worker_command)
+
+    args = parser.parse_args(argv)
+    if args.handler is worker_command:
+        return worker_command(args)
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
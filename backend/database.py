@@ -1,17 +1,52 @@
+from sqlalchemy import event, inspect, text, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from config import settings
+from services.metrics import instrument_engine
+from services.profiling import phase, trace_engine
 import os
 
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Ensure the data directory exists
 os.makedirs("data", exist_ok=True)
 
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.is_dev,
-    future=True,
-)
+# JSON on SQLite, JSONB (indexable with GIN) on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
+def _engine_options() -> dict:
+    # SQL logging with timings comes from services.profiling (DB_LOG_SQL_MS), not echo
+    options = {"echo": False, "future": True}
+    if settings.is_postgres:
+        # asyncpg connection pool shared by all requests on this node
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=True,
+        )
+    return options
+
+
+engine = create_async_engine(settings.database_url, **_engine_options())
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL lets readers run alongside the background log writers and compactor."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+trace_engine(engine)
 
 async_session = async_sessionmaker(
     engine,
@@ -30,7 +65,8 @@ async def get_db():
     async with async_session() as session:
         try:
             yield session
-            await session.commit()
+            with phase("commit"):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -38,7 +74,45 @@ async def get_db():
             await session.close()
 
 
+# Databases created with create_all before migrations existed: the newest
+# table present tells us which revision the schema already matches.
+LEGACY_REVISIONS = [
+    ("candidate_skills", "0003_skill_index"),
+    ("api_log_rollups", "0002_log_rollups"),
+    ("candidates", "0001_initial_schema"),
+]
+
+# Serializes migrations when several API nodes start against one PostgreSQL
+MIGRATION_LOCK_KEY = 720_301
+
+
+def _alembic_config(connection):
+    from alembic.config import Config
+
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def _upgrade(connection):
+    from alembic import command
+
+    config = _alembic_config(connection)
+    inspector = inspect(connection)
+    if not inspector.has_table("alembic_version"):
+        for table, revision in LEGACY_REVISIONS:
+            if inspector.has_table(table):
+                command.stamp(config, revision)
+                break
+    command.upgrade(config, "head")
+
+
 async def init_db():
-    """Create all database tables."""
+    """Bring the schema up to date by running Alembic migrations."""
+    if not settings.db_auto_migrate:
+        return
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "postgresql":
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        await conn.run_sync(_upgrade)
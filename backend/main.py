@@ -7,14 +7,52 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
 from database import init_db
+from services.event_writer import activity_writer
+from services.api_logger import api_logger, ApiLogMiddleware
+from services.rollup_service import rollup_compactor
+from services.skill_index import skill_index
+from services.semantic_search import semantic_search
+from services.cascade_classifier import cascade_classifier
+from services.leaderboard import leaderboards
+from services.dashboard_feed import dashboard_feed
+from services.sync_scheduler import sync_scheduler
+from services.entity_resolution import entity_resolver
+from agents.orchestrator import orchestrator
+from agents.integration_agent import integration_agent
+from services.job_worker import job_worker
+from services.reclassification import candidate_profile, profile_fingerprint
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database tables on startup."""
+    """Initialize database tables on startup and drain buffered writes on shutdown."""
     await init_db()
     await seed_demo_data()
+    await skill_index.rebuild_if_empty()
+    activity_writer.start()
+    api_logger.writer.start()
+    rollup_compactor.start()
+    semantic_search.start()
+    cascade_classifier.start()
+    leaderboards.start(follow=not settings.job_worker_in_app)
+    entity_resolver.start()
+    dashboard_feed.start()
+    sync_scheduler.start()
+    if settings.job_worker_in_app:
+        job_worker.start()
     yield
+    await job_worker.stop()
+    await dashboard_feed.stop()
+    await sync_scheduler.stop()
+    await leaderboards.stop()
+    await entity_resolver.stop()
+    await semantic_search.stop()
+    await cascade_classifier.stop()
+    await orchestrator.stop()
+    await integration_agent.close()
+    await rollup_compactor.stop()
+    await activity_writer.stop()
+    await api_logger.writer.stop()
 
 
 app = FastAPI(
@@ -33,6 +71,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# API call logging – outermost so durations cover the full request
+app.add_middleware(ApiLogMiddleware)
+
 # ── Include Routers ──
 from routers.intake import router as intake_router
 from routers.vision import router as vision_router
@@ -40,6 +81,10 @@ from routers.classification import router as classification_router
 from routers.integration import router as integration_router
 from routers.candidates import router as candidates_router
 from routers.dashboard import router as dashboard_router
+from routers.pipeline import router as pipeline_router
+from routers.jobs import router as jobs_router
+from routers.metrics import router as metrics_router
+from routers.debug import router as debug_router
 
 app.include_router(intake_router, prefix="/api/v1")
 app.include_router(vision_router, prefix="/api/v1")
@@ -47,6 +92,10 @@ app.include_router(classification_router, prefix="/api/v1")
 app.include_router(integration_router, prefix="/api/v1")
 app.include_router(candidates_router, prefix="/api/v1")
 app.include_router(dashboard_router, prefix="/api/v1")
+app.include_router(pipeline_router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
+app.include_router(debug_router, prefix="/api/v1")
+app.include_router(metrics_router)
 
 
 @app.get("/", tags=["Health"])
@@ -167,12 +216,16 @@ async def seed_demo_data():
         ]
 
         for i, (cat, conf, sen, fit) in enumerate(classifications_data):
+            c = candidates[i]
             classification = Classification(
-                candidate_id=candidates[i].id,
+                candidate_id=c.id,
                 category=cat,
                 confidence=conf,
                 seniority=sen,
                 culture_fit=fit,
+                fingerprint=profile_fingerprint(
+                    candidate_profile(c.name, c.title, c.company, c.skills, c.experience)
+                ),
             )
             db.add(classification)
 
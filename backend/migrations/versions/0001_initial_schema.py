@@ -0,0 +1,119 @@
+"""Initial schema: intakes, documents, candidates, classifications, integrations, logs
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001_initial_schema"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade():
+    op.create_table(
+        "intakes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("mode", sa.String(20), nullable=False),
+        sa.Column("raw_input", sa.Text(), nullable=True),
+        sa.Column("file_path", sa.String(500), nullable=True),
+        sa.Column("parsed_data", JSON_TYPE, nullable=True),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_intakes_id", "intakes", ["id"])
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("filename", sa.String(255), nullable=False),
+        sa.Column("file_path", sa.String(500), nullable=False),
+        sa.Column("file_type", sa.String(50), nullable=False),
+        sa.Column("doc_type", sa.String(50), nullable=True),
+        sa.Column("extracted_fields", JSON_TYPE, nullable=True),
+        sa.Column("confidence_scores", JSON_TYPE, nullable=True),
+        sa.Column("status", sa.String(20), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"])
+
+    op.create_table(
+        "candidates",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(200), nullable=False),
+        sa.Column("initials", sa.String(5), nullable=True),
+        sa.Column("title", sa.String(200), nullable=True),
+        sa.Column("company", sa.String(200), nullable=True),
+        sa.Column("location", sa.String(200), nullable=True),
+        sa.Column("skills", JSON_TYPE, nullable=True),
+        sa.Column("experience", sa.String(50), nullable=True),
+        sa.Column("match_score", sa.Float(), nullable=True),
+        sa.Column("screen_score", sa.Float(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=True),
+        sa.Column("source", sa.String(100), nullable=True),
+        sa.Column("email", sa.String(200), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_candidates_id", "candidates", ["id"])
+
+    op.create_table(
+        "classifications",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id"), nullable=False),
+        sa.Column("category", sa.String(100), nullable=False),
+        sa.Column("confidence", sa.Float(), nullable=False),
+        sa.Column("seniority", sa.String(50), nullable=True),
+        sa.Column("culture_fit", sa.String(50), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_classifications_id", "classifications", ["id"])
+
+    op.create_table(
+        "integrations",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("system_name", sa.String(100), nullable=False, unique=True),
+        sa.Column("system_type", sa.String(50), nullable=True),
+        sa.Column("status", sa.String(20), nullable=True),
+        sa.Column("last_sync", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("record_count", sa.Integer(), nullable=True),
+        sa.Column("config", JSON_TYPE, nullable=True),
+        sa.Column("color", sa.String(20), nullable=True),
+    )
+    op.create_index("ix_integrations_id", "integrations", ["id"])
+
+    op.create_table(
+        "api_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("method", sa.String(10), nullable=False),
+        sa.Column("endpoint", sa.String(500), nullable=False),
+        sa.Column("source", sa.String(100), nullable=True),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("duration_ms", sa.Integer(), nullable=True),
+        sa.Column("request_body", JSON_TYPE, nullable=True),
+        sa.Column("response_summary", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_api_logs_id", "api_logs", ["id"])
+
+    op.create_table(
+        "activity_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("agent", sa.String(50), nullable=False),
+        sa.Column("action", sa.Text(), nullable=False),
+        sa.Column("details", JSON_TYPE, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.create_index("ix_activity_logs_id", "activity_logs", ["id"])
+
+
+def downgrade():
+    for table in ("activity_logs", "api_logs", "integrations", "classifications",
+                  "candidates", "documents", "intakes"):
+        op.drop_table(table)
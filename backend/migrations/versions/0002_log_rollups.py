@@ -0,0 +1,65 @@
+"""Log rollup tables, watermarks and created_at indexes on raw logs
+
+Revision ID: 0002_log_rollups
+Revises: 0001_initial_schema
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002_log_rollups"
+down_revision = "0001_initial_schema"
+branch_labels = None
+depends_on = None
+
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def upgrade():
+    op.create_index("ix_activity_logs_created_at", "activity_logs", ["created_at"])
+    op.create_index("ix_api_logs_created_at", "api_logs", ["created_at"])
+
+    op.create_table(
+        "activity_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("granularity", sa.String(10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("agent", sa.String(50), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("granularity", "bucket_start", "agent"),
+    )
+    op.create_index("ix_activity_rollups_id", "activity_rollups", ["id"])
+    op.create_index("ix_activity_rollups_bucket_start", "activity_rollups", ["bucket_start"])
+
+    op.create_table(
+        "api_log_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("granularity", sa.String(10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("endpoint", sa.String(500), nullable=False),
+        sa.Column("source", sa.String(100), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("errors", sa.Integer(), nullable=False),
+        sa.Column("latency_p50", sa.Float(), nullable=True),
+        sa.Column("latency_p95", sa.Float(), nullable=True),
+        sa.Column("latency_p99", sa.Float(), nullable=True),
+        sa.Column("histogram", JSON_TYPE, nullable=True),
+        sa.UniqueConstraint("granularity", "bucket_start", "endpoint", "source"),
+    )
+    op.create_index("ix_api_log_rollups_id", "api_log_rollups", ["id"])
+    op.create_index("ix_api_log_rollups_bucket_start", "api_log_rollups", ["bucket_start"])
+
+    op.create_table(
+        "rollup_watermarks",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("rollup_watermarks")
+    op.drop_table("api_log_rollups")
+    op.drop_table("activity_rollups")
+    op.drop_index("ix_api_logs_created_at", "api_logs")
+    op.drop_index("ix_activity_logs_created_at", "activity_logs")
@@ -0,0 +1,38 @@
+"""Skill vocabulary and candidate_skills inverted index
+
+Revision ID: 0003_skill_index
+Revises: 0002_log_rollups
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_skill_index"
+down_revision = "0002_log_rollups"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_candidates_match_score", "candidates", ["match_score"])
+
+    op.create_table(
+        "skills",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False, unique=True),
+        sa.Column("candidate_count", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_skills_id", "skills", ["id"])
+
+    op.create_table(
+        "candidate_skills",
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("skill_id", sa.Integer(), sa.ForeignKey("skills.id"), primary_key=True),
+    )
+    op.create_index("ix_candidate_skills_skill_candidate", "candidate_skills", ["skill_id", "candidate_id"])
+
+
+def downgrade():
+    op.drop_table("candidate_skills")
+    op.drop_table("skills")
+    op.drop_index("ix_candidates_match_score", "candidates")
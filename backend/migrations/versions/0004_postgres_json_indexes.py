@@ -0,0 +1,27 @@
+"""GIN indexes on candidates.skills and intakes.parsed_data (PostgreSQL only)
+
+Revision ID: 0004_postgres_json_indexes
+Revises: 0003_skill_index
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0004_postgres_json_indexes"
+down_revision = "0003_skill_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    # Lowercased so skill filters are case-insensitive; default jsonb_ops supports ?&, ?| and @>
+    op.execute("CREATE INDEX ix_candidates_skills_gin ON candidates USING gin ((lower(skills::text)::jsonb))")
+    op.execute("CREATE INDEX ix_intakes_parsed_data_gin ON intakes USING gin (parsed_data jsonb_path_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_intakes_parsed_data_gin")
+    op.execute("DROP INDEX IF EXISTS ix_candidates_skills_gin")
@@ -0,0 +1,39 @@
+"""Unique (email, source) on candidates for bulk-import upserts
+
+Revision ID: 0005_candidate_upsert_key
+Revises: 0004_postgres_json_indexes
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_candidate_upsert_key"
+down_revision = "0004_postgres_json_indexes"
+branch_labels = None
+depends_on = None
+
+DUPLICATES = """
+    SELECT id FROM candidates c
+    WHERE c.email IS NOT NULL AND c.source IS NOT NULL
+      AND c.id < (SELECT max(d.id) FROM candidates d WHERE d.email = c.email AND d.source = c.source)
+"""
+
+
+def upgrade():
+    # Imports match on normalized emails. Older rows sharing the newest row's
+    # (email, source) keep everything but the email, so the key becomes unique
+    op.execute("UPDATE candidates SET email = lower(trim(email)) WHERE email IS NOT NULL")
+    conflicts = op.get_bind().execute(sa.text(
+        f"SELECT id, email, source FROM candidates WHERE id IN ({DUPLICATES}) ORDER BY id"
+    )).all()
+    if conflicts:
+        listed = ", ".join(f"{candidate_id} ({email}, {source})" for candidate_id, email, source in conflicts[:50])
+        more = f" and {len(conflicts) - 50} more" if len(conflicts) > 50 else ""
+        print(f"⚠️ Cleared the email of {len(conflicts)} older candidates sharing (email, source) with a newer one: "
+              f"{listed}{more}", flush=True)
+        op.execute(f"UPDATE candidates SET email = NULL WHERE id IN ({DUPLICATES})")
+    op.create_index("uq_candidates_email_source", "candidates", ["email", "source"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_candidates_email_source", "candidates")
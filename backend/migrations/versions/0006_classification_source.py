@@ -0,0 +1,23 @@
+"""Record which cascade stage produced each classification
+
+Revision ID: 0006_classification_source
+Revises: 0005_candidate_upsert_key
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_classification_source"
+down_revision = "0005_candidate_upsert_key"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("classifications") as batch:
+        batch.add_column(sa.Column("source", sa.String(20), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("classifications") as batch:
+        batch.drop_column("source")
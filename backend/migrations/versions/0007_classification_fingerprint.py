@@ -0,0 +1,30 @@
+"""One fingerprinted classification per candidate
+
+Revision ID: 0007_classification_fingerprint
+Revises: 0006_classification_source
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0007_classification_fingerprint"
+down_revision = "0006_classification_source"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("classifications") as batch:
+        batch.add_column(sa.Column("fingerprint", sa.String(64), nullable=True))
+    # Keep only the newest classification of each candidate
+    op.execute(
+        "DELETE FROM classifications WHERE id < "
+        "(SELECT max(c.id) FROM classifications c WHERE c.candidate_id = classifications.candidate_id)"
+    )
+    op.create_index("uq_classifications_candidate_id", "classifications", ["candidate_id"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_classifications_candidate_id", table_name="classifications")
+    with op.batch_alter_table("classifications") as batch:
+        batch.drop_column("fingerprint")
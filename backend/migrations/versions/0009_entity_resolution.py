@@ -0,0 +1,44 @@
+"""Canonical candidates and merge lineage for entity resolution
+
+Revision ID: 0009_entity_resolution
+Revises: 0008_job_queue
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_entity_resolution"
+down_revision = "0008_job_queue"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("candidates") as batch:
+        batch.add_column(sa.Column("canonical_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_candidates_canonical_id", "candidates", ["canonical_id"], ["id"],
+                                 ondelete="SET NULL")
+        batch.create_index("ix_candidates_canonical_id", ["canonical_id"])
+    op.create_table(
+        "candidate_lineage",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("canonical_id", sa.Integer(), sa.ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("candidate_id", sa.Integer(), sa.ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False,
+                  unique=True),
+        sa.Column("source", sa.String(100), nullable=True),
+        sa.Column("email", sa.String(200), nullable=True),
+        sa.Column("rule", sa.String(20), nullable=False),
+        sa.Column("similarity", sa.Float(), nullable=True),
+        sa.Column("matched_with", sa.Integer(), nullable=True),
+        sa.Column("merged_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_candidate_lineage_id", "candidate_lineage", ["id"])
+    op.create_index("ix_candidate_lineage_canonical_id", "candidate_lineage", ["canonical_id"])
+
+
+def downgrade():
+    op.drop_table("candidate_lineage")
+    with op.batch_alter_table("candidates") as batch:
+        batch.drop_index("ix_candidates_canonical_id")
+        batch.drop_constraint("fk_candidates_canonical_id", type_="foreignkey")
+        batch.drop_column("canonical_id")
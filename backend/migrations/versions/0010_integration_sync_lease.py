@@ -0,0 +1,25 @@
+"""Sync lease on integrations so processes never pull the same delta twice
+
+Revision ID: 0010_integration_sync_lease
+Revises: 0009_entity_resolution
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_integration_sync_lease"
+down_revision = "0009_entity_resolution"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("integrations") as batch:
+        batch.add_column(sa.Column("sync_leased_by", sa.String(100), nullable=True))
+        batch.add_column(sa.Column("sync_lease_expires_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("integrations") as batch:
+        batch.drop_column("sync_lease_expires_at")
+        batch.drop_column("sync_leased_by")
@@ -0,0 +1,203 @@
+"""
+Mock ATS – A local HTTP server that behaves like a rate-limited ATS API, for offline testing.
+
+    python cli.py mock-ats --port 8765 --rate 10 --burst 20 --latency-ms 80 --error-rate 0.02
+
+It speaks the API HttpConnector expects (see agents/integration_agent.py).
+Each API key (the Authorization header; requests without one share a key)
+gets a token bucket of --rate requests/second with --burst. There is also an
+optional --quota of requests per --quota-window seconds. Requests over
+either limit get 429 with Retry-After. Latency is log-normal around
+--latency-ms, plus --item-latency-ms per candidate in a batch. A share of
+requests (--error-rate) fail with 503, half of them after the work was
+done. Batches above --max-batch get 413,
+and a batch repeated with the same Idempotency-Key returns the first answer
+without applying it again. GET /stats shows what the server saw.
+
+Point the backend at it with
+    HTTP_CONNECTORS='[{"name": "Mock ATS", "url": "http://127.0.0.1:8765", "rate": 10, "burst": 20}]'
+"""
+import asyncio
+import math
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from aiohttp import web
+
+FIRST = ["Alex", "Priya", "Jordan", "Maria", "Wei", "Sam", "Fatima", "Lucas", "Emma", "Noah", "Aisha", "Diego"]
+LAST = ["Kim", "Sharma", "Lee", "Garcia", "Chen", "Taylor", "Khan", "Silva", "Brown", "Müller", "Bello", "Torres"]
+
+
+@dataclass
+class Limits:
+    rate: float = 10.0  # requests per second per API key; 0 = unlimited
+    burst: int = 20
+    quota: int = 0  # requests per quota window per API key; 0 = no quota
+    quota_window: float = 60.0
+    latency_ms: float = 50.0  # median
+    item_latency_ms: float = 1.0  # per candidate in a batch
+    error_rate: float = 0.0
+    max_batch: int = 100
+    records: int = 1000  # candidates the feed starts with
+
+
+class Client:
+    """Rate and quota state of one API key."""
+
+    def __init__(self, limits: Limits):
+        self.tokens = float(limits.burst)
+        self.updated = time.monotonic()
+        self.window_started = self.updated
+        self.window_requests = 0
+
+    def admit(self, limits: Limits) -> Optional[float]:
+        """None if the request may proceed, else the seconds to wait."""
+        now = time.monotonic()
+        if limits.quota:
+            if now - self.window_started >= limits.quota_window:
+                self.window_started, self.window_requests = now, 0
+            if self.window_requests >= limits.quota:
+                return self.window_started + limits.quota_window - now
+        if limits.rate > 0:
+            self.tokens = min(limits.burst, self.tokens + (now - self.updated) * limits.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / limits.rate
+            self.tokens -= 1
+        self.window_requests += 1
+        return None
+
+
+class MockAts:
+    def __init__(self, limits: Limits, seed: Optional[int] = None):
+        self.limits = limits
+        self.random = random.Random(seed)
+        self.clients: Dict[str, Client] = {}
+        self.candidates: List[Optional[Dict[str, Any]]] = []  # in change order; the cursor is an index into it
+        self.by_email: Dict[str, int] = {}  # -> position in the feed
+        self.total = 0
+        self.replies: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # Idempotency-Key -> first answer
+        self.counts = {"requests": 0, "ok": 0, "throttled": 0, "errors": 0, "rejected": 0, "replayed": 0,
+                       "pushed": 0}
+        for i in range(limits.records):
+            first, last = self.random.choice(FIRST), self.random.choice(LAST)
+            self._store({"name": f"{first} {last}", "email": f"{first}.{last}.{i}@example.com".lower()})
+
+    def _store(self, candidate: Dict[str, Any]) -> Dict[str, Any]:
+        email = (candidate.get("email") or "").lower()
+        if email and email in self.by_email:
+            position = self.by_email[email]
+            record = {**candidate, "id": self.candidates[position]["id"]}
+            self.candidates[position] = None  # the change moves to the end of the feed
+            status = "updated"
+        else:
+            self.total += 1
+            record = {**candidate, "id": self.total}
+            status = "created"
+        self.candidates.append(record)
+        if email:
+            self.by_email[email] = len(self.candidates) - 1
+        return {"status": status, "id": record["id"]}
+
+    @web.middleware
+    async def gate(self, request: web.Request, handler):
+        if request.path == "/stats":
+            return await handler(request)
+        self.counts["requests"] += 1
+        key = request.headers.get("Authorization", "anonymous")
+        client = self.clients.setdefault(key, Client(self.limits))
+        wait = client.admit(self.limits)
+        if wait is not None:
+            self.counts["throttled"] += 1
+            return web.json_response({"error": "rate limit exceeded"}, status=429,
+                                     headers={"Retry-After": f"{max(wait, 0.001):.3f}"})
+        seconds = self.limits.latency_ms / 1000 * math.exp(self.random.gauss(0, 0.5))
+        await asyncio.sleep(seconds)
+        if self.random.random() < self.limits.error_rate:
+            self.counts["errors"] += 1
+            if self.random.random() < 0.5:
+                await handler(request)  # the work is done but the answer is lost, as with a timeout upstream
+            return web.json_response({"error": "upstream unavailable"}, status=503)
+        response = await handler(request)
+        if response.status < 400:
+            self.counts["ok"] += 1
+        return response
+
+    async def list_candidates(self, request: web.Request) -> web.Response:
+        since = int(request.query.get("since") or 0)
+        limit = min(int(request.query.get("limit", 100)), 500)
+        items, position = [], since
+        while position < len(self.candidates) and len(items) < limit:
+            if self.candidates[position] is not None:
+                items.append(self.candidates[position])
+            position += 1
+        return web.json_response({
+            "items": items,
+            "cursor": str(position),
+            "has_more": position < len(self.candidates),
+            "total": self.total,
+        })
+
+    async def search(self, request: web.Request) -> web.Response:
+        terms = request.query.get("q", "").lower().split()
+        limit = min(int(request.query.get("limit", 20)), 100)
+        items = []
+        for record in reversed(self.candidates):
+            if record is None:
+                continue
+            name = record["name"].lower()
+            hits = sum(term in name for term in terms)
+            if hits:
+                items.append({"name": record["name"], "email": record.get("email"),
+                              "score": min(99, 60 + 40 * hits // len(terms))})
+                if len(items) >= limit:
+                    break
+        return web.json_response({"items": items})
+
+    async def push_batch(self, request: web.Request) -> web.Response:
+        key = request.headers.get("Idempotency-Key")
+        if key and key in self.replies:
+            self.counts["replayed"] += 1
+            return web.json_response(self.replies[key])
+        candidates = (await request.json()).get("candidates") or []
+        if len(candidates) > self.limits.max_batch:
+            self.counts["rejected"] += 1
+            return web.json_response({"error": f"at most {self.limits.max_batch} candidates per batch"}, status=413)
+        await asyncio.sleep(len(candidates) * self.limits.item_latency_ms / 1000)
+        results = []
+        for candidate in candidates:
+            if not candidate.get("name"):
+                results.append({"status": "invalid", "error": "name is required"})
+            else:
+                results.append(self._store(candidate))
+        self.counts["pushed"] += len(candidates)
+        reply = {"results": results}
+        if key:
+            self.replies[key] = reply
+            while len(self.replies) > 10_000:
+                self.replies.popitem(last=False)
+        return web.json_response(reply)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.counts, "candidates": self.total, "clients": len(self.clients)})
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self.gate])
+        app.router.add_get("/candidates", self.list_candidates)
+        app.router.add_post("/candidates/batch", self.push_batch)
+        app.router.add_get("/search", self.search)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+async def start(limits: Limits, host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+    """Serve in the running loop; returns (runner, server, url). port 0 picks a free port."""
+    server = MockAts(limits, seed)
+    runner = web.AppRunner(server.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, server, f"http://{host}:{port}"
@@ -1,18 +1,22 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from database import Base
+from database import Base, JSONType
 
 
 class Intake(Base):
     """Raw intake submissions from hiring managers."""
     __tablename__ = "intakes"
+    __table_args__ = (
+        Index("ix_intakes_parsed_data_gin", "parsed_data",
+              postgresql_using="gin", postgresql_ops={"parsed_data": "jsonb_path_ops"}).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     mode = Column(String(20), nullable=False)  # 'voice', 'image', 'text'
     raw_input = Column(Text, nullable=True)  # text content or file reference
     file_path = Column(String(500), nullable=True)  # uploaded file path
-    parsed_data = Column(JSON, nullable=True)  # extracted structured data
+    parsed_data = Column(JSONType, nullable=True)  # extracted structured data
     confidence = Column(Float, nullable=True)
     status = Column(String(20), default="pending")  # pending, processing, processed, error
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -27,8 +31,8 @@ class Document(Base):
     file_path = Column(String(500), nullable=False)
     file_type = Column(String(50), nullable=False)  # pdf, png, jpg, docx
     doc_type = Column(String(50), nullable=True)  # Resume, Job Description, Org Chart, etc.
-    extracted_fields = Column(JSON, nullable=True)
-    confidence_scores = Column(JSON, nullable=True)
+    extracted_fields = Column(JSONType, nullable=True)
+    confidence_scores = Column(JSONType, nullable=True)
     status = Column(String(20), default="pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -36,6 +40,13 @@ class Document(Base):
 class Candidate(Base):
     """Candidates sourced and matched by the platform."""
     __tablename__ = "candidates"
+    __table_args__ = (
+        # Case-insensitive skill containment (?&, ?|, @>) on PostgreSQL
+        Index("ix_candidates_skills_gin", text("(lower(skills::text)::jsonb)"),
+              postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Upsert key for bulk imports; rows without an email never conflict
+        Index("uq_candidates_email_source", "email", "source", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False)
@@ -43,21 +54,63 @@ class Candidate(Base):
     title = Column(String(200), nullable=True)
     company = Column(String(200), nullable=True)
     location = Column(String(200), nullable=True)
-    skills = Column(JSON, nullable=True)
+    skills = Column(JSONType, nullable=True)
     experience = Column(String(50), nullable=True)
-    match_score = Column(Float, nullable=True)
+    match_score = Column(Float, nullable=True, index=True)
     screen_score = Column(Float, nullable=True)
     status = Column(String(20), default="new")  # new, screened, interview, offer, hired
     source = Column(String(100), nullable=True)  # LinkedIn, GitHub, Referral, etc.
     email = Column(String(200), nullable=True)
+    # Set on a duplicate once entity resolution merges it into another candidate; NULL on canonical rows
+    canonical_id = Column(Integer, ForeignKey("candidates.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     classification = relationship("Classification", back_populates="candidate", uselist=False)
 
 
+class CandidateLineage(Base):
+    """Source records merged into a canonical candidate, and the rule that matched each one."""
+    __tablename__ = "candidate_lineage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    canonical_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False, index=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), nullable=False, unique=True)
+    source = Column(String(100), nullable=True)
+    email = Column(String(200), nullable=True)
+    rule = Column(String(20), nullable=False)  # canonical, email, name_company, profile, cluster
+    similarity = Column(Float, nullable=True)
+    matched_with = Column(Integer, nullable=True)  # the candidate it was matched against
+    merged_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Skill(Base):
+    """Normalized skill vocabulary shared by all candidates."""
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False, unique=True)  # lowercase, whitespace-collapsed
+    candidate_count = Column(Integer, nullable=False, default=0)  # posting list length
+
+
+class CandidateSkill(Base):
+    """Inverted index entry: one row per (skill, candidate) pair."""
+    __tablename__ = "candidate_skills"
+    __table_args__ = (
+        # Posting lists: all candidates for a skill, read index-only
+        Index("ix_candidate_skills_skill_candidate", "skill_id", "candidate_id"),
+    )
+
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+
+
 class Classification(Base):
     """Classification results for a candidate."""
     __tablename__ = "classifications"
+    __table_args__ = (
+        # One classification per candidate, upserted when the profile changes
+        Index("uq_classifications_candidate_id", "candidate_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
@@ -65,6 +118,8 @@ class Classification(Base):
     confidence = Column(Float, nullable=False)
     seniority = Column(String(50), nullable=True)  # Junior, Mid, Senior, Staff, Principal
     culture_fit = Column(String(50), nullable=True)  # Low, Medium, High, Very High
+    source = Column(String(20), nullable=True)  # local, llm, local-fallback; NULL before the cascade
+    fingerprint = Column(String(64), nullable=True)  # hash of the profile inputs it was computed from
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     candidate = relationship("Candidate", back_populates="classification")
@@ -80,8 +135,10 @@ class Integration(Base):
     status = Column(String(20), default="disconnected")  # connected, syncing, error, disconnected
     last_sync = Column(DateTime(timezone=True), nullable=True)
     record_count = Column(Integer, default=0)
-    config = Column(JSON, nullable=True)  # connection parameters (non-sensitive)
+    config = Column(JSONType, nullable=True)  # connection parameters (non-sensitive)
     color = Column(String(20), nullable=True)  # UI display color
+    sync_leased_by = Column(String(100), nullable=True)  # process holding the connector's cursor
+    sync_lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # then another process may take it
 
 
 class ApiLog(Base):
@@ -94,9 +151,9 @@ class ApiLog(Base):
     source = Column(String(100), nullable=True)
     status_code = Column(Integer, nullable=False)
     duration_ms = Column(Integer, nullable=True)
-    request_body = Column(JSON, nullable=True)
+    request_body = Column(JSONType, nullable=True)
     response_summary = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
 
 class ActivityLog(Base):
@@ -106,5 +163,69 @@ class ActivityLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     agent = Column(String(50), nullable=False)  # intake, vision, classification, integration, orchestrator
     action = Column(Text, nullable=False)
-    details = Column(JSON, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    details = Column(JSONType, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class ActivityRollup(Base):
+    """Activity counts per agent, bucketed by minute, hour and day."""
+    __tablename__ = "activity_rollups"
+    __table_args__ = (UniqueConstraint("granularity", "bucket_start", "agent"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(10), nullable=False)  # minute, hour, day
+    bucket_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    agent = Column(String(50), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ApiLogRollup(Base):
+    """API call counts and latency percentiles per endpoint and source, bucketed by minute, hour and day."""
+    __tablename__ = "api_log_rollups"
+    __table_args__ = (UniqueConstraint("granularity", "bucket_start", "endpoint", "source"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    granularity = Column(String(10), nullable=False)  # minute, hour, day
+    bucket_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    endpoint = Column(String(500), nullable=False)  # numeric path segments collapsed to {id}
+    source = Column(String(100), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)  # status >= 400
+    latency_p50 = Column(Float, nullable=True)
+    latency_p95 = Column(Float, nullable=True)
+    latency_p99 = Column(Float, nullable=True)
+    histogram = Column(JSONType, nullable=True)  # log-bucketed latency counts, mergeable across buckets
+
+
+class RollupWatermark(Base):
+    """Last bucket boundary each rollup level has been computed up to."""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(50), primary_key=True)  # e.g. api_logs:minute
+    watermark = Column(DateTime(timezone=True), nullable=False)
+
+
+class Job(Base):
+    """Durable background job, leased by worker processes (cli.py worker) with a visibility timeout."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_claim", "status", "priority", "run_at"),
+        Index("ix_jobs_type_status", "type", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(30), nullable=False)  # intake, vision, classification, sync
+    payload = Column(JSONType, nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, dead
+    priority = Column(Integer, nullable=False, default=0)  # higher runs first
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    idempotency_key = Column(String(200), nullable=True, unique=True)  # enqueueing the same key twice is a no-op
+    run_at = Column(DateTime(timezone=True), nullable=False)  # invisible to workers until then (retry backoff)
+    leased_by = Column(String(100), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # an expired lease makes the job claimable again
+    result = Column(JSONType, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,52 +1,194 @@
 """Candidates router – Candidate listing, detail, and status management."""
-from fastapi import APIRouter, Depends, HTTPException, Query
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc, or_
+from sqlalchemy import select, desc, func
 from database import get_db
 from models import Candidate
-from schemas import CandidateResponse, CandidateListResponse, CandidateStatusUpdate
+from schemas import (
+    CandidateResponse, CandidateListResponse, CandidateLineageResponse, CandidateStatusUpdate, ImportReport, JobResponse,
+    SemanticMatch, SemanticSearchResponse,
+)
+from services.entity_resolution import entity_resolver
+from services.event_writer import activity_writer
+from services.import_service import CandidateImporter, format_for
+from services.job_queue import job_queue
+from services.export_service import CandidateExporter, export_query, parquet_available, MEDIA_TYPES as EXPORT_MEDIA_TYPES
+from services.skill_index import skill_index
+from services.semantic_search import semantic_search
+from services.query_layer import dialect_of, text_search, skill_filter
 
 router = APIRouter(prefix="/candidates", tags=["Candidates Portal"])
 
 
+async def _candidate_filters(db: AsyncSession, search: str, status: str, skills: str, skill_mode: str,
+                             include_merged: bool = False):
+    """WHERE clauses shared by the list and export endpoints, plus the skill filter if any."""
+    where = [] if include_merged else [Candidate.canonical_id.is_(None)]
+    if status and status != "all":
+        where.append(Candidate.status == status)
+
+    if search:
+        where.append(text_search(dialect_of(db), search, Candidate.name, Candidate.title, Candidate.company))
+
+    skills_filter = None
+    if skills:
+        skills_filter = await skill_filter(db, skills.split(","), match_all=(skill_mode == "all"))
+        if skills_filter is not None:
+            where.append(skills_filter.clause)
+    return where, skills_filter
+
+
 @router.get("", response_model=CandidateListResponse)
 async def list_candidates(
     search: str = None,
     status: str = None,
+    skills: str = Query(None, description="Comma-separated skills, e.g. 'kubernetes,go'"),
+    skill_mode: str = Query("all", pattern="^(all|any)$", description="all = AND, any = OR"),
+    include_merged: bool = Query(False, description="Also list duplicates merged into another candidate"),
     limit: int = 50,
     offset: int = 0,
     db: AsyncSession = Depends(get_db)
 ):
-    """List candidates with optional search and status filter."""
-    query = select(Candidate).order_by(desc(Candidate.match_score))
-
-    if status and status != "all":
-        query = query.where(Candidate.status == status)
+    """List candidates with optional search, status and skill filters."""
+    where, skills_filter = await _candidate_filters(db, search, status, skills, skill_mode, include_merged)
+    query = select(Candidate).where(*where)
 
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            or_(
-                Candidate.name.ilike(search_filter),
-                Candidate.title.ilike(search_filter),
-                Candidate.company.ilike(search_filter),
-            )
-        )
+    # Get total count – from the skill index alone when skills are the only filter
+    if skills_filter is not None and len(where) == (1 if include_merged else 2):
+        total = (await db.execute(skills_filter.count_query())).scalar_one()
+        if not include_merged:
+            # Merged duplicates are few and indexed: subtract them rather than leave the fast path
+            total -= (await db.execute(
+                select(func.count()).select_from(Candidate)
+                .where(Candidate.canonical_id.is_not(None), skills_filter.clause)
+            )).scalar_one()
+    else:
+        total = (await db.execute(select(func.count()).select_from(query.subquery()))).scalar_one()
 
-    query = query.offset(offset).limit(limit)
+    query = query.order_by(desc(Candidate.match_score)).offset(offset).limit(limit)
     result = await db.execute(query)
     candidates = result.scalars().all()
 
-    # Get total count
-    count_query = select(Candidate)
-    if status and status != "all":
-        count_query = count_query.where(Candidate.status == status)
-    count_result = await db.execute(count_query)
-    total = len(count_result.scalars().all())
-
     return CandidateListResponse(candidates=candidates, total=total)
 
 
+@router.get("/export")
+async def export_candidates(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson|parquet)$"),
+    search: str = None,
+    status: str = None,
+    skills: str = Query(None, description="Comma-separated skills, e.g. 'kubernetes,go'"),
+    skill_mode: str = Query("all", pattern="^(all|any)$", description="all = AND, any = OR"),
+    include_merged: bool = Query(False, description="Also export duplicates merged into another candidate"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream every matching candidate with its latest classification as CSV, NDJSON or Parquet."""
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow (pip install pyarrow)")
+
+    where, _ = await _candidate_filters(db, search, status, skills, skill_mode, include_merged)
+    gzip = "gzip" in request.headers.get("accept-encoding", "").lower()
+    exporter = CandidateExporter(export_query(*where), format, gzip=gzip)
+
+    headers = {"Content-Disposition": f'attachment; filename="candidates.{format}"'}
+    if exporter.gzip:
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(exporter.stream(), media_type=EXPORT_MEDIA_TYPES[format], headers=headers)
+
+
+@router.get("/skills")
+async def list_skills(limit: int = 50, db: AsyncSession = Depends(get_db)):
+    """Most common candidate skills with their candidate counts."""
+    return await skill_index.top_skills(db, limit)
+
+
+@router.get("/semantic", response_model=SemanticSearchResponse)
+async def semantic_search_candidates(
+    q: str = Query(..., min_length=2),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
+    """Candidates whose profile is closest in meaning to a free-text query ("ML Engineer")."""
+    started = time.perf_counter()
+    hits, exact = await semantic_search.search(q, limit)
+    result = await db.execute(
+        select(Candidate).where(Candidate.id.in_([c for c, _ in hits]), Candidate.canonical_id.is_(None))
+    )
+    by_id = {c.id: c for c in result.scalars().all()}
+    return SemanticSearchResponse(
+        query=q,
+        embedder=semantic_search.embedder.name,
+        exact=exact,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        matches=[
+            SemanticMatch(candidate=by_id[c], similarity=round(score, 4))
+            for c, score in hits if c in by_id
+        ],
+    )
+
+
+@router.get("/semantic/stats")
+async def semantic_search_stats():
+    """Embedding store and ANN index counters."""
+    return semantic_search.stats()
+
+
+@router.post("/semantic/reindex")
+async def reindex_semantic_search():
+    """Re-embed every candidate, e.g. after switching embedding provider."""
+    embedded = await semantic_search.reindex()
+    return {"reindexed": embedded, **semantic_search.stats()}
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_candidates(
+    request: Request,
+    format: str = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the Content-Type"),
+    batch_size: int = Query(None, ge=1, le=50000),
+):
+    """Stream a CSV or NDJSON body into the candidates table, upserting on email + source."""
+    fmt = format or format_for(request.headers.get("content-type"))
+    if not fmt:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format=")
+
+    report = await CandidateImporter(batch_size=batch_size).run(request.stream(), fmt)
+    if report.imported:
+        activity_writer.log(
+            agent="integration",
+            action=f"Imported {report.imported} candidates from {fmt.upper()}",
+            details={"rows_read": report.rows_read, "failed": report.failed},
+        )
+    return report
+
+
+@router.post("/resolve", response_model=JobResponse, status_code=202)
+async def resolve_duplicates(response: Response, db: AsyncSession = Depends(get_db)):
+    """Queue a full entity-resolution pass: find duplicates across sources and merge them."""
+    job = await job_queue.enqueue(db, "resolve", {})
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return job
+
+
+@router.get("/resolve/stats")
+async def resolution_stats():
+    """Incremental resolution counters and the report of the last batch run in this process."""
+    return entity_resolver.stats()
+
+
+@router.get("/{candidate_id}/lineage", response_model=CandidateLineageResponse)
+async def get_candidate_lineage(candidate_id: int, db: AsyncSession = Depends(get_db)):
+    """The canonical candidate this one resolves to, with every source record merged into it."""
+    lineage = await entity_resolver.lineage(db, candidate_id)
+    if lineage is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return lineage
+
+
 @router.get("/{candidate_id}", response_model=CandidateResponse)
 async def get_candidate(candidate_id: int, db: AsyncSession = Depends(get_db)):
     """Get a candidate by ID."""
@@ -1,60 +1,68 @@
 """Classification router – Candidate categorization endpoints."""
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
 from database import get_db
-from models import Candidate, Classification, ActivityLog
+from models import Classification
 from schemas import (
     ClassifyRequest, ClassificationResponse, ClassificationListResponse,
     CategoryBreakdown
 )
-from agents.classification_agent import classification_agent, CATEGORIES
+from services.event_writer import activity_writer
+from agents.classification_agent import CATEGORIES
+from services.cascade_classifier import cascade_classifier
+from services.reclassification import classify_one, stale_reclassifier
+from services.response_cache import response_cache
 
 router = APIRouter(prefix="/classification", tags=["Classification Agent"])
 
 
 @router.post("/classify", response_model=ClassificationResponse)
 async def classify_candidate(request: ClassifyRequest, db: AsyncSession = Depends(get_db)):
-    """Classify a single candidate."""
-    result = await db.execute(select(Candidate).where(Candidate.id == request.candidate_id))
-    candidate = result.scalar_one_or_none()
-    if not candidate:
+    """Classify a single candidate; unchanged profiles return the stored classification."""
+    try:
+        profile, classification, reused = await classify_one(db, request.candidate_id, request.force)
+    except LookupError:
         raise HTTPException(status_code=404, detail="Candidate not found")
+    if reused:
+        return classification
 
-    candidate_data = {
-        "name": candidate.name,
-        "title": candidate.title,
-        "company": candidate.company,
-        "skills": candidate.skills or [],
-        "experience": candidate.experience,
-    }
-
-    classification_result = await classification_agent.classify_candidate(candidate_data)
-
-    classification = Classification(
-        candidate_id=candidate.id,
-        category=classification_result["category"],
-        confidence=classification_result["confidence"],
-        seniority=classification_result.get("seniority"),
-        culture_fit=classification_result.get("culture_fit"),
-    )
-    db.add(classification)
-
-    activity = ActivityLog(
+    activity_writer.log(
         agent="classification",
-        action=f"Classified {candidate.name} as {classification_result['category']} ({classification_result['confidence']}%)",
-        details={"candidate_id": candidate.id}
+        action=f"Classified {profile['name']} as {classification.category} ({classification.confidence}%)",
+        details={"candidate_id": request.candidate_id, "source": classification.source},
     )
-    db.add(activity)
-
-    await db.flush()
     return classification
 
 
-@router.get("/categories")
-async def get_categories(db: AsyncSession = Depends(get_db)):
-    """Get category breakdown with counts."""
-    # Get counts from DB
+@router.post("/reclassify-stale", status_code=202)
+async def reclassify_stale(limit: int = Query(None, ge=1)):
+    """Start a background job classifying only new or changed candidates (at most limit)."""
+    started = stale_reclassifier.start(limit)
+    return {"started": started, **stale_reclassifier.progress}
+
+
+@router.get("/reclassify-stale")
+async def reclassify_stale_progress():
+    """Progress of the last stale reclassification job."""
+    return stale_reclassifier.progress
+
+
+@router.get("/cascade")
+async def cascade_stats():
+    """Local vs LLM classification counts and the last training report (accuracy by threshold)."""
+    return cascade_classifier.stats()
+
+
+@router.post("/cascade/train")
+async def train_cascade():
+    """Refit the local classifier on stored LLM classifications."""
+    return await cascade_classifier.train()
+
+
+async def category_breakdown(db: AsyncSession):
+    """Candidates per category, in CATEGORIES order."""
     result = await db.execute(
         select(Classification.category, func.count(Classification.id))
         .group_by(Classification.category)
@@ -75,6 +83,13 @@ async def get_categories(db: AsyncSession = Depends(get_db)):
     return categories
 
 
+@router.get("/categories", response_model=List[CategoryBreakdown])
+async def get_categories(request: Request):
+    """Get category breakdown with counts (coalesced, briefly cached, ETag-validated)."""
+    return await response_cache.respond(request, "classification_categories", category_breakdown,
+                                        tags=("classifications",))
+
+
 @router.get("/results", response_model=ClassificationListResponse)
 async def get_classification_results(
     category: str = None,
@@ -90,21 +105,6 @@ async def get_classification_results(
     result = await db.execute(query)
     classifications = result.scalars().all()
 
-    # Get categories
-    cat_result = await db.execute(
-        select(Classification.category, func.count(Classification.id))
-        .group_by(Classification.category)
-    )
-    counts = dict(cat_result.all())
-    total = sum(counts.values()) or 1
-
-    categories = [
-        CategoryBreakdown(
-            name=c["name"], count=counts.get(c["name"], 0),
-            color=c["color"],
-            percentage=round((counts.get(c["name"], 0) / total) * 100, 1)
-        )
-        for c in CATEGORIES
-    ]
+    categories = await category_breakdown(db)
 
     return ClassificationListResponse(classifications=classifications, categories=categories)
@@ -1,11 +1,23 @@
-"""Dashboard router – Metrics, agent status, and activity feed."""
-from fastapi import APIRouter, Depends
+"""Dashboard router – Metrics, agent status, activity feed and its live WebSocket/SSE push."""
+import asyncio
+from datetime import timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from config import settings
 from database import get_db
 from models import ActivityLog
-from schemas import DashboardMetrics, AgentStatus, ActivityItem, DashboardResponse
+from schemas import DashboardMetrics, ActivityItem, DashboardResponse, AgentThroughput
 from agents.orchestrator import orchestrator
+from services.dashboard_feed import build_dashboard, dashboard_feed
+from services.event_bus import TOPICS, event_bus
+from services.event_writer import activity_writer
+from services.response_cache import response_cache
+from services.rollup_service import rollup_compactor, activity_counts
+from services.instrumentation import agent_metrics
+from services.ai_service import ai_service
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -22,6 +34,12 @@ async def get_agent_statuses():
     return orchestrator.get_agent_statuses()
 
 
+@router.get("/agents/metrics")
+async def get_agent_metrics():
+    """Get call counts, errors and latency percentiles per agent, provider and model."""
+    return {**agent_metrics.snapshot(), "ai_coalescing": ai_service.flights.stats()}
+
+
 @router.get("/activity")
 async def get_activity(limit: int = 10, db: AsyncSession = Depends(get_db)):
     """Get recent activity feed."""
@@ -45,15 +63,110 @@ async def get_activity(limit: int = 10, db: AsyncSession = Depends(get_db)):
     return orchestrator.get_recent_activity()
 
 
+@router.get("/activity/writer")
+async def get_activity_writer_stats():
+    """Get buffer depth, flush and drop counters for the activity writer."""
+    return activity_writer.stats()
+
+
+@router.get("/cache")
+async def get_response_cache_stats():
+    """Get hit, coalesced, miss and 304 counts for the cached read endpoints."""
+    return response_cache.stats()
+
+
+@router.get("/throughput", response_model=AgentThroughput)
+async def get_throughput(hours: int = 24, db: AsyncSession = Depends(get_db)):
+    """Get activity event counts per agent from the rollups."""
+    counts = await activity_counts(db, timedelta(hours=hours))
+    return AgentThroughput(window_hours=hours, agents=counts, total=sum(counts.values()))
+
+
+@router.get("/rollups")
+async def get_rollup_status():
+    """Get compaction and retention counters for the log rollups."""
+    return rollup_compactor.stats()
+
+
 @router.get("", response_model=DashboardResponse)
-async def get_dashboard(db: AsyncSession = Depends(get_db)):
-    """Get full dashboard data in one call."""
-    metrics = DashboardMetrics(**orchestrator.get_metrics())
-    agents = [AgentStatus(**a) for a in orchestrator.get_agent_statuses()]
-    activity = orchestrator.get_recent_activity()
-
-    return DashboardResponse(
-        metrics=metrics,
-        agents=agents,
-        activity=[ActivityItem(**a) for a in activity],
+async def get_dashboard(request: Request):
+    """Get full dashboard data in one call (coalesced, briefly cached, ETag-validated)."""
+    return await response_cache.respond(
+        request, "dashboard", build_dashboard, tags=("activity", "candidates", "classifications"),
     )
+
+
+def parse_topics(topics: str):
+    requested = {t.strip() for t in topics.split(",") if t.strip()}
+    unknown = requested - set(TOPICS)
+    if unknown or not requested:
+        raise HTTPException(status_code=422, detail=f"topics must be a subset of {', '.join(TOPICS)}")
+    return requested
+
+
+@router.get("/stream")
+async def stream(
+    topics: str = Query("activity,dashboard", description="Comma-separated: activity, dashboard"),
+    last_event_id: Optional[int] = Header(None),
+):
+    """Server-sent events: activity as it is logged and dashboard snapshots when they change."""
+    subscriber = event_bus.subscribe(parse_topics(topics), last_event_id)
+    if "dashboard" in subscriber.topics:
+        dashboard_feed.prime(subscriber)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                batch = await subscriber.next_batch(settings.live_heartbeat_seconds)
+                if subscriber.evicted:
+                    yield f"event: evicted\ndata: {subscriber.evicted}\n\n"
+                    return
+                yield "".join(m.sse for m in batch) if batch else ": keep-alive\n\n"
+        finally:
+            event_bus.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+
+@router.websocket("/ws")
+async def websocket_feed(websocket: WebSocket, topics: str = "activity,dashboard"):
+    """WebSocket push of the same events as /dashboard/stream, one JSON message per event."""
+    try:
+        requested = parse_topics(topics)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+    subscriber = event_bus.subscribe(requested)
+    if "dashboard" in subscriber.topics:
+        dashboard_feed.prime(subscriber)
+    # Clients only send pings/close; reading is what notices a dropped connection
+    reader = asyncio.create_task(websocket.receive_text())
+    reader.add_done_callback(lambda _: subscriber.wake())
+    try:
+        while True:
+            batch = await subscriber.next_batch(settings.live_heartbeat_seconds)
+            if reader.done():
+                return
+            if subscriber.evicted:
+                await websocket.close(code=1013, reason=f"Evicted: {subscriber.evicted}")
+                return
+            for message in batch:
+                await websocket.send_text(message.ws)
+            if not batch:
+                await websocket.send_text('{"topic":"heartbeat"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
+        event_bus.unsubscribe(subscriber)
+
+
+@router.get("/live")
+async def get_live_stats():
+    """Get subscriber, fan-out and eviction counters for the live feed."""
+    return {**event_bus.stats(), "dashboard_snapshots": dashboard_feed.published}
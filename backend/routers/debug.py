@@ -0,0 +1,66 @@
+"""Debug router – Admin-only sampling profiler and slow-request capture."""
+import asyncio
+import secrets
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from config import settings
+from services.event_writer import activity_writer
+from services.profiling import ProfilerBusy, sampling_profiler, slow_requests
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints are off until ADMIN_TOKEN is set; then the header must match it."""
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/debug", tags=["Debug"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+):
+    """Sample every thread's stack for `seconds` and return collapsed stacks (flamegraph.pl / speedscope)."""
+    if seconds > settings.profiler_max_seconds:
+        raise HTTPException(status_code=422, detail=f"seconds must be at most {settings.profiler_max_seconds:g}")
+    try:
+        session = sampling_profiler.start(seconds, interval_ms or settings.profiler_default_interval_ms)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stacks = sampling_profiler.finish(session)
+    activity_writer.log(
+        agent="system",
+        action=f"Profiled for {seconds:g}s ({session.samples} samples)",
+        details={"seconds": seconds, "samples": session.samples, "stacks": len(session.stacks)},
+    )
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return Response(stacks, media_type="text/plain", headers={
+        "Content-Disposition": f'attachment; filename="profile-{stamp}.folded"',
+        "X-Profile-Samples": str(session.samples),
+    })
+
+
+@router.get("/slow-requests")
+async def list_slow_requests(limit: int = Query(20, ge=1, le=1000)):
+    """Most recent requests over the threshold, newest first, with phase timings and SQL."""
+    return slow_requests.snapshot(limit)
+
+
+@router.put("/slow-requests")
+async def set_slow_request_threshold(threshold_ms: float = Query(..., ge=0)):
+    """Change the capture threshold at runtime; 0 stops tracing requests."""
+    slow_requests.threshold_ms = threshold_ms
+    return {"threshold_ms": threshold_ms}
+
+
+@router.delete("/slow-requests", status_code=204)
+async def clear_slow_requests():
+    slow_requests.recent.clear()
@@ -1,24 +1,49 @@
 """Intake router – Endpoints for voice, image, and text intake."""
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from config import settings
 from database import get_db
-from models import Intake, ActivityLog
-from schemas import IntakeTextRequest, IntakeResponse, IntakeHistoryResponse
+from models import Intake, Candidate
+from schemas import (
+    IntakeTextRequest, IntakeResponse, IntakeHistoryResponse,
+    MatchRequest, MatchResponse, CandidateMatch, LeaderboardResponse,
+)
 from agents.intake_agent import intake_agent
 from services.file_service import file_service
+from services.event_writer import activity_writer
+from services.matching_engine import matching_engine, Requirements
+from services.leaderboard import board_timestamp, leaderboards
+from services.job_queue import job_queue
 import json
+from typing import Optional
 
 router = APIRouter(prefix="/intake", tags=["Intake Agent"])
 
+DEFER = Query(False, description="Queue the extraction as a background job and respond 202 right away")
+
+
+async def defer_intake(db: AsyncSession, intake: Intake, response: Response) -> Intake:
+    """Hand the intake to the job queue; poll the intake or the Location job for the result."""
+    intake.status = "queued"
+    await db.flush()
+    job = await job_queue.enqueue(db, "intake", {"intake_id": intake.id}, idempotency_key=f"intake:{intake.id}")
+    response.status_code = 202
+    response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+    return intake
+
 
 @router.post("/text", response_model=IntakeResponse)
-async def intake_text(request: IntakeTextRequest, db: AsyncSession = Depends(get_db)):
+async def intake_text(
+    request: IntakeTextRequest, response: Response, defer: bool = DEFER, db: AsyncSession = Depends(get_db)
+):
     """Process text input and extract hiring preferences."""
     # Create intake record
     intake = Intake(mode="text", raw_input=request.text, status="processing")
     db.add(intake)
     await db.flush()
+    if defer:
+        return await defer_intake(db, intake, response)
 
     # Process with agent
     result = await intake_agent.process_text(request.text)
@@ -28,18 +53,19 @@ async def intake_text(request: IntakeTextRequest, db: AsyncSession = Depends(get
     intake.status = "processed"
 
     # Log activity
-    activity = ActivityLog(
+    activity_writer.log(
         agent="intake",
         action=f"Processed text intake for {result['parsed_data'].get('job_title', 'Unknown Role')}",
-        details={"intake_id": intake.id, "mode": "text"}
+        details={"intake_id": intake.id, "mode": "text", "prefilled": result["prefilled"]},
     )
-    db.add(activity)
 
     return intake
 
 
 @router.post("/image", response_model=IntakeResponse)
-async def intake_image(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+async def intake_image(
+    response: Response, file: UploadFile = File(...), defer: bool = DEFER, db: AsyncSession = Depends(get_db)
+):
     """Process image/document upload and extract hiring preferences."""
     file_bytes = await file.read()
     file_path = file_service.save_file(file_bytes, file.filename)
@@ -47,6 +73,8 @@ async def intake_image(file: UploadFile = File(...), db: AsyncSession = Depends(
     intake = Intake(mode="image", file_path=file_path, status="processing")
     db.add(intake)
     await db.flush()
+    if defer:
+        return await defer_intake(db, intake, response)
 
     result = await intake_agent.process_image(file_bytes, file.filename)
 
@@ -54,18 +82,19 @@ async def intake_image(file: UploadFile = File(...), db: AsyncSession = Depends(
     intake.confidence = result["confidence"]
     intake.status = "processed"
 
-    activity = ActivityLog(
+    activity_writer.log(
         agent="intake",
         action=f"Processed image upload — {file.filename}",
-        details={"intake_id": intake.id, "mode": "image"}
+        details={"intake_id": intake.id, "mode": "image"},
     )
-    db.add(activity)
 
     return intake
 
 
 @router.post("/voice", response_model=IntakeResponse)
-async def intake_voice(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+async def intake_voice(
+    response: Response, file: UploadFile = File(...), defer: bool = DEFER, db: AsyncSession = Depends(get_db)
+):
     """Process voice recording and extract hiring preferences."""
     file_bytes = await file.read()
     file_path = file_service.save_file(file_bytes, file.filename)
@@ -73,6 +102,8 @@ async def intake_voice(file: UploadFile = File(...), db: AsyncSession = Depends(
     intake = Intake(mode="voice", file_path=file_path, status="processing")
     db.add(intake)
     await db.flush()
+    if defer:
+        return await defer_intake(db, intake, response)
 
     result = await intake_agent.process_voice(file_bytes, file.filename)
 
@@ -80,12 +111,11 @@ async def intake_voice(file: UploadFile = File(...), db: AsyncSession = Depends(
     intake.confidence = result["confidence"]
     intake.status = "processed"
 
-    activity = ActivityLog(
+    activity_writer.log(
         agent="intake",
         action="Processed voice recording intake",
-        details={"intake_id": intake.id, "mode": "voice"}
+        details={"intake_id": intake.id, "mode": "voice"},
     )
-    db.add(activity)
 
     return intake
 
@@ -98,3 +128,124 @@ async def intake_history(limit: int = 20, db: AsyncSession = Depends(get_db)):
     )
     intakes = result.scalars().all()
     return IntakeHistoryResponse(intakes=intakes, total=len(intakes))
+
+
+@router.post("/{intake_id}/matches", response_model=MatchResponse)
+async def match_intake(
+    intake_id: int,
+    request: MatchRequest = MatchRequest(),
+    db: AsyncSession = Depends(get_db),
+):
+    """Score every candidate against an intake's requirements and return the top k."""
+    intake = (await db.execute(select(Intake).where(Intake.id == intake_id))).scalar_one_or_none()
+    if not intake:
+        raise HTTPException(status_code=404, detail="Intake not found")
+    if not intake.parsed_data:
+        raise HTTPException(status_code=409, detail="Intake has not been processed yet")
+
+    requirements = Requirements.from_parsed(intake.parsed_data)
+    pool, result = await matching_engine.match(requirements, request.top_k)
+
+    ids = [int(i) for i in result.ids]
+    rows = await db.execute(select(Candidate).where(Candidate.id.in_(ids)))
+    candidates = {c.id: c for c in rows.scalars().all()}
+    written = 0
+    if request.write_scores:
+        # Only the returned top k; match_score is shared by every intake, so the rest is left alone
+        for rank, candidate_id in enumerate(ids):
+            if candidate_id in candidates:
+                candidates[candidate_id].match_score = round(float(result.scores[rank]), 1)
+                written += 1
+
+    matches = [
+        CandidateMatch(
+            candidate=candidates[candidate_id],
+            score=round(float(result.scores[rank]), 1),
+            skill_score=round(float(result.skill_scores[rank]), 3),
+            experience_score=round(float(result.experience_scores[rank]), 3),
+            location_score=round(float(result.location_scores[rank]), 3),
+            matched_skills=result.matched_skills[rank],
+        )
+        for rank, candidate_id in enumerate(ids)
+        if candidate_id in candidates  # deleted since the pool was built
+    ]
+
+    activity_writer.log(
+        agent="orchestrator",
+        action=f"Matched {pool.size} candidates to {intake.parsed_data.get('job_title') or 'intake'} #{intake_id}",
+        details={"intake_id": intake_id, "elapsed_ms": result.elapsed_ms},
+    )
+
+    return MatchResponse(
+        intake_id=intake_id,
+        requirements=requirements.to_dict(),
+        pool_size=pool.size,
+        elapsed_ms=result.elapsed_ms,
+        matches=matches,
+        scores_written=written,
+    )
+
+
+@router.get("/matches/engine")
+async def matching_engine_stats():
+    """In-memory candidate pool size, build time and freshness."""
+    return matching_engine.stats()
+
+
+@router.get("/leaderboards")
+async def leaderboard_stats():
+    """Cached boards, queued candidate changes and how far behind the boards are."""
+    return leaderboards.stats()
+
+
+@router.post("/leaderboards/rebuild")
+async def rebuild_leaderboards():
+    """Recompute every cached board from the matching pool."""
+    rebuilt = await leaderboards.rebuild_all()
+    return {"rebuilt": rebuilt, **leaderboards.stats()}
+
+
+@router.get("/{intake_id}/leaderboard", response_model=LeaderboardResponse)
+async def intake_leaderboard(
+    intake_id: int,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_db),
+):
+    """Top candidates for an intake from its materialized leaderboard; honours If-None-Match."""
+    board = await leaderboards.get(intake_id)
+    if board is None:
+        exists = (await db.execute(select(Intake.id).where(Intake.id == intake_id))).scalar()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Intake not found")
+        raise HTTPException(status_code=409, detail="Intake has not been processed yet")
+
+    limit = min(limit or settings.leaderboard_size, settings.leaderboard_size)
+    etag = leaderboards.etag(board, limit)
+    if etag in request.headers.get("if-none-match", ""):
+        leaderboards.not_modified += 1
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return LeaderboardResponse(
+        intake_id=intake_id,
+        version=board.version,
+        built_at=board_timestamp(board.built_at),
+        updated_at=board_timestamp(board.updated_at),
+        entries=board.top(limit),
+    )
+
+
+@router.post("/{intake_id}/leaderboard/rebuild", response_model=LeaderboardResponse)
+async def rebuild_intake_leaderboard(intake_id: int):
+    """Recompute one intake's board from the matching pool."""
+    board = await leaderboards.rebuild(intake_id)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Intake not found or not processed")
+    return LeaderboardResponse(
+        intake_id=intake_id,
+        version=board.version,
+        built_at=board_timestamp(board.built_at),
+        updated_at=board_timestamp(board.updated_at),
+        entries=board.top(settings.leaderboard_size),
+    )
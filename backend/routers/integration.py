@@ -1,38 +1,224 @@
 """Integration router – External system management and API logs."""
-from fastapi import APIRouter, Depends
+import json
+import time
+from datetime import timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
-from schemas import IntegrationStatsResponse, ApiLogResponse, ApiLogListResponse
+from models import Candidate
+from schemas import (
+    IntegrationStatsResponse, ApiLogResponse, ApiLogListResponse, EndpointStats, CandidatePushRequest,
+    CandidatePushResponse,
+)
 from agents.integration_agent import integration_agent
+from services.api_logger import api_logger
+from services.event_writer import activity_writer
+from services.federated_search import federated_search
+from services.response_cache import response_cache
+from services.rollup_service import api_stats
+from services.sync_scheduler import sync_scheduler
 
 router = APIRouter(prefix="/integration", tags=["Integration Agent (MCP)"])
 
 
-@router.get("/systems")
-async def get_systems():
-    """List all connected external systems."""
+async def list_systems(db: AsyncSession):
     return integration_agent.get_systems()
 
 
+@router.get("/systems")
+async def get_systems(request: Request):
+    """List all connected external systems (coalesced, briefly cached, ETag-validated)."""
+    return await response_cache.respond(request, "integration_systems", list_systems, tags=("integration",))
+
+
+async def start_search(q: str, limit: int, deadline_ms: Optional[float], sources: Optional[str]):
+    try:
+        return await federated_search.search(
+            q, limit, deadline_ms, [s.strip() for s in sources.split(",") if s.strip()] if sources else None,
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+@router.get("/search")
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=200),
+    deadline_ms: Optional[float] = Query(None, ge=10, le=10_000),
+    sources: Optional[str] = Query(None, description="Comma-separated system names (default: all healthy)"),
+):
+    """Search every healthy system at once; answers by the deadline, marked partial if sources are still out."""
+    run = await start_search(q, limit, deadline_ms, sources)
+    body = run.snapshot()
+    if body["partial"]:
+        body["stream"] = request.url_for("follow_search", search_id=run.id).path
+    return body
+
+
+@router.get("/search/stream")
+async def search_stream(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(50, ge=1, le=200),
+    deadline_ms: Optional[float] = Query(None, ge=10, le=10_000),
+    sources: Optional[str] = None,
+):
+    """Server-sent events: `results` at the deadline, a `source` event per late system, then `done`."""
+    run = await start_search(q, limit, deadline_ms, sources)
+
+    async def events():
+        yield f"event: results\ndata: {json.dumps(run.snapshot(), separators=(',', ':'))}\n\n"
+        async for frame in federated_search.follow(run):
+            yield frame
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/search/stats")
+async def get_search_stats():
+    """Per-source search latency, late answers, timeouts and errors."""
+    return federated_search.stats()
+
+
+@router.get("/search/{search_id}/stream", name="follow_search")
+async def follow_search(search_id: int, last_event_id: Optional[int] = Header(None)):
+    """Server-sent events for the sources of a partial search that answer after the deadline."""
+    run = federated_search.runs.get(search_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Search not found or expired")
+    return StreamingResponse(federated_search.follow(run, last_event_id or 0), media_type="text/event-stream",
+                             headers=SSE_HEADERS)
+
+
+@router.post("/sync")
+async def sync_all(concurrency: Optional[int] = Query(None, ge=1, le=32)):
+    """Sync every connected system in parallel, each pulling only what changed since its last sync."""
+    report = await sync_scheduler.sync_all(concurrency=concurrency)
+    activity_writer.log(
+        agent="integration",
+        action=f"Synced {report['synced']} systems: {report['new_records']} new records"
+               + (f", {report['failed']} failed" if report["failed"] else ""),
+        details={"new_records": report["new_records"], "failed": report["failed"],
+                 "duration_ms": report["duration_ms"]},
+    )
+    return report
+
+
+@router.get("/sync/status")
+async def get_sync_status():
+    """Per-connector sync counts, durations, record rates and schedules."""
+    return sync_scheduler.stats()
+
+
 @router.post("/sync/{system_name}")
 async def sync_system(system_name: str):
-    """Trigger a sync for a specific system."""
-    result = await integration_agent.sync_system(system_name)
+    """Trigger an incremental sync for a specific system (waits for one already running)."""
+    try:
+        result = await sync_scheduler.sync(system_name)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Sync of {system_name} failed: {e}")
+    activity_writer.log(
+        agent="integration",
+        action=f"Synced {system_name}: {result['new_records']} new records",
+        details={"system_name": system_name, "new_records": result["new_records"],
+                 "duration_ms": result["duration_ms"]},
+    )
     return result
 
 
+@router.put("/sync/{system_name}/schedule")
+async def set_sync_schedule(system_name: str, interval_seconds: Optional[float] = Query(None, ge=0)):
+    """Set how often a system syncs in the background; 0 disables, omitted restores the default."""
+    try:
+        await sync_scheduler.set_interval(system_name, interval_seconds)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"system_name": system_name, "interval_seconds": sync_scheduler.interval(system_name)}
+
+
+@router.post("/push/{system_name}", response_model=CandidatePushResponse)
+async def push_candidates(system_name: str, body: CandidatePushRequest, db: AsyncSession = Depends(get_db)):
+    """Push stored candidates to a system in batch requests, under its rate limit."""
+    rows = (await db.execute(
+        select(Candidate.id, Candidate.name, Candidate.email, Candidate.title, Candidate.company,
+               Candidate.location, Candidate.skills, Candidate.experience, Candidate.source)
+        .where(Candidate.id.in_(body.candidate_ids))
+    )).mappings().all()
+    candidates = [{"candidate_id": row["id"], **{k: v for k, v in row.items() if k != "id"}} for row in rows]
+    started = time.perf_counter()
+    try:
+        results = await integration_agent.push_candidates(system_name, candidates)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ConnectionError as e:
+        raise HTTPException(status_code=502, detail=f"Push to {system_name} failed: {e}")
+    pushed = sum(results)
+    found = {c["candidate_id"] for c in candidates}
+    activity_writer.log(
+        agent="integration",
+        action=f"Pushed {pushed} candidates to {system_name}",
+        details={"system_name": system_name, "pushed": pushed, "rejected": len(results) - pushed},
+    )
+    return CandidatePushResponse(
+        system_name=system_name,
+        requested=len(body.candidate_ids),
+        pushed=pushed,
+        rejected=len(results) - pushed,
+        missing=[i for i in dict.fromkeys(body.candidate_ids) if i not in found],
+        duration_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+@router.get("/transport")
+async def get_transport_stats():
+    """Per-system rate limiting, retry, throttling and push batching counters of the HTTP connectors."""
+    return integration_agent.transport_stats()
+
+
 @router.get("/logs", response_model=ApiLogListResponse)
 async def get_api_logs(count: int = 10):
-    """Get recent API call logs."""
-    logs = integration_agent.generate_mock_logs(count)
+    """Get recent API call logs from the in-memory ring buffer."""
+    logs = api_logger.recent(count)
     return ApiLogListResponse(
-        logs=[ApiLogResponse(id=i + 1, **log) for i, log in enumerate(logs)],
-        total=count,
+        logs=[ApiLogResponse(**log) for log in logs],
+        total=api_logger.ring.total,
     )
 
 
-@router.get("/stats", response_model=IntegrationStatsResponse)
-async def get_stats():
-    """Get aggregate connection statistics."""
+@router.get("/logs/overhead")
+async def get_api_log_overhead():
+    """Get the per-record cost of API call logging against its budget."""
+    return api_logger.overhead()
+
+
+async def integration_stats(db: AsyncSession) -> IntegrationStatsResponse:
     stats = integration_agent.get_stats()
-    return IntegrationStatsResponse(**stats)
+    traffic = (await api_stats(db, timedelta(hours=1)))[0]
+    return IntegrationStatsResponse(
+        **stats,
+        requests_last_hour=traffic["requests"],
+        error_rate=traffic["error_rate"],
+        latency_p50=traffic["latency_p50"],
+        latency_p95=traffic["latency_p95"],
+    )
+
+
+@router.get("/stats", response_model=IntegrationStatsResponse)
+async def get_stats(request: Request):
+    """Get aggregate connection statistics and last-hour API traffic (coalesced, briefly cached, ETag-validated)."""
+    return await response_cache.respond(request, "integration_stats", integration_stats, tags=("integration",))
+
+
+@router.get("/stats/endpoints", response_model=List[EndpointStats])
+async def get_endpoint_stats(hours: int = 1, limit: int = 20, db: AsyncSession = Depends(get_db)):
+    """Get per-endpoint request counts and latency percentiles from the rollups."""
+    stats = await api_stats(db, timedelta(hours=hours), by_endpoint=True)
+    return stats[:limit]
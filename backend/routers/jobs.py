@@ -0,0 +1,67 @@
+"""Jobs router – Enqueue and inspect durable background jobs."""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db
+from models import Job
+from schemas import JobCreate, JobResponse, JobListResponse
+from services.job_queue import job_queue
+from services.job_worker import HANDLERS, job_worker
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+async def enqueue_job(request: JobCreate, db: AsyncSession = Depends(get_db)):
+    """Queue a job; an idempotency key already used returns the existing job."""
+    if request.type not in HANDLERS:
+        raise HTTPException(status_code=422, detail=f"Unknown job type '{request.type}'")
+    return await job_queue.enqueue(
+        db, request.type, request.payload, priority=request.priority, idempotency_key=request.idempotency_key,
+        max_attempts=request.max_attempts, delay_seconds=request.delay_seconds,
+    )
+
+
+@router.get("", response_model=JobListResponse)
+async def list_jobs(
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """List recent jobs, optionally filtered by type and status."""
+    query = select(Job)
+    count = select(func.count(Job.id))
+    if type:
+        query, count = query.where(Job.type == type), count.where(Job.type == type)
+    if status:
+        query, count = query.where(Job.status == status), count.where(Job.status == status)
+    jobs = (await db.execute(query.order_by(desc(Job.id)).limit(limit))).scalars().all()
+    return JobListResponse(jobs=jobs, total=(await db.execute(count)).scalar() or 0)
+
+
+@router.get("/stats")
+async def job_stats(db: AsyncSession = Depends(get_db)):
+    """Queue depth, oldest ready job, lease age and throughput per job type."""
+    return {**await job_queue.stats(db), "in_app_worker": job_worker.stats()}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a job's status, attempts and result."""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/retry", response_model=JobResponse)
+async def retry_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """Requeue a dead job with a fresh attempt budget."""
+    job = await job_queue.retry(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "queued":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}; only dead jobs can be retried")
+    return job
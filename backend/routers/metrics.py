@@ -0,0 +1,159 @@
+"""Metrics router – Prometheus scrape endpoint and the scrape-time collectors."""
+from datetime import datetime, timezone
+from fastapi import APIRouter, Response
+from sqlalchemy import func, select
+from database import async_session, engine
+from models import Job
+from agents.integration_agent import integration_agent
+from agents.orchestrator import orchestrator
+from services.api_logger import api_logger
+from services.cascade_classifier import cascade_classifier
+from services.event_bus import event_bus
+from services.event_writer import activity_writer
+from services.instrumentation import agent_metrics
+from services.job_worker import job_worker
+from services.leaderboard import leaderboards
+from services.metrics import (
+    CONTENT_TYPE, Family, agent_families, cache_requests, metrics, pool_families, ratio_family,
+)
+from services.rollup_service import utc_naive
+from services.semantic_search import semantic_search
+from services.sync_scheduler import sync_scheduler
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def scrape():
+    """Prometheus text exposition."""
+    return Response(await metrics.render(), media_type=CONTENT_TYPE)
+
+
+@metrics.collector
+def agents():
+    return agent_families(agent_metrics)
+
+
+@metrics.collector
+def database_pool():
+    return pool_families(engine)
+
+
+@metrics.collector
+def buffered_writers():
+    pending = Family("writer_pending", "gauge", "Records buffered for the next batch insert.")
+    capacity = Family("writer_capacity", "gauge", "Buffer capacity before records are dropped.")
+    written = Family("writer_written", "counter", "Records written.")
+    dropped = Family("writer_dropped", "counter", "Records dropped on overflow.")
+    for writer in (activity_writer, api_logger.writer):
+        stats = writer.stats()
+        pending.add(stats["pending"], table=stats["table"])
+        capacity.add(stats["capacity"], table=stats["table"])
+        written.add(stats["written"], "_total", table=stats["table"])
+        dropped.add(stats["dropped_oldest"] + stats["dropped_newest"], "_total", table=stats["table"])
+    return [pending, capacity, written, dropped]
+
+
+@metrics.collector
+async def job_queue_depth():
+    depth = Family("jobs", "gauge", "Jobs by type and status.")
+    oldest = Family("jobs_oldest_ready_age_seconds", "gauge", "Age of the oldest job waiting for a worker.")
+    now = utc_naive(datetime.now(timezone.utc))
+    async with async_session() as db:
+        for job_type, status, count in (await db.execute(
+            select(Job.type, Job.status, func.count()).group_by(Job.type, Job.status)
+        )).all():
+            depth.add(count, type=job_type, status=status)
+        for job_type, run_at in (await db.execute(
+            select(Job.type, func.min(Job.run_at)).where(Job.status == "queued", Job.run_at <= now).group_by(Job.type)
+        )).all():
+            oldest.add(round((now - utc_naive(run_at)).total_seconds(), 3), type=job_type)
+    in_flight = Family("job_worker_in_flight", "gauge", "Jobs running in this process's worker.")
+    in_flight.add(len(job_worker.running))
+    return [depth, oldest, in_flight]
+
+
+@metrics.collector
+def background_queues():
+    pending = Family("pending_changes", "gauge", "Changes waiting to be applied by a background consumer.")
+    pending.add(len(leaderboards.pending), consumer="leaderboards")
+    pending.add(len(semantic_search.dirty), consumer="semantic_search")
+    lag = Family("leaderboard_lag_seconds", "gauge", "Age of the oldest change not yet on the boards.")
+    lag.add(leaderboards.lag_seconds())
+    runs = Family("pipeline_runs_active", "gauge", "Orchestrator pipeline runs in progress.")
+    runs.add(len(orchestrator.active_jobs))
+    stage = Family("pipeline_items_in_flight", "gauge", "Fan-out items running per pipeline stage, across runs.")
+    for name, count in orchestrator.executor.active.items():
+        stage.add(count, stage=name)
+    return [pending, lag, runs, stage]
+
+
+@metrics.collector
+def live_feed():
+    subscribers = Family("live_subscribers", "gauge", "WebSocket/SSE clients subscribed per topic.")
+    for topic, subs in event_bus.subscribers.items():
+        subscribers.add(len(subs), topic=topic)
+    published = Family("live_events_published", "counter", "Events published to the live feed.")
+    published.add(event_bus.published, "_total")
+    evicted = Family("live_clients_evicted", "counter", "Live clients evicted for falling behind.")
+    evicted.add(event_bus.evicted, "_total")
+    return [subscribers, published, evicted]
+
+
+@metrics.collector
+def connector_syncs():
+    syncs = Family("connector_syncs", "counter", "Connector syncs by system and result.")
+    records = Family("connector_sync_records", "counter", "Records pulled by connector syncs.")
+    seconds = Family("connector_sync_seconds", "counter", "Time spent in successful connector syncs.")
+    for name, s in sync_scheduler.connector_stats.items():
+        syncs.add(s.syncs, "_total", system=name, result="success")
+        syncs.add(s.failures, "_total", system=name, result="error")
+        records.add(s.records, "_total", system=name)
+        seconds.add(round(s.seconds, 6), "_total", system=name)
+    return [syncs, records, seconds]
+
+
+@metrics.collector
+def connector_transport():
+    requests = Family("connector_http_requests", "counter",
+                      "HTTP requests to external systems by outcome (ok, throttled, server_error, client_error, "
+                      "network_error).")
+    retries = Family("connector_http_retries", "counter", "Requests to external systems that were retried.")
+    failed = Family("connector_http_failures", "counter", "Requests to external systems that failed for good.")
+    waited = Family("connector_rate_limit_wait_seconds", "counter", "Time spent waiting for a rate-limit token.")
+    batches = Family("connector_push_requests", "counter", "Batch push requests sent to external systems.")
+    pushed = Family("connector_pushed_candidates", "counter", "Candidates sent in batch push requests.")
+    for name, s in integration_agent.transport_stats().items():
+        requests.add(s["ok"], "_total", system=name, outcome="ok")
+        requests.add(s["throttled"], "_total", system=name, outcome="throttled")
+        requests.add(s["server_errors"], "_total", system=name, outcome="server_error")
+        requests.add(s["client_errors"], "_total", system=name, outcome="client_error")
+        requests.add(s["network_errors"], "_total", system=name, outcome="network_error")
+        retries.add(s["retries"], "_total", system=name)
+        failed.add(s["failed"], "_total", system=name)
+        waited.add(s["bucket_wait_seconds"], "_total", system=name)
+        batches.add(s["push_requests"], "_total", system=name)
+        pushed.add(s["pushed"], "_total", system=name)
+    return [requests, retries, failed, waited, batches, pushed]
+
+
+@metrics.collector
+def caches():
+    hits_misses = {}
+    for (cache, result), value in cache_requests.values.items():
+        hits, misses = hits_misses.get(cache, (0, 0))
+        # A request that joined an in-flight computation was served without one of its own
+        hits_misses[cache] = (hits + value, misses) if result in ("hit", "coalesced") else (hits, misses + value)
+    decisions = Family("classifier_decisions", "counter", "Cascade classifier answers by path.")
+    decisions.add(cascade_classifier.local, "_total", path="local")
+    decisions.add(cascade_classifier.escalated, "_total", path="escalated")
+    decisions.add(cascade_classifier.llm_failed, "_total", path="llm_failed")
+    hits_misses["cascade_classifier"] = (cascade_classifier.local, cascade_classifier.escalated)
+    return [ratio_family(hits_misses), decisions]
+
+
+@metrics.collector
+def scrapes():
+    family = Family("metrics_render_seconds", "gauge", "Time the previous scrape took to render.")
+    family.add((metrics.last_render_ms or 0) / 1000)
+    return [family]
@@ -0,0 +1,73 @@
+"""Pipeline router – Run hiring requirements through the multi-agent DAG."""
+import json
+from typing import List, Optional
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from schemas import PipelineRunResponse, PipelineRunListResponse
+from agents.orchestrator import orchestrator
+
+router = APIRouter(prefix="/pipeline", tags=["Orchestrator"])
+
+
+@router.post("/runs", response_model=PipelineRunResponse, status_code=202)
+async def start_run(
+    text: Optional[str] = Form(None, description="Hiring requirement; or pass intake_id"),
+    intake_id: Optional[int] = Form(None),
+    files: List[UploadFile] = File(default=[], description="Resumes and documents for the vision stage"),
+    top_k: int = Form(50, ge=1, le=1000),
+    push_to: Optional[str] = Form(None, description="Comma-separated connectors; defaults to PIPELINE_PUSH_SYSTEMS"),
+    timeouts: Optional[str] = Form(None, description='Per-stage seconds as JSON, e.g. {"vision": 30}'),
+    wait: bool = Query(False, description="Respond when the run has finished"),
+):
+    """Start a pipeline run: intake, vision fan-out, classification, integration push and matching."""
+    if not text and not intake_id:
+        raise HTTPException(status_code=422, detail="Pass the requirement text or an intake_id")
+    try:
+        stage_timeouts = {k: float(v) for k, v in json.loads(timeouts).items()} if timeouts else {}
+    except (ValueError, AttributeError, TypeError):
+        raise HTTPException(status_code=422, detail="timeouts must be a JSON object of stage -> seconds")
+
+    run = orchestrator.start_pipeline({
+        "text": text,
+        "intake_id": intake_id,
+        "documents": [(f.filename, await f.read()) for f in files],
+        "top_k": top_k,
+        "push_to": [s.strip() for s in push_to.split(",") if s.strip()] if push_to else None,
+        "timeouts": stage_timeouts,
+    })
+    if wait:
+        await run.task
+        return JSONResponse(jsonable_encoder(run.snapshot()), status_code=200)
+    return run.snapshot()
+
+
+@router.get("/runs", response_model=PipelineRunListResponse)
+async def list_runs(limit: int = Query(20, ge=1, le=100)):
+    """Most recent runs first, without their results."""
+    runs = list(orchestrator.runs.values())[::-1][:limit]
+    return PipelineRunListResponse(
+        runs=[run.snapshot(results=False) for run in runs],
+        active=len(orchestrator.active_jobs),
+        in_flight=orchestrator.executor.active,
+    )
+
+
+@router.get("/runs/{run_id}", response_model=PipelineRunResponse)
+async def get_run(run_id: str):
+    """Stage statuses, wall times and the results collected so far."""
+    run = orchestrator.runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    return run.snapshot()
+
+
+@router.post("/runs/{run_id}/cancel", response_model=PipelineRunResponse)
+async def cancel_run(run_id: str):
+    """Cancel a running pipeline; stages that finished keep their results."""
+    run = orchestrator.runs.get(run_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="Pipeline run not found")
+    if run.cancel():
+        await run.task
+    return run.snapshot()
@@ -1,21 +1,31 @@
 """Vision router – Document upload and extraction endpoints."""
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
 from database import get_db
-from models import Document, ActivityLog
+from models import Document
 from schemas import DocumentResponse, DocumentListResponse
 from agents.vision_agent import vision_agent
 from services.file_service import file_service
+from services.event_writer import activity_writer
+from services.job_queue import job_queue
+from services.profiling import phase
 
 router = APIRouter(prefix="/vision", tags=["Vision Agent"])
 
 
 @router.post("/upload", response_model=DocumentResponse)
-async def upload_document(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+async def upload_document(
+    response: Response,
+    file: UploadFile = File(...),
+    defer: bool = Query(False, description="Queue the extraction as a background job and respond 202 right away"),
+    db: AsyncSession = Depends(get_db),
+):
     """Upload a document for AI extraction."""
-    file_bytes = await file.read()
-    file_path = file_service.save_file(file_bytes, file.filename)
+    with phase("file_read"):
+        file_bytes = await file.read()
+    with phase("save"):
+        file_path = file_service.save_file(file_bytes, file.filename)
     file_type = file_service.get_file_type(file.filename)
 
     doc = Document(
@@ -25,7 +35,14 @@ async def upload_document(file: UploadFile = File(...), db: AsyncSession = Depen
         status="processing",
     )
     db.add(doc)
-    await db.flush()
+    with phase("db_flush"):
+        await db.flush()
+    if defer:
+        doc.status = "queued"
+        job = await job_queue.enqueue(db, "vision", {"document_id": doc.id}, idempotency_key=f"vision:{doc.id}")
+        response.status_code = 202
+        response.headers["Location"] = f"/api/v1/jobs/{job.id}"
+        return doc
 
     result = await vision_agent.process_document(file_bytes, file.filename, file_type)
 
@@ -34,12 +51,11 @@ async def upload_document(file: UploadFile = File(...), db: AsyncSession = Depen
     doc.confidence_scores = result.get("confidence_scores", {})
     doc.status = "complete"
 
-    activity = ActivityLog(
+    activity_writer.log(
         agent="vision",
         action=f"Extracted {len(result.get('fields', []))} fields from {file.filename}",
-        details={"document_id": doc.id}
+        details={"document_id": doc.id},
     )
-    db.add(activity)
 
     return doc
 
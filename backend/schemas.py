@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -61,6 +61,7 @@ class DocumentListResponse(BaseModel):
 
 class ClassifyRequest(BaseModel):
     candidate_id: int
+    force: bool = Field(False, description="Classify again even if the profile is unchanged")
 
 class ClassificationResult(BaseModel):
     category: str
@@ -75,6 +76,7 @@ class ClassificationResponse(BaseModel):
     confidence: float
     seniority: Optional[str] = None
     culture_fit: Optional[str] = None
+    source: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -106,6 +108,7 @@ class CandidateResponse(BaseModel):
     screen_score: Optional[float] = None
     status: str
     source: Optional[str] = None
+    canonical_id: Optional[int] = None  # set when merged into another candidate
     created_at: datetime
 
     class Config:
@@ -115,9 +118,174 @@ class CandidateListResponse(BaseModel):
     candidates: List[CandidateResponse]
     total: int
 
+class CandidateLineageEntry(BaseModel):
+    candidate_id: int
+    source: Optional[str] = None
+    email: Optional[str] = None
+    rule: str  # canonical, email, name_company, profile, cluster
+    similarity: Optional[float] = None
+    matched_with: Optional[int] = None
+    merged_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class CandidateLineageResponse(BaseModel):
+    canonical: CandidateResponse
+    members: List[CandidateLineageEntry]
+
 class CandidateStatusUpdate(BaseModel):
     status: str = Field(..., pattern="^(new|screened|interview|offer|hired)$")
 
+class MatchRequest(BaseModel):
+    top_k: int = Field(50, ge=1, le=1000)
+    write_scores: bool = Field(False, description="Store the returned top-k scores as Candidate.match_score, "
+                                                  "replacing those of earlier matches")
+
+class CandidateMatch(BaseModel):
+    candidate: CandidateResponse
+    score: float
+    skill_score: float
+    experience_score: float
+    location_score: float
+    matched_skills: List[str]
+
+class MatchResponse(BaseModel):
+    intake_id: int
+    requirements: Dict[str, Any]
+    pool_size: int
+    elapsed_ms: float
+    matches: List[CandidateMatch]
+    scores_written: int = 0  # candidates whose match_score was set (write_scores only)
+
+class LeaderboardEntry(BaseModel):
+    candidate_id: int
+    name: str
+    title: Optional[str] = None
+    status: Optional[str] = None
+    category: Optional[str] = None
+    score: float
+
+class LeaderboardResponse(BaseModel):
+    intake_id: int
+    version: int
+    built_at: datetime
+    updated_at: datetime
+    entries: List[LeaderboardEntry]
+
+class PipelineStageReport(BaseModel):
+    name: str
+    after: List[str]
+    status: str  # pending, running, done, partial, failed, timeout, cancelled, skipped
+    wall_ms: Optional[float] = None
+    items_total: int
+    items_done: int
+    items_failed: int
+    error: Optional[str] = None
+
+class PipelineRunResponse(BaseModel):
+    id: str
+    label: str
+    status: str  # pending, running, complete, partial, failed, cancelled
+    created_at: datetime
+    wall_ms: Optional[float] = None
+    concurrency: Optional[float] = None  # summed stage time / run time; above 1 means stages overlapped
+    stages: List[PipelineStageReport]
+    results: Optional[Dict[str, Any]] = None
+
+class PipelineRunListResponse(BaseModel):
+    runs: List[PipelineRunResponse]
+    active: int
+    in_flight: Dict[str, int]  # fan-out items running per stage, across runs
+
+class JobCreate(BaseModel):
+    type: str = Field(..., description="intake, vision, classification, sync or resolve")
+    payload: Dict[str, Any]
+    priority: int = 0  # higher runs first
+    idempotency_key: Optional[str] = Field(None, max_length=200)
+    max_attempts: Optional[int] = Field(None, ge=1, le=50)
+    delay_seconds: float = Field(0, ge=0)
+
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    payload: Dict[str, Any]
+    status: str  # queued, running, done, dead
+    priority: int
+    attempts: int
+    max_attempts: int
+    idempotency_key: Optional[str] = None
+    run_at: datetime
+    leased_by: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class JobListResponse(BaseModel):
+    jobs: List[JobResponse]
+    total: int
+
+class SemanticMatch(BaseModel):
+    candidate: CandidateResponse
+    similarity: float
+
+class SemanticSearchResponse(BaseModel):
+    query: str
+    embedder: str
+    exact: bool  # False when answered from the ANN index
+    elapsed_ms: float
+    matches: List[SemanticMatch]
+
+class CandidateImportRow(BaseModel):
+    """One row of a CSV/NDJSON candidate import (CandidateResponse fields plus email)."""
+    name: str = Field(..., min_length=1, max_length=200)
+    initials: Optional[str] = Field(None, max_length=5)
+    title: Optional[str] = Field(None, max_length=200)
+    company: Optional[str] = Field(None, max_length=200)
+    location: Optional[str] = Field(None, max_length=200)
+    skills: Optional[List[str]] = None
+    experience: Optional[str] = Field(None, max_length=50)
+    match_score: Optional[float] = Field(None, ge=0, le=100)
+    screen_score: Optional[float] = Field(None, ge=0, le=100)
+    status: str = Field("new", pattern="^(new|screened|interview|offer|hired)$")
+    source: Optional[str] = Field(None, max_length=100)
+    email: Optional[str] = Field(None, max_length=200)
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def split_skills(cls, value):
+        # CSV cells carry skills as "Python; Go" or "Python|Go"
+        if isinstance(value, str):
+            return [s.strip() for s in value.replace("|", ";").replace(",", ";").split(";") if s.strip()]
+        return value
+
+    @field_validator("email", mode="before")
+    @classmethod
+    def normalize_email(cls, value):
+        if isinstance(value, str):
+            return value.strip().lower() or None
+        return value
+
+class ImportErrorRow(BaseModel):
+    line: int
+    error: str
+
+class ImportReport(BaseModel):
+    format: str
+    rows_read: int
+    imported: int
+    failed: int
+    batches: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: List[ImportErrorRow]
+
 
 # ── Integration Schemas ──
 
@@ -138,6 +306,32 @@ class IntegrationStatsResponse(BaseModel):
     syncing: int
     errors: int
     total_records: int
+    # API traffic over the last hour, read from api_log_rollups
+    requests_last_hour: int = 0
+    error_rate: float = 0.0
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+
+class CandidatePushRequest(BaseModel):
+    candidate_ids: List[int] = Field(..., min_length=1, max_length=10000)
+
+class CandidatePushResponse(BaseModel):
+    system_name: str
+    requested: int
+    pushed: int
+    rejected: int  # answered but not accepted by the system
+    missing: List[int] = []  # ids not found
+    duration_ms: float
+
+class EndpointStats(BaseModel):
+    endpoint: str
+    source: str
+    requests: int
+    errors: int
+    error_rate: float
+    latency_p50: Optional[float] = None
+    latency_p95: Optional[float] = None
+    latency_p99: Optional[float] = None
 
 class ApiLogResponse(BaseModel):
     id: int
@@ -170,13 +364,20 @@ class AgentStatus(BaseModel):
     description: str
     color: str
     stats: List[Dict[str, str]]
+    metrics: Optional[Dict[str, Any]] = None  # live counts, errors and latency percentiles
 
 class ActivityItem(BaseModel):
     text: str
     time: str
     agent: str
 
+class AgentThroughput(BaseModel):
+    window_hours: int
+    agents: Dict[str, int]
+    total: int
+
 class DashboardResponse(BaseModel):
     metrics: DashboardMetrics
     agents: List[AgentStatus]
     activity: List[ActivityItem]
+    agent_activity: Dict[str, int] = {}  # events per agent over the last 24h, from rollups
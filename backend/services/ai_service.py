@@ -1,7 +1,10 @@
 """
 AI Service – Uses Ollama (local) or Gemini (cloud) for text and vision tasks.
 Ollama is preferred (free, unlimited). Falls back to Gemini, then mock data.
+Identical extractions already in flight (same prompt and content) share one call.
 """
+import copy
+import hashlib
 import json
 import logging
 import asyncio
@@ -9,12 +12,26 @@ import base64
 import aiohttp
 from typing import Dict, Any, Optional
 from config import settings
+from services.api_logger import api_logger
+from services.metrics import ai_coalesced
+from services.instrumentation import agent_metrics
+from services.profiling import phase, timed_phase
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 OLLAMA_BASE = "http://localhost:11434"
 
 
+def flight_key(operation: str, prompt: str, content: bytes = b"") -> tuple:
+    """Identity of an extraction: operation plus a hash of the prompt and the content bytes."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(len(prompt).to_bytes(8, "big"))
+    digest.update(prompt.encode())
+    digest.update(content)
+    return operation, digest.hexdigest()
+
+
 class AIService:
     """Wrapper for AI inference — Ollama (local) preferred, Gemini fallback."""
 
@@ -22,6 +39,7 @@ class AIService:
         self._ollama_available = None
         self._gemini_model = None
         self._initialized = False
+        self.flights = SingleFlight()
 
     async def _check_ollama(self) -> bool:
         """Check if Ollama is running and has a model available."""
@@ -90,20 +108,24 @@ class AIService:
                 "options": {"temperature": 0.3},
             }
             print(f"🔄 Calling Ollama ({model}) with {len(prompt)} chars...")
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{OLLAMA_BASE}/api/generate",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=120),
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        text = data.get("response", "").strip()
-                        print(f"✅ Ollama responded ({len(text)} chars)")
-                        return text
-                    else:
-                        print(f"❌ Ollama returned status {resp.status}")
-                        return None
+            with agent_metrics.track(None, "extract_from_text", "ollama", model) as metric, phase("ai_call"):
+                async with api_logger.track("POST", f"{OLLAMA_BASE}/api/generate", "Ollama") as call, \
+                        aiohttp.ClientSession() as session:
+                    async with session.post(
+                        f"{OLLAMA_BASE}/api/generate",
+                        json=payload,
+                        timeout=aiohttp.ClientTimeout(total=120),
+                    ) as resp:
+                        call.status_code = resp.status
+                        if resp.status == 200:
+                            data = await resp.json()
+                            text = data.get("response", "").strip()
+                            print(f"✅ Ollama responded ({len(text)} chars)")
+                            return text
+                        else:
+                            print(f"❌ Ollama returned status {resp.status}")
+                            metric.error = f"HTTP {resp.status}"
+                            return None
         except asyncio.TimeoutError:
             print("❌ Ollama timed out (120s)")
             return None
@@ -113,18 +135,41 @@ class AIService:
 
     async def extract_from_text(self, prompt: str) -> Dict[str, Any]:
         """Extract structured data from text using Gemini (preferred) or Ollama."""
-        
+        return await self._coalesced(
+            flight_key("extract_from_text", prompt), lambda: self._extract_from_text(prompt),
+        )
+
+    async def extract_from_image(self, image_bytes: bytes, prompt: str) -> Dict[str, Any]:
+        """Extract data from image using Gemini Vision (preferred) or Ollama (moondream)."""
+        return await self._coalesced(
+            flight_key("extract_from_image", prompt, image_bytes),
+            lambda: self._extract_from_image(image_bytes, prompt),
+        )
+
+    async def _coalesced(self, key: tuple, call) -> Dict[str, Any]:
+        """Join an identical extraction already in flight, or lead one; every caller gets its own copy."""
+        result, shared = await self.flights.do(key, call)
+        if shared:
+            ai_coalesced.inc(key[0])
+        return copy.deepcopy(result)
+
+    async def _extract_from_text(self, prompt: str) -> Dict[str, Any]:
         # Try Gemini first (higher quality)
         self._init_gemini()
         if self._gemini_model:
             try:
                 print(f"🔄 Calling Gemini (Cloud)...", flush=True)
                 loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None, self._gemini_model.generate_content, prompt
-                )
-                text = response.text.strip()
-                result = self._parse_json(text)
+                with agent_metrics.track(None, "extract_from_text", "gemini", "gemini-1.5-flash") as metric:
+                    with phase("ai_call"):
+                        async with api_logger.track("POST", "gemini-1.5-flash:generateContent", "Gemini"):
+                            response = await loop.run_in_executor(
+                                None, self._gemini_model.generate_content, prompt
+                            )
+                    text = response.text.strip()
+                    result = self._parse_json(text)
+                    if not result:
+                        metric.error = "unparseable response"
                 if result:
                     return result
             except Exception as e:
@@ -139,11 +184,10 @@ class AIService:
                     return result
 
         print("⚠️ All AI providers failed, using mock data", flush=True)
-        return self._mock_text_response()
+        with agent_metrics.track(None, "extract_from_text", "mock"), phase("ai_call"):
+            return self._mock_text_response()
 
-    async def extract_from_image(self, image_bytes: bytes, prompt: str) -> Dict[str, Any]:
-        """Extract data from image using Gemini Vision (preferred) or Ollama (moondream)."""
-        
+    async def _extract_from_image(self, image_bytes: bytes, prompt: str) -> Dict[str, Any]:
         # Try Gemini Vision first (Higher Quality)
         self._init_gemini()
         if self._gemini_model:
@@ -151,10 +195,15 @@ class AIService:
                 print(f"🔄 Calling Gemini Vision (Cloud)...", flush=True)
                 image_part = {"mime_type": "image/png", "data": image_bytes}
                 loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None, self._gemini_model.generate_content, [prompt, image_part]
-                )
-                result = self._parse_json(response.text.strip())
+                with agent_metrics.track(None, "extract_from_image", "gemini", "gemini-1.5-flash") as metric:
+                    with phase("ai_call"):
+                        async with api_logger.track("POST", "gemini-1.5-flash:generateContent", "Gemini Vision"):
+                            response = await loop.run_in_executor(
+                                None, self._gemini_model.generate_content, [prompt, image_part]
+                            )
+                    result = self._parse_json(response.text.strip())
+                    if not result:
+                        metric.error = "unparseable response"
                 if result:
                     return result
             except Exception as e:
@@ -202,30 +251,39 @@ class AIService:
                 }
                 
                 print(f"🔄 Calling Ollama Vision ({model_name}) with image...", flush=True)
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"{OLLAMA_BASE}/api/generate",
-                        json=payload,
-                        timeout=aiohttp.ClientTimeout(total=120),
-                    ) as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            text = data.get("response", "").strip()
-                            print(f"✅ Ollama Vision responded ({len(text)} chars)", flush=True)
-                            result = self._parse_json(text)
-                            if result:
-                                return result
-                        elif resp.status == 404:
-                             print(f"⚠️ Model '{model_name}' not found. Pull with: ollama pull {model_name}", flush=True)
-                        else:
-                            print(f"❌ Ollama Vision returned status {resp.status}", flush=True)
+                with agent_metrics.track(None, "extract_from_image", "ollama", model_name) as metric, \
+                        phase("ai_call"):
+                    async with api_logger.track("POST", f"{OLLAMA_BASE}/api/generate", "Ollama Vision") as call, \
+                            aiohttp.ClientSession() as session:
+                        async with session.post(
+                            f"{OLLAMA_BASE}/api/generate",
+                            json=payload,
+                            timeout=aiohttp.ClientTimeout(total=120),
+                        ) as resp:
+                            call.status_code = resp.status
+                            if resp.status == 200:
+                                data = await resp.json()
+                                text = data.get("response", "").strip()
+                                print(f"✅ Ollama Vision responded ({len(text)} chars)", flush=True)
+                                result = self._parse_json(text)
+                                if result:
+                                    return result
+                                metric.error = "unparseable response"
+                            elif resp.status == 404:
+                                 print(f"⚠️ Model '{model_name}' not found. Pull with: ollama pull {model_name}", flush=True)
+                                 metric.error = "model not found"
+                            else:
+                                print(f"❌ Ollama Vision returned status {resp.status}", flush=True)
+                                metric.error = f"HTTP {resp.status}"
             except asyncio.TimeoutError:
                 print("❌ Ollama Vision timed out (120s)", flush=True)
             except Exception as e:
                 print(f"❌ Ollama Vision failed: {e}", flush=True)
 
-        return self._mock_vision_response()
+        with agent_metrics.track(None, "extract_from_image", "mock"), phase("ai_call"):
+            return self._mock_vision_response()
 
+    @timed_phase("parse")
     def _parse_json(self, text: str) -> Optional[Dict[str, Any]]:
         """Parse JSON from AI response, handling markdown code blocks and moondream chatter."""
         try:
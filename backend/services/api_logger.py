@@ -0,0 +1,190 @@
+"""
+API Logger – Records inbound HTTP requests and outbound connector/LLM calls.
+Records land in a fixed-size ring buffer that serves /integration/logs directly
+and are persisted to api_logs in background batches.
+"""
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from config import settings
+from models import ApiLog
+from services.event_writer import BufferedWriter
+from services.metrics import http_in_flight, observe_request
+from services.profiling import slow_requests
+
+
+class RingBuffer:
+    """Fixed-capacity ring of recent records.
+
+    Writers claim a slot from an atomic counter and overwrite it, so appends
+    never take a lock and never allocate beyond the record itself.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._slots: List[Optional[Dict[str, Any]]] = [None] * capacity
+        self._counter = itertools.count()
+        self._head = -1
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Store a record and stamp it with its 1-based sequence id."""
+        seq = next(self._counter)
+        record["id"] = seq + 1
+        self._slots[seq % self.capacity] = record
+        self._head = seq
+        return seq
+
+    def latest(self, n: int) -> List[Dict[str, Any]]:
+        """Return up to n most recent records, newest first."""
+        head = self._head
+        n = min(n, head + 1, self.capacity)
+        records = []
+        for seq in range(head, head - n, -1):
+            record = self._slots[seq % self.capacity]
+            if record is not None:
+                records.append(record)
+        return records
+
+    @property
+    def total(self) -> int:
+        return self._head + 1
+
+
+class CallHandle:
+    """Mutable status holder for a tracked outbound call."""
+
+    __slots__ = ("status_code",)
+
+    def __init__(self):
+        self.status_code = 200
+
+
+class ApiLogger:
+    """Collects API call records and measures its own per-record overhead."""
+
+    def __init__(self):
+        self.ring = RingBuffer(settings.api_log_ring_size)
+        self.writer = BufferedWriter(
+            ApiLog.__table__,
+            max_queue=settings.api_log_buffer_size,
+            batch_size=settings.api_log_batch_size,
+            flush_interval=settings.api_log_flush_interval,
+            overflow_policy="drop_oldest",
+        )
+        self.exclude_paths = {p.strip() for p in settings.api_log_exclude_paths.split(",") if p.strip()}
+        self._overhead_ns = 0
+        self._overhead_max_ns = 0
+        self._records = 0
+
+    def record(self, method: str, endpoint: str, status_code: int, duration_ms: float, source: str):
+        """Append one call record to the ring and queue it for persistence."""
+        started = time.perf_counter_ns()
+        created_at = datetime.now(timezone.utc)
+        self.ring.append({
+            "method": method,
+            "endpoint": endpoint,
+            "source": source,
+            "status_code": status_code,
+            "duration_ms": int(duration_ms),
+            "created_at": created_at,
+        })
+        self.writer.record({
+            "method": method,
+            "endpoint": endpoint,
+            "source": source,
+            "status_code": status_code,
+            "duration_ms": int(duration_ms),
+            "created_at": created_at,
+        })
+        elapsed = time.perf_counter_ns() - started
+        self._records += 1
+        self._overhead_ns += elapsed
+        if elapsed > self._overhead_max_ns:
+            self._overhead_max_ns = elapsed
+
+    @asynccontextmanager
+    async def track(self, method: str, endpoint: str, source: str):
+        """Time an outbound call. Set handle.status_code from the response if known."""
+        handle = CallHandle()
+        started = time.perf_counter()
+        try:
+            yield handle
+        except asyncio.TimeoutError:
+            handle.status_code = 504
+            raise
+        except Exception:
+            if handle.status_code < 400:
+                handle.status_code = 500
+            raise
+        finally:
+            self.record(method, endpoint, handle.status_code, (time.perf_counter() - started) * 1000, source)
+
+    def recent(self, count: int) -> List[Dict[str, Any]]:
+        return self.ring.latest(count)
+
+    def overhead(self) -> Dict[str, Any]:
+        """Per-record recording cost against the configured budget."""
+        mean_us = (self._overhead_ns / self._records / 1000) if self._records else 0.0
+        return {
+            "records": self._records,
+            "mean_us": round(mean_us, 2),
+            "max_us": round(self._overhead_max_ns / 1000, 2),
+            "budget_us": settings.api_log_overhead_budget_us,
+            "within_budget": mean_us <= settings.api_log_overhead_budget_us,
+            "writer": self.writer.stats(),
+        }
+
+
+class ApiLogMiddleware:
+    """ASGI middleware that records method, path, status, duration and source of every request,
+    feeds the request duration histogram served at /metrics and traces requests for the
+    slow-request recorder."""
+
+    def __init__(self, app):
+        self.app = app
+        self.metrics = settings.metrics_enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        logged = scope["path"] not in api_logger.exclude_paths
+        if not logged and not self.metrics:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        http_in_flight.value += 1
+        trace = slow_requests.begin() if slow_requests.enabled else None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.value -= 1
+            elapsed = time.perf_counter() - started
+            # Route template, not the raw path, so ids do not explode the label set
+            route = getattr(scope.get("route"), "path", "unmatched")
+            if self.metrics:
+                observe_request(scope["method"], route, status_code, elapsed)
+            if trace is not None:
+                slow_requests.finish(trace, scope["method"], scope["path"], route, status_code, elapsed * 1000)
+            if logged:
+                source = "API"
+                for name, value in scope.get("headers", ()):
+                    if name == b"x-client-source":
+                        source = value.decode("latin-1")[:100]
+                        break
+                api_logger.record(scope["method"], scope["path"], status_code, elapsed * 1000, source)
+
+
+api_logger = ApiLogger()
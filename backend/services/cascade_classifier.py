@@ -0,0 +1,376 @@
+"""
+Cascade Classifier – Local first stage for candidate classification.
+
+Category, seniority and culture fit each come from a linear model over sparse
+profile features (canonical skills, title role and words, seniority words,
+experience bucket). Before any labels exist the weights are the compiled keyword rules
+below; once enough LLM classifications are stored, the model is fitted to them
+with L2 regularization towards those rules, and a softmax temperature is fitted
+on a holdout split so confidences are calibrated. Callers escalate to the LLM
+only when the calibrated confidence is below the configured threshold.
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import or_, select
+
+from config import settings
+from database import engine
+from models import Candidate, Classification
+from services.keyword_extractor import keyword_extractor, tokenize
+from services.matching_engine import parse_years
+from services.skill_index import normalize_skill
+
+# Compiled keyword rules: feature -> logit weight per class
+CATEGORY_RULES = {
+    "Machine Learning": {
+        "skill:Machine Learning": 3, "skill:Deep Learning": 3, "skill:PyTorch": 3, "skill:TensorFlow": 3,
+        "skill:JAX": 2, "skill:Keras": 2, "skill:NLP": 2, "skill:Computer Vision": 2, "skill:LLMs": 2,
+        "skill:MLOps": 2, "skill:Hugging Face": 2, "skill:AWS SageMaker": 2, "skill:Reinforcement Learning": 2,
+        "role:Machine Learning Engineer": 5, "role:Machine Learning Scientist": 5,
+    },
+    "Frontend Engineering": {
+        "skill:React": 3, "skill:Vue.js": 3, "skill:Angular": 3, "skill:Svelte": 3, "skill:Next.js": 3,
+        "skill:TypeScript": 1, "skill:JavaScript": 1, "skill:CSS": 2, "skill:HTML": 1, "skill:Redux": 2,
+        "skill:Tailwind CSS": 2, "skill:Webpack": 1, "skill:GraphQL": 1, "role:Frontend Engineer": 5,
+        "role:Full Stack Engineer": 2,
+    },
+    "Backend Engineering": {
+        "skill:Go": 2, "skill:Java": 2, "skill:Rust": 2, "skill:C#": 1, "skill:Ruby": 1, "skill:PHP": 1,
+        "skill:Node.js": 2, "skill:Django": 2, "skill:Flask": 2, "skill:FastAPI": 2, "skill:Spring Boot": 2,
+        "skill:Ruby on Rails": 2, "skill:gRPC": 2, "skill:PostgreSQL": 1, "skill:MySQL": 1, "skill:Redis": 1,
+        "skill:Kafka": 1, "skill:Microservices": 2, "skill:REST APIs": 1, "skill:System Design": 1,
+        "role:Backend Engineer": 5, "role:Software Engineer": 2, "role:Full Stack Engineer": 2,
+    },
+    "DevOps / SRE": {
+        "skill:Kubernetes": 2, "skill:Docker": 2, "skill:Terraform": 3, "skill:Ansible": 2, "skill:Helm": 2,
+        "skill:CI/CD": 2, "skill:Jenkins": 2, "skill:AWS": 1, "skill:GCP": 1, "skill:Azure": 1,
+        "skill:Prometheus": 2, "skill:Grafana": 2, "skill:Linux": 1, "skill:Datadog": 1,
+        "role:DevOps Engineer": 5, "role:Site Reliability Engineer": 5, "role:Solutions Architect": 2,
+    },
+    "Product Design": {
+        "skill:Figma": 3, "skill:Sketch": 3, "skill:User Research": 3, "skill:Design Systems": 3,
+        "skill:Prototyping": 3, "role:Product Designer": 5, "word:design": 2, "word:designer": 3,
+    },
+    "Data Science": {
+        "skill:Pandas": 2, "skill:NumPy": 1, "skill:Scikit-learn": 2, "skill:Statistics": 3, "skill:R": 2,
+        "skill:SQL": 1, "skill:Spark": 2, "skill:Tableau": 2, "skill:Power BI": 2, "skill:Airflow": 1,
+        "skill:dbt": 2, "skill:A/B Testing": 2, "role:Data Scientist": 5, "role:Data Analyst": 4,
+        "role:Data Engineer": 4,
+    },
+    "Engineering Management": {
+        "skill:Leadership": 3, "skill:Agile": 1, "role:Engineering Manager": 6, "role:Technical Lead": 3,
+        "role:VP of Engineering": 6, "role:CTO": 6, "word:manager": 2, "word:director": 3, "word:head": 2,
+    },
+    "Mobile Development": {
+        "skill:Swift": 3, "skill:Kotlin": 3, "skill:iOS": 3, "skill:Android": 3, "skill:Flutter": 3,
+        "skill:React Native": 3, "skill:SwiftUI": 3, "skill:Objective-C": 3, "skill:Dart": 2,
+        "role:Mobile Engineer": 5, "role:iOS Engineer": 5, "role:Android Engineer": 5, "word:mobile": 2,
+    },
+}
+
+SENIORITY_RULES = {
+    "Junior": {"seniority:Junior": 4, "seniority:Intern": 5, "years:0-1": 3, "years:2-4": 1},
+    "Mid": {"seniority:Mid-level": 4, "years:2-4": 3, "years:5-8": 1},
+    "Senior": {"seniority:Senior": 4, "years:5-8": 3, "years:9-13": 1},
+    "Staff": {"seniority:Staff": 4, "seniority:Lead": 3, "years:9-13": 2, "years:14+": 1,
+              "role:Technical Lead": 2},
+    "Principal": {"seniority:Principal": 4, "years:14+": 2, "role:VP of Engineering": 3, "role:CTO": 3},
+}
+
+# No keyword evidence for culture fit: until labels exist every class ties and
+# the first one, High, is the answer (the rating classifications carried before the cascade)
+CULTURE_FIT_RULES = {"High": {}, "Very High": {}, "Medium": {}, "Low": {}}
+
+YEAR_BUCKETS = [(2, "0-1"), (5, "2-4"), (9, "5-8"), (14, "9-13")]
+THRESHOLDS = [50, 60, 70, 80, 90, 95]
+
+
+def profile_features(data: Dict) -> List[str]:
+    """Sparse feature names for a candidate dict (title, skills, experience)."""
+    title = data.get("title") or ""
+    skills = data.get("skills") or []
+    features = {f"raw:{normalize_skill(s)}" for s in skills if s}
+    features.update(f"word:{w}" for w in tokenize(title) if len(w) > 1)
+    prefix = {"skill": "skill", "title": "role", "seniority": "seniority"}
+    for _, _, (category, canonical, _) in keyword_extractor.matches(f"{title} | {' ; '.join(skills)}"):
+        if category in prefix:
+            features.add(f"{prefix[category]}:{canonical}")
+    low, _ = parse_years(data.get("experience"))
+    if low is not None:
+        features.add("years:" + next((label for limit, label in YEAR_BUCKETS if low < limit), "14+"))
+    return sorted(features)
+
+
+class LinearModel:
+    """Softmax regression over named sparse features, initialized from keyword rules."""
+
+    def __init__(self, rules: Dict[str, Dict[str, float]]):
+        self.classes = list(rules)
+        self.rules = rules
+        self.temperature = 1.0
+        self.trained_on = 0
+        self._compile(())
+
+    def _compile(self, extra_features: Sequence[str]):
+        names = sorted({f for weights in self.rules.values() for f in weights} | set(extra_features))
+        self.columns = {name: i for i, name in enumerate(names)}
+        self.prior = np.zeros((len(names), len(self.classes)), dtype=np.float64)
+        for c, weights in enumerate(self.rules.values()):
+            for name, weight in weights.items():
+                self.prior[self.columns[name], c] = weight
+        self.weights = self.prior.copy()
+        self.bias = np.zeros(len(self.classes))
+
+    def matrix(self, rows: Sequence[Sequence[str]]) -> sparse.csr_matrix:
+        indices, indptr = [], [0]
+        for features in rows:
+            indices.extend(self.columns[f] for f in features if f in self.columns)
+            indptr.append(len(indices))
+        data = np.ones(len(indices))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), len(self.columns)))
+
+    def probabilities(self, X: sparse.csr_matrix, temperature: Optional[float] = None) -> np.ndarray:
+        logits = (X @ self.weights + self.bias) / (temperature or self.temperature)
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def fit(self, rows, labels: Sequence[str], l2: float = 1.0, epochs: int = 300, lr: float = 0.5):
+        """Full-batch gradient descent on cross-entropy + l2 * ||W - rules||^2."""
+        self._compile([f for features in rows for f in features])
+        X = self.matrix(rows)
+        y = np.zeros((len(labels), len(self.classes)))
+        y[np.arange(len(labels)), [self.classes.index(label) for label in labels]] = 1
+        n = len(labels)
+        for _ in range(epochs):
+            error = self.probabilities(X, 1.0) - y
+            self.weights -= lr * (X.T @ error / n + l2 * (self.weights - self.prior) / n)
+            self.bias -= lr * error.mean(axis=0)
+        self.trained_on = n
+
+    def calibrate(self, rows, labels: Sequence[str]):
+        """Pick the softmax temperature minimizing holdout log loss."""
+        X = self.matrix(rows)
+        target = np.array([self.classes.index(label) for label in labels])
+        best = (np.inf, 1.0)
+        for temperature in np.geomspace(0.25, 8, 40):
+            p = self.probabilities(X, temperature)[np.arange(len(target)), target]
+            best = min(best, (-np.log(np.maximum(p, 1e-12)).mean(), temperature))
+        self.temperature = float(best[1])
+
+    def predict(self, rows) -> Tuple[List[str], np.ndarray]:
+        """Predicted class and confidence (0-100) per row."""
+        p = self.probabilities(self.matrix(rows))
+        best = p.argmax(axis=1)
+        return [self.classes[i] for i in best], np.round(p[np.arange(len(best)), best] * 100, 1)
+
+
+def _expected_calibration_error(confidence: np.ndarray, correct: np.ndarray, bins: int = 10) -> float:
+    edges = np.minimum((confidence / 100 * bins).astype(int), bins - 1)
+    error = 0.0
+    for b in range(bins):
+        mask = edges == b
+        if mask.any():
+            error += mask.mean() * abs(correct[mask].mean() - confidence[mask].mean() / 100)
+    return round(float(error), 4)
+
+
+class CascadeClassifier:
+    """Answers locally when confident; tracks how many LLM calls that saves."""
+
+    def __init__(self):
+        self.category = LinearModel(CATEGORY_RULES)
+        self.seniority = LinearModel(SENIORITY_RULES)
+        self.culture_fit = LinearModel(CULTURE_FIT_RULES)
+        self.report: Dict = {"trained": False}
+        self.local = 0
+        self.escalated = 0
+        self.llm_failed = 0
+        self.labels_since_train = 0
+        self._training: Optional[asyncio.Task] = None
+
+    def classify(self, data: Dict) -> Dict:
+        features = [profile_features(data)]
+        category, category_conf = self.category.predict(features)
+        seniority, seniority_conf = self.seniority.predict(features)
+        culture_fit, _ = self.culture_fit.predict(features)
+        return {
+            "category": category[0],
+            "confidence": float(category_conf[0]),
+            "seniority": seniority[0],
+            "seniority_confidence": float(seniority_conf[0]),
+            "culture_fit": culture_fit[0],
+            "source": "local",
+        }
+
+    def confident(self, result: Dict) -> bool:
+        threshold = settings.classifier_escalation_threshold
+        return result["confidence"] >= threshold and result["seniority_confidence"] >= threshold
+
+    def count(self, path: str):
+        """Record how a classification was answered: local, escalated or llm_failed."""
+        setattr(self, path, getattr(self, path) + 1)
+
+    def record_label(self):
+        """Count a new LLM label and retrain in the background every classifier_retrain_every labels."""
+        self.labels_since_train += 1
+        if self.labels_since_train >= settings.classifier_retrain_every:
+            self.start()
+
+    def start(self):
+        if self._training is None or self._training.done():
+            self._training = asyncio.create_task(self._train_quietly())
+
+    async def stop(self):
+        if self._training:
+            self._training.cancel()
+            try:
+                await self._training
+            except asyncio.CancelledError:
+                pass
+            self._training = None
+
+    async def _train_quietly(self):
+        try:
+            await self.train()
+        except Exception as e:
+            print(f"⚠️ Cascade classifier training failed: {e}", flush=True)
+
+    async def _labeled_rows(self) -> List[Tuple[Dict, str, Optional[str], Optional[str]]]:
+        """LLM (or pre-cascade) classifications with the profile they were made for."""
+        async with engine.connect() as conn:
+            rows = (await conn.execute(
+                select(Candidate.title, Candidate.skills, Candidate.experience,
+                       Classification.category, Classification.seniority, Classification.culture_fit)
+                .join(Classification, Classification.candidate_id == Candidate.id)
+                .where(or_(Classification.source == "llm", Classification.source.is_(None)))
+                .order_by(Classification.id)
+            )).all()
+        return [
+            ({"title": title, "skills": skills or [], "experience": experience}, category, seniority, culture_fit)
+            for title, skills, experience, category, seniority, culture_fit in rows
+        ]
+
+    async def train(self) -> Dict:
+        """Fit the models on stored labels and report accuracy, calibration and LLM-call savings."""
+        started = time.perf_counter()
+        labeled = await self._labeled_rows()
+        self.labels_since_train = 0
+        labeled = [r for r in labeled if r[1] in CATEGORY_RULES]
+        if len(labeled) < settings.classifier_min_training_rows:
+            self.report = {"trained": False, "labeled_rows": len(labeled),
+                           "min_training_rows": settings.classifier_min_training_rows}
+            return self.report
+        report = await asyncio.to_thread(self._fit, labeled)
+        report["seconds"] = round(time.perf_counter() - started, 2)
+        self.report = report
+        print(f"🧮 Cascade classifier trained on {len(labeled)} labels – holdout accuracy "
+              f"{report['category_accuracy']:.0%}, {report['local_share_at_threshold']:.0%} answered locally", flush=True)
+        return report
+
+    def _fit(self, labeled) -> Dict:
+        rng = np.random.default_rng(0)
+        order = rng.permutation(len(labeled))
+        cut = int(len(order) * 0.8)
+        train, holdout = [labeled[i] for i in order[:cut]], [labeled[i] for i in order[cut:]]
+        features = {id(r): profile_features(r[0]) for r in labeled}
+
+        def rows(subset):
+            return [features[id(r)] for r in subset]
+
+        def seniority_rows(subset):
+            return [r for r in subset if r[2] in SENIORITY_RULES]
+
+        def culture_fit_rows(subset):
+            return [r for r in subset if r[3] in CULTURE_FIT_RULES]
+
+        # Rules-only baseline on the holdout, before fitting
+        rules = LinearModel(CATEGORY_RULES)
+        rules_pred, rules_conf = rules.predict(rows(holdout))
+        truth = np.array([r[1] for r in holdout])
+
+        category = LinearModel(CATEGORY_RULES)
+        category.fit(rows(train), [r[1] for r in train])
+        category.calibrate(rows(holdout), truth)
+        predicted, confidence = category.predict(rows(holdout))
+        correct = np.array(predicted) == truth
+
+        seniority = LinearModel(SENIORITY_RULES)
+        sen_train, sen_holdout = seniority_rows(train), seniority_rows(holdout)
+        if sen_train and sen_holdout:
+            seniority.fit(rows(sen_train), [r[2] for r in sen_train])
+            seniority.calibrate(rows(sen_holdout), [r[2] for r in sen_holdout])
+        sen_pred, sen_conf_all = seniority.predict(rows(holdout))
+        sen_known = np.array([r[2] in SENIORITY_RULES for r in holdout])
+        sen_correct = np.array(sen_pred) == np.array([r[2] for r in holdout])
+
+        culture_fit = LinearModel(CULTURE_FIT_RULES)
+        fit_train, fit_holdout = culture_fit_rows(train), culture_fit_rows(holdout)
+        if fit_train:
+            culture_fit.fit(rows(fit_train), [r[3] for r in fit_train])
+        fit_pred, _ = culture_fit.predict(rows(fit_holdout)) if fit_holdout else ([], None)
+        fit_correct = np.array(fit_pred) == np.array([r[3] for r in fit_holdout])
+
+        tradeoff = []
+        for threshold in THRESHOLDS:
+            local = (confidence >= threshold) & (sen_conf_all >= threshold)
+            tradeoff.append({
+                "threshold": threshold,
+                "local_share": round(float(local.mean()), 3),
+                "local_accuracy": round(float(correct[local].mean()), 3) if local.any() else None,
+                # Escalated rows take the LLM's answer, which is the label itself here
+                "overall_accuracy": round(float((correct | ~local).mean()), 3),
+            })
+        at_threshold = (confidence >= settings.classifier_escalation_threshold) & (
+            sen_conf_all >= settings.classifier_escalation_threshold)
+
+        # Refit on every label with the chosen temperatures, then swap the models in
+        final_category, final_seniority = LinearModel(CATEGORY_RULES), LinearModel(SENIORITY_RULES)
+        final_category.fit(rows(labeled), [r[1] for r in labeled])
+        final_category.temperature = category.temperature
+        sen_all = seniority_rows(labeled)
+        if sen_all:
+            final_seniority.fit(rows(sen_all), [r[2] for r in sen_all])
+            final_seniority.temperature = seniority.temperature
+        final_culture_fit = LinearModel(CULTURE_FIT_RULES)
+        fit_all = culture_fit_rows(labeled)
+        if fit_all:
+            final_culture_fit.fit(rows(fit_all), [r[3] for r in fit_all])
+        self.category, self.seniority, self.culture_fit = final_category, final_seniority, final_culture_fit
+
+        return {
+            "trained": True,
+            "labeled_rows": len(labeled),
+            "holdout_rows": len(holdout),
+            "rules_accuracy": round(float((np.array(rules_pred) == truth).mean()), 3),
+            "category_accuracy": round(float(correct.mean()), 3),
+            "seniority_accuracy": round(float(sen_correct[sen_known].mean()), 3) if sen_known.any() else None,
+            "culture_fit_accuracy": round(float(fit_correct.mean()), 3) if fit_holdout else None,
+            "category_temperature": round(category.temperature, 3),
+            "seniority_temperature": round(seniority.temperature, 3),
+            "calibration_error_rules": _expected_calibration_error(rules_conf, np.array(rules_pred) == truth),
+            "calibration_error": _expected_calibration_error(confidence, correct),
+            "local_share_at_threshold": round(float(at_threshold.mean()), 3),
+            "tradeoff": tradeoff,
+        }
+
+    def stats(self) -> Dict:
+        decided = self.local + self.escalated
+        return {
+            "threshold": settings.classifier_escalation_threshold,
+            "local": self.local,
+            "escalated": self.escalated,
+            "llm_failed": self.llm_failed,
+            "llm_call_reduction": round(self.local / decided, 3) if decided else None,
+            "labels_since_train": self.labels_since_train,
+            "features": {"category": len(self.category.columns), "seniority": len(self.seniority.columns),
+                         "culture_fit": len(self.culture_fit.columns)},
+            "training": self.report,
+        }
+
+
+cascade_classifier = CascadeClassifier()
@@ -0,0 +1,261 @@
+"""
+Connector Transport – Rate-limited, retrying, batching HTTP client for external systems.
+
+Every request to a system first takes a token from that system's bucket
+(rate per second, with a burst), so the agent stays under the system's
+quota instead of finding it through 429s. A 429, a 5xx, a timeout or a
+connection error is retried up to CONNECTOR_MAX_RETRIES times with
+exponential backoff and ±50% jitter. When the answer carries Retry-After,
+that wait is used instead and also pauses the bucket, so every other
+caller to the same system holds off too. Other 4xx answers are not retried.
+
+Candidate pushes go through a PushBatcher: single pushes wait up to
+CONNECTOR_PUSH_LINGER_MS for others to join them, and go out together as
+one request of at most CONNECTOR_PUSH_BATCH_SIZE candidates. Each batch
+carries an Idempotency-Key, so a retried batch is not applied twice.
+"""
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import aiohttp
+from config import settings
+from services.histogram import fine_histogram
+
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class TransportError(ConnectionError):
+    """A request that failed for good; status is None when no HTTP answer came back."""
+
+    def __init__(self, system: str, status: Optional[int], message: str):
+        super().__init__(f"{system}: HTTP {status}: {message}" if status else f"{system}: {message}")
+        self.system = system
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRY_STATUSES
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse Retry-After: delta seconds (fractions accepted) or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_seconds(retry: int) -> float:
+    """Delay before retry `retry` (1-based): exponential from the base, capped, with ±50% jitter."""
+    delay = min(settings.connector_retry_max_seconds, settings.connector_retry_base_seconds * 2 ** (retry - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class TokenBucket:
+    """`rate` tokens per second up to `burst`; rate 0 means unlimited. Waiters are served in arrival order."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+        self.waits = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    async def acquire(self):
+        if self.rate <= 0 and time.monotonic() >= self.paused_until:
+            return
+        started = time.monotonic()
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                if self.rate <= 0:
+                    break
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self.waits += 1
+            self.waited_seconds += waited
+
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (the server asked for it) and restart from an empty bucket."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self.updated = self.paused_until
+
+
+class TransportStats:
+    __slots__ = ("requests", "ok", "retries", "throttled", "server_errors", "client_errors", "network_errors",
+                 "failed", "latency")
+
+    def __init__(self):
+        self.requests = self.ok = self.retries = self.throttled = 0
+        self.server_errors = self.client_errors = self.network_errors = self.failed = 0
+        self.latency = fine_histogram()
+
+
+class ConnectorTransport:
+    """JSON over HTTP to one system, under that system's token bucket and retry policy."""
+
+    def __init__(self, system: str, base_url: str, rate: Optional[float] = None, burst: Optional[int] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        self.system = system
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers or {}
+        self.bucket = TokenBucket(
+            settings.connector_rate_per_second if rate is None else rate,
+            settings.connector_burst if burst is None else burst,
+        )
+        self.stats = TransportStats()
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers, timeout=aiohttp.ClientTimeout(total=settings.connector_timeout_seconds),
+            )
+        return self.session
+
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      json: Any = None, headers: Optional[Dict[str, str]] = None) -> Any:
+        """Send one request, retrying what is worth retrying. Returns the decoded JSON body."""
+        for retry in range(settings.connector_max_retries + 1):
+            await self.bucket.acquire()
+            self.stats.requests += 1
+            retry_after = None
+            started = time.perf_counter()
+            try:
+                async with self._session().request(method, self.base_url + path, params=params, json=json,
+                                                   headers=headers) as response:
+                    if response.status < 400:
+                        body = await response.json()
+                        self.stats.ok += 1
+                        self.stats.latency.record((time.perf_counter() - started) * 1000)
+                        return body
+                    error = TransportError(self.system, response.status, (await response.text())[:200])
+                    retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = TransportError(self.system, None, f"{type(e).__name__}: {e}")
+
+            if error.status is None:
+                self.stats.network_errors += 1
+            elif error.status == 429:
+                self.stats.throttled += 1
+            elif error.status >= 500:
+                self.stats.server_errors += 1
+            else:
+                self.stats.client_errors += 1
+            if not error.retryable or retry == settings.connector_max_retries:
+                self.stats.failed += 1
+                raise error
+            self.stats.retries += 1
+            if retry_after is not None:
+                self.bucket.pause(retry_after)  # the next acquire() waits it out, for every caller
+            else:
+                await asyncio.sleep(backoff_seconds(retry + 1))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        s = self.stats
+        return {
+            "base_url": self.base_url,
+            "rate_per_second": self.bucket.rate,
+            "burst": self.bucket.burst,
+            "requests": s.requests,
+            "ok": s.ok,
+            "retries": s.retries,
+            "throttled": s.throttled,
+            "server_errors": s.server_errors,
+            "client_errors": s.client_errors,
+            "network_errors": s.network_errors,
+            "failed": s.failed,
+            "bucket_waits": self.bucket.waits,
+            "bucket_wait_seconds": round(self.bucket.waited_seconds, 3),
+            "latency": s.latency.summary(),
+        }
+
+
+class PushBatcher:
+    """Gathers single pushes into batch calls of `send`, which returns one result per candidate."""
+
+    def __init__(self, send: Callable[[List[Dict[str, Any]]], Awaitable[List[bool]]],
+                 batch_size: Optional[int] = None, linger_ms: Optional[float] = None):
+        self.send = send
+        self.batch_size = batch_size or settings.connector_push_batch_size
+        self.linger = (settings.connector_push_linger_ms if linger_ms is None else linger_ms) / 1000
+        self.pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.sending: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.gathered = 0
+
+    async def push(self, candidate: Dict[str, Any]) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((candidate, future))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = asyncio.get_running_loop().call_later(self.linger, self.flush)
+        return await future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        while self.pending:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            task = asyncio.create_task(self._send(batch))
+            self.sending.add(task)
+            task.add_done_callback(self.sending.discard)
+
+    async def _send(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        self.batches += 1
+        self.gathered += len(batch)
+        try:
+            results = await self.send([candidate for candidate, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            # A caller that gave up has a cancelled future; its candidate was sent all the same
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "linger_ms": self.linger * 1000,
+            "batches": self.batches,
+            "gathered": self.gathered,
+            "mean_batch": round(self.gathered / self.batches, 1) if self.batches else None,
+            "waiting": len(self.pending),
+        }
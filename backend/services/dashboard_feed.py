@@ -0,0 +1,94 @@
+"""
+Dashboard Feed – Publishes dashboard snapshots to live subscribers.
+
+While anyone is subscribed to the "dashboard" topic, the snapshot served
+by GET /dashboard is rebuilt every dashboard_push_seconds and published
+only when it changed, so an unchanged dashboard costs one rollup query
+per tick and nothing at all when no one is watching. New subscribers get
+the latest snapshot straight away.
+"""
+import asyncio
+import json
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import async_session
+from schemas import DashboardMetrics, AgentStatus, ActivityItem, DashboardResponse
+from agents.orchestrator import orchestrator
+from services.event_bus import Message, Subscriber, event_bus
+from services.rollup_service import activity_counts
+
+
+async def build_dashboard(db: AsyncSession) -> DashboardResponse:
+    """Metrics, agent cards, activity and 24h throughput in one payload."""
+    metrics = DashboardMetrics(**orchestrator.get_metrics())
+    agents = [AgentStatus(**a) for a in orchestrator.get_agent_statuses()]
+    activity = orchestrator.get_recent_activity()
+
+    return DashboardResponse(
+        metrics=metrics,
+        agents=agents,
+        activity=[ActivityItem(**a) for a in activity],
+        agent_activity=await activity_counts(db, timedelta(hours=24)),
+    )
+
+
+class DashboardFeed:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._last: Optional[str] = None
+        self.latest: Optional[Message] = None
+        self.published = 0
+
+    def prime(self, subscriber: Subscriber):
+        """Give a new subscriber the current snapshot, or build one right away if there is none."""
+        if self.latest is not None:
+            subscriber.buffer.append(self.latest)
+            subscriber.wake()
+        else:
+            self._wake.set()
+
+    async def publish_if_changed(self) -> bool:
+        async with async_session() as db:
+            snapshot = (await build_dashboard(db)).model_dump(mode="json")
+        key = json.dumps(snapshot, sort_keys=True, default=str)
+        if key == self._last:
+            return False
+        self._last = key
+        self.latest = event_bus.publish("dashboard", snapshot)
+        self.published += 1
+        return True
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.dashboard_push_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not event_bus.has_subscribers("dashboard"):
+                self._last = self.latest = None  # the next subscriber gets a fresh snapshot
+                continue
+            try:
+                await self.publish_if_changed()
+            except Exception as e:
+                print(f"⚠️ Dashboard push failed: {e}", flush=True)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+dashboard_feed = DashboardFeed()
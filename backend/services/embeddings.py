@@ -0,0 +1,153 @@
+"""
+Embeddings – Pluggable text embedders for semantic candidate search.
+Ollama's /api/embed is used when an embedding model is pulled; otherwise a local
+feature-hashing embedder (words, word pairs and character trigrams, with common
+recruiting abbreviations expanded) keeps search working offline.
+All embedders return L2-normalized float32 rows, so dot product = cosine.
+"""
+import re
+import zlib
+from typing import List, Optional, Sequence
+
+import aiohttp
+import numpy as np
+
+from config import settings
+from services.ai_service import OLLAMA_BASE
+from services.api_logger import api_logger
+
+# Abbreviations expanded before hashing so "ML Engineer" and "Machine Learning" share features
+SYNONYMS = {
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "cv": "computer vision",
+    "ds": "data science",
+    "de": "data engineering",
+    "sre": "site reliability engineering",
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "fe": "frontend",
+    "be": "backend",
+    "fullstack": "full stack",
+    "js": "javascript",
+    "ts": "typescript",
+    "k8s": "kubernetes",
+    "pm": "product manager",
+    "em": "engineering manager",
+    "ux": "user experience design",
+    "ui": "user interface design",
+    "qa": "quality assurance",
+    "ios": "ios mobile",
+    "android": "android mobile",
+}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        token = token.rstrip(".")
+        tokens.extend(SYNONYMS.get(token, token).split())
+    return tokens
+
+
+class HashingEmbedder:
+    """Signed feature hashing into a fixed number of dimensions; no model, no network."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+        self._cache = {}
+
+    def _hash(self, feature: str, weight: float):
+        h = zlib.crc32(feature.encode())
+        return h % self.dim, (weight if h & 0x80000000 else -weight)
+
+    def _token_features(self, token: str):
+        """Slots and signed weights for a word and its character trigrams (cached per word)."""
+        cached = self._cache.get(token)
+        if cached is None:
+            padded = f"<{token}>"
+            # Character trigrams tie together inflections: engineer / engineering
+            pairs = [self._hash(token, 1.0)] + [self._hash("#" + padded[i:i + 3], 0.25) for i in range(len(padded) - 2)]
+            cached = ([p[0] for p in pairs], [p[1] for p in pairs])
+            if len(self._cache) < 200_000:
+                self._cache[token] = cached
+        return cached
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        rows, slots, weights = [], [], []
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            start = len(slots)
+            for token in tokens:
+                token_slots, token_weights = self._token_features(token)
+                slots.extend(token_slots)
+                weights.extend(token_weights)
+            for a, b in zip(tokens, tokens[1:]):
+                slot, weight = self._hash(a + " " + b, 0.75)
+                slots.append(slot)
+                weights.append(weight)
+            rows.extend([row] * (len(slots) - start))
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(slots, dtype=np.int64)
+        out = np.bincount(flat, weights, minlength=len(texts) * self.dim).astype(np.float32)
+        out = out.reshape(len(texts), self.dim)
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1, norms)
+
+
+class OllamaEmbedder:
+    """Embeddings from a local Ollama model via /api/embed."""
+
+    def __init__(self, model: str, dim: int):
+        self.model = model
+        self.dim = dim
+        self.name = f"ollama-{model.replace(':', '-').replace('/', '-')}"
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        async with api_logger.track("POST", f"{OLLAMA_BASE}/api/embed", "Ollama") as call, \
+                aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{OLLAMA_BASE}/api/embed",
+                json={"model": self.model, "input": list(texts)},
+                timeout=aiohttp.ClientTimeout(total=120),
+            ) as resp:
+                call.status_code = resp.status
+                resp.raise_for_status()
+                data = await resp.json()
+        vectors = np.asarray(data["embeddings"], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+async def _ollama_embedder() -> Optional[OllamaEmbedder]:
+    """An Ollama embedder if the configured model is pulled, else None."""
+    model = settings.ollama_embed_model
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{OLLAMA_BASE}/api/tags", timeout=aiohttp.ClientTimeout(total=3)) as resp:
+                names = [m["name"] for m in (await resp.json()).get("models", [])]
+        if not any(n == model or n.split(":")[0] == model for n in names):
+            return None
+        probe = OllamaEmbedder(model, 0)
+        probe.dim = (await probe.embed(["probe"])).shape[1]
+        return probe
+    except Exception:
+        return None
+
+
+async def create_embedder():
+    """Embedder for settings.embedding_provider: ollama, hashing, or auto (Ollama if available)."""
+    provider = settings.embedding_provider
+    if provider in ("auto", "ollama"):
+        embedder = await _ollama_embedder()
+        if embedder:
+            print(f"✅ Semantic search using Ollama embeddings ({embedder.model}, {embedder.dim}d)", flush=True)
+            return embedder
+        if provider == "ollama":
+            raise RuntimeError(f"Ollama embedding model '{settings.ollama_embed_model}' is not available")
+    print(f"ℹ️ Semantic search using local hashing embeddings ({settings.embedding_dim}d)", flush=True)
+    return HashingEmbedder(settings.embedding_dim)
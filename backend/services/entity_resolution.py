@@ -0,0 +1,554 @@
+"""
+Entity Resolution – Merge the same person arriving from several sources into one canonical candidate.
+
+Comparing every pair of candidates is quadratic, so records are only compared
+within blocks:
+
+  * e:  normalized email (lowercase, +tag dropped);
+  * n:  name tokens in sorted order ("Lee Jordan" == "Jordan Lee");
+  * c:  surname plus company tokens without legal suffixes;
+  * LSH bands of a MinHash signature over skills and title tokens, per
+    full name token, so similar profiles meet even when the names are
+    written differently ("J. Lee" and "Jordan Lee" share "lee").
+
+Blocks larger than ENTITY_RESOLUTION_MAX_BLOCK (a very common name, a
+generic profile) are skipped; they would bring back the quadratic cost for
+little precision. Each pair found in a block is verified: equal emails
+match; otherwise the names must agree (at least one full token in common;
+initials and middle names allowed) and either the company or the estimated
+profile Jaccard must agree too.
+Two different emails from the same source never match.
+
+Matched candidates are unioned into clusters. The lowest id in a cluster
+stays the canonical row: it is filled in from the duplicates (missing
+fields, the union of skills, the best scores) and every duplicate points at
+it through Candidate.canonical_id. candidate_lineage keeps one row per
+member with its source, email and the rule that matched it. Duplicates are
+left in place, so references to them (classifications, exports of old ids)
+still resolve.
+
+New candidates are resolved incrementally against an in-memory index, a
+second or so after they are inserted; `run_batch()` (job type "resolve",
+`cli.py resolve`) rebuilds the index from the table and resolves everything.
+Clusters are always read back from the database before merging, so a batch
+run in a worker process and the API's incremental index agree. Indexing and
+matching are CPU-bound and run in a worker thread, under the resolver's lock,
+so a full batch does not stall the event loop.
+"""
+import asyncio
+import functools
+import re
+import time
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import event, or_, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import async_session, engine
+from models import Candidate, CandidateLineage
+from services.skill_index import normalize_skill
+
+PRIME = 4294967311  # smallest prime above 2**32: MinHash permutations are (a*x + b) mod PRIME
+SIGNATURE_CHUNK = 4096  # candidates hashed per vectorized step (bounds the num_perm x tokens matrix)
+CHUNK = 500  # ids per IN (...) lookup
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "gmbh", "plc", "sa", "ag"}
+TITLE_NOISE = {"senior", "sr", "junior", "jr", "lead", "staff", "principal", "the", "of", "and", "at", "i", "ii", "iii"}
+FIELDS = ("id", "name", "email", "company", "title", "skills", "source")
+# Not email: (email, source) is unique, and the lineage keeps every member's address
+FILLED_FIELDS = ("title", "company", "location", "experience", "initials")
+
+
+def tokens(text: Optional[str]) -> List[str]:
+    """Lowercase ASCII word tokens, accents folded ("Müller" -> "muller")."""
+    if not text:
+        return []
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return re.findall(r"[a-z0-9]+", folded)
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email or "@" not in email:
+        return None
+    local, _, domain = email.strip().lower().rpartition("@")
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def company_key(company: Optional[str]) -> str:
+    return " ".join(t for t in tokens(company) if t not in COMPANY_SUFFIXES)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def name_similarity(a: Tuple[str, ...], b: Tuple[str, ...]) -> float:
+    """Matched tokens over the shorter name plus the longer one's unmatched full tokens; initials match.
+
+    Names are sorted token tuples, so the many comparisons between common names hit the cache.
+    """
+    if a == b:
+        return 1.0 if a else 0.0
+    if not a or not b:
+        return 0.0
+    short, long = (a, b) if len(a) <= len(b) else (b, a)
+    rest = list(long)
+    matched = 0
+    for token in short:
+        for i, other in enumerate(rest):
+            if token == other or ((len(token) == 1 or len(other) == 1) and token[0] == other[0]):
+                matched += 1
+                del rest[i]
+                break
+    # Unmatched middle initials in the longer name do not count against it
+    return matched / (len(short) + sum(1 for t in rest if len(t) > 1))
+
+
+class Record:
+    """What resolution keeps per candidate: normalized keys and the MinHash signature."""
+
+    __slots__ = ("id", "source", "email", "name", "words", "company", "signature", "keys")
+
+    def __init__(self, id: int, source: Optional[str], email: Optional[str], name: Tuple[str, ...], company: str,
+                 signature: Optional[np.ndarray]):
+        self.id = id
+        self.source = source
+        self.email = email
+        self.name = name
+        self.words = frozenset(t for t in name if len(t) > 1)  # full name tokens, for a cheap first check
+        self.company = company
+        self.signature = signature
+        self.keys: List[Any] = []
+
+
+@dataclass
+class Match:
+    a: int
+    b: int
+    rule: str  # email, name_company, profile
+    score: float
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent.setdefault(x, x)
+        if parent != x:
+            parent = self.parent[x] = self.find(parent)
+        return parent
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # The lower id stays the root, so the canonical candidate is the oldest
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+    def groups(self) -> Dict[int, List[int]]:
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for x in self.parent:
+            groups[self.find(x)].append(x)
+        return groups
+
+
+def clusters(matches: Iterable[Match]) -> List[List[int]]:
+    """Connected components of the match graph, each sorted, canonical (lowest id) first."""
+    uf = UnionFind()
+    for m in matches:
+        uf.union(m.a, m.b)
+    return [sorted(members) for members in uf.groups().values()]
+
+
+class Resolver:
+    """In-memory blocking index; add() records, then match() them against everything indexed."""
+
+    def __init__(self, num_perm: Optional[int] = None, bands: Optional[int] = None,
+                 max_block: Optional[int] = None, profile_threshold: Optional[float] = None,
+                 name_threshold: Optional[float] = None, seed: int = 1):
+        self.num_perm = num_perm or settings.entity_resolution_num_perm
+        self.bands = bands or settings.entity_resolution_bands
+        if self.num_perm % self.bands:
+            raise ValueError("entity_resolution_num_perm must be a multiple of entity_resolution_bands")
+        self.rows = self.num_perm // self.bands
+        self.max_block = max_block or settings.entity_resolution_max_block
+        self.profile_threshold = profile_threshold or settings.entity_resolution_profile_threshold
+        self.name_threshold = name_threshold or settings.entity_resolution_name_threshold
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 1 << 31, size=self.num_perm).astype(np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=self.num_perm).astype(np.uint64)
+        self.mix = rng.randint(1, 1 << 31, size=self.rows).astype(np.uint64)
+        self.records: Dict[int, Record] = {}
+        self.blocks: Dict[Any, List[int]] = defaultdict(list)
+        self.comparisons = 0
+        self.oversized = 0
+
+    # ── Indexing ──
+    def signatures(self, shingle_sets: Sequence[Set[str]]) -> np.ndarray:
+        """MinHash signatures, one row per set; rows of empty sets stay at the maximum value."""
+        signatures = np.full((len(shingle_sets), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        for start in range(0, len(shingle_sets), SIGNATURE_CHUNK):
+            chunk = shingle_sets[start:start + SIGNATURE_CHUNK]
+            lengths = np.fromiter((len(s) for s in chunk), dtype=np.int64, count=len(chunk))
+            if not lengths.sum():
+                continue
+            hashes = np.fromiter((zlib.crc32(t.encode()) for s in chunk for t in s), dtype=np.uint64,
+                                 count=int(lengths.sum()))
+            permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % np.uint64(PRIME)
+            nonempty = np.flatnonzero(lengths)
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+            # Each candidate's tokens are one contiguous run of columns: min over each run
+            signatures[start + nonempty] = np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+        return signatures
+
+    def band_keys(self, signatures: np.ndarray) -> np.ndarray:
+        """(n, bands) uint64 hash of each band's rows."""
+        banded = signatures.astype(np.uint64).reshape(len(signatures), self.bands, self.rows)
+        return (banded * self.mix).sum(axis=2)
+
+    def add(self, rows: Iterable[Any]) -> List[int]:
+        """Index candidates (objects with FIELDS as attributes); re-adding an id replaces its entry."""
+        rows = list(rows)
+        shingles = []
+        for row in rows:
+            profile = {f"s:{normalize_skill(s)}" for s in row.skills or [] if s}
+            profile.update(f"t:{t}" for t in tokens(row.title) if t not in TITLE_NOISE)
+            shingles.append(profile)
+        signatures = self.signatures(shingles)
+        band_keys = self.band_keys(signatures).tolist()
+        for row, profile, signature, bands in zip(rows, shingles, signatures, band_keys):
+            self.remove(row.id)
+            words = tokens(row.name)
+            name = tuple(sorted(words))
+            record = Record(row.id, row.source, normalize_email(row.email), name, company_key(row.company),
+                            signature if profile else None)
+            if record.email:
+                record.keys.append("e:" + record.email)
+            if name:
+                record.keys.append("n:" + " ".join(name))
+                if record.company:
+                    record.keys.append(f"c:{words[-1]}|{record.company}")
+            if profile:
+                # Verification needs a full name token in common, so bands only meet within one
+                record.keys.extend((band, key, word) for band, key in enumerate(bands) for word in record.words)
+            for key in record.keys:
+                self.blocks[key].append(row.id)
+            self.records[row.id] = record
+        return [row.id for row in rows]
+
+    def remove(self, candidate_id: int):
+        record = self.records.pop(candidate_id, None)
+        if record is None:
+            return
+        for key in record.keys:
+            block = self.blocks[key]
+            block.remove(candidate_id)
+            if not block:
+                del self.blocks[key]
+
+    # ── Matching ──
+    def match(self, candidate_ids: Iterable[int]) -> List[Match]:
+        """Verified matches between these candidates and every indexed one, each pair once."""
+        requested = set(candidate_ids)
+        matches, comparisons = [], 0
+        for candidate_id in sorted(requested):
+            record = self.records.get(candidate_id)
+            if record is None:
+                continue
+            # A pair usually shares several blocks; the set union finds each neighbour once
+            others = set()
+            for key in record.keys:
+                block = self.blocks[key]
+                if len(block) > self.max_block:
+                    self.oversized += 1
+                else:
+                    others.update(block)
+            for other_id in others:
+                if other_id == candidate_id or (other_id < candidate_id and other_id in requested):
+                    continue  # itself, or a pair already verified from the other side
+                comparisons += 1
+                other = self.records[other_id]
+                match = self.verify(other, record) if other_id < candidate_id else self.verify(record, other)
+                if match is not None:
+                    matches.append(match)
+        self.comparisons += comparisons
+        return matches
+
+    def similarity(self, a: Record, b: Record) -> float:
+        """Estimated Jaccard similarity of two profiles: the fraction of equal MinHash values."""
+        if a.signature is None or b.signature is None:
+            return 0.0
+        return float(np.count_nonzero(a.signature == b.signature)) / self.num_perm
+
+    def verify(self, a: Record, b: Record) -> Optional[Match]:
+        both_emails = a.email is not None and b.email is not None
+        if both_emails:
+            if a.email == b.email:
+                return Match(a.id, b.id, "email", 1.0)
+            if a.source == b.source:
+                return None
+        if a.words.isdisjoint(b.words):
+            return None  # not one full name token in common (most pairs from the LSH blocks)
+        names = name_similarity(a.name, b.name)
+        if names < self.name_threshold:
+            return None
+        if a.company and a.company == b.company:
+            # A personal and a work address for the same name and employer: the profile must agree too
+            if not both_emails or self.similarity(a, b) >= self.profile_threshold:
+                return Match(a.id, b.id, "name_company", round(names, 3))
+            return None
+        # Two different employers or two different addresses: names and skills alone are not enough
+        if not both_emails and not (a.company and b.company):
+            profile = self.similarity(a, b)
+            if profile >= self.profile_threshold:
+                return Match(a.id, b.id, "profile", round(profile, 3))
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "indexed": len(self.records),
+            "blocks": len(self.blocks),
+            "comparisons": self.comparisons,
+            "oversized_blocks_skipped": self.oversized,
+        }
+
+
+def merge_into(canonical: Candidate, duplicates: Iterable[Candidate]):
+    """Fill the canonical row's gaps from its duplicates; skills are unioned, scores keep the best."""
+    skills = list(canonical.skills or [])
+    known = {normalize_skill(s) for s in skills}
+    for duplicate in duplicates:
+        for field in FILLED_FIELDS:
+            if not getattr(canonical, field) and getattr(duplicate, field):
+                setattr(canonical, field, getattr(duplicate, field))
+        for skill in duplicate.skills or []:
+            if normalize_skill(skill) not in known:
+                known.add(normalize_skill(skill))
+                skills.append(skill)
+        for field in ("match_score", "screen_score"):
+            if getattr(duplicate, field) is not None and (getattr(canonical, field) or 0) < getattr(duplicate, field):
+                setattr(canonical, field, getattr(duplicate, field))
+    if skills != list(canonical.skills or []):
+        canonical.skills = skills
+
+
+class EntityResolver:
+    """Keeps candidates resolved: incrementally after inserts, or all at once in run_batch()."""
+
+    def __init__(self):
+        self.index: Optional[Resolver] = None
+        self.pending: Set[int] = set()
+        self._lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.resolved = 0
+        self.merged = 0
+        self.last_apply_ms = 0.0
+        self.last_batch: Optional[Dict[str, Any]] = None
+
+    # ── Change events ──
+    def mark_dirty(self, candidate_ids: Iterable[int]):
+        """Queue new or re-imported candidates; ignored where the resolver is not running (the next batch covers them)."""
+        if self._wake is None:
+            return
+        self.pending.update(candidate_ids)
+        if self.pending:
+            self._wake.set()
+
+    def start(self):
+        if not settings.entity_resolution_incremental:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wake = None
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            # Let the inserting transaction commit and let bursts (imports) coalesce
+            await asyncio.sleep(settings.entity_resolution_delay_seconds)
+            self._wake.clear()
+            try:
+                await self.apply_pending()
+            except Exception as e:
+                print(f"⚠️ Entity resolution failed: {e}", flush=True)
+
+    # ── Resolution ──
+    @staticmethod
+    async def _load(candidate_ids: Optional[List[int]] = None, batch_size: int = 20_000):
+        """Rows to index: the given candidates, or every candidate in id order."""
+        columns = [getattr(Candidate, f) for f in FIELDS]
+        async with engine.connect() as conn:
+            if candidate_ids is not None:
+                for start in range(0, len(candidate_ids), CHUNK):
+                    yield (await conn.execute(
+                        select(*columns).where(Candidate.id.in_(candidate_ids[start:start + CHUNK]))
+                    )).all()
+                return
+            result = await conn.stream(select(*columns).order_by(Candidate.id).execution_options(yield_per=batch_size))
+            async for rows in result.partitions(batch_size):
+                yield rows
+
+    async def _build(self) -> Resolver:
+        resolver = Resolver()
+        async for rows in self._load():
+            await asyncio.to_thread(resolver.add, rows)
+        return resolver
+
+    async def apply_pending(self) -> int:
+        """Resolve the queued candidates against the index (built from the table on first use)."""
+        if not self.pending:
+            return 0
+        async with self._lock:
+            pending, self.pending = sorted(self.pending), set()
+            started = time.perf_counter()
+            if self.index is None:
+                self.index = await self._build()
+            else:
+                async for rows in self._load(pending):
+                    await asyncio.to_thread(self.index.add, rows)
+            merged = await self.merge(await asyncio.to_thread(self.index.match, pending))
+            self.resolved += len(pending)
+            self.last_apply_ms = round((time.perf_counter() - started) * 1000, 2)
+        if merged:
+            print(f"🧬 Merged {merged} duplicate candidates from {len(pending)} new", flush=True)
+        return merged
+
+    async def run_batch(self) -> Dict[str, Any]:
+        """Rebuild the index from the whole table and resolve every candidate."""
+        async with self._lock:
+            started = time.perf_counter()
+            resolver = await self._build()
+            indexed = time.perf_counter()
+            matches = await asyncio.to_thread(resolver.match, sorted(resolver.records))
+            matched = time.perf_counter()
+            merged = await self.merge(matches)
+            finished = time.perf_counter()
+            self.index = resolver
+            self.pending.clear()
+        n = len(resolver.records)
+        groups = clusters(matches)
+        self.last_batch = {
+            "candidates": n,
+            **resolver.stats(),
+            "pairwise_comparisons": n * (n - 1) // 2,
+            "matches": len(matches),
+            "clusters": len(groups),
+            "largest_cluster": max((len(g) for g in groups), default=0),
+            "merged": merged,
+            "index_ms": round((indexed - started) * 1000, 1),
+            "match_ms": round((matched - indexed) * 1000, 1),
+            "merge_ms": round((finished - matched) * 1000, 1),
+            "candidates_per_second": round(n / (matched - started), 1) if matched > started else None,
+        }
+        return self.last_batch
+
+    async def merge(self, matches: List[Match]) -> int:
+        """Union matched candidates with their existing clusters and write canonical rows and lineage."""
+        if not matches:
+            return 0
+        ids = sorted({m.a for m in matches} | {m.b for m in matches})
+        async with async_session() as db:
+            current: Dict[int, Optional[int]] = {}
+            for start in range(0, len(ids), CHUNK):
+                current.update((await db.execute(
+                    select(Candidate.id, Candidate.canonical_id).where(Candidate.id.in_(ids[start:start + CHUNK]))
+                )).all())
+            uf, best = UnionFind(), {}
+            for m in matches:
+                if m.a not in current or m.b not in current:
+                    continue  # deleted since it was indexed
+                uf.union(current[m.a] or m.a, current[m.b] or m.b)
+                for candidate_id in (m.a, m.b):
+                    if candidate_id not in best or m.score > best[candidate_id].score:
+                        best[candidate_id] = m
+
+            merged = 0
+            for canonical_id, roots in uf.groups().items():
+                absorbed = [r for r in roots if r != canonical_id]
+                if absorbed:
+                    merged += await self._absorb(db, canonical_id, absorbed, best)
+            await db.commit()
+        if merged:
+            from services.matching_engine import matching_engine
+            matching_engine.invalidate()  # duplicates leave the pool
+            self.merged += merged
+        return merged
+
+    @staticmethod
+    async def _absorb(db, canonical_id: int, roots: List[int], best: Dict[int, Match]) -> int:
+        canonical = await db.get(Candidate, canonical_id)
+        members = (await db.execute(
+            select(Candidate).where(or_(Candidate.id.in_(roots), Candidate.canonical_id.in_(roots)))
+        )).scalars().all()
+        if canonical is None or not members:
+            return 0
+        merge_into(canonical, sorted((m for m in members if m.id in roots), key=lambda m: m.id))
+        for member in members:
+            member.canonical_id = canonical_id
+
+        lineage = {row.candidate_id: row for row in (await db.execute(
+            select(CandidateLineage).where(CandidateLineage.candidate_id.in_([canonical_id, *(m.id for m in members)]))
+        )).scalars().all()}
+        if canonical_id not in lineage:
+            db.add(CandidateLineage(canonical_id=canonical_id, candidate_id=canonical_id, source=canonical.source,
+                                    email=canonical.email, rule="canonical"))
+        for member in members:
+            row = lineage.get(member.id)
+            match = best.get(member.id)
+            if row is None:
+                row = CandidateLineage(candidate_id=member.id, source=member.source, email=member.email)
+                db.add(row)
+            row.canonical_id = canonical_id
+            if match is not None and row.rule in (None, "canonical"):
+                row.rule = match.rule
+                row.similarity = match.score
+                row.matched_with = match.b if match.a == member.id else match.a
+            elif row.rule in (None, "canonical"):
+                row.rule = "cluster"  # came along with a cluster that matched
+        return len(members)
+
+    async def lineage(self, db, candidate_id: int) -> Optional[Dict[str, Any]]:
+        """The canonical candidate a candidate resolves to, with every merged source record."""
+        candidate = await db.get(Candidate, candidate_id)
+        if candidate is None:
+            return None
+        canonical = await db.get(Candidate, candidate.canonical_id) if candidate.canonical_id else candidate
+        members = (await db.execute(
+            select(CandidateLineage).where(CandidateLineage.canonical_id == canonical.id)
+            .order_by(CandidateLineage.candidate_id)
+        )).scalars().all()
+        return {"canonical": canonical, "members": members}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "incremental": self._task is not None,
+            "pending": len(self.pending),
+            "resolved": self.resolved,
+            "merged": self.merged,
+            "last_apply_ms": self.last_apply_ms,
+            "index": self.index.stats() if self.index is not None else None,
+            "last_batch": self.last_batch,
+        }
+
+
+entity_resolver = EntityResolver()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_inserted_candidates(session: Session, flush_context):
+    """Queue candidates inserted through the ORM for incremental resolution."""
+    new = [obj.id for obj in session.new if isinstance(obj, Candidate)]
+    if new:
+        entity_resolver.mark_dirty(new)
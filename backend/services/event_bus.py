@@ -0,0 +1,187 @@
+"""
+Event Bus – In-process pub/sub behind the WebSocket and SSE live feeds.
+
+Publishing is synchronous and never waits on a client: each event is JSON
+encoded at most once, its WebSocket and SSE frames are built on first use and
+shared by every subscriber, and delivery is an append to each subscriber's
+bounded buffer. Waking the send loops is deferred to one callback per event
+loop turn, so a burst of events costs one wake-up per client, and the
+request that logged the event does not pay for it. A subscriber whose buffer is full is evicted rather than
+allowed to hold memory or slow the publisher; it reconnects (SSE clients
+resume from Last-Event-ID out of a short replay ring). The bus lives in
+the API process, so events logged by `cli.py worker` processes reach the
+feed only through the database.
+"""
+import asyncio
+import json
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set
+
+from config import settings
+
+TOPICS = ("activity", "dashboard")
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class Message:
+    """One published event; encoded on first delivery, then shared by all subscribers."""
+
+    __slots__ = ("id", "topic", "payload", "_data", "_ws", "_sse")
+
+    def __init__(self, id: int, topic: str, payload: Any):
+        self.id = id
+        self.topic = topic
+        self.payload = payload
+        self._data: Optional[str] = None
+        self._ws: Optional[str] = None
+        self._sse: Optional[str] = None
+
+    @property
+    def data(self) -> str:
+        if self._data is None:
+            self._data = json.dumps(self.payload, default=_default, separators=(",", ":"))
+        return self._data
+
+    @property
+    def ws(self) -> str:
+        if self._ws is None:
+            self._ws = f'{{"id":{self.id},"topic":"{self.topic}","data":{self.data}}}'
+        return self._ws
+
+    @property
+    def sse(self) -> str:
+        if self._sse is None:
+            self._sse = f"id: {self.id}\nevent: {self.topic}\ndata: {self.data}\n\n"
+        return self._sse
+
+
+class Subscriber:
+    """A connected client: bounded buffer of messages plus the future its send loop waits on."""
+
+    __slots__ = ("topics", "buffer", "capacity", "waiter", "evicted", "delivered")
+
+    def __init__(self, topics: Set[str], capacity: int):
+        self.topics = topics
+        self.buffer: Deque[Message] = deque()
+        self.capacity = capacity
+        self.waiter: Optional[asyncio.Future] = None
+        self.evicted: Optional[str] = None
+        self.delivered = 0
+
+    def wake(self):
+        waiter = self.waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[Message]:
+        """Everything buffered, waiting up to `timeout` for the first message ([] on timeout or eviction)."""
+        if not self.buffer and self.evicted is None:
+            # A bare future and timer are much cheaper per wake-up than Event + wait_for
+            loop = asyncio.get_running_loop()
+            self.waiter = loop.create_future()
+            timer = loop.call_later(timeout, self.wake) if timeout is not None else None
+            try:
+                await self.waiter
+            finally:
+                self.waiter = None
+                if timer is not None:
+                    timer.cancel()
+        if self.evicted is not None:
+            return []
+        batch = list(self.buffer)
+        self.buffer.clear()
+        self.delivered += len(batch)
+        return batch
+
+
+class EventBus:
+    """Topic fan-out to bounded subscriber buffers, evicting consumers that fall behind."""
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set[Subscriber]] = {topic: set() for topic in TOPICS}
+        self.replay: Deque[Message] = deque(maxlen=settings.event_bus_replay)
+        self.last_id = 0
+        self.published = 0
+        self.fanned_out = 0
+        self.evicted = 0
+        self._ready: List[Subscriber] = []
+        self._wake_scheduled = False
+
+    def subscribe(self, topics: Iterable[str], last_event_id: Optional[int] = None,
+                  capacity: Optional[int] = None) -> Subscriber:
+        topics = {t for t in topics if t in self.subscribers}
+        subscriber = Subscriber(topics, capacity or settings.event_bus_client_buffer)
+        for topic in topics:
+            self.subscribers[topic].add(subscriber)
+        if last_event_id is not None:
+            missed = [m for m in self.replay if m.id > last_event_id and m.topic in topics]
+            subscriber.buffer.extend(missed[-subscriber.capacity:])
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        for topic in subscriber.topics:
+            self.subscribers[topic].discard(subscriber)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return bool(self.subscribers.get(topic))
+
+    def publish(self, topic: str, payload: Any) -> Message:
+        """Fan an event out to the topic's subscribers. Must be called on the event loop thread."""
+        subscribers = self.subscribers[topic]
+        self.last_id += 1
+        message = Message(self.last_id, topic, payload)
+        self.replay.append(message)
+        self.published += 1
+        slow = []
+        ready = self._ready
+        for subscriber in subscribers:
+            buffer = subscriber.buffer
+            if len(buffer) >= subscriber.capacity:
+                slow.append(subscriber)
+                continue
+            if not buffer:
+                ready.append(subscriber)
+            buffer.append(message)
+        self.fanned_out += len(subscribers) - len(slow)
+        for subscriber in slow:
+            self.evict(subscriber, f"buffer full ({subscriber.capacity} events)")
+        if ready and not self._wake_scheduled:
+            self._wake_scheduled = True
+            try:
+                asyncio.get_running_loop().call_soon(self._wake_ready)
+            except RuntimeError:  # no loop, so nobody can be waiting
+                self._wake_ready()
+        return message
+
+    def _wake_ready(self):
+        """Wake subscribers whose buffers filled since the last pass: once per loop turn, not per event."""
+        ready, self._ready = self._ready, []
+        self._wake_scheduled = False
+        for subscriber in ready:
+            subscriber.wake()
+
+    def evict(self, subscriber: Subscriber, reason: str):
+        subscriber.evicted = reason
+        subscriber.buffer.clear()
+        subscriber.wake()
+        self.unsubscribe(subscriber)
+        self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": {topic: len(subs) for topic, subs in self.subscribers.items()},
+            "published": self.published,
+            "fanned_out": self.fanned_out,
+            "evicted": self.evicted,
+            "last_id": self.last_id,
+            "client_buffer": settings.event_bus_client_buffer,
+        }
+
+
+event_bus = EventBus()
@@ -0,0 +1,156 @@
+"""
+Event Writer – Buffers log rows off the request path and persists them in group commits.
+Rows are queued in memory and flushed with a single executemany INSERT per batch,
+triggered when the batch size is reached or the flush interval elapses.
+"""
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+from sqlalchemy import insert, Table
+from config import settings
+from database import engine
+from models import ActivityLog
+from services.event_bus import event_bus
+from services.response_cache import response_cache
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest")
+
+
+class BufferedWriter:
+    """Bounded in-memory queue of rows for one table, flushed in group commits."""
+
+    def __init__(
+        self,
+        table: Table,
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+        overflow_policy: str = "drop_oldest",
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow_policy}'")
+        self.table = table
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+
+        self._buffer: deque = deque()
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped_oldest = 0
+        self.dropped_newest = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def record(self, row: Dict[str, Any]) -> bool:
+        """Queue a row without blocking. Returns False if the row was dropped."""
+        if len(self._buffer) >= self.max_queue:
+            if self.overflow_policy == "drop_newest":
+                self.dropped_newest += 1
+                return False
+            self._buffer.popleft()
+            self.dropped_oldest += 1
+
+        self._buffer.append(row)
+        self.enqueued += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    async def flush(self) -> int:
+        """Write everything currently buffered, one transaction per batch."""
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._take_batch()
+                try:
+                    async with engine.begin() as conn:
+                        await conn.execute(insert(self.table), batch)
+                except Exception as e:
+                    self.failed += len(batch)
+                    print(f"❌ Failed to flush {len(batch)} rows to {self.table.name}: {e}", flush=True)
+                    break
+                self.flushes += 1
+                self.written += len(batch)
+                written += len(batch)
+        return written
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        size = min(self.batch_size, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(size)]
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        """Start the background flush loop on the running event loop."""
+        if self._task is None or self._task.done():
+            # Bind the loop primitives to the loop that runs the flusher
+            self._wake = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and drain whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "table": self.table.name,
+            "pending": len(self._buffer),
+            "capacity": self.max_queue,
+            "overflow_policy": self.overflow_policy,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "flushes": self.flushes,
+            "dropped_oldest": self.dropped_oldest,
+            "dropped_newest": self.dropped_newest,
+            "failed": self.failed,
+        }
+
+
+class ActivityWriter(BufferedWriter):
+    """Buffered writer for the agent activity feed."""
+
+    def __init__(self):
+        super().__init__(
+            ActivityLog.__table__,
+            max_queue=settings.activity_buffer_size,
+            batch_size=settings.activity_batch_size,
+            flush_interval=settings.activity_flush_interval,
+            overflow_policy=settings.activity_overflow_policy,
+        )
+
+    def log(self, agent: str, action: str, details: Optional[Dict[str, Any]] = None) -> bool:
+        """Queue an activity event for the feed, push it to live subscribers and expire cached dashboards."""
+        row = {
+            "agent": agent,
+            "action": action,
+            "details": details,
+            "created_at": datetime.now(timezone.utc),
+        }
+        event_bus.publish("activity", row)
+        response_cache.invalidate("activity")
+        return self.record(row)
+
+
+activity_writer = ActivityWriter()
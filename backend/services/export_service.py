@@ -0,0 +1,169 @@
+"""
+Export Service – Streams candidates joined with their latest classification as
+CSV, NDJSON or Parquet. Rows come from a server-side cursor in fixed-size
+partitions and are encoded (and optionally gzipped) one partition at a time, so
+memory stays constant however many candidates match.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Dict, List
+from sqlalchemy import select
+from config import settings
+from database import engine
+from models import Candidate, Classification
+
+FORMATS = ("csv", "ndjson", "parquet")
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+CANDIDATE_COLUMNS = [
+    "id", "name", "email", "title", "company", "location", "skills", "experience",
+    "match_score", "screen_score", "status", "source", "created_at",
+]
+CLASSIFICATION_COLUMNS = {
+    "category": Classification.category,
+    "category_confidence": Classification.confidence,
+    "seniority": Classification.seniority,
+    "culture_fit": Classification.culture_fit,
+    "classified_at": Classification.created_at,
+}
+COLUMNS = CANDIDATE_COLUMNS + list(CLASSIFICATION_COLUMNS)
+
+
+def export_query(*where):
+    """Candidates matching the filters, outer-joined with their classification."""
+    return (
+        select(
+            *(getattr(Candidate, c) for c in CANDIDATE_COLUMNS),
+            *(col.label(name) for name, col in CLASSIFICATION_COLUMNS.items()),
+        )
+        .outerjoin(Classification, Classification.candidate_id == Candidate.id)
+        .where(*where)
+        .order_by(Candidate.id)
+    )
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class CandidateExporter:
+    """Encodes one export query as a stream of byte chunks."""
+
+    def __init__(self, query, fmt: str, gzip: bool = False, batch_size: int = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'")
+        self.query = query
+        self.fmt = fmt
+        # Parquet pages are already compressed
+        self.gzip = gzip and fmt != "parquet"
+        self.batch_size = batch_size or settings.export_batch_size
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        encode = {"csv": self._csv, "ndjson": self._ndjson, "parquet": self._parquet}[self.fmt]
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if self.gzip else None  # wbits=31: gzip container
+        async for chunk in encode(self._partitions()):
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                yield chunk
+        if compressor:
+            yield compressor.flush()
+
+    async def _partitions(self) -> AsyncIterator[List[Dict]]:
+        # A dedicated connection: the response body outlives the request's session
+        async with engine.connect() as conn:
+            result = await conn.stream(self.query.execution_options(yield_per=self.batch_size))
+            async for partition in result.mappings().partitions(self.batch_size):
+                yield partition
+
+    async def _csv(self, partitions) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(COLUMNS)
+        async for rows in partitions:
+            for row in rows:
+                writer.writerow([_csv_value(row[c]) for c in COLUMNS])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    async def _ndjson(self, partitions) -> AsyncIterator[bytes]:
+        async for rows in partitions:
+            yield "".join(json.dumps({c: _json_value(row[c]) for c in COLUMNS}) + "\n" for row in rows).encode()
+
+    async def _parquet(self, partitions) -> AsyncIterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.int64()), ("name", pa.string()), ("email", pa.string()), ("title", pa.string()),
+            ("company", pa.string()), ("location", pa.string()), ("skills", pa.list_(pa.string())),
+            ("experience", pa.string()), ("match_score", pa.float64()), ("screen_score", pa.float64()),
+            ("status", pa.string()), ("source", pa.string()), ("created_at", pa.timestamp("us", tz="UTC")),
+            ("category", pa.string()), ("category_confidence", pa.float64()), ("seniority", pa.string()),
+            ("culture_fit", pa.string()), ("classified_at", pa.timestamp("us", tz="UTC")),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+        async for rows in partitions:
+            columns = {c: [row[c] for row in rows] for c in COLUMNS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))  # one row group per partition
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        yield sink.drain()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        chunk = b"".join(self._chunks)
+        self._chunks = []
+        return chunk
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(value)  # same convention the CSV importer reads back
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
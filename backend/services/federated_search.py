@@ -0,0 +1,219 @@
+"""
+Federated Search – Fan a candidate query out to every healthy connector under one deadline.
+
+search() starts one task per connector that is not in the error state and
+waits at most FEDERATED_SEARCH_DEADLINE_MS. Whatever has arrived by then is
+merged (the same person found in several systems becomes one result, keeping
+the best score and every source) and ranked by score. The response is marked
+partial when sources are still out. They keep running for up to
+FEDERATED_SEARCH_LATE_SECONDS longer, then they are cancelled and counted as
+timeouts. Anything that lands in that window goes to the run's event log,
+which GET /integration/search/{id}/stream replays and then follows over SSE.
+Runs are kept in memory, the last FEDERATED_SEARCH_KEEP of them.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import settings
+from agents.integration_agent import integration_agent
+from services.histogram import fine_histogram
+from services.metrics import connector_search_outcomes, connector_search_seconds
+
+
+class SourceStats:
+    __slots__ = ("calls", "ok", "late", "timeouts", "errors", "latency", "last_error")
+
+    def __init__(self):
+        self.calls = self.ok = self.late = self.timeouts = self.errors = 0
+        self.latency = fine_histogram()
+        self.last_error: Optional[str] = None
+
+
+def merge(results: Iterable[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """One entry per person (email, else name), best score first; sources lists every system that found them."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        key = (result.get("email") or result["name"]).lower()
+        entry = merged.get(key)
+        if entry is None:
+            merged[key] = {**result, "sources": [result["source"]]}
+        else:
+            entry["sources"].append(result["source"])
+            if result["score"] > entry["score"]:
+                entry.update({k: v for k, v in result.items() if k != "sources"})
+    return sorted(merged.values(), key=lambda r: (-r["score"], -len(r["sources"]), r["name"]))[:limit]
+
+
+class SearchRun:
+    """One fan-out: per-source state, the results seen so far and the events of late arrivals."""
+
+    def __init__(self, id: int, query: str, sources: List[str], limit: int):
+        self.id = id
+        self.query = query
+        self.limit = limit
+        self.started = time.perf_counter()
+        self.sources: Dict[str, Dict[str, Any]] = {name: {"status": "pending"} for name in sources}
+        self.results: Dict[str, List[Dict[str, Any]]] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.cutoff = False
+        self.events: List[str] = []
+        self.changed = asyncio.Event()
+        self.expiry: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def pending(self) -> List[str]:
+        return [name for name, source in self.sources.items() if source["status"] == "pending"]
+
+    @property
+    def done(self) -> bool:
+        return self.cutoff and not self.pending
+
+    def merged(self) -> List[Dict[str, Any]]:
+        return merge(itertools.chain.from_iterable(self.results.values()), self.limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        pending = self.pending
+        return {
+            "search_id": self.id,
+            "query": self.query,
+            "partial": bool(pending),
+            "pending": pending,
+            "sources": self.sources,
+            "total": sum(len(r) for r in self.results.values()),
+            "results": self.merged(),
+        }
+
+    def emit(self, event: str, data: Dict[str, Any]):
+        self.events.append(
+            f"id: {len(self.events) + 1}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n")
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class FederatedSearch:
+    def __init__(self):
+        self.runs: "OrderedDict[int, SearchRun]" = OrderedDict()
+        self.source_stats: Dict[str, SourceStats] = defaultdict(SourceStats)
+        self._ids = itertools.count(1)
+        self.searches = 0
+        self.partial = 0
+
+    def healthy(self, only: Optional[Iterable[str]] = None) -> List[str]:
+        names = list(only) if only is not None else list(integration_agent.connectors)
+        for name in names:
+            if name not in integration_agent.connectors:
+                raise LookupError(f"System '{name}' not found")
+        return [name for name in names if integration_agent.connectors[name].status != "error"]
+
+    async def search(self, query: str, limit: int = 50, deadline_ms: Optional[float] = None,
+                     sources: Optional[Iterable[str]] = None) -> SearchRun:
+        """Start the fan-out and return once every source answered or the deadline passed."""
+        run = SearchRun(next(self._ids), query, self.healthy(sources), limit)
+        self._keep(run)
+        for name in run.sources:
+            task = asyncio.create_task(integration_agent.search_system(name, query))
+            task.add_done_callback(lambda task, name=name: self._land(run, name, task))
+            run.tasks[name] = task
+        if run.tasks:
+            deadline = (deadline_ms if deadline_ms is not None else settings.federated_search_deadline_ms) / 1000
+            await asyncio.wait(list(run.tasks.values()), timeout=deadline)
+        # Sources that have not landed by now are late, whether or not their task has just finished
+        run.cutoff = True
+        self.searches += 1
+        if run.pending:
+            self.partial += 1
+            run.expiry = asyncio.get_running_loop().call_later(
+                settings.federated_search_late_seconds, self._expire, run)
+        else:
+            run.emit("done", run.snapshot())
+        return run
+
+    def _land(self, run: SearchRun, name: str, task: asyncio.Task):
+        ms = (time.perf_counter() - run.started) * 1000
+        stats = self.source_stats[name]
+        stats.calls += 1
+        source = run.sources[name]
+        source["latency_ms"] = round(ms, 1)
+        if task.cancelled():
+            stats.timeouts += 1
+            source["status"] = "timeout"
+            connector_search_outcomes.inc(name, "timeout")
+        elif task.exception() is not None:
+            error = task.exception()
+            stats.errors += 1
+            stats.last_error = source["error"] = f"{type(error).__name__}: {error}"
+            source["status"] = "error"
+            connector_search_outcomes.inc(name, "error")
+        else:
+            results = task.result()
+            run.results[name] = results
+            source["status"] = "late" if run.cutoff else "ok"
+            source["count"] = len(results)
+            stats.latency.record(ms)
+            connector_search_seconds.observe(ms / 1000, name)
+            if run.cutoff:
+                stats.late += 1
+            else:
+                stats.ok += 1
+            connector_search_outcomes.inc(name, source["status"])
+        if run.cutoff:
+            run.emit("source", {"source": name, **source, "results": run.results.get(name, [])})
+            if run.done:
+                if run.expiry is not None:
+                    run.expiry.cancel()
+                run.emit("done", run.snapshot())
+
+    def _expire(self, run: SearchRun):
+        for task in run.tasks.values():
+            task.cancel()  # each cancelled task lands as a timeout, and the last one emits done
+
+    def _keep(self, run: SearchRun):
+        self.runs[run.id] = run
+        while len(self.runs) > settings.federated_search_keep:
+            _, old = self.runs.popitem(last=False)
+            if not old.done:
+                self._expire(old)
+
+    async def follow(self, run: SearchRun, replay_from: int = 0):
+        """SSE frames for a run after event id `replay_from`, then new ones until it is done."""
+        sent = replay_from
+        while True:
+            changed = run.changed
+            while sent < len(run.events):
+                yield run.events[sent]
+                sent += 1
+            if run.done:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), settings.live_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+
+    def stats(self) -> Dict[str, Any]:
+        sources = {}
+        for name in integration_agent.connectors:
+            s = self.source_stats.get(name) or SourceStats()
+            sources[name] = {
+                "calls": s.calls,
+                "ok": s.ok,
+                "late": s.late,
+                "timeouts": s.timeouts,
+                "errors": s.errors,
+                "last_error": s.last_error,
+                "latency": s.latency.summary(),
+            }
+        return {
+            "deadline_ms": settings.federated_search_deadline_ms,
+            "late_seconds": settings.federated_search_late_seconds,
+            "searches": self.searches,
+            "partial": self.partial,
+            "active": sum(1 for run in self.runs.values() if not run.done),
+            "sources": sources,
+        }
+
+
+federated_search = FederatedSearch()
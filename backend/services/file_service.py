@@ -5,6 +5,7 @@ import os
 import uuid
 from typing import Optional
 from config import settings
+from services.metrics import upload_bytes, uploads
 
 
 class FileService:
@@ -21,6 +22,8 @@ class FileService:
 
         with open(file_path, "wb") as f:
             f.write(file_bytes)
+        uploads.inc()
+        upload_bytes.inc(amount=len(file_bytes))
 
         return file_path
 
@@ -0,0 +1,111 @@
+"""
+Log-bucketed latency histogram – fixed relative error, mergeable, JSON-serializable.
+Bucket i (i >= 1) covers [lowest * growth**(i-1), lowest * growth**i) milliseconds; bucket 0 holds
+values below `lowest`. Persisted histograms (API log rollups) use the defaults, GROWTH and LOWEST_MS.
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+GROWTH = 2 ** 0.25  # ~19% bucket width
+LOWEST_MS = 1.0
+# Live in-memory series (agent calls, connector requests) can afford finer buckets: percentiles within 5%
+FINE_GROWTH = 1.05
+FINE_LOWEST_MS = 0.01
+
+
+class LogHistogram:
+    """Sparse histogram of latencies in milliseconds, with the largest value seen."""
+
+    __slots__ = ("counts", "total", "sum", "max", "growth", "lowest", "_log_growth")
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None, growth: float = GROWTH, lowest: float = LOWEST_MS):
+        self.growth = growth
+        self.lowest = lowest
+        self._log_growth = math.log(growth)
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+        self.sum = sum(self.bucket_value(i) * c for i, c in self.counts.items())
+        self.max = self.bucket_upper(max(self.counts)) if self.counts else 0.0
+
+    def bucket_index(self, value: float) -> int:
+        if value < self.lowest:
+            return 0
+        return 1 + int(math.log(value / self.lowest) / self._log_growth)
+
+    def bucket_value(self, index: int) -> float:
+        """Representative value (geometric midpoint) of a bucket."""
+        if index == 0:
+            return self.lowest / 2
+        return self.lowest * self.growth ** (index - 0.5)
+
+    def bucket_upper(self, index: int) -> float:
+        return self.lowest * self.growth ** index
+
+    def record(self, value: float):
+        i = self.bucket_index(value)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def record_many(self, values: Iterable[float]):
+        for v in values:
+            self.record(v)
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        """Add `other` (same bucket layout) into this histogram; returns self."""
+        if (other.growth, other.lowest) != (self.growth, self.lowest):
+            raise ValueError("cannot merge histograms with different buckets")
+        for i, c in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + c
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> "LogHistogram":
+        return LogHistogram(growth=self.growth, lowest=self.lowest).merge(self)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate q-th percentile (0-100), capped at the largest value seen; None when empty."""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(self.total * q / 100))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return round(min(self.bucket_value(i), self.max), 2)
+        return round(self.max, 2)
+
+    def count_below(self, bound: float) -> int:
+        """Values in buckets lying entirely under `bound` (for fixed-bucket exports such as Prometheus)."""
+        return sum(c for i, c in self.counts.items() if self.bucket_upper(i) <= bound * (1 + 1e-9))
+
+    @property
+    def mean(self) -> Optional[float]:
+        return round(self.sum / self.total, 2) if self.total else None
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        def ms(value):
+            return round(value, 2) if value is not None else None
+        return {
+            "count": self.total,
+            "mean_ms": self.mean,
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max) if self.total else None,
+        }
+
+    def to_json(self) -> Dict[str, int]:
+        return {str(i): c for i, c in self.counts.items()}
+
+    @classmethod
+    def from_json(cls, data: Optional[Dict[str, int]]) -> "LogHistogram":
+        return cls({int(i): c for i, c in (data or {}).items()})
+
+
+def fine_histogram() -> LogHistogram:
+    return LogHistogram(growth=FINE_GROWTH, lowest=FINE_LOWEST_MS)
@@ -0,0 +1,252 @@
+"""
+Import Service – Streaming bulk import of candidates from CSV or NDJSON.
+Input is parsed incrementally from byte chunks, validated row by row against
+CandidateImportRow and written with one executemany upsert per batch, so memory
+stays bounded by the batch size however large the export is.
+"""
+import asyncio
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from config import settings
+from database import engine
+from models import Candidate
+from schemas import CandidateImportRow, ImportErrorRow, ImportReport
+from services.query_layer import insert_for
+from services.entity_resolution import entity_resolver
+from services.leaderboard import leaderboards
+from services.response_cache import response_cache
+from services.semantic_search import semantic_search
+from services.skill_index import skill_index
+
+FORMATS = ("csv", "ndjson")
+UPSERT_KEY = ("email", "source")
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+}
+
+
+def format_for(content_type: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+    """Guess the import format from a Content-Type header or file name."""
+    if content_type:
+        fmt = CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+        if fmt:
+            return fmt
+    if filename:
+        ext = filename.lower().rsplit(".", 1)[-1]
+        if ext == "csv":
+            return "csv"
+        if ext in ("ndjson", "jsonl"):
+            return "ndjson"
+    return None
+
+
+async def read_file(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[bytes]:
+    """Yield a file in chunks without blocking the event loop."""
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into complete records as (starting line number, text).
+
+    For CSV a record only ends on a newline outside a quoted cell, so quoted cells
+    may span lines and chunk boundaries. As in csv.reader, a quote only opens a
+    cell at its start; one inside an unquoted cell (6" monitor) is plain text.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    line_no = 0
+    record: List[str] = []
+    record_start = 1
+    quoted = False
+
+    def complete(lines):
+        nonlocal line_no, record, record_start, quoted
+        for line in lines:
+            line_no += 1
+            if not record:
+                record_start = line_no
+            record.append(line)
+            if fmt == "csv":
+                quoted = _ends_quoted(line, quoted)
+                if quoted:
+                    continue
+            text = "\n".join(record)
+            record = []
+            if text.strip():
+                yield record_start, text
+
+    async for chunk in chunks:
+        tail += decoder.decode(chunk)
+        lines = tail.split("\n")
+        tail = lines.pop()
+        for item in complete(l.rstrip("\r") for l in lines):
+            yield item
+    tail += decoder.decode(b"", final=True)
+    for item in complete([tail.rstrip("\r")] if tail else []):
+        yield item
+    if record:
+        # unterminated quote at end of input – hand it to the parser to report
+        yield record_start, "\n".join(record)
+
+
+def _ends_quoted(line: str, quoted: bool) -> bool:
+    """Whether a CSV line that starts inside (quoted) or outside a quoted cell ends inside one."""
+    i = 0
+    while True:
+        if quoted:
+            i = line.find('"', i)
+            if i < 0:
+                return True
+            if line.startswith('"', i + 1):
+                i += 2  # "" escape
+            else:
+                quoted, i = False, i + 1
+        else:
+            # Only a quote at the start of a cell opens one
+            i = line.find('"', i)
+            while i > 0 and line[i - 1] != ",":
+                i = line.find('"', i + 1)
+            if i < 0:
+                return False
+            quoted, i = True, i + 1
+
+
+class CandidateImporter:
+    """Parses, validates and upserts one import stream."""
+
+    def __init__(self, batch_size: Optional[int] = None, max_error_rows: Optional[int] = None):
+        self.batch_size = max(1, batch_size or settings.import_batch_size)
+        self.max_error_rows = settings.import_max_error_rows if max_error_rows is None else max_error_rows
+
+    async def run(self, chunks: AsyncIterator[bytes], fmt: str) -> ImportReport:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown import format '{fmt}'")
+        started = time.perf_counter()
+        rows_read = imported = failed = batches = 0
+        errors: List[ImportErrorRow] = []
+        header: Optional[List[str]] = None
+        batch: List[CandidateImportRow] = []
+
+        def fail(line: int, error: str):
+            nonlocal failed
+            failed += 1
+            if len(errors) < self.max_error_rows:
+                errors.append(ImportErrorRow(line=line, error=error))
+
+        async for line, text in iter_records(chunks, fmt):
+            if fmt == "csv" and header is None:
+                header = [h.strip().lower() for h in next(csv.reader([text]))]
+                continue
+            rows_read += 1
+            try:
+                raw = self._parse(text, fmt, header)
+                batch.append(CandidateImportRow.model_validate(raw))
+            except ValidationError as e:
+                fail(line, "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors()))
+                continue
+            except ValueError as e:
+                fail(line, str(e))
+                continue
+
+            if len(batch) >= self.batch_size:
+                imported += await self._write(batch)
+                batches += 1
+                batch = []
+
+        if batch:
+            imported += await self._write(batch)
+            batches += 1
+
+        elapsed = time.perf_counter() - started
+        report = ImportReport(
+            format=fmt,
+            rows_read=rows_read,
+            imported=imported,
+            failed=failed,
+            batches=batches,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(rows_read / elapsed, 1) if elapsed else 0.0,
+            errors=errors,
+        )
+        print(
+            f"📥 Imported {imported}/{rows_read} candidates ({failed} failed) "
+            f"in {report.elapsed_seconds}s – {report.rows_per_second} rows/s",
+            flush=True,
+        )
+        return report
+
+    @staticmethod
+    def _parse(text: str, fmt: str, header: Optional[List[str]]) -> Dict:
+        if fmt == "ndjson":
+            try:
+                raw = json.loads(text)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"invalid JSON: {e.msg}") from None
+            if not isinstance(raw, dict):
+                raise ValueError("expected a JSON object")
+            return raw
+        try:
+            values = next(csv.reader([text], strict=True))
+        except csv.Error as e:
+            raise ValueError(f"invalid CSV: {e}") from None
+        if len(values) > len(header):
+            raise ValueError(f"expected {len(header)} columns, got {len(values)}")
+        # Empty cells fall back to the schema defaults
+        return {k: v for k, v in zip(header, values) if v.strip()}
+
+    async def _write(self, rows: List[CandidateImportRow]) -> int:
+        await self.upsert(rows)
+        return len(rows)
+
+    async def upsert(self, rows: List[CandidateImportRow]) -> List[int]:
+        """Upsert one batch on (email, source) and index its skills, in one transaction; returns the ids."""
+        # The last occurrence of a key wins; one statement may not touch a row twice
+        keyed: Dict[Tuple, CandidateImportRow] = {}
+        for i, row in enumerate(rows):
+            key = (row.email, row.source) if row.email and row.source else ("#", i)
+            keyed.pop(key, None)
+            keyed[key] = row
+
+        # Only overwrite columns the input actually provided, grouped per column set
+        groups: Dict[frozenset, List[Dict]] = {}
+        for row in keyed.values():
+            values = row.model_dump()
+            values["initials"] = values["initials"] or _initials(row.name)
+            groups.setdefault(frozenset(row.model_fields_set - set(UPSERT_KEY)), []).append(values)
+
+        async with engine.begin() as conn:
+            indexed = []
+            for updated, values in groups.items():
+                stmt = insert_for(conn.dialect.name, Candidate.__table__)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(UPSERT_KEY),
+                    set_={c: stmt.excluded[c] for c in sorted(updated | {"name"})},
+                ).returning(Candidate.id, Candidate.skills)
+                result = await conn.execute(stmt, values)
+                indexed.extend((candidate_id, skills) for candidate_id, skills in result.all())
+            # Core inserts bypass the ORM flush hook that maintains the skill index
+            await conn.run_sync(skill_index.index_candidates, indexed, True)
+        semantic_search.mark_dirty(candidate_id for candidate_id, _ in indexed)
+        leaderboards.mark_dirty(candidate_id for candidate_id, _ in indexed)
+        entity_resolver.mark_dirty(candidate_id for candidate_id, _ in indexed)
+        response_cache.invalidate("candidates")
+        return [candidate_id for candidate_id, _ in indexed]
+
+
+def _initials(name: str) -> str:
+    return "".join(part[0] for part in name.split()[:2]).upper()
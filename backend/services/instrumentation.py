@@ -0,0 +1,203 @@
+"""
+Instrumentation – Live call counts, errors and latency histograms per agent.
+
+Agent methods are wrapped with @instrumented(agent); AI providers and
+connectors record their calls with agent_metrics.track(...) and are
+attributed to the agent whose call is on the stack. Each series (agent,
+operation, provider, model) keeps a lifetime histogram plus two rotating
+windows, so the dashboard reflects the last few minutes rather than the
+process lifetime. Recording is a bucket index and a few integer adds.
+"""
+import functools
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from services.histogram import LogHistogram, fine_histogram
+
+# Agent whose call is running; AI and connector calls made underneath are attributed to it
+current_agent: ContextVar[Optional[str]] = ContextVar("current_agent", default=None)
+
+
+class Window:
+    __slots__ = ("started", "latency", "errors")
+
+    def __init__(self, started: float):
+        self.started = started
+        self.latency = fine_histogram()
+        self.errors = 0
+
+
+class Series:
+    """Counters for one (agent, operation, provider, model)."""
+
+    __slots__ = ("calls", "errors", "latency", "current", "previous", "last_error", "last_at")
+
+    def __init__(self, now: float):
+        self.calls = 0
+        self.errors = 0
+        self.latency = fine_histogram()
+        self.current = Window(now)
+        self.previous: Optional[Window] = None
+        self.last_error: Optional[str] = None
+        self.last_at: Optional[float] = None
+
+    def rotate(self, now: float):
+        """Start a new window once the current one is older than the configured span."""
+        span = settings.instrumentation_window_seconds
+        if now - self.current.started >= span:
+            self.previous = self.current if now - self.current.started < 2 * span else None
+            self.current = Window(now)
+
+    def observe(self, ms: float, error: Optional[str], now: float):
+        self.rotate(now)
+        self.calls += 1
+        self.latency.record(ms)
+        self.current.latency.record(ms)
+        if error is not None:
+            self.errors += 1
+            self.current.errors += 1
+            self.last_error = error
+        self.last_at = now
+
+    def recent(self, now: float) -> Tuple[LogHistogram, int]:
+        """Histogram and error count over the last one to two windows."""
+        self.rotate(now)
+        if self.previous is None:
+            return self.current.latency, self.current.errors
+        return self.current.latency.copy().merge(self.previous.latency), self.current.errors + self.previous.errors
+
+
+class Tracked:
+    """Context manager timing one call; set `error` (or raise) to count a failure."""
+
+    __slots__ = ("metrics", "agent", "operation", "provider", "model", "error", "started", "token")
+
+    def __init__(self, metrics: "AgentMetrics", agent: str, operation: str, provider: Optional[str],
+                 model: Optional[str], bind: bool):
+        self.metrics = metrics
+        self.agent = agent
+        self.operation = operation
+        self.provider = provider
+        self.model = model
+        self.error: Optional[str] = None
+        self.token = current_agent.set(agent) if bind else None
+
+    def __enter__(self) -> "Tracked":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.started) * 1000
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.metrics.observe(self.agent, self.operation, self.provider, self.model, ms, self.error)
+        if self.token is not None:
+            current_agent.reset(self.token)
+        return False
+
+
+class AgentMetrics:
+    """Registry of call series, keyed by (agent, operation, provider, model)."""
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, str, Optional[str], Optional[str]], Series] = {}
+        self.started = time.monotonic()
+
+    def observe(self, agent: str, operation: str, provider: Optional[str], model: Optional[str],
+                ms: float, error: Optional[str] = None):
+        now = time.monotonic()
+        key = (agent, operation, provider, model)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = Series(now)
+        series.observe(ms, error, now)
+
+    def track(self, agent: Optional[str], operation: str, provider: Optional[str] = None,
+              model: Optional[str] = None) -> Tracked:
+        """Time a call made on behalf of `agent` (defaults to the agent whose call is running)."""
+        return Tracked(self, agent or current_agent.get() or "ai", operation, provider, model, bind=False)
+
+    def instrumented(self, agent: str, operation: Optional[str] = None):
+        """Decorator for async agent methods: counts, errors and latency under (agent, method name)."""
+        def decorate(fn):
+            name = operation or fn.__name__
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                if current_agent.get() == agent:
+                    return await fn(*args, **kwargs)  # nested call of the same agent counts once
+                with Tracked(self, agent, name, None, None, bind=True):
+                    return await fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def summary(self, agent: str) -> Dict[str, Any]:
+        """Agent-level counts and latency (its own method calls), plus its provider calls."""
+        now = time.monotonic()
+        own = [s for (a, _, p, _), s in self.series.items() if a == agent and p is None]
+        calls = sum(s.calls for s in own)
+        errors = sum(s.errors for s in own)
+        latency, recent, recent_errors = fine_histogram(), fine_histogram(), 0
+        for s in own:
+            latency.merge(s.latency)
+            window, window_errors = s.recent(now)
+            recent.merge(window)
+            recent_errors += window_errors
+        return {
+            "agent": agent,
+            "calls": calls,
+            "errors": errors,
+            "latency": latency.summary(),
+            "recent": {
+                "window_seconds": settings.instrumentation_window_seconds,
+                "calls": recent.total,
+                "errors": recent_errors,
+                "error_rate": round(recent_errors / recent.total, 4) if recent.total else None,
+                "latency": recent.summary(),
+            },
+            "last_error": max(own, key=lambda s: s.last_at or 0).last_error if own else None,
+            "providers": self.providers(agent),
+        }
+
+    def providers(self, agent: str) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        rows = []
+        for (a, operation, provider, model), s in sorted(self.series.items(), key=lambda kv: str(kv[0])):
+            if a != agent or provider is None:
+                continue
+            window, window_errors = s.recent(now)
+            rows.append({
+                "operation": operation,
+                "provider": provider,
+                "model": model,
+                "calls": s.calls,
+                "errors": s.errors,
+                "latency": s.latency.summary(),
+                "recent_calls": window.total,
+                "recent_errors": window_errors,
+                "recent_p95_ms": window.summary()["p95_ms"],
+                "last_error": s.last_error,
+            })
+        return rows
+
+    def snapshot(self) -> Dict[str, Any]:
+        agents = sorted({a for a, _, _, _ in self.series})
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "agents": {agent: self.summary(agent) for agent in agents},
+        }
+
+
+agent_metrics = AgentMetrics()
+instrumented = agent_metrics.instrumented
+
+
+def format_ms(ms: Optional[float]) -> str:
+    """Dashboard rendering: 3.5ms, 850ms, 4.2s."""
+    if ms is None:
+        return "—"
+    if ms < 10:
+        return f"{ms:.1f}ms"
+    return f"{ms:.0f}ms" if ms < 1000 else f"{ms / 1000:.1f}s"
@@ -0,0 +1,229 @@
+"""
+Job Queue – Durable background jobs in the application database.
+
+Jobs are rows in `jobs`. A worker claims a batch with one UPDATE ... RETURNING
+(SKIP LOCKED on PostgreSQL; SQLite serializes writers), which marks them running
+under its name with a lease. Workers renew the lease while a job runs; when a
+worker dies its lease expires and the job becomes claimable again, so nothing
+in flight at a restart is lost; a job whose last attempt expired is parked as
+dead instead of being retried forever. Failures are retried with exponential backoff
+and jitter until max_attempts, then the job is parked as dead; a handler
+raising JobPayloadError goes straight to dead. Completion is
+conditional on still holding the lease, so a job that was taken over is never
+finished twice.
+"""
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, event, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import engine
+from models import Job
+from services.query_layer import dialect_of, insert_for
+from services.rollup_service import utc_naive
+
+JOB_TYPES = ("intake", "vision", "classification", "sync", "resolve")
+
+
+class JobPayloadError(Exception):
+    """The payload lacks a field or names a row, file or system that does not exist."""
+
+
+# Only bad payloads are final; anything else (an LLM answer that does not parse, a timeout) is retried
+PERMANENT_ERRORS = (JobPayloadError,)
+
+
+def utcnow() -> datetime:
+    return utc_naive(datetime.now(timezone.utc))
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before attempt `attempts + 1`: exponential from the base, capped, with ±50% jitter."""
+    delay = min(settings.job_retry_max_seconds, settings.job_retry_base_seconds * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1.5)
+
+
+class JobQueue:
+    """Enqueue, claim, renew, complete and fail jobs; all state lives in the jobs table."""
+
+    def __init__(self):
+        self.wake = asyncio.Event()  # lets an in-process worker pick up new jobs without waiting for its poll
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        job_type: str,
+        payload: Dict[str, Any],
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        max_attempts: Optional[int] = None,
+        delay_seconds: float = 0,
+    ) -> Job:
+        """Add a job in the caller's transaction; an existing idempotency key returns that job instead."""
+        if job_type not in JOB_TYPES:
+            raise ValueError(f"Unknown job type '{job_type}'")
+        now = utcnow()
+        stmt = insert_for(dialect_of(db), Job).values(
+            type=job_type,
+            payload=payload,
+            status="queued",
+            priority=priority,
+            attempts=0,
+            max_attempts=max_attempts or settings.job_max_attempts,
+            idempotency_key=idempotency_key,
+            run_at=now + timedelta(seconds=delay_seconds),
+            created_at=now,
+        )
+        if idempotency_key:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[Job.idempotency_key])
+        job = (await db.scalars(stmt.returning(Job))).one_or_none()
+        if job is None:
+            job = (await db.scalars(select(Job).where(Job.idempotency_key == idempotency_key))).one()
+        # Wake an in-process worker once the job is visible to it
+        event.listen(db.sync_session, "after_commit", lambda _session: self.wake.set(), once=True)
+        return job
+
+    async def claim(self, worker: str, types: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+        """Lease up to `limit` visible jobs, highest priority then oldest first."""
+        now = utcnow()
+        visible = or_(
+            and_(Job.status == "queued", Job.run_at <= now),
+            and_(Job.status == "running", Job.lease_expires_at < now, Job.attempts < Job.max_attempts),
+        )
+        picked = (
+            select(Job.id)
+            .where(visible, Job.type.in_(types))
+            .order_by(Job.priority.desc(), Job.run_at, Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(Job)
+            .where(Job.id.in_(picked.scalar_subquery()))
+            .values(
+                status="running",
+                leased_by=worker,
+                lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds),
+                started_at=now,
+                attempts=Job.attempts + 1,
+            )
+            .returning(Job.id, Job.type, Job.payload, Job.attempts, Job.max_attempts)
+            .execution_options(synchronize_session=False)
+        )
+        async with engine.begin() as conn:
+            rows = (await conn.execute(stmt)).all()
+        return [row._asdict() for row in rows]
+
+    async def bury_expired(self, types: Sequence[str]) -> List[Dict[str, Any]]:
+        """Park jobs whose last allowed attempt lost its worker (lease expired) as dead; returns them."""
+        now = utcnow()
+        stmt = (
+            update(Job)
+            .where(Job.status == "running", Job.lease_expires_at < now, Job.attempts >= Job.max_attempts,
+                   Job.type.in_(types))
+            .values(status="dead", error="Lease expired on the last attempt (worker died or hung)",
+                    finished_at=now, lease_expires_at=None)
+            .returning(Job.id, Job.type, Job.payload, Job.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        async with engine.begin() as conn:
+            rows = (await conn.execute(stmt)).all()
+        return [row._asdict() for row in rows]
+
+    async def renew(self, worker: str, job_ids: Sequence[int]) -> int:
+        """Extend the leases this worker still holds."""
+        if not job_ids:
+            return 0
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                update(Job)
+                .where(Job.id.in_(job_ids), Job.leased_by == worker, Job.status == "running")
+                .values(lease_expires_at=utcnow() + timedelta(seconds=settings.job_lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+        return result.rowcount
+
+    async def complete(self, worker: str, job_id: int, result: Optional[Dict[str, Any]]) -> bool:
+        return await self._finish(worker, job_id, status="done", result=result, error=None,
+                                  finished_at=utcnow(), lease_expires_at=None)
+
+    async def fail(self, worker: str, job: Dict[str, Any], error: BaseException) -> str:
+        """Schedule a retry with backoff, or park the job as dead; returns the new status."""
+        message = f"{type(error).__name__}: {error}"[:2000]
+        if isinstance(error, PERMANENT_ERRORS) or job["attempts"] >= job["max_attempts"]:
+            await self._finish(worker, job["id"], status="dead", error=message, finished_at=utcnow(),
+                               lease_expires_at=None)
+            return "dead"
+        await self._finish(worker, job["id"], status="queued", error=message, leased_by=None, lease_expires_at=None,
+                           run_at=utcnow() + timedelta(seconds=backoff_seconds(job["attempts"])))
+        return "queued"
+
+    async def release(self, worker: str, job_id: int) -> bool:
+        """Hand a job back untouched (worker shutting down); the attempt is not counted."""
+        return await self._finish(worker, job_id, status="queued", leased_by=None, lease_expires_at=None,
+                                  run_at=utcnow(), attempts=Job.attempts - 1)
+
+    async def _finish(self, worker: str, job_id: int, **values) -> bool:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.leased_by == worker, Job.status == "running")
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        return result.rowcount == 1
+
+    async def retry(self, db: AsyncSession, job_id: int) -> Optional[Job]:
+        """Requeue a dead job with a fresh attempt budget."""
+        job = await db.get(Job, job_id)
+        if job is None or job.status != "dead":
+            return job
+        job.status, job.attempts, job.run_at, job.error = "queued", 0, utcnow(), None
+        job.finished_at = job.leased_by = None
+        event.listen(db.sync_session, "after_commit", lambda _session: self.wake.set(), once=True)
+        return job
+
+    async def stats(self, db: AsyncSession) -> Dict[str, Any]:
+        """Depth, ready backlog age, lease age and throughput per job type."""
+        now = utcnow()
+        types: Dict[str, Dict[str, Any]] = {
+            t: {"queued": 0, "ready": 0, "running": 0, "done": 0, "dead": 0,
+                "oldest_ready_age_seconds": None, "oldest_lease_age_seconds": None, "expired_leases": 0,
+                "done_last_minute": 0, "per_second_5m": 0.0}
+            for t in JOB_TYPES
+        }
+
+        def age(value) -> Optional[float]:
+            return round((now - utc_naive(value)).total_seconds(), 1) if value else None
+
+        for job_type, status, count in (await db.execute(
+            select(Job.type, Job.status, func.count()).group_by(Job.type, Job.status)
+        )).all():
+            types[job_type][status] = count
+        for job_type, count, oldest in (await db.execute(
+            select(Job.type, func.count(), func.min(Job.run_at))
+            .where(Job.status == "queued", Job.run_at <= now).group_by(Job.type)
+        )).all():
+            types[job_type].update(ready=count, oldest_ready_age_seconds=age(oldest))
+        for job_type, oldest, expired in (await db.execute(
+            select(Job.type, func.min(Job.started_at), func.count().filter(Job.lease_expires_at < now))
+            .where(Job.status == "running").group_by(Job.type)
+        )).all():
+            types[job_type].update(oldest_lease_age_seconds=age(oldest), expired_leases=expired)
+        for job_type, last_minute, last_5m in (await db.execute(
+            select(Job.type, func.count().filter(Job.finished_at >= now - timedelta(minutes=1)), func.count())
+            .where(Job.status == "done", Job.finished_at >= now - timedelta(minutes=5)).group_by(Job.type)
+        )).all():
+            types[job_type].update(done_last_minute=last_minute, per_second_5m=round(last_5m / 300, 3))
+
+        workers = (await db.execute(
+            select(Job.leased_by).where(Job.status == "running", Job.lease_expires_at >= now).distinct()
+        )).scalars().all()
+        return {"types": types, "active_workers": sorted(w for w in workers if w)}
+
+
+job_queue = JobQueue()
@@ -0,0 +1,334 @@
+"""
+Job Worker – Consumes the durable job queue.
+
+Handlers are registered per job type and take the job payload. A JobWorker
+keeps up to `concurrency` jobs in flight, renews their leases while they run
+and records the outcome; a failed job goes back to the queue with backoff or,
+out of attempts, is parked as dead and its record marked failed. One worker
+runs inside the API by default; `python cli.py worker --processes N` runs N
+worker processes so CPU-bound work spreads across cores.
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from agents.intake_agent import intake_agent
+from agents.integration_agent import integration_agent
+from agents.vision_agent import vision_agent
+from config import settings
+from database import async_session, engine
+from models import Document, Intake
+from services.entity_resolution import entity_resolver
+from services.event_writer import activity_writer
+from services.job_queue import JOB_TYPES, JobPayloadError, job_queue
+from services.reclassification import classify_one
+from services.sync_scheduler import sync_scheduler
+
+
+@dataclass
+class Handler:
+    run: Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+    on_dead: Optional[Callable[[Dict[str, Any], str], Awaitable[None]]] = None
+
+
+HANDLERS: Dict[str, Handler] = {}
+
+
+def handler(job_type: str, on_dead=None):
+    """Register the coroutine that runs jobs of this type."""
+    def register(fn):
+        HANDLERS[job_type] = Handler(fn, on_dead)
+        return fn
+    return register
+
+
+def payload_field(payload: Dict[str, Any], key: str) -> Any:
+    if payload.get(key) is None:
+        raise JobPayloadError(f"Payload has no '{key}'")
+    return payload[key]
+
+
+async def read_upload(file_path: Optional[str]) -> bytes:
+    if not file_path or not os.path.exists(file_path):
+        raise JobPayloadError(f"Upload {file_path} is missing")
+    return await asyncio.to_thread(lambda: open(file_path, "rb").read())
+
+
+def upload_name(file_path: str) -> str:
+    """Original filename of a stored upload (file_service prefixes a 12-char id)."""
+    return os.path.basename(file_path)[13:]
+
+
+async def mark_failed(model, row_id: Optional[int], error: str):
+    if row_id is None:
+        return
+    async with async_session() as db:
+        row = await db.get(model, row_id)
+        if row is not None:
+            row.status = "failed"
+            await db.commit()
+
+
+@handler("intake", on_dead=lambda payload, error: mark_failed(Intake, payload.get("intake_id"), error))
+async def run_intake(payload: Dict[str, Any]) -> Dict[str, Any]:
+    async with async_session() as db:
+        intake = await db.get(Intake, payload_field(payload, "intake_id"))
+        if intake is None:
+            raise JobPayloadError(f"Intake {payload['intake_id']} not found")
+        intake.status = "processing"
+        if intake.mode == "text":
+            result = await intake_agent.process_text(intake.raw_input)
+        else:
+            process = intake_agent.process_voice if intake.mode == "voice" else intake_agent.process_image
+            result = await process(await read_upload(intake.file_path), upload_name(intake.file_path))
+        intake.parsed_data = result["parsed_data"]
+        intake.confidence = result["confidence"]
+        intake.status = "processed"
+        await db.commit()
+
+    job_title = result["parsed_data"].get("job_title", "Unknown Role")
+    activity_writer.log(
+        agent="intake",
+        action=f"Processed queued {intake.mode} intake for {job_title}",
+        details={"intake_id": intake.id, "mode": intake.mode, "prefilled": result.get("prefilled", [])},
+    )
+    return {"intake_id": intake.id, "job_title": job_title, "confidence": result["confidence"]}
+
+
+@handler("vision", on_dead=lambda payload, error: mark_failed(Document, payload.get("document_id"), error))
+async def run_vision(payload: Dict[str, Any]) -> Dict[str, Any]:
+    async with async_session() as db:
+        doc = await db.get(Document, payload_field(payload, "document_id"))
+        if doc is None:
+            raise JobPayloadError(f"Document {payload['document_id']} not found")
+        doc.status = "processing"
+        result = await vision_agent.process_document(await read_upload(doc.file_path), doc.filename, doc.file_type)
+        doc.doc_type = result.get("doc_type", "Document")
+        doc.extracted_fields = result.get("fields", [])
+        doc.confidence_scores = result.get("confidence_scores", {})
+        doc.status = "complete"
+        await db.commit()
+
+    activity_writer.log(
+        agent="vision",
+        action=f"Extracted {len(doc.extracted_fields)} fields from {doc.filename}",
+        details={"document_id": doc.id, "queued": True},
+    )
+    return {"document_id": doc.id, "doc_type": doc.doc_type, "fields": len(doc.extracted_fields)}
+
+
+@handler("classification")
+async def run_classification(payload: Dict[str, Any]) -> Dict[str, Any]:
+    async with async_session() as db:
+        try:
+            profile, classification, reused = await classify_one(
+                db, payload_field(payload, "candidate_id"), payload.get("force", False))
+        except LookupError as e:  # the candidate is gone
+            raise JobPayloadError(str(e)) from e
+        if not reused:
+            await db.commit()
+            activity_writer.log(
+                agent="classification",
+                action=f"Classified {profile['name']} as {classification.category} ({classification.confidence}%)",
+                details={"candidate_id": payload["candidate_id"], "source": classification.source},
+            )
+        return {"candidate_id": payload["candidate_id"], "category": classification.category,
+                "confidence": classification.confidence, "reused": reused}
+
+
+@handler("sync")
+async def run_sync(payload: Dict[str, Any]) -> Dict[str, Any]:
+    if payload_field(payload, "system_name") not in integration_agent.connectors:
+        raise JobPayloadError(f"System '{payload['system_name']}' not found")
+    result = await sync_scheduler.sync(payload["system_name"])
+    activity_writer.log(
+        agent="integration",
+        action=f"Synced {payload['system_name']}: {result['new_records']} new records",
+        details={"system_name": payload["system_name"], "queued": True, "new_records": result["new_records"],
+                 "duration_ms": result["duration_ms"]},
+    )
+    return result
+
+
+@handler("resolve")
+async def run_resolve(payload: Dict[str, Any]) -> Dict[str, Any]:
+    report = await entity_resolver.run_batch()
+    if report["merged"]:
+        activity_writer.log(
+            agent="integration",
+            action=f"Merged {report['merged']} duplicate candidates into {report['clusters']} canonical profiles",
+            details={"candidates": report["candidates"], "comparisons": report["comparisons"],
+                     "queued": True},
+        )
+    return report
+
+
+class JobWorker:
+    """Claims and runs jobs with bounded concurrency, renewing leases while they run."""
+
+    def __init__(self, types: Sequence[str] = JOB_TYPES, concurrency: Optional[int] = None):
+        self.types = list(types)
+        self.concurrency = concurrency or settings.job_worker_concurrency
+        self.name: Optional[str] = None
+        self.running: Dict[int, asyncio.Task] = {}
+        self.completed: Counter = Counter()
+        self.failed: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self):
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = False
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self, grace: float = 10.0):
+        """Stop claiming, give running jobs `grace` seconds, then hand the rest back to the queue."""
+        if self._task is None:
+            return
+        self._stopping = True
+        job_queue.wake.set()
+        if self.running:
+            await asyncio.wait(list(self.running.values()), timeout=grace)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _loop(self):
+        heartbeat = asyncio.create_task(self._heartbeat())
+        print(f"👷 Job worker {self.name} consuming {', '.join(self.types)} ({self.concurrency} at a time)", flush=True)
+        try:
+            while not self._stopping:
+                job_queue.wake.clear()
+                free = self.concurrency - len(self.running)
+                jobs = []
+                if free > 0:
+                    try:
+                        await self._bury_expired()
+                        jobs = await job_queue.claim(self.name, self.types, free)
+                    except Exception as e:
+                        print(f"⚠️ Job claim failed: {e}", flush=True)
+                for job in jobs:
+                    self.running[job["id"]] = asyncio.create_task(self._run(job))
+                if jobs and len(jobs) == free:
+                    continue  # a full batch: claim again as soon as a slot frees up
+                wake = asyncio.create_task(job_queue.wake.wait())
+                await asyncio.wait([wake, *self.running.values()], timeout=settings.job_poll_seconds,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                wake.cancel()
+        finally:
+            heartbeat.cancel()
+            for task in self.running.values():
+                task.cancel()
+            await asyncio.gather(*self.running.values(), heartbeat, return_exceptions=True)
+
+    async def _bury_expired(self):
+        for job in await job_queue.bury_expired(self.types):
+            self.failed[job["type"]] += 1
+            print(f"⚠️ Job {job['id']} ({job['type']}) lost its lease on attempt {job['attempts']}, dead", flush=True)
+            on_dead = HANDLERS[job["type"]].on_dead if job["type"] in HANDLERS else None
+            if on_dead:
+                await on_dead(job["payload"], "lease expired on the last attempt")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.job_lease_seconds / 3)
+            try:
+                await job_queue.renew(self.name, list(self.running))
+            except Exception as e:
+                print(f"⚠️ Job lease renewal failed: {e}", flush=True)
+
+    async def _run(self, job: Dict[str, Any]):
+        started = time.perf_counter()
+        try:
+            result = await HANDLERS[job["type"]].run(job["payload"])
+        except asyncio.CancelledError:
+            await job_queue.release(self.name, job["id"])
+            raise
+        except Exception as e:
+            self.failed[job["type"]] += 1
+            status = await job_queue.fail(self.name, job, e)
+            print(f"⚠️ Job {job['id']} ({job['type']}) attempt {job['attempts']} failed, {status}: {e}", flush=True)
+            on_dead = HANDLERS[job["type"]].on_dead if job["type"] in HANDLERS else None
+            if status == "dead" and on_dead:
+                await on_dead(job["payload"], str(e))
+        else:
+            self.completed[job["type"]] += 1
+            await job_queue.complete(self.name, job["id"], result)
+            if settings.is_dev:
+                print(f"✅ Job {job['id']} ({job['type']}) done in {time.perf_counter() - started:.2f}s", flush=True)
+        finally:
+            self.running.pop(job["id"], None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "running": self._task is not None and not self._task.done(),
+            "in_flight": len(self.running),
+            "completed": dict(self.completed),
+            "failed": dict(self.failed),
+        }
+
+
+job_worker = JobWorker()
+
+
+async def _serve(types: Sequence[str], concurrency: Optional[int]):
+    from agents.integration_agent import integration_agent
+    from services.api_logger import api_logger
+    from services.cascade_classifier import cascade_classifier
+    from services.leaderboard import leaderboards
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = JobWorker(types, concurrency)
+    activity_writer.start()
+    api_logger.writer.start()
+    cascade_classifier.start()
+    # No boards here: this only drains the change marks writes leave behind. The API follows the
+    # candidates and classifications tables to update its own boards and response cache.
+    leaderboards.start()
+    worker.start()
+    await stop.wait()
+    await worker.stop()
+    await leaderboards.stop()
+    await cascade_classifier.stop()
+    await integration_agent.close()
+    await activity_writer.stop()
+    await api_logger.writer.stop()
+    await engine.dispose()
+
+
+def _worker_process(types: Sequence[str], concurrency: Optional[int]):
+    asyncio.run(_serve(types, concurrency))
+
+
+def run_workers(processes: int, types: Sequence[str] = JOB_TYPES, concurrency: Optional[int] = None) -> int:
+    """Run `processes` worker processes until SIGTERM/SIGINT; each stops gracefully."""
+    context = multiprocessing.get_context("spawn")
+    children = [context.Process(target=_worker_process, args=(list(types), concurrency), name=f"job-worker-{i}")
+                for i in range(processes)]
+    for child in children:
+        child.start()
+
+    def forward(signum, _frame):
+        for child in children:
+            if child.is_alive():
+                os.kill(child.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for child in children:
+        child.join()
+    return max((child.exitcode or 0 for child in children), default=0)
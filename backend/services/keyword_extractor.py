@@ -0,0 +1,193 @@
+"""
+Keyword Extractor – Dictionary fast path for skills, titles and locations.
+Every alias in the curated vocabulary is compiled into one Aho-Corasick automaton
+over word tokens, so a text is scanned once regardless of vocabulary size and
+matches always fall on word boundaries. Overlaps resolve leftmost-longest, e.g.
+"react native" wins over "react". Experience, budget and email use regexes.
+"""
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from services.vocabulary import EXACT_CASE, LOCATIONS, SENIORITY, SKILLS, TITLES
+
+# Words (with + and # for C++ / C#) or single punctuation marks; punctuation is kept as
+# tokens so "ci/cd" and "node.js" match while "python, java" does not form a phrase
+_TOKEN = re.compile(r"[a-z0-9+#]+|[^\sa-z0-9+#]")
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+#")
+
+_EXPERIENCE = re.compile(
+    r"(\d{1,2})\s*(\+|plus)?\s*(?:(?:-|–|to)\s*(\d{1,2})\s*)?\+?\s*(?:years?|yrs?)\b", re.IGNORECASE
+)
+_AMOUNT = r"\d[\d,]*(?:\.\d+)?\s?[kK]?"
+_BUDGET = re.compile(rf"\${_AMOUNT}(?:\s*(?:-|–|to)\s*\$?{_AMOUNT})?")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+WORK_MODES = {"Remote", "Hybrid", "On-site"}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+class AhoCorasick:
+    """Multi-pattern matcher over token sequences."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, tuple]]] = [[]]  # (phrase length, payload) per state
+
+    def add(self, tokens: Sequence[str], payload: tuple):
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(tokens), payload))
+
+    def build(self):
+        """Compute failure links breadth-first and merge their outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    @property
+    def states(self) -> int:
+        return len(self._goto)
+
+    def scan(self, tokens: Sequence[str]) -> List[Tuple[int, int, tuple]]:
+        """All (start, end, payload) matches in one pass over the tokens."""
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        state, ends = 0, []
+        for i, token in enumerate(tokens):
+            if not state:
+                # Most tokens are not the start of any phrase
+                state = root.get(token, 0)
+                if state and out[state]:
+                    ends.append((i + 1, state))
+                continue
+            nxt = goto[state].get(token)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(token)
+            state = nxt or 0
+            if out[state]:
+                ends.append((i + 1, state))
+        return [(end - length, end, payload) for end, state in ends for length, payload in out[state]]
+
+
+@dataclass
+class Extraction:
+    skills: List[str] = field(default_factory=list)
+    job_title: Optional[str] = None
+    location: Optional[str] = None
+    experience: Optional[str] = None
+    budget: Optional[str] = None
+    email: Optional[str] = None
+
+
+class KeywordExtractor:
+    """Extracts normalized skills, titles and locations from free text without an LLM."""
+
+    def __init__(self):
+        self.automaton = AhoCorasick()
+        for category, vocabulary in (("skill", SKILLS), ("title", TITLES),
+                                     ("seniority", SENIORITY), ("location", LOCATIONS)):
+            for canonical, aliases in vocabulary.items():
+                for alias in {canonical.lower(), *aliases}:
+                    tokens = tokenize(alias)
+                    exact = EXACT_CASE.get(alias) if len(tokens) == 1 else None
+                    self.automaton.add(tokens, (category, canonical, exact))
+        self.automaton.build()
+        # Literal-first patterns (no lookbehind) so the regex engine can use its fast substring scan
+        self._exact = {form: re.compile(rf"{re.escape(form)}(?![A-Za-z0-9+#])") for form in EXACT_CASE.values()}
+        self.texts = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def _spelled(self, form: str, text: str) -> bool:
+        """Whether the text contains form as a whole word, in exactly that casing."""
+        return any(m.start() == 0 or text[m.start() - 1] not in _WORD_CHARS for m in self._exact[form].finditer(text))
+
+    def matches(self, text: str) -> List[Tuple[int, int, tuple]]:
+        """Non-overlapping (start, end, payload) matches, leftmost-longest."""
+        tokens = tokenize(text)
+        found = self.automaton.scan(tokens)
+        exact = {payload[2] for _, _, payload in found if payload[2]}
+        if exact:
+            # Ambiguous words ("go", "r") count only if the text also spells them as a skill ("Go", "R")
+            present = {form for form in exact if self._spelled(form, text)}
+            found = [m for m in found if not m[2][2] or m[2][2] in present]
+        found.sort(key=lambda m: (m[0], m[0] - m[1]))
+        selected, last_end = [], 0
+        for match in found:
+            if match[0] >= last_end:
+                selected.append(match)
+                last_end = match[1]
+        return selected
+
+    def extract(self, text: str) -> Extraction:
+        started = time.perf_counter()
+        result = Extraction()
+        seniority_end, seniority = -1, None
+        cities, modes = [], []
+        for start, end, (category, canonical, _) in self.matches(text):
+            if category == "skill":
+                if canonical not in result.skills:
+                    result.skills.append(canonical)
+            elif category == "seniority":
+                seniority_end, seniority = end, canonical
+            elif category == "title" and result.job_title is None:
+                prefix = seniority if seniority_end == start else None
+                result.job_title = f"{prefix} {canonical}" if prefix else canonical
+            elif category == "location":
+                bucket = modes if canonical in WORK_MODES else cities
+                if canonical not in bucket:
+                    bucket.append(canonical)
+        if cities or modes:
+            # City first so the matching engine keys on it; "Remote" alone stays "Remote"
+            result.location = cities[0] + (f" ({modes[0]})" if modes else "") if cities else modes[0]
+
+        years = _EXPERIENCE.search(text)
+        if years:
+            low, plus, high = years.groups()
+            result.experience = f"{low}-{high} years" if high else f"{low}{'+' if plus else ''} years"
+        # Cheap membership checks first: a failed regex search backtracks over every word
+        budget = _BUDGET.search(text) if "$" in text else None
+        if budget:
+            result.budget = budget.group(0).strip()
+        email = _EMAIL.search(text) if "@" in text else None
+        if email:
+            result.email = email.group(0)
+
+        self.texts += 1
+        self.bytes += len(text)
+        self.seconds += time.perf_counter() - started
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "states": self.automaton.states,
+            "texts": self.texts,
+            "megabytes": round(self.bytes / 1e6, 3),
+            "mb_per_second": round(self.bytes / 1e6 / self.seconds, 1) if self.seconds else None,
+        }
+
+
+keyword_extractor = KeywordExtractor()
@@ -0,0 +1,401 @@
+"""
+Leaderboards – Materialized top-N candidates per intake, served from memory.
+
+Each intake is one role being hired for. Its leaderboard holds the best
+candidates by match score plus a headroom of runners-up, and the display fields
+a recruiter's list needs, so a view is a slice of a Python list and an ETag.
+
+Candidate writes (ORM flushes, bulk imports, reclassification) queue the
+candidate id. A background task rescores only the queued candidates against
+every board and moves them in or out. The board keeps the invariant that no
+candidate outside it scores above its floor; when removals leave fewer than
+N entries above the floor the board is rebuilt from the matching pool.
+
+Worker processes (`cli.py worker`) share only the database with the API, so
+when they do the job work the API polls for candidates and classifications
+stamped since its last look and queues those the same way.
+"""
+import asyncio
+import bisect
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from config import settings
+from database import engine
+from models import Candidate, Classification, Intake
+from services.matching_engine import CandidatePool, MatchingEngine, Requirements, matching_engine
+from services.metrics import cache_requests
+from services.response_cache import response_cache
+from services.skill_index import normalize_skill
+
+CLOSED_STATUSES = ("hired",)  # no longer on any shortlist
+TRACKED_FIELDS = ("name", "title", "skills", "experience", "location", "status", "canonical_id")
+CHUNK = 500  # ids per IN (...) lookup
+# Rows other processes write, as (response cache tag, candidate id, stamp); upserts refresh classification stamps
+FOLLOWED = (
+    ("candidates", Candidate.id, Candidate.created_at),
+    ("classifications", Classification.candidate_id, Classification.created_at),
+)
+# Re-read this far back so rows from transactions that began before the last poll are not missed
+FOLLOW_OVERLAP = timedelta(seconds=10)
+
+
+@dataclass
+class Board:
+    """One intake's top candidates, best first."""
+    intake_id: int
+    requirements: Requirements
+    keys: List[Tuple[float, int]]  # (-score, candidate_id), ascending = best first
+    entries: Dict[int, dict]  # candidate_id -> display fields and score
+    # Key of the best candidate outside the board; None when the board holds every eligible one
+    floor: Optional[Tuple[float, int]]
+    version: int = 1
+    built_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def short(self) -> bool:
+        """Too few entries to serve N while candidates outside may outrank the tail."""
+        return len(self.keys) < settings.leaderboard_size and self.floor is not None
+
+    def remove(self, candidate_id: int) -> Optional[int]:
+        entry = self.entries.pop(candidate_id, None)
+        if entry is None:
+            return None
+        rank = bisect.bisect_left(self.keys, (-entry["score"], candidate_id))
+        del self.keys[rank]
+        return rank
+
+    def place(self, entry: dict) -> Optional[int]:
+        """Insert when it outranks everything outside; returns the rank, or None when it stays out."""
+        key = (-entry["score"], entry["candidate_id"])
+        if self.floor is not None and key > self.floor:
+            return None
+        rank = bisect.bisect_left(self.keys, key)
+        self.keys.insert(rank, key)
+        self.entries[entry["candidate_id"]] = entry
+        capacity = settings.leaderboard_size + settings.leaderboard_headroom
+        while len(self.keys) > capacity:
+            evicted = self.keys.pop()
+            del self.entries[evicted[1]]
+            self.floor = evicted if self.floor is None else min(self.floor, evicted)
+        return rank if entry["candidate_id"] in self.entries else None
+
+    def top(self, limit: int) -> List[dict]:
+        return [self.entries[candidate_id] for _, candidate_id in self.keys[:limit]]
+
+    def fill(self, rows, ids: Sequence[int], scores: np.ndarray):
+        """Load the entries picked by select_top; ids missing from rows were deleted since."""
+        display = {row.id: row for row in rows}
+        for candidate_id, score in zip(ids, scores):
+            row = display.get(candidate_id)
+            if row is not None:
+                self.entries[candidate_id] = _entry(candidate_id, score, row)
+                self.keys.append((-float(score), candidate_id))
+        self.keys.sort()
+
+    def update(self, candidate_ids: Iterable[int], rows, scores: np.ndarray) -> bool:
+        """Take the changed candidates out and place the still-eligible rows by their new scores.
+
+        The version only moves when the served top N changed, so unchanged views keep their ETag.
+        """
+        ranks = [self.remove(candidate_id) for candidate_id in candidate_ids]
+        ranks += [self.place(_entry(row.id, score, row)) for row, score in zip(rows, rounded(scores))]
+        changed = min((rank for rank in ranks if rank is not None), default=None)
+        if changed is None or changed >= settings.leaderboard_size:
+            return False
+        self.version += 1
+        self.updated_at = time.time()
+        return True
+
+
+def rounded(scores: np.ndarray) -> np.ndarray:
+    """Scores as served; ranking on the rounded value makes ties break by candidate id everywhere."""
+    return np.round(scores.astype(np.float64), 1)
+
+
+def select_top(ids: np.ndarray, scores: np.ndarray, capacity: int) -> Tuple[np.ndarray, Optional[Tuple[float, int]]]:
+    """Positions of the best `capacity` finite scores ordered by (score desc, id), and the floor key after them."""
+    scores = rounded(scores)
+    eligible = np.flatnonzero(np.isfinite(scores))
+    k = min(capacity + 1, len(eligible))
+    if k < len(eligible):
+        # Everything strictly above the k-th best score, then the lowest ids among ties with it
+        kth = -np.partition(-scores[eligible], k - 1)[k - 1]
+        above = eligible[scores[eligible] > kth]
+        tied = eligible[scores[eligible] == kth]
+        eligible = np.concatenate([above, tied[np.argsort(ids[tied], kind="stable")][:k - len(above)]])
+    top = eligible[np.lexsort((ids[eligible], -scores[eligible]))]
+    floor = (-float(scores[top[capacity]]), int(ids[top[capacity]])) if len(top) > capacity else None
+    return top[:capacity], floor
+
+
+def _entry(candidate_id: int, score: float, row) -> dict:
+    return {"candidate_id": candidate_id, "name": row.name, "title": row.title, "status": row.status,
+            "category": row.category, "score": float(score)}
+
+
+def _mini_pool(rows) -> CandidatePool:
+    """Matching features for a handful of candidates, with a local skill vocabulary."""
+    names: Dict[str, int] = {}
+    counts, skill_ids = [], []
+    for row in rows:
+        skills = {normalize_skill(s) for s in row.skills or [] if s and normalize_skill(s)}
+        counts.append(len(skills))
+        skill_ids.extend(names.setdefault(s, len(names)) for s in skills)
+    return CandidatePool.from_columns(
+        [r.id for r in rows], [r.experience for r in rows], [r.location for r in rows],
+        np.array(counts, dtype=np.int64), np.array(skill_ids, dtype=np.int32), names,
+    )
+
+
+class Leaderboards:
+    """Per-intake boards kept current from candidate change events."""
+
+    def __init__(self):
+        self.boards: "OrderedDict[int, Board]" = OrderedDict()
+        self.pending: Dict[int, float] = {}  # candidate_id -> monotonic time first queued
+        self.recent: Dict[int, float] = {}  # applied changes, replayed over older pool snapshots
+        self.epoch = format(int(time.time()), "x")  # ETags from a previous process never match
+        self._lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._follower: Optional[asyncio.Task] = None
+        self.rebuilds = 0
+        self.incremental_updates = 0
+        self.last_apply_ms = 0.0
+        self.last_rebuild_drift = 0
+        self.hits = 0
+        self.not_modified = 0
+
+    # ── Change events ──
+    def mark_dirty(self, candidate_ids: Iterable[int]):
+        """Queue candidates whose score or display fields may have changed."""
+        now = time.monotonic()
+        for candidate_id in candidate_ids:
+            self.pending.setdefault(candidate_id, now)
+        if self.pending and self._wake is not None:
+            self._wake.set()
+
+    def drop(self, intake_id: int):
+        """Forget a board whose requirements changed; the next view rebuilds it."""
+        self.boards.pop(intake_id, None)
+
+    def start(self, follow: bool = False):
+        """`follow` also picks up the writes of worker processes (set when the API runs no worker itself)."""
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        if follow:
+            self._follower = asyncio.create_task(self._follow())
+
+    async def stop(self):
+        for task in (self._task, self._follower):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._follower = None
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            # Let the writing transaction commit and let bursts coalesce
+            await asyncio.sleep(settings.leaderboard_update_delay_seconds)
+            self._wake.clear()
+            try:
+                await self.apply_pending()
+            except Exception as e:
+                print(f"⚠️ Leaderboard update failed: {e}", flush=True)
+
+    async def _follow(self):
+        async with engine.connect() as conn:
+            since = (await conn.execute(select(func.now()))).scalar()
+        seen = {tag: set() for tag, _, _ in FOLLOWED}
+        while True:
+            await asyncio.sleep(settings.leaderboard_follow_seconds)
+            try:
+                async with engine.connect() as conn:
+                    now = (await conn.execute(select(func.now()))).scalar()
+                    for tag, key, stamp in FOLLOWED:
+                        rows = {tuple(row) for row in (await conn.execute(
+                            select(key, stamp).where(stamp >= since - FOLLOW_OVERLAP)
+                        )).all()}
+                        changed = rows - seen[tag]
+                        seen[tag] = rows
+                        if changed:
+                            self.mark_dirty({candidate_id for candidate_id, _ in changed})
+                            response_cache.invalidate(tag)
+                since = now
+            except Exception as e:
+                print(f"⚠️ Leaderboard follow failed: {e}", flush=True)
+
+    async def apply_pending(self) -> int:
+        """Rescore queued candidates against every board."""
+        if not self.pending:
+            return 0
+        async with self._lock:
+            pending, self.pending = self.pending, {}
+            started = time.perf_counter()
+            await self._apply(list(pending), self.boards.values())
+            now = time.monotonic()
+            self.recent.update(dict.fromkeys(pending, now))
+            horizon = now - 2 * settings.matching_pool_max_age_seconds
+            self.recent = {k: t for k, t in self.recent.items() if t > horizon}
+            self.incremental_updates += len(pending)
+            self.last_apply_ms = round((time.perf_counter() - started) * 1000, 2)
+        for board in [b for b in self.boards.values() if b.short]:
+            await self.rebuild(board.intake_id)
+        return len(pending)
+
+    async def _apply(self, candidate_ids: List[int], boards: Iterable[Board]):
+        boards = list(boards)
+        if not boards or not candidate_ids:
+            return
+        rows = await self._load(candidate_ids)
+        # Duplicates merged into another candidate leave the boards like closed ones
+        open_rows = [r for r in rows if r.status not in CLOSED_STATUSES and r.canonical_id is None]
+        pool = _mini_pool(open_rows)
+        for board in boards:
+            board.update(candidate_ids, open_rows, MatchingEngine.score(pool, board.requirements, top_k=0).all_scores)
+
+    @staticmethod
+    async def _load(candidate_ids: List[int]) -> list:
+        rows = []
+        async with engine.connect() as conn:
+            for start in range(0, len(candidate_ids), CHUNK):
+                rows.extend((await conn.execute(
+                    select(Candidate.id, Candidate.name, Candidate.title, Candidate.status, Candidate.skills,
+                           Candidate.experience, Candidate.location,
+                           Candidate.canonical_id, Classification.category)
+                    .outerjoin(Classification, Classification.candidate_id == Candidate.id)
+                    .where(Candidate.id.in_(candidate_ids[start:start + CHUNK]))
+                )).all())
+        return rows
+
+    # ── Full rebuild ──
+    async def rebuild(self, intake_id: int) -> Optional[Board]:
+        """Recompute a board from the matching pool; None when the intake has no requirements."""
+        async with engine.connect() as conn:
+            parsed = (await conn.execute(select(Intake.parsed_data).where(Intake.id == intake_id))).scalar()
+            if not parsed:
+                self.boards.pop(intake_id, None)
+                return None
+            closed = (await conn.execute(
+                select(Candidate.id).where(Candidate.status.in_(CLOSED_STATUSES))
+            )).scalars().all()
+        requirements = Requirements.from_parsed(parsed)
+
+        async with self._lock:
+            pool, result = await matching_engine.match(requirements, top_k=0)
+            scores = result.all_scores.copy()
+            if closed:
+                scores[np.isin(pool.ids, np.asarray(closed, dtype=np.int64))] = -np.inf
+            top, floor = select_top(pool.ids, scores, settings.leaderboard_size + settings.leaderboard_headroom)
+            ids = [int(i) for i in pool.ids[top]]
+            board = Board(intake_id, requirements, keys=[], entries={}, floor=floor)
+            board.fill(await self._load(ids), ids, rounded(scores[top]))
+            # Changes applied after the pool snapshot was taken are replayed on top of it
+            replay = [k for k, t in self.recent.items() if t >= pool.built_at]
+            await self._apply(replay, [board])
+
+            previous = self.boards.get(intake_id)
+            if previous is not None and not previous.short:
+                served = settings.leaderboard_size
+                self.last_rebuild_drift = len(
+                    {(e["candidate_id"], e["score"]) for e in previous.top(served)}
+                    ^ {(e["candidate_id"], e["score"]) for e in board.top(served)}
+                ) // 2
+            if previous is not None:
+                board.version = previous.version + 1
+            self.boards[intake_id] = board
+            self.boards.move_to_end(intake_id)
+            while len(self.boards) > settings.leaderboard_max_boards:
+                self.boards.popitem(last=False)
+            self.rebuilds += 1
+        return board
+
+    async def rebuild_all(self) -> int:
+        """Rebuild every cached board, e.g. after the scoring weights changed."""
+        rebuilt = 0
+        for intake_id in list(self.boards):
+            if await self.rebuild(intake_id):
+                rebuilt += 1
+        return rebuilt
+
+    # ── Serving ──
+    async def get(self, intake_id: int) -> Optional[Board]:
+        board = self.boards.get(intake_id)
+        if board is None or board.short:
+            cache_requests.inc("leaderboard", "miss")
+            return await self.rebuild(intake_id)
+        self.boards.move_to_end(intake_id)
+        self.hits += 1
+        cache_requests.inc("leaderboard", "hit")
+        return board
+
+    def etag(self, board: Board, limit: int) -> str:
+        return f'"lb-{self.epoch}-{board.intake_id}-{board.version}-{limit}"'
+
+    def lag_seconds(self) -> float:
+        """Age of the oldest change not yet reflected on the boards."""
+        return round(time.monotonic() - min(self.pending.values()), 3) if self.pending else 0.0
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            "boards": len(self.boards),
+            "pending_changes": len(self.pending),
+            "lag_seconds": self.lag_seconds(),
+            "oldest_rebuild_age_seconds": round(now - min(b.built_at for b in self.boards.values()), 1)
+            if self.boards else None,
+            "incremental_updates": self.incremental_updates,
+            "last_apply_ms": self.last_apply_ms,
+            "rebuilds": self.rebuilds,
+            "last_rebuild_drift": self.last_rebuild_drift,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+        }
+
+
+def board_timestamp(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+leaderboards = Leaderboards()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_candidate_changes(session: Session, flush_context):
+    """Queue candidates that were added, edited, reclassified or deleted; drop boards of edited intakes."""
+    changed = set()
+    for obj in session.new:
+        if isinstance(obj, Candidate):
+            changed.add(obj.id)
+        elif isinstance(obj, Classification):
+            changed.add(obj.candidate_id)
+    for obj in session.dirty:
+        if isinstance(obj, Candidate) and any(get_history(obj, f).has_changes() for f in TRACKED_FIELDS):
+            changed.add(obj.id)
+        elif isinstance(obj, Classification) and get_history(obj, "category").has_changes():
+            changed.add(obj.candidate_id)
+        elif isinstance(obj, Intake) and get_history(obj, "parsed_data").has_changes():
+            leaderboards.drop(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Candidate):
+            changed.add(obj.id)
+        elif isinstance(obj, Classification):
+            changed.add(obj.candidate_id)
+        elif isinstance(obj, Intake):
+            leaderboards.drop(obj.id)
+    if changed:
+        leaderboards.mark_dirty(changed)
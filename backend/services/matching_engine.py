@@ -0,0 +1,350 @@
+"""
+Matching Engine – Scores the whole candidate pool against intake requirements in
+one vectorized pass.
+
+Candidates are held in memory as a CSR skill matrix (one row per candidate, one
+column per skill id from the skill index) with parallel experience and location
+arrays. A match is a sparse mat-vec for skill overlap plus elementwise experience
+and location terms; top-k comes from argpartition, so the cost is linear in the
+pool with no Python-level loop over candidates.
+"""
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config import settings
+from database import engine
+from models import Candidate, CandidateSkill, Skill
+from services.metrics import cache_requests
+from services.query_layer import group_concat
+from services.skill_index import normalize_skill, skill_index
+
+UNKNOWN = 0.5  # score for a missing experience/location on either side
+OVERQUALIFIED = 0.8  # experience above the requested range
+SYNC_REBUILD_MS = 250  # slower pool builds run in the background instead
+REMOTE_WORDS = ("remote", "anywhere", "distributed")
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_years(text) -> Tuple[Optional[float], Optional[float]]:
+    """'5-8 years' -> (5, 8), '5+ years' -> (5, None), '8 years' -> (8, 8)."""
+    if text is None:
+        return None, None
+    if isinstance(text, (int, float)):
+        return float(text), float(text)
+    numbers = [float(n) for n in _NUMBER.findall(str(text))]
+    if not numbers:
+        return None, None
+    if len(numbers) >= 2:
+        return min(numbers[:2]), max(numbers[:2])
+    if "+" in str(text):
+        return numbers[0], None
+    return numbers[0], numbers[0]
+
+
+def location_key(text: Optional[str]) -> str:
+    """'San Francisco, CA' -> 'san francisco'; remote policies -> 'remote'; unknown -> ''."""
+    if not text:
+        return ""
+    text = str(text).lower()
+    if any(word in text for word in REMOTE_WORDS):
+        return "remote"
+    return re.split(r"[,(/]", text)[0].strip()
+
+
+@dataclass
+class Requirements:
+    """What an intake asks for, normalized for scoring."""
+    skills: List[str]
+    min_years: Optional[float] = None
+    max_years: Optional[float] = None
+    location: str = ""
+
+    @classmethod
+    def from_parsed(cls, parsed: Optional[dict]) -> "Requirements":
+        parsed = parsed or {}
+        raw_skills = parsed.get("skills") or []
+        if isinstance(raw_skills, str):
+            raw_skills = raw_skills.split(",")
+        skills = sorted({normalize_skill(s) for s in raw_skills if s and normalize_skill(s)})
+        min_years, max_years = parse_years(parsed.get("experience"))
+        return cls(skills, min_years, max_years, location_key(parsed.get("location")))
+
+    def to_dict(self) -> dict:
+        return {
+            "skills": self.skills,
+            "min_years": self.min_years,
+            "max_years": self.max_years,
+            "location": self.location or None,
+        }
+
+
+@dataclass
+class CandidatePool:
+    """In-memory snapshot of every candidate's matching features."""
+    ids: np.ndarray  # int64, ascending
+    skills: sparse.csr_matrix  # float32 0/1, rows aligned with ids, column = skill id
+    skill_names: Dict[str, int]  # normalized name -> column
+    years: np.ndarray  # float32, NaN when unknown
+    location_codes: np.ndarray  # int32 index into locations
+    locations: List[str]  # location_key values
+    version: int = 0
+    built_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_columns(
+        cls,
+        ids: Sequence[int],
+        experience: Sequence,
+        location: Sequence,
+        skill_counts: np.ndarray,
+        skill_ids: np.ndarray,
+        skill_names: Dict[str, int],
+        version: int = 0,
+    ) -> "CandidatePool":
+        """Build from per-candidate columns; skill_ids holds each candidate's skills back to back."""
+        ids = np.asarray(ids, dtype=np.int64)
+        # Experience and location strings repeat heavily; parse each distinct value once
+        years_of: Dict = {}
+        years = np.fromiter(
+            (years_of[e] if e in years_of else years_of.setdefault(e, _years_value(e)) for e in experience),
+            dtype=np.float32, count=len(ids),
+        )
+        codes: Dict[str, int] = {}
+        location_codes = np.fromiter(
+            (codes.setdefault(location_key(l), len(codes)) for l in location), dtype=np.int32, count=len(ids)
+        )
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(skill_counts, out=indptr[1:])
+        n_columns = max(max(skill_names.values(), default=0), int(skill_ids.max(initial=0))) + 1
+        matrix = sparse.csr_matrix(
+            (np.ones(len(skill_ids), dtype=np.float32), skill_ids, indptr), shape=(len(ids), n_columns)
+        )
+        return cls(
+            ids=ids,
+            skills=matrix,
+            skill_names=skill_names,
+            years=years,
+            location_codes=location_codes,
+            locations=list(codes),
+            version=version,
+        )
+
+
+def _years_value(text) -> float:
+    low, _ = parse_years(text)
+    return np.nan if low is None else low
+
+
+@dataclass
+class MatchResult:
+    ids: np.ndarray  # top-k candidate ids, best first
+    scores: np.ndarray  # total scores of those candidates
+    skill_scores: np.ndarray
+    experience_scores: np.ndarray
+    location_scores: np.ndarray
+    matched_skills: List[List[str]]
+    all_scores: np.ndarray  # total score for every candidate in the pool, aligned with pool.ids
+    elapsed_ms: float
+
+
+class MatchingEngine:
+    """Caches the candidate pool and scores requirements against it."""
+
+    def __init__(self):
+        self._pool: Optional[CandidatePool] = None
+        self._build_lock = asyncio.Lock()
+        self._refresh: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.last_build_ms = 0.0
+
+    async def pool(self) -> CandidatePool:
+        """Current snapshot, rebuilt when the skill index changed or it aged out.
+
+        Small pools are rebuilt inline. Once a build takes longer than
+        SYNC_REBUILD_MS the previous snapshot keeps serving while a refresh runs
+        in the background, so a burst of imports never stalls matching.
+        """
+        pool = self._pool
+        if not self._stale(pool):
+            cache_requests.inc("matching_pool", "hit")
+            return pool
+        cache_requests.inc("matching_pool", "miss")
+        if pool is None or self.last_build_ms <= SYNC_REBUILD_MS:
+            await self._rebuild()
+        elif self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._rebuild())
+        return self._pool
+
+    async def _rebuild(self):
+        async with self._build_lock:
+            if not self._stale(self._pool):
+                return
+            started = time.perf_counter()
+            async with engine.connect() as conn:
+                self._pool = await self.build_pool(conn)
+            self.builds += 1
+            self.last_build_ms = round((time.perf_counter() - started) * 1000, 1)
+            print(f"🧮 Matching pool built: {self._pool.size} candidates in {self.last_build_ms}ms", flush=True)
+
+    def invalidate(self):
+        self._pool = None
+
+    @staticmethod
+    def _stale(pool: Optional[CandidatePool]) -> bool:
+        # The version catches skill changes in this process; the age bound catches
+        # other edits and writes from other nodes
+        return (
+            pool is None
+            or pool.version != skill_index.version
+            or time.monotonic() - pool.built_at > settings.matching_pool_max_age_seconds
+        )
+
+    @staticmethod
+    async def build_pool(conn: AsyncConnection, batch_size: int = 50_000) -> CandidatePool:
+        """Load every candidate with its skill ids in one ordered pass."""
+        version = skill_index.version
+        # Aggregating postings per candidate in SQL moves 1 row per candidate instead of one per skill
+        postings = (
+            select(group_concat(conn.dialect.name, CandidateSkill.skill_id))
+            .where(CandidateSkill.candidate_id == Candidate.id)
+            .scalar_subquery()
+        )
+        result = await conn.stream(
+            select(Candidate.id, Candidate.experience, Candidate.location, postings)
+            .where(Candidate.canonical_id.is_(None))
+            .order_by(Candidate.id)
+            .execution_options(yield_per=batch_size)
+        )
+        ids, experience, location, counts, skill_ids = [], [], [], [], []
+        async for rows in result.partitions(batch_size):
+            lists = []
+            for candidate_id, exp, loc, skills in rows:
+                ids.append(candidate_id)
+                experience.append(exp)
+                location.append(loc)
+                lists.append(skills or "")
+            counts.append(np.fromiter((s.count(",") + 1 if s else 0 for s in lists), dtype=np.int64, count=len(lists)))
+            joined = ",".join(s for s in lists if s)
+            skill_ids.append(np.array(joined.split(",") if joined else [], dtype=np.int32))
+
+        names = {name: skill_id for skill_id, name in (await conn.execute(select(Skill.id, Skill.name))).all()}
+        return CandidatePool.from_columns(
+            ids, experience, location,
+            np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64),
+            np.concatenate(skill_ids) if skill_ids else np.zeros(0, dtype=np.int32),
+            names,
+            version,
+        )
+
+    @staticmethod
+    def score(pool: CandidatePool, req: Requirements, top_k: int = 50) -> MatchResult:
+        """Score every candidate in the pool and pick the top k."""
+        started = time.perf_counter()
+        n = pool.size
+        components, weights = [], []
+
+        skill_scores = np.zeros(n, dtype=np.float32)
+        columns = [pool.skill_names[s] for s in req.skills if s in pool.skill_names]
+        if req.skills:
+            if columns:
+                wanted = np.zeros(pool.skills.shape[1], dtype=np.float32)
+                wanted[columns] = 1.0
+                # Unknown skills stay in the denominator: nobody in the pool has them
+                skill_scores = pool.skills.dot(wanted) / np.float32(len(req.skills))
+            components.append(skill_scores)
+            weights.append(settings.matching_skill_weight)
+
+        experience_scores = np.full(n, UNKNOWN, dtype=np.float32)
+        if req.min_years:
+            years = pool.years
+            known = ~np.isnan(years)
+            ratio = np.clip(np.where(known, years, 0) / np.float32(req.min_years), 0, 1)
+            if req.max_years is not None:
+                ratio = np.where(years > req.max_years, np.float32(OVERQUALIFIED), ratio)
+            experience_scores = np.where(known, ratio, np.float32(UNKNOWN)).astype(np.float32)
+            components.append(experience_scores)
+            weights.append(settings.matching_experience_weight)
+
+        location_scores = np.full(n, UNKNOWN, dtype=np.float32)
+        if req.location:
+            # A handful of distinct locations: score each once, then gather
+            per_location = np.array(
+                [_location_score(req.location, loc) for loc in pool.locations] or [UNKNOWN], dtype=np.float32
+            )
+            location_scores = per_location[pool.location_codes]
+            components.append(location_scores)
+            weights.append(settings.matching_location_weight)
+
+        total = np.zeros(n, dtype=np.float32)
+        if components:
+            for component, weight in zip(components, weights):
+                total += np.float32(weight) * component
+            total *= np.float32(100.0 / sum(weights))
+
+        k = min(top_k, n)
+        if k:
+            top = np.argpartition(-total, k - 1)[:k] if k < n else np.arange(n)
+            top = top[np.argsort(-total[top], kind="stable")]
+        else:
+            top = np.zeros(0, dtype=np.int64)
+
+        column_names = {pool.skill_names[s]: s for s in req.skills if s in pool.skill_names}
+        matched = [
+            [column_names[c] for c in pool.skills.indices[pool.skills.indptr[row]:pool.skills.indptr[row + 1]]
+             if c in column_names]
+            for row in top
+        ]
+        return MatchResult(
+            ids=pool.ids[top],
+            scores=total[top],
+            skill_scores=skill_scores[top],
+            experience_scores=experience_scores[top],
+            location_scores=location_scores[top],
+            matched_skills=matched,
+            all_scores=total,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+
+    async def match(self, req: Requirements, top_k: int = 50) -> Tuple[CandidatePool, MatchResult]:
+        pool = await self.pool()
+        return pool, self.score(pool, req, top_k)
+
+    def stats(self) -> dict:
+        pool = self._pool
+        return {
+            "pool_size": pool.size if pool else 0,
+            "skill_columns": pool.skills.shape[1] if pool else 0,
+            "builds": self.builds,
+            "last_build_ms": self.last_build_ms,
+            "pool_age_seconds": round(time.monotonic() - pool.built_at, 1) if pool else None,
+            "stale": self._stale(pool),
+            "refreshing": bool(self._refresh and not self._refresh.done()),
+        }
+
+
+def _location_score(wanted: str, candidate: str) -> float:
+    if wanted == "remote":
+        return 1.0
+    if not candidate:
+        return UNKNOWN
+    if candidate == wanted or candidate in wanted or wanted in candidate:
+        return 1.0
+    if candidate == "remote":
+        return UNKNOWN
+    return 0.0
+
+
+matching_engine = MatchingEngine()
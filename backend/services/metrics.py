@@ -0,0 +1,285 @@
+"""
+Metrics – Prometheus text exposition for GET /metrics.
+
+Hot paths (HTTP requests, DB queries, uploads) update plain counters and
+fixed-bucket histograms held in dicts: one bisect and a few adds per
+observation, no locks, no allocation after the first sample of a label set.
+Everything that already keeps its own statistics (agent instrumentation,
+buffered writers, job queue, leaderboards, classifiers) is read only at
+scrape time by collectors, so it costs nothing between scrapes.
+"""
+import inspect
+import math
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import event
+
+PREFIX = "perfectly"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+AI_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# (sample name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class Family:
+    """One metric as rendered: name, type, help text and its samples."""
+
+    __slots__ = ("name", "kind", "help", "samples")
+
+    def __init__(self, name: str, kind: str, help: str, samples: Optional[List[Sample]] = None):
+        self.name = f"{PREFIX}_{name}"
+        self.kind = kind
+        self.help = help
+        self.samples: List[Sample] = samples if samples is not None else []
+
+    def add(self, value: float, suffix: str = "", **labels):
+        self.samples.append((self.name + suffix, labels, value))
+        return self
+
+
+class Counter:
+    __slots__ = ("name", "help", "labelnames", "values")
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def collect(self) -> Family:
+        family = Family(self.name, "counter", self.help)
+        for labels, value in self.values.items():
+            family.add(value, "_total", **dict(zip(self.labelnames, labels)))
+        return family
+
+
+class Gauge:
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0.0
+
+    def collect(self) -> Family:
+        return Family(self.name, "gauge", self.help).add(self.value)
+
+
+class Histogram:
+    """Fixed-bucket histogram; per label set: non-cumulative bucket counts, sum and count."""
+
+    __slots__ = ("name", "help", "labelnames", "buckets", "series")
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def collect(self) -> Family:
+        family = Family(self.name, "histogram", self.help)
+        for labels, (counts, total) in self.series.items():
+            histogram_samples(family, dict(zip(self.labelnames, labels)), self.buckets, counts, total)
+        return family
+
+
+def histogram_samples(family: Family, labels: Dict[str, str], bounds: Sequence[float], counts: Sequence[int],
+                      total: float):
+    """Append cumulative _bucket samples, _sum and _count (counts has one extra slot for +Inf)."""
+    cumulative = 0
+    for bound, count in zip(bounds, counts):
+        cumulative += count
+        family.add(cumulative, "_bucket", **labels, le=format_value(bound))
+    cumulative += counts[len(bounds)]
+    family.add(cumulative, "_bucket", **labels, le="+Inf")
+    family.add(total, "_sum", **labels)
+    family.add(cumulative, "_count", **labels)
+
+
+Collector = Callable[[], Union[Iterable[Family], Awaitable[Iterable[Family]]]]
+
+
+class MetricsRegistry:
+    """Owns the hot-path metrics and the scrape-time collectors."""
+
+    def __init__(self):
+        self.metrics: List[Union[Counter, Gauge, Histogram]] = []
+        self.collectors: List[Collector] = []
+        self.scrapes = 0
+        self.last_render_ms: Optional[float] = None
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        metric = Gauge(name, help)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = HTTP_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Collector) -> Collector:
+        """Register a function returning Families, called at scrape time (may be async)."""
+        self.collectors.append(fn)
+        return fn
+
+    async def render(self) -> str:
+        started = time.perf_counter()
+        families = [m.collect() for m in self.metrics]
+        for fn in self.collectors:
+            try:
+                result = fn()
+                if inspect.isawaitable(result):
+                    result = await result
+                families.extend(result)
+            except Exception as e:
+                print(f"⚠️ Metrics collector {fn.__name__} failed: {e}", flush=True)
+        lines = []
+        for family in families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for name, labels, value in family.samples:
+                if labels:
+                    rendered = ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{rendered}}} {format_value(value)}")
+                else:
+                    lines.append(f"{name} {format_value(value)}")
+        self.scrapes += 1
+        self.last_render_ms = round((time.perf_counter() - started) * 1000, 2)
+        return "\n".join(lines) + "\n"
+
+
+def escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+metrics = MetricsRegistry()
+
+http_requests = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request duration by route template and status.",
+    ("method", "route", "status"),
+)
+http_in_flight = metrics.gauge("http_requests_in_flight", "HTTP requests being handled.")
+db_queries = metrics.histogram(
+    "db_query_duration_seconds", "Database statement execution time by statement type.", ("operation",), DB_BUCKETS,
+)
+db_errors = metrics.counter("db_query_errors", "Database statements that raised.", ("operation",))
+upload_bytes = metrics.counter("upload_bytes", "Bytes of uploaded files stored.")
+uploads = metrics.counter("uploads", "Uploaded files stored.")
+ai_coalesced = metrics.counter(
+    "ai_requests_coalesced", "AI extractions served by joining an identical call already in flight.", ("operation",),
+)
+connector_search_seconds = metrics.histogram(
+    "connector_search_duration_seconds", "Federated search answers by source, including late ones.", ("source",),
+)
+connector_search_outcomes = metrics.counter(
+    "connector_searches", "Federated search calls by source and outcome (ok, late, timeout or error).",
+    ("source", "outcome"),
+)
+cache_requests = metrics.counter("cache_requests", "Cache lookups by cache and result (hit, coalesced or miss).",
+                                 ("cache", "result"))
+
+DB_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK", "PRAGMA"}
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    http_requests.observe(seconds, method, route, str(status))
+
+
+def instrument_engine(engine):
+    """Time every statement on the engine (cursor execute to result)."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is not None:
+            db_queries.observe(time.perf_counter() - started, statement_kind(statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        db_errors.inc(statement_kind(exception_context.statement or ""))
+
+
+def statement_kind(statement: str) -> str:
+    head = statement.lstrip()[:8].split(None, 1)
+    kind = head[0].upper() if head else ""
+    return kind if kind in DB_OPERATIONS else "OTHER"
+
+
+def pool_families(engine) -> List[Family]:
+    pool = engine.pool
+    family = Family("db_pool_connections", "gauge", "Database pool connections by state.")
+    for state, method in (("checked_out", "checkedout"), ("idle", "checkedin"), ("overflow", "overflow")):
+        if hasattr(pool, method):
+            family.add(getattr(pool, method)(), state=state)
+    size = Family("db_pool_size", "gauge", "Configured pool size.")
+    if hasattr(pool, "size"):
+        size.add(pool.size())
+    return [family, size]
+
+
+def agent_families(agent_metrics) -> List[Family]:
+    """Export the agent instrumentation as histograms at AI_BUCKETS, plus error and mock-fallback counts."""
+    duration = Family("agent_call_duration_seconds", "histogram",
+                      "Agent and AI provider call latency by agent, operation, provider and model.")
+    errors = Family("agent_call_errors", "counter", "Failed agent and AI provider calls.")
+    fallbacks = Family("ai_mock_fallbacks", "counter", "AI calls answered with mock data after every provider failed.")
+    for (agent, operation, provider, model), series in list(agent_metrics.series.items()):
+        labels = {"agent": agent, "operation": operation, "provider": provider or "", "model": model or ""}
+        counts, previous = [], 0
+        for bound in AI_BUCKETS:
+            upto = series.latency.count_below(bound * 1000)
+            counts.append(upto - previous)
+            previous = upto
+        counts.append(series.latency.total - previous)
+        histogram_samples(duration, labels, AI_BUCKETS, counts, series.latency.sum / 1000)
+        errors.add(series.errors, "_total", **labels)
+        if provider == "mock":
+            fallbacks.add(series.calls, "_total", agent=agent, operation=operation)
+    return [duration, errors, fallbacks]
+
+
+def ratio_family(caches: Dict[str, Tuple[float, float]]) -> Family:
+    """Hit ratio per cache from (hits, misses); NaN before the first lookup."""
+    family = Family("cache_hit_ratio", "gauge", "Cache hits / lookups since start.")
+    for cache, (hits, misses) in caches.items():
+        family.add(hits / (hits + misses) if hits + misses else math.nan, cache=cache)
+    return family
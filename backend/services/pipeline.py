@@ -0,0 +1,230 @@
+"""
+Pipeline – asyncio DAG executor for multi-agent runs.
+
+A pipeline is a set of stages with dependencies. Each stage starts as soon as
+everything it depends on has finished usably, so independent stages overlap.
+Stages may fan out over items; the fan-out is bounded per stage name by a
+semaphore shared by every run, so N concurrent runs never put more than the
+configured number of calls in flight against one agent.
+
+Every run owns its state: per-stage status, wall time, item counters and the
+results collected so far. A stage that times out or loses some items still
+hands its partial results downstream; cancelling a run keeps whatever finished.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence
+
+# pending -> running -> done | partial | failed | timeout | cancelled; skipped when a dependency was unusable
+USABLE = ("done", "partial")
+FINISHED = USABLE + ("failed", "timeout", "cancelled", "skipped")
+
+
+@dataclass
+class Stage:
+    """One node of the DAG. `run` receives the PipelineRun and returns the stage result."""
+    name: str
+    run: Callable[["PipelineRun"], Awaitable[Any]]
+    after: Sequence[str] = ()
+    timeout: Optional[float] = None
+
+
+@dataclass
+class StageState:
+    name: str
+    after: Sequence[str]
+    status: str = "pending"
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    items_total: int = 0
+    items_done: int = 0
+    items_failed: int = 0
+    error: Optional[str] = None
+    result: Any = None
+
+    @property
+    def wall_ms(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return round(((self.finished or time.perf_counter()) - self.started) * 1000, 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "after": list(self.after),
+            "status": self.status,
+            "wall_ms": self.wall_ms,
+            "items_total": self.items_total,
+            "items_done": self.items_done,
+            "items_failed": self.items_failed,
+            "error": self.error,
+        }
+
+
+class PipelineRun:
+    """One execution of a DAG over its own inputs."""
+
+    def __init__(self, stages: Iterable[Stage], inputs: Dict[str, Any], label: str = "pipeline"):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.inputs = inputs
+        self.stages: Dict[str, Stage] = {s.name: s for s in stages}
+        for stage in self.stages.values():
+            missing = [d for d in stage.after if d not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {missing}")
+        self.state: Dict[str, StageState] = {name: StageState(name, s.after) for name, s in self.stages.items()}
+        self.status = "pending"
+        self.created_at = datetime.now(timezone.utc)
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.executor: Optional["PipelineExecutor"] = None
+
+    def result(self, stage: str) -> Any:
+        return self.state[stage].result
+
+    async def fan_out(self, stage: str, items: Sequence, fn: Callable[[Any], Awaitable[Any]]) -> List:
+        """Run fn over items under the stage's shared semaphore, publishing each result as it lands.
+
+        Failed items are counted and left out. The returned list (also the
+        stage's partial result while it runs) keeps completion order.
+        """
+        state = self.state[stage]
+        state.items_total += len(items)
+        done: List = []
+        state.result = done
+        limit = self.executor.limit(stage)
+        active = self.executor.active
+
+        async def one(item):
+            async with limit:
+                active[stage] = active.get(stage, 0) + 1
+                try:
+                    value = await fn(item)
+                except Exception as e:
+                    state.items_failed += 1
+                    state.error = state.error or f"{type(e).__name__}: {e}"
+                    return
+                finally:
+                    active[stage] -= 1
+            state.items_done += 1
+            if value is not None:
+                done.append(value)
+
+        await asyncio.gather(*(one(item) for item in items))
+        return done
+
+    @property
+    def wall_ms(self) -> Optional[float]:
+        if self.started is None:
+            return None
+        return round(((self.finished or time.perf_counter()) - self.started) * 1000, 1)
+
+    def cancel(self) -> bool:
+        if self.task is None or self.task.done():
+            return False
+        self.task.cancel()
+        return True
+
+    def snapshot(self, results: bool = True) -> dict:
+        stage_ms = sum(s.wall_ms or 0 for s in self.state.values())
+        return {
+            "id": self.id,
+            "label": self.label,
+            "status": self.status,
+            "created_at": self.created_at,
+            "wall_ms": self.wall_ms,
+            # Above 1.0 means stages overlapped
+            "concurrency": round(stage_ms / self.wall_ms, 2) if self.wall_ms else None,
+            "stages": [s.to_dict() for s in self.state.values()],
+            "results": {name: s.result for name, s in self.state.items()} if results else None,
+        }
+
+
+class PipelineExecutor:
+    """Runs PipelineRuns; owns the per-stage fan-out semaphores shared across runs."""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = limits
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.active: Dict[str, int] = {}  # fan-out items in flight per stage, across runs
+
+    def limit(self, stage: str) -> asyncio.Semaphore:
+        if stage not in self._semaphores:
+            self._semaphores[stage] = asyncio.Semaphore(self.limits.get(stage, 4))
+        return self._semaphores[stage]
+
+    async def execute(self, run: PipelineRun) -> PipelineRun:
+        """Start each stage once its dependencies are usable; wait for all of them."""
+        run.executor = self
+        run.status = "running"
+        run.started = time.perf_counter()
+        tasks: Dict[asyncio.Task, str] = {}
+        try:
+            while True:
+                self._schedule(run, tasks)
+                if not tasks:
+                    break
+                finished, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    tasks.pop(task)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for state in run.state.values():
+                if state.status in ("pending", "running"):
+                    state.status = "cancelled"
+                    state.finished = state.finished or (time.perf_counter() if state.started else None)
+            run.status = "cancelled"
+            raise
+        finally:
+            run.finished = time.perf_counter()
+
+        statuses = {s.status for s in run.state.values()}
+        run.status = "complete" if statuses == {"done"} else "failed" if not statuses & set(USABLE) else "partial"
+        return run
+
+    def _schedule(self, run: PipelineRun, tasks: Dict[asyncio.Task, str]):
+        # Repeat until stable so a skip propagates down the whole chain in one pass
+        changed = True
+        while changed:
+            changed = False
+            for name, state in run.state.items():
+                if state.status != "pending":
+                    continue
+                deps = [run.state[d] for d in run.stages[name].after]
+                unusable = [d.name for d in deps if d.status in FINISHED and d.status not in USABLE]
+                if unusable:
+                    state.status = "skipped"
+                    state.error = "upstream " + ", ".join(unusable)
+                    changed = True
+                elif all(d.status in USABLE for d in deps):
+                    state.status = "running"
+                    state.started = time.perf_counter()
+                    tasks[asyncio.create_task(self._run_stage(run, run.stages[name]))] = name
+
+    async def _run_stage(self, run: PipelineRun, stage: Stage):
+        state = run.state[stage.name]
+        try:
+            value = await asyncio.wait_for(stage.run(run), stage.timeout)
+            if value is not None:
+                state.result = value
+            state.status = "partial" if state.items_failed else "done"
+        except asyncio.TimeoutError:
+            # Fan-out results that landed before the deadline still go downstream
+            state.status = "partial" if state.items_done else "timeout"
+            state.error = f"timed out after {stage.timeout}s"
+        except asyncio.CancelledError:
+            state.status = "cancelled"
+            raise
+        except Exception as e:
+            state.status = "failed"
+            state.error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Pipeline {run.id} stage {stage.name} failed: {e}", flush=True)
+        finally:
+            state.finished = time.perf_counter()
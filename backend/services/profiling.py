@@ -0,0 +1,264 @@
+"""
+Profiling – On-demand sampling profiler and slow-request capture.
+
+The sampler is a daemon thread that walks sys._current_frames() every few
+milliseconds while a session is open and folds the stacks into the
+collapsed format read by flamegraph.pl, speedscope and inferno. Suspended
+coroutines are not on any thread's stack, so the event loop thread shows
+where CPU goes, not where requests wait; the slow-request recorder covers
+waiting. Each request carries a RequestTrace in a ContextVar; code marks
+its phases with `with phase("save"):` and every SQL statement adds its
+time (and text) to the trace. Requests over the threshold are kept in a
+ring buffer. Nothing here touches the engine's `echo`.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+
+from config import settings
+
+
+class ProfilerBusy(RuntimeError):
+    """A profiling session is already running."""
+
+
+class ProfileSession:
+    """One sampling run; stop() joins the thread and returns the collapsed stacks."""
+
+    def __init__(self, seconds: float, interval: float):
+        self.seconds = seconds
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.started_at = datetime.now(timezone.utc)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                self.stacks[collapse(frame, names.get(ident, str(ident)))] += 1
+            self.samples += 1
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def collapse(frame, thread_name: str) -> str:
+    """Root-first `thread;func (file:line);...` with frames in py-spy style."""
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    frames.append(f"thread:{thread_name}")
+    return ";".join(reversed(frames))
+
+
+class SamplingProfiler:
+    """At most one session per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.session: Optional[ProfileSession] = None
+
+    def start(self, seconds: float, interval_ms: float) -> ProfileSession:
+        with self._lock:
+            if self.session is not None:
+                raise ProfilerBusy("A profiling session is already running")
+            self.session = ProfileSession(seconds, interval_ms / 1000)
+        self.session.start()
+        print(f"🔬 Sampling profiler on for {seconds:g}s every {interval_ms:g}ms", flush=True)
+        return self.session
+
+    def finish(self, session: ProfileSession) -> str:
+        try:
+            return session.stop()
+        finally:
+            with self._lock:
+                self.session = None
+            print(f"🔬 Sampling profiler off ({session.samples} samples, {len(session.stacks)} stacks)", flush=True)
+
+
+class RequestTrace:
+    """Phase timings and SQL statements of one request."""
+
+    __slots__ = ("phases", "statements", "db_ms", "db_count", "open")
+
+    def __init__(self):
+        self.phases: Dict[str, List[float]] = {}
+        self.statements: List[Dict[str, Any]] = []
+        self.db_ms = 0.0
+        self.db_count = 0
+        self.open: List["Phase"] = []  # phases being timed, innermost last
+
+    def add(self, name: str, ms: float):
+        entry = self.phases.get(name)
+        if entry is None:
+            self.phases[name] = [ms, 1]
+        else:
+            entry[0] += ms
+            entry[1] += 1
+
+    def add_statement(self, statement: str, ms: float):
+        self.db_ms += ms
+        self.db_count += 1
+        if len(self.statements) < settings.slow_request_max_statements:
+            self.statements.append({"ms": round(ms, 3), "sql": " ".join(statement.split())[:500]})
+
+
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+class Phase:
+    """Times a block; nested phases are subtracted, so each phase reports its own time."""
+
+    __slots__ = ("name", "trace", "started", "nested_ms")
+
+    def __init__(self, name: str, trace: RequestTrace):
+        self.name = name
+        self.trace = trace
+        self.nested_ms = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.trace.open.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.started) * 1000
+        trace = self.trace
+        if trace.open and trace.open[-1] is self:
+            trace.open.pop()
+            if trace.open:
+                trace.open[-1].nested_ms += ms
+        elif self in trace.open:  # overlapped by a concurrent phase of the same request
+            trace.open.remove(self)
+        trace.add(self.name, ms - self.nested_ms)
+        return False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str):
+    """Time a block as a named phase of the current request (a no-op outside traced requests)."""
+    trace = current_trace.get()
+    return _NO_PHASE if trace is None else Phase(name, trace)
+
+
+def timed_phase(name: str):
+    """Decorator form of phase() for sync functions."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class SlowRequestRecorder:
+    """Keeps the most recent requests slower than threshold_ms, with their phases and SQL."""
+
+    def __init__(self):
+        self.threshold_ms: float = settings.slow_request_ms
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=settings.slow_request_keep)
+        self.captured = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def begin(self):
+        """Attach a trace to the running request; returns the ContextVar token."""
+        return current_trace.set(RequestTrace())
+
+    def finish(self, token, method: str, path: str, route: Optional[str], status: int, ms: float):
+        trace = current_trace.get()
+        current_trace.reset(token)
+        if trace is None or ms < self.threshold_ms:
+            return
+        phases = {
+            name: {"ms": round(total, 2), "count": count}
+            for name, (total, count) in sorted(trace.phases.items(), key=lambda kv: -kv[1][0])
+        }
+        record = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status,
+            "duration_ms": round(ms, 2),
+            "phases": phases,
+            "other_ms": round(max(0.0, ms - sum(total for total, _ in trace.phases.values())), 2),
+            "db": {"statements": trace.db_count, "ms": round(trace.db_ms, 2)},
+            "sql": trace.statements,
+        }
+        self.recent.append(record)
+        self.captured += 1
+        top = ", ".join(f"{name} {p['ms']:.0f}ms" for name, p in list(phases.items())[:4])
+        print(f"🐢 Slow request {method} {path} {ms:.0f}ms ({top or 'no phases'}; "
+              f"{trace.db_count} SQL {trace.db_ms:.0f}ms)", flush=True)
+
+    def snapshot(self, limit: int) -> Dict[str, Any]:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "captured": self.captured,
+            "requests": list(self.recent)[-limit:][::-1],
+        }
+
+
+def trace_engine(engine):
+    """Time each statement for the request trace and, above db_log_sql_ms, log it with its timing."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._trace_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_trace_started", None)
+        if started is None:
+            return
+        ms = (time.perf_counter() - started) * 1000
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add_statement(statement, ms)
+        threshold = settings.db_log_sql_ms
+        if threshold is not None and ms >= threshold:
+            print(f"🗄️ SQL {ms:.2f}ms: {' '.join(statement.split())[:300]}", flush=True)
+
+
+sampling_profiler = SamplingProfiler()
+slow_requests = SlowRequestRecorder()
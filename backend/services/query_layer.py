@@ -0,0 +1,90 @@
+"""
+Query Layer – Dialect-aware query builders shared by the routers and services.
+Routers ask for a search, skill filter, upsert or time bucket and get the native
+form for the backend in use: JSONB/GIN and date_trunc on PostgreSQL, the skill
+posting lists and strftime on SQLite.
+"""
+from datetime import datetime
+from typing import List
+from sqlalchemy import Text, cast, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Candidate
+
+_SQLITE_BUCKET_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00",
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+
+def dialect_of(bind) -> str:
+    """Dialect name for a session, connection or engine."""
+    if isinstance(bind, AsyncSession):
+        bind = bind.get_bind()
+    return bind.dialect.name
+
+
+def insert_for(dialect: str, table):
+    """INSERT construct supporting on_conflict_do_nothing / on_conflict_do_update."""
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def text_search(dialect: str, term: str, *columns):
+    """Case-insensitive substring match on any of the columns."""
+    pattern = f"%{term}%"
+    if dialect == "postgresql":
+        return or_(*(c.ilike(pattern) for c in columns))
+    # SQLite LIKE is already case-insensitive for ASCII; skip lower() on every row
+    return or_(*(c.like(pattern) for c in columns))
+
+
+def time_bucket(dialect: str, column, granularity: str):
+    """Truncate a timestamp column to the start of its minute/hour/day."""
+    if dialect == "postgresql":
+        return func.date_trunc(granularity, column)
+    return func.strftime(_SQLITE_BUCKET_FORMATS[granularity], column)
+
+
+def group_concat(dialect: str, column):
+    """Comma-separated aggregate of a column's values."""
+    if dialect == "postgresql":
+        return func.string_agg(cast(column, Text), ",")
+    return func.group_concat(column)
+
+
+def bucket_value(value) -> datetime:
+    """Normalize a time_bucket() result to a datetime (SQLite returns text)."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+class JsonbSkillFilter:
+    """Skill filter on PostgreSQL: ?& / ?| against the GIN index on lower(skills)."""
+
+    def __init__(self, names: List[str], match_all: bool):
+        self.names = names
+        self.match_all = match_all
+
+    @property
+    def clause(self):
+        skills = cast(func.lower(cast(Candidate.skills, Text)), JSONB)
+        values = array(self.names)
+        return skills.has_all(values) if self.match_all else skills.has_any(values)
+
+    def count_query(self):
+        return select(func.count()).select_from(Candidate).where(self.clause)
+
+
+async def skill_filter(db: AsyncSession, skills: List[str], match_all: bool = True):
+    """AND/OR skill filter for Candidate with .clause and .count_query(), or None if no skills given."""
+    from services.skill_index import skill_index, normalize_skill
+
+    if dialect_of(db) == "postgresql":
+        names = sorted({normalize_skill(s) for s in skills if s and normalize_skill(s)})
+        return JsonbSkillFilter(names, match_all) if names else None
+    return await skill_index.resolve_filter(db, skills, match_all)
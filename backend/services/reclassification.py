@@ -0,0 +1,200 @@
+"""
+Reclassification – Fingerprint-based incremental classification.
+Each classification stores a hash of the profile inputs it was computed from.
+Classifying an unchanged candidate again is a no-op, and a changed candidate's
+single classification row is upserted in place. The stale job walks the
+candidates by id and only classifies those that were never classified or whose
+fingerprint no longer matches.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from agents.classification_agent import classification_agent
+from config import settings
+from database import engine
+from models import Candidate, Classification
+from services.event_writer import activity_writer
+from services.leaderboard import leaderboards
+from services.metrics import cache_requests
+from services.response_cache import response_cache
+from services.query_layer import dialect_of, insert_for
+from services.skill_index import normalize_skill
+
+# Bump when the prompt or the local model's inputs change so every row counts as stale
+FINGERPRINT_VERSION = 1
+PROFILE_COLUMNS = (Candidate.id, Candidate.name, Candidate.title, Candidate.company, Candidate.skills,
+                   Candidate.experience)
+
+
+def candidate_profile(name, title, company, skills, experience) -> Dict:
+    """The inputs a classification is computed from."""
+    return {"name": name, "title": title, "company": company, "skills": skills or [], "experience": experience}
+
+
+def profile_fingerprint(profile: Dict) -> str:
+    """sha256 over the normalized classification inputs; the name does not affect the result."""
+    key = [
+        FINGERPRINT_VERSION,
+        " ".join((profile.get("title") or "").lower().split()),
+        " ".join((profile.get("company") or "").lower().split()),
+        sorted({normalize_skill(s) for s in profile.get("skills") or [] if s}),
+        " ".join((profile.get("experience") or "").lower().split()),
+    ]
+    return hashlib.sha256(json.dumps(key, separators=(",", ":")).encode()).hexdigest()
+
+
+def _values(candidate_id: int, result: Dict, fingerprint: str) -> Dict:
+    return {
+        "candidate_id": candidate_id,
+        "category": result["category"],
+        "confidence": result["confidence"],
+        "seniority": result.get("seniority"),
+        "culture_fit": result.get("culture_fit"),
+        "source": result.get("source"),
+        "fingerprint": fingerprint,
+    }
+
+
+def _upsert(dialect: str, rows: List[Dict]):
+    stmt = insert_for(dialect, Classification)
+    return stmt.on_conflict_do_update(
+        index_elements=[Classification.candidate_id],
+        set_={
+            **{name: stmt.excluded[name] for name in rows[0] if name != "candidate_id"},
+            "created_at": func.now(),
+        },
+    )
+
+
+async def upsert_classification(db: AsyncSession, candidate_id: int, result: Dict, fingerprint: str) -> Classification:
+    """Insert or replace the candidate's classification and return the ORM row."""
+    values = _values(candidate_id, result, fingerprint)
+    stmt = _upsert(dialect_of(db), [values]).values(**values).returning(Classification)
+    row = (await db.scalars(stmt, execution_options={"populate_existing": True})).one()
+    leaderboards.mark_dirty([candidate_id])
+    response_cache.invalidate_on_commit(db.sync_session, "classifications")
+    return row
+
+
+async def classify_one(
+    db: AsyncSession, candidate_id: int, force: bool = False
+) -> Tuple[Dict, Classification, bool]:
+    """Classify one candidate unless its fingerprint is unchanged; returns (profile, classification, reused)."""
+    row = (await db.execute(
+        select(*PROFILE_COLUMNS, Classification)
+        .outerjoin(Classification, Classification.candidate_id == Candidate.id)
+        .where(Candidate.id == candidate_id)
+    )).first()
+    if row is None:
+        raise LookupError(f"Candidate {candidate_id} not found")
+    *fields, existing = row[1:]
+    profile = candidate_profile(*fields)
+    fingerprint = profile_fingerprint(profile)
+    if existing is not None and existing.fingerprint == fingerprint and not force:
+        cache_requests.inc("classification_fingerprint", "hit")
+        return profile, existing, True
+    cache_requests.inc("classification_fingerprint", "miss")
+    result = await classification_agent.classify_candidate(profile)
+    return profile, await upsert_classification(db, candidate_id, result, fingerprint), False
+
+
+class StaleReclassifier:
+    """Background job that classifies only new or changed candidates."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.progress: Dict = {"running": False}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, limit: Optional[int] = None) -> bool:
+        """Start the job unless it is already running."""
+        if self.running:
+            return False
+        self.progress = {"running": True}
+        self._task = asyncio.create_task(self._run_quietly(limit))
+        return True
+
+    async def _run_quietly(self, limit: Optional[int]):
+        try:
+            await self.run(limit)
+        except Exception as e:
+            self.progress.update(running=False, error=str(e))
+            print(f"⚠️ Stale reclassification failed: {e}", flush=True)
+
+    async def run(self, limit: Optional[int] = None) -> Dict:
+        """Scan every candidate; classify and upsert those whose fingerprint changed (at most limit)."""
+        started = time.perf_counter()
+        sources: Counter = Counter()
+        progress = self.progress = {"running": True, "scanned": 0, "stale": 0, "classified": 0, "failed": 0,
+                                    "sources": sources, "elapsed_seconds": 0.0}
+        semaphore = asyncio.Semaphore(settings.reclassify_concurrency)
+
+        async def classify(profile: Dict, fingerprint: str):
+            async with semaphore:
+                try:
+                    return _values(profile["id"], await classification_agent.classify_candidate(profile), fingerprint)
+                except Exception as e:
+                    print(f"⚠️ Could not classify candidate {profile['id']}: {e}", flush=True)
+                    progress["failed"] += 1
+                    return None
+
+        last_id = 0
+        while limit is None or progress["stale"] < limit:
+            async with engine.connect() as conn:
+                rows = (await conn.execute(
+                    select(*PROFILE_COLUMNS, Classification.fingerprint)
+                    .outerjoin(Classification, Classification.candidate_id == Candidate.id)
+                    .where(Candidate.id > last_id)
+                    .order_by(Candidate.id)
+                    .limit(settings.reclassify_batch_size)
+                )).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            progress["scanned"] += len(rows)
+
+            stale = []
+            for candidate_id, *fields, stored in rows:
+                profile = {"id": candidate_id, **candidate_profile(*fields)}
+                fingerprint = profile_fingerprint(profile)
+                if fingerprint != stored:
+                    stale.append((profile, fingerprint))
+            cache_requests.inc("classification_fingerprint", "hit", amount=len(rows) - len(stale))
+            cache_requests.inc("classification_fingerprint", "miss", amount=len(stale))
+            if limit is not None:
+                stale = stale[:limit - progress["stale"]]
+            progress["stale"] += len(stale)
+
+            results = [r for r in await asyncio.gather(*(classify(p, f) for p, f in stale)) if r]
+            if results:
+                async with engine.begin() as conn:
+                    await conn.execute(_upsert(conn.dialect.name, results), results)
+                leaderboards.mark_dirty(r["candidate_id"] for r in results)
+                response_cache.invalidate("classifications")
+                progress["classified"] += len(results)
+                sources.update(r["source"] for r in results)
+            progress["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+
+        progress.update(running=False, sources=dict(sources), elapsed_seconds=round(time.perf_counter() - started, 2))
+        if progress["classified"]:
+            activity_writer.log(
+                agent="classification",
+                action=f"Reclassified {progress['classified']} changed candidates",
+                details={k: progress[k] for k in ("scanned", "stale", "failed", "sources")},
+            )
+        print(f"🔁 Reclassified {progress['classified']}/{progress['stale']} stale of "
+              f"{progress['scanned']} candidates in {progress['elapsed_seconds']}s", flush=True)
+        return progress
+
+
+stale_reclassifier = StaleReclassifier()
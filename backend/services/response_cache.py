@@ -0,0 +1,174 @@
+"""
+Response Cache – Single-flight coalescing, short-TTL memoization and ETags for hot reads.
+
+Dashboards in many open tabs poll the same endpoints at the same moment.
+`response_cache.respond(request, name, compute)` serves them from one
+computation:
+
+  * concurrent identical requests join one SingleFlight task; it runs on
+    its own session, so one caller disconnecting does not cancel the others;
+  * the serialized body is kept for RESPONSE_CACHE_TTL_SECONDS, and dropped
+    early when a write touches one of its tags (committed ORM changes,
+    activity events, connector syncs);
+  * the ETag is a hash of those bytes, so If-None-Match is answered with a
+    304 straight from the entry, without rebuilding or re-serializing.
+
+Invalidation bumps a per-tag generation; an entry or flight is only reused
+while the generations it was computed under are current, so a request
+arriving after a write never joins a computation that started before it.
+
+Only ORM flushes are seen automatically. Code that writes cached tables with
+core statements (bulk imports, classification upserts) must call
+invalidate() after its transaction, or invalidate_on_commit() inside one.
+"""
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import async_session
+from models import Candidate, Classification, Intake
+from services.metrics import cache_requests
+from services.single_flight import SingleFlight
+
+Compute = Callable[[Any], Awaitable[Any]]
+
+# Committed ORM changes invalidate these tags
+MODEL_TAGS = {Candidate: "candidates", Classification: "classifications", Intake: "intakes"}
+
+
+class Entry:
+    __slots__ = ("body", "etag", "expires", "generations")
+
+    def __init__(self, body: bytes, etag: str, expires: float, generations: Tuple[int, ...]):
+        self.body = body
+        self.etag = etag
+        self.expires = expires
+        self.generations = generations
+
+
+class Stats:
+    __slots__ = ("hits", "coalesced", "misses", "not_modified", "stored")
+
+    def __init__(self):
+        self.hits = self.coalesced = self.misses = self.not_modified = self.stored = 0
+
+
+class ResponseCache:
+    def __init__(self):
+        self.entries: Dict[Tuple, Entry] = {}
+        self.flight = SingleFlight()
+        self.generation: Dict[str, int] = {}
+        self.invalidations = 0
+        self.stats_by_name: Dict[str, Stats] = {}
+
+    def invalidate(self, *tags: str):
+        for tag in tags:
+            self.generation[tag] = self.generation.get(tag, 0) + 1
+        self.invalidations += 1
+
+    def invalidate_on_commit(self, session: Session, *tags: str):
+        """Invalidate `tags` when `session` commits; for core statements, which no flush reports."""
+        session.info.setdefault("response_cache_tags", set()).update(tags)
+
+    def _generations(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self.generation.get(tag, 0) for tag in tags)
+
+    async def respond(self, request: Request, name: str, compute: Compute, tags: Iterable[str] = (),
+                      ttl: Optional[float] = None) -> Response:
+        """Serve `compute(db)` as JSON through the flight, the TTL entry and the request's ETag."""
+        tags = tuple(tags)
+        ttl = settings.response_cache_ttl_seconds if ttl is None else ttl
+        stats = self.stats_by_name.get(name)
+        if stats is None:
+            stats = self.stats_by_name[name] = Stats()
+        key = (name, tuple(sorted(request.query_params.multi_items())))
+        generations = self._generations(tags)
+
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires > time.monotonic() and entry.generations == generations:
+            stats.hits += 1
+            cache_requests.inc(name, "hit")
+        else:
+            entry, shared = await self.flight.do(key + (generations,), lambda: self._build(compute, ttl, generations))
+            if shared:
+                stats.coalesced += 1
+                cache_requests.inc(name, "coalesced")
+            else:
+                stats.misses += 1
+                cache_requests.inc(name, "miss")
+                # A write that landed while computing makes the result stale already; serve but don't keep it
+                if ttl > 0 and entry.generations == self._generations(tags):
+                    self.store(key, entry)
+                    stats.stored += 1
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*"
+                              or entry.etag in (t.strip() for t in if_none_match.split(","))):
+            stats.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(entry.body, media_type="application/json", headers=headers)
+
+    def store(self, key: Tuple, entry: Entry):
+        self.entries.pop(key, None)
+        if len(self.entries) >= settings.response_cache_max_entries:
+            del self.entries[next(iter(self.entries))]  # oldest stored first
+        self.entries[key] = entry
+
+    async def _build(self, compute: Compute, ttl: float, generations: Tuple[int, ...]) -> Entry:
+        async with async_session() as db:
+            result = await compute(db)
+        body = json.dumps(jsonable_encoder(result), separators=(",", ":")).encode()
+        etag = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        return Entry(body, etag, time.monotonic() + ttl, generations)
+
+    def stats(self) -> Dict[str, Any]:
+        caches = {}
+        for name, s in sorted(self.stats_by_name.items()):
+            lookups = s.hits + s.coalesced + s.misses
+            caches[name] = {
+                "hits": s.hits,
+                "coalesced": s.coalesced,
+                "misses": s.misses,
+                "not_modified": s.not_modified,
+                "hit_rate": round((s.hits + s.coalesced) / lookups, 4) if lookups else None,
+            }
+        return {
+            "ttl_seconds": settings.response_cache_ttl_seconds,
+            "entries": len(self.entries),
+            "in_flight": len(self.flight.flights),
+            "invalidations": self.invalidations,
+            "generations": dict(self.generation),
+            "caches": caches,
+        }
+
+
+response_cache = ResponseCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_tags(session: Session, flush_context):
+    """Remember which cached tags this transaction wrote; they are invalidated once it commits."""
+    tags = {MODEL_TAGS[type(obj)] for obj in (*session.new, *session.dirty, *session.deleted)
+            if type(obj) in MODEL_TAGS}
+    if tags:
+        session.info.setdefault("response_cache_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tags(session: Session):
+    tags = session.info.pop("response_cache_tags", None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_tags(session: Session):
+    session.info.pop("response_cache_tags", None)
@@ -0,0 +1,358 @@
+"""
+Rollup Service – Compacts activity_logs and api_logs into minute/hour/day rollups
+and ages raw rows and fine-grained rollups out past their retention windows.
+
+Minute rollups are computed from raw rows, hour rollups from minute rollups and
+day rollups from hour rollups, so raw rows only need to live until their minute
+has been rolled up. Each level keeps a watermark so every run only touches new data.
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import async_session
+from models import ActivityLog, ApiLog, ActivityRollup, ApiLogRollup, RollupWatermark
+from services.histogram import LogHistogram
+from services.query_layer import dialect_of, time_bucket, bucket_value
+
+STEPS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+COARSER = [("hour", "minute"), ("day", "hour")]
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def normalize_endpoint(path: str) -> str:
+    """Collapse numeric path segments so /candidates/42 and /candidates/7 share a rollup."""
+    return _ID_SEGMENT.sub("/{id}", path)
+
+
+def utc_naive(dt: datetime) -> datetime:
+    """Normalize to naive UTC, which is how SQLite hands timestamps back."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def floor_time(dt: datetime, granularity: str) -> datetime:
+    dt = utc_naive(dt).replace(second=0, microsecond=0)
+    if granularity in ("hour", "day"):
+        dt = dt.replace(minute=0)
+    if granularity == "day":
+        dt = dt.replace(hour=0)
+    return dt
+
+
+def granularity_for(window: timedelta) -> str:
+    """Finest rollup level that is cheap to scan for a window and still retained."""
+    if window <= timedelta(hours=24):
+        return "minute"
+    if window <= timedelta(days=settings.rollup_hour_retention_days):
+        return "hour"
+    return "day"
+
+
+class _Stream:
+    """One raw log table and the rollup table it compacts into."""
+
+    def __init__(self, name: str, raw, rollup, dims: Tuple[str, ...], with_latency: bool):
+        self.name = name
+        self.raw = raw
+        self.rollup = rollup
+        self.dims = dims
+        self.with_latency = with_latency
+
+
+ACTIVITY = _Stream("activity_logs", ActivityLog, ActivityRollup, ("agent",), with_latency=False)
+API_LOGS = _Stream("api_logs", ApiLog, ApiLogRollup, ("endpoint", "source"), with_latency=True)
+
+
+class _Bucket:
+    __slots__ = ("count", "errors", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.histogram = LogHistogram()
+
+
+class RollupCompactor:
+    """Background job that maintains rollups and enforces retention."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.last_run: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.rows_rolled = 0
+        self.raw_deleted = 0
+        self.rollups_deleted = 0
+
+    # ── Watermarks ──
+
+    async def _get_watermark(self, db: AsyncSession, name: str) -> Optional[datetime]:
+        result = await db.execute(select(RollupWatermark.watermark).where(RollupWatermark.name == name))
+        value = result.scalar_one_or_none()
+        return utc_naive(value) if value else None
+
+    async def _set_watermark(self, db: AsyncSession, name: str, value: datetime):
+        existing = await db.get(RollupWatermark, name)
+        if existing:
+            existing.watermark = value
+        else:
+            db.add(RollupWatermark(name=name, watermark=value))
+
+    # ── Rolling ──
+
+    def _rows_for(self, stream: _Stream, granularity: str, buckets: Dict[Tuple, _Bucket]) -> List[Dict[str, Any]]:
+        rows = []
+        for (bucket_start, *dims), bucket in buckets.items():
+            row = {"granularity": granularity, "bucket_start": bucket_start, "count": bucket.count}
+            row.update(zip(stream.dims, dims))
+            if stream.with_latency:
+                row.update({
+                    "errors": bucket.errors,
+                    "latency_p50": bucket.histogram.percentile(50),
+                    "latency_p95": bucket.histogram.percentile(95),
+                    "latency_p99": bucket.histogram.percentile(99),
+                    "histogram": bucket.histogram.to_json(),
+                })
+            rows.append(row)
+        return rows
+
+    async def _roll_raw(self, db: AsyncSession, stream: _Stream, horizon: datetime) -> Optional[datetime]:
+        """Roll raw rows into minute buckets up to the last closed minute."""
+        name = f"{stream.name}:minute"
+        start = await self._get_watermark(db, name)
+        if start is None:
+            first = (await db.execute(select(func.min(stream.raw.created_at)))).scalar()
+            if first is None:
+                return None
+            start = floor_time(first, "minute")
+        end = floor_time(horizon, "minute")
+        if start >= end:
+            return start
+
+        buckets: Dict[Tuple, _Bucket] = {}
+        if stream.with_latency:
+            # Latency histograms and endpoint normalization happen in Python
+            result = await db.execute(
+                select(ApiLog.created_at, ApiLog.endpoint, ApiLog.source, ApiLog.status_code, ApiLog.duration_ms)
+                .where(ApiLog.created_at >= start, ApiLog.created_at < end)
+            )
+            for row in result:
+                key = (floor_time(row.created_at, "minute"), normalize_endpoint(row.endpoint), row.source or "")
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = _Bucket()
+                bucket.count += 1
+                if row.status_code >= 400:
+                    bucket.errors += 1
+                if row.duration_ms is not None:
+                    bucket.histogram.record(row.duration_ms)
+        else:
+            # Counts only: let the database bucket and aggregate natively
+            bucket_col = time_bucket(dialect_of(db), ActivityLog.created_at, "minute")
+            result = await db.execute(
+                select(bucket_col, ActivityLog.agent, func.count())
+                .where(ActivityLog.created_at >= start, ActivityLog.created_at < end)
+                .group_by(bucket_col, ActivityLog.agent)
+            )
+            for bucket_start, agent, count in result.all():
+                bucket = buckets[(utc_naive(bucket_value(bucket_start)), agent)] = _Bucket()
+                bucket.count = count
+
+        rows = self._rows_for(stream, "minute", buckets)
+        if rows:
+            await db.execute(insert(stream.rollup), rows)
+            self.rows_rolled += sum(r["count"] for r in rows)
+        await self._set_watermark(db, name, end)
+        return end
+
+    async def _roll_up(self, db: AsyncSession, stream: _Stream, granularity: str, finer: str,
+                       finer_watermark: Optional[datetime]) -> Optional[datetime]:
+        """Merge completed finer buckets into the next coarser level."""
+        if finer_watermark is None:
+            return None
+        name = f"{stream.name}:{granularity}"
+        start = await self._get_watermark(db, name)
+        rollup = stream.rollup
+        if start is None:
+            first = (await db.execute(
+                select(func.min(rollup.bucket_start)).where(rollup.granularity == finer)
+            )).scalar()
+            if first is None:
+                return None
+            start = floor_time(first, granularity)
+        end = floor_time(finer_watermark, granularity)
+        if start >= end:
+            return start
+
+        buckets: Dict[Tuple, _Bucket] = {}
+        result = await db.execute(
+            select(rollup).where(
+                rollup.granularity == finer,
+                rollup.bucket_start >= start,
+                rollup.bucket_start < end,
+            )
+        )
+        for r in result.scalars():
+            key = (floor_time(r.bucket_start, granularity), *(getattr(r, d) for d in stream.dims))
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = _Bucket()
+            bucket.count += r.count
+            if stream.with_latency:
+                bucket.errors += r.errors
+                bucket.histogram.merge(LogHistogram.from_json(r.histogram))
+
+        rows = self._rows_for(stream, granularity, buckets)
+        if rows:
+            await db.execute(insert(rollup), rows)
+        await self._set_watermark(db, name, end)
+        return end
+
+    # ── Retention ──
+
+    async def _expire(self, db: AsyncSession, stream: _Stream, now: datetime,
+                      watermarks: Dict[str, Optional[datetime]]):
+        """Delete raw rows and fine rollups that are past retention and already rolled up."""
+        minute_wm = watermarks.get("minute")
+        if minute_wm is not None:
+            cutoff = min(now - timedelta(hours=settings.raw_log_retention_hours), minute_wm)
+            result = await db.execute(delete(stream.raw).where(stream.raw.created_at < cutoff))
+            self.raw_deleted += result.rowcount or 0
+
+        retention = {
+            "minute": (timedelta(days=settings.rollup_minute_retention_days), watermarks.get("hour")),
+            "hour": (timedelta(days=settings.rollup_hour_retention_days), watermarks.get("day")),
+        }
+        for granularity, (keep, coarser_wm) in retention.items():
+            if coarser_wm is None:
+                continue
+            cutoff = min(now - keep, coarser_wm)
+            result = await db.execute(
+                delete(stream.rollup).where(
+                    stream.rollup.granularity == granularity,
+                    stream.rollup.bucket_start < cutoff,
+                )
+            )
+            self.rollups_deleted += result.rowcount or 0
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Run one compaction pass over both log tables."""
+        started = datetime.now(timezone.utc)
+        now = utc_naive(started)
+        horizon = now - timedelta(seconds=settings.rollup_lag_seconds)
+
+        async with async_session() as db:
+            for stream in (ACTIVITY, API_LOGS):
+                watermarks = {"minute": await self._roll_raw(db, stream, horizon)}
+                for granularity, finer in COARSER:
+                    watermarks[granularity] = await self._roll_up(
+                        db, stream, granularity, finer, watermarks[finer]
+                    )
+                await self._expire(db, stream, now, watermarks)
+            await db.commit()
+
+        self.runs += 1
+        self.last_run = started
+        self.last_duration_ms = round((datetime.now(timezone.utc) - started).total_seconds() * 1000, 1)
+        return self.stats()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"❌ Rollup compaction failed: {e}", flush=True)
+            await asyncio.sleep(settings.rollup_interval_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_duration_ms": self.last_duration_ms,
+            "rows_rolled": self.rows_rolled,
+            "raw_deleted": self.raw_deleted,
+            "rollups_deleted": self.rollups_deleted,
+        }
+
+
+# ── Rollup Queries ──
+
+async def activity_counts(db: AsyncSession, window: timedelta) -> Dict[str, int]:
+    """Activity events per agent over the window."""
+    granularity = granularity_for(window)
+    since = floor_time(datetime.now(timezone.utc) - window, granularity)
+    result = await db.execute(
+        select(ActivityRollup.agent, func.sum(ActivityRollup.count))
+        .where(ActivityRollup.granularity == granularity, ActivityRollup.bucket_start >= since)
+        .group_by(ActivityRollup.agent)
+    )
+    return {agent: int(count) for agent, count in result.all()}
+
+
+async def api_stats(db: AsyncSession, window: timedelta, by_endpoint: bool = False) -> List[Dict[str, Any]]:
+    """API call counts, error rate and latency percentiles over the window.
+
+    Returns one overall entry, or one entry per endpoint/source when by_endpoint is set.
+    """
+    granularity = granularity_for(window)
+    since = floor_time(datetime.now(timezone.utc) - window, granularity)
+    result = await db.execute(
+        select(ApiLogRollup.endpoint, ApiLogRollup.source, ApiLogRollup.count,
+               ApiLogRollup.errors, ApiLogRollup.histogram)
+        .where(ApiLogRollup.granularity == granularity, ApiLogRollup.bucket_start >= since)
+    )
+
+    groups: Dict[Tuple, _Bucket] = {}
+    for endpoint, source, count, errors, histogram in result.all():
+        key = (endpoint, source) if by_endpoint else ()
+        bucket = groups.get(key)
+        if bucket is None:
+            bucket = groups[key] = _Bucket()
+        bucket.count += count
+        bucket.errors += errors
+        bucket.histogram.merge(LogHistogram.from_json(histogram))
+
+    if not by_endpoint and not groups:
+        groups[()] = _Bucket()
+
+    stats = []
+    for key, bucket in groups.items():
+        entry = {
+            "requests": bucket.count,
+            "errors": bucket.errors,
+            "error_rate": round(bucket.errors / bucket.count, 4) if bucket.count else 0.0,
+            "latency_p50": bucket.histogram.percentile(50),
+            "latency_p95": bucket.histogram.percentile(95),
+            "latency_p99": bucket.histogram.percentile(99),
+        }
+        if by_endpoint:
+            entry = {"endpoint": key[0], "source": key[1], **entry}
+        stats.append(entry)
+    stats.sort(key=lambda e: e["requests"], reverse=True)
+    return stats
+
+
+rollup_compactor = RollupCompactor()
@@ -0,0 +1,373 @@
+"""
+Semantic Search – Embedding search over candidate profiles.
+
+Vectors live in a float32 memory-mapped matrix on disk (one row per candidate,
+grown by doubling) so the pool survives restarts without re-embedding. Queries
+go through an IVF index: spherical k-means centroids partition the rows into
+inverted lists and a query scans only the nprobe closest lists. New and edited
+candidates are embedded incrementally and appended to their nearest list; small
+pools are searched exhaustively.
+"""
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+
+from config import settings
+from database import engine
+from models import Candidate
+from services.embeddings import create_embedder
+
+PROFILE_FIELDS = ("title", "skills", "experience", "company", "location")
+BRUTE_FORCE_CHUNK = 65_536
+
+
+def profile_text(title=None, skills=None, experience=None, company=None, location=None) -> str:
+    """The text embedded for a candidate: role, skills and context, without the name."""
+    parts = [title, "; ".join(skills or []), experience, company, location]
+    return " | ".join(p for p in parts if p)
+
+
+class VectorStore:
+    """Append-mostly float32 matrix on disk with a candidate id per row."""
+
+    def __init__(self, directory: str, dim: int):
+        self.directory = directory
+        self.dim = dim
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._ids_path = os.path.join(directory, "ids.npy")
+        self._meta_path = os.path.join(directory, "meta.json")
+
+        meta = self._read_meta()
+        if meta and meta.get("dim") == dim and os.path.exists(self._ids_path):
+            self.count = meta["count"]
+            self.capacity = meta["capacity"]
+            ids = np.load(self._ids_path)
+        else:
+            self.count, self.capacity, ids = 0, 1024, np.zeros(0, dtype=np.int64)
+            self._resize_file(self.capacity)
+        self.ids = np.full(self.capacity, -1, dtype=np.int64)
+        self.ids[:len(ids)] = ids
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, dim))
+        self.row_of: Dict[int, int] = {int(c): r for r, c in enumerate(self.ids[:self.count]) if c >= 0}
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _resize_file(self, capacity: int):
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+
+    def _grow(self, needed: int):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self.capacity:
+            return
+        self.vectors.flush()
+        del self.vectors
+        self._resize_file(capacity)
+        self.vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+        self.ids = np.concatenate([self.ids, np.full(capacity - self.capacity, -1, dtype=np.int64)])
+        self.capacity = capacity
+
+    @property
+    def max_id(self) -> int:
+        return int(self.ids[:self.count].max(initial=0))
+
+    def upsert(self, candidate_ids: Sequence[int], vectors: np.ndarray) -> np.ndarray:
+        """Write vectors in place for known ids and append the rest; returns their rows."""
+        rows = np.empty(len(candidate_ids), dtype=np.int64)
+        new = [i for i, c in enumerate(candidate_ids) if c not in self.row_of]
+        self._grow(self.count + len(new))
+        for i, candidate_id in enumerate(candidate_ids):
+            row = self.row_of.get(candidate_id)
+            if row is None:
+                row = self.count
+                self.count += 1
+                self.row_of[candidate_id] = row
+                self.ids[row] = candidate_id
+            rows[i] = row
+        self.vectors[rows] = vectors
+        return rows
+
+    def remove(self, candidate_ids: Iterable[int]) -> List[int]:
+        """Tombstone rows of deleted candidates."""
+        rows = [self.row_of.pop(c) for c in candidate_ids if c in self.row_of]
+        if rows:
+            self.ids[rows] = -1
+            self.vectors[rows] = 0
+        return rows
+
+    def flush(self):
+        self.vectors.flush()
+        tmp = self._ids_path + ".tmp.npy"
+        np.save(tmp, self.ids[:self.count])
+        os.replace(tmp, self._ids_path)
+        with open(self._meta_path + ".tmp", "w") as f:
+            json.dump({"dim": self.dim, "count": self.count, "capacity": self.capacity}, f)
+        os.replace(self._meta_path + ".tmp", self._meta_path)
+
+    def search_exact(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top k (rows, scores), scanning the matrix in chunks."""
+        best_rows, best_scores = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        for start in range(0, self.count, BRUTE_FORCE_CHUNK):
+            stop = min(start + BRUTE_FORCE_CHUNK, self.count)
+            scores = self.vectors[start:stop] @ query
+            scores[self.ids[start:stop] < 0] = -np.inf
+            rows = np.arange(start, stop)
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_rows) > k:
+                keep = np.argpartition(-best_scores, k - 1)[:k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+        order = np.argsort(-best_scores, kind="stable")
+        return best_rows[order], best_scores[order]
+
+
+class IVFIndex:
+    """Inverted-file ANN index over VectorStore rows."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+        self.assignment = np.zeros(0, dtype=np.int32)  # list per row, -1 = not indexed
+        self.trained_on = 0
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(self, store: VectorStore, iterations: int = 10, seed: int = 0):
+        """Spherical k-means on a sample, then assign every row."""
+        live = np.flatnonzero(store.ids[:store.count] >= 0)
+        n_lists = int(np.clip(2 * np.sqrt(len(live)), 16, settings.ann_max_lists))
+        rng = np.random.default_rng(seed)
+        sample = np.asarray(store.vectors[np.sort(rng.choice(live, min(len(live), 32 * n_lists), replace=False))])
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            nearest = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(nearest, kind="stable")
+            groups, starts = np.unique(nearest[order], return_index=True)
+            sums = np.zeros_like(centroids)
+            sums[groups] = np.add.reduceat(sample[order], starts, axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            centroids = np.where(empty[:, None], centroids, sums / np.where(norms == 0, 1, norms))
+        self.centroids = centroids.astype(np.float32)
+        self.lists = [np.zeros(0, dtype=np.int64) for _ in range(n_lists)]
+        self.assignment = np.full(store.capacity, -1, dtype=np.int32)
+        self.trained_on = len(live)
+        self.add(store, live)
+
+    def add(self, store: VectorStore, rows: np.ndarray):
+        """Assign rows to their nearest list; rows already indexed move lists lazily."""
+        if not self.trained or not len(rows):
+            return
+        if len(self.assignment) < store.capacity:
+            self.assignment = np.concatenate(
+                [self.assignment, np.full(store.capacity - len(self.assignment), -1, dtype=np.int32)]
+            )
+        nearest = np.empty(len(rows), dtype=np.int32)
+        for start in range(0, len(rows), BRUTE_FORCE_CHUNK):
+            chunk = rows[start:start + BRUTE_FORCE_CHUNK]
+            nearest[start:start + len(chunk)] = np.argmax(store.vectors[chunk] @ self.centroids.T, axis=1)
+        self.assignment[rows] = nearest
+        order = np.argsort(nearest, kind="stable")
+        bounds = np.searchsorted(nearest[order], np.arange(len(self.lists) + 1))
+        for list_id in np.unique(nearest):
+            members = rows[order[bounds[list_id]:bounds[list_id + 1]]]
+            self.lists[list_id] = np.concatenate([self.lists[list_id], members])
+
+    def search(self, store: VectorStore, query: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        probe = np.argsort(-(self.centroids @ query))[:nprobe]
+        rows = np.concatenate([self.lists[p] for p in probe])
+        # Drop stale entries: rows that moved to another list or were deleted
+        rows = rows[np.isin(self.assignment[rows], probe) & (store.ids[rows] >= 0)]
+        if not len(rows):
+            return rows, np.zeros(0, dtype=np.float32)
+        rows = np.unique(rows)
+        scores = store.vectors[rows] @ query
+        if len(rows) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return rows[order], scores[order]
+
+
+class SemanticSearch:
+    """Keeps candidate embeddings in sync with the database and answers similarity queries."""
+
+    def __init__(self):
+        self.embedder = None
+        self.store: Optional[VectorStore] = None
+        self.index: Optional[IVFIndex] = None
+        self.dirty: set = set()
+        self._lock = asyncio.Lock()
+        self._warmup: Optional[asyncio.Task] = None
+        self.embedded = 0
+        self.queries = 0
+        self.last_sync_ms = 0.0
+        self.last_query_ms = 0.0
+
+    def mark_dirty(self, candidate_ids: Iterable[int]):
+        """Queue candidates for re-embedding (changed outside the ORM, e.g. bulk upserts)."""
+        self.dirty.update(candidate_ids)
+
+    def start(self):
+        """Embed the backlog in the background so the first query does not pay for it."""
+        if settings.embedding_warmup:
+            self._warmup = asyncio.create_task(self._warm())
+
+    async def stop(self):
+        if self._warmup:
+            self._warmup.cancel()
+            try:
+                await self._warmup
+            except asyncio.CancelledError:
+                pass
+            self._warmup = None
+
+    async def _warm(self):
+        try:
+            await self.sync()
+        except Exception as e:
+            print(f"⚠️ Semantic search warm-up failed: {e}", flush=True)
+
+    async def _open(self):
+        if self.store is None:
+            self.embedder = await create_embedder()
+            directory = os.path.join(settings.embedding_dir, self.embedder.name)
+            self.store = await asyncio.to_thread(VectorStore, directory, self.embedder.dim)
+            self.index = IVFIndex(self.embedder.dim)
+
+    async def sync(self) -> int:
+        """Embed candidates added or changed since the last sync; retrain the index as the pool grows."""
+        async with self._lock:
+            await self._open()
+            started = time.perf_counter()
+            embedded = 0
+            batch = settings.embedding_batch_size
+
+            # Edited or deleted candidates; ids above the stored maximum are new and
+            # get picked up by the scan below
+            last_id = self.store.max_id
+            dirty = [c for c in self.dirty if c <= last_id]
+            self.dirty = set()
+            for start in range(0, len(dirty), batch):
+                chunk = dirty[start:start + batch]
+                async with engine.connect() as conn:
+                    rows = (await conn.execute(
+                        select(Candidate.id, *(getattr(Candidate, f) for f in PROFILE_FIELDS))
+                        .where(Candidate.id.in_(chunk))
+                    )).all()
+                found = {r[0] for r in rows}
+                self.store.remove([c for c in chunk if c not in found])
+                await self._embed_rows(rows)
+                embedded += len(rows)
+
+            # New candidates, in id order
+            while True:
+                async with engine.connect() as conn:
+                    rows = (await conn.execute(
+                        select(Candidate.id, *(getattr(Candidate, f) for f in PROFILE_FIELDS))
+                        .where(Candidate.id > last_id)
+                        .order_by(Candidate.id)
+                        .limit(batch)
+                    )).all()
+                if not rows:
+                    break
+                await self._embed_rows(rows)
+                embedded += len(rows)
+                last_id = rows[-1][0]
+
+            live = len(self.store.row_of)
+            if live >= settings.ann_min_vectors and (
+                not self.index.trained or live > settings.ann_retrain_growth * self.index.trained_on
+            ):
+                # Train a fresh index off the loop, then swap it in whole
+                index = IVFIndex(self.embedder.dim)
+                await asyncio.to_thread(index.train, self.store)
+                self.index = index
+                print(f"🧭 Trained ANN index: {len(self.index.lists)} lists over {live} vectors", flush=True)
+            if embedded:
+                await asyncio.to_thread(self.store.flush)
+            self.embedded += embedded
+            self.last_sync_ms = round((time.perf_counter() - started) * 1000, 1)
+            return embedded
+
+    async def _embed_rows(self, rows):
+        if not rows:
+            return
+        vectors = await self.embedder.embed([profile_text(*r[1:]) for r in rows])
+        stored = self.store.upsert([r[0] for r in rows], vectors)
+        self.index.add(self.store, stored)
+
+    async def search(self, query: str, k: int = 20) -> Tuple[List[Tuple[int, float]], bool]:
+        """Top k (candidate_id, cosine similarity) for a free-text query, and whether it was exact."""
+        await self.sync()
+        started = time.perf_counter()
+        vector = (await self.embedder.embed([query]))[0]
+        exact = not self.index.trained
+        if exact:
+            rows, scores = self.store.search_exact(vector, k)
+        else:
+            rows, scores = self.index.search(self.store, vector, k, settings.ann_nprobe)
+        self.queries += 1
+        self.last_query_ms = round((time.perf_counter() - started) * 1000, 2)
+        return [(int(self.store.ids[r]), float(s)) for r, s in zip(rows, scores)], exact
+
+    async def reindex(self) -> int:
+        """Re-embed every candidate from scratch (e.g. after changing the embedder)."""
+        async with self._lock:
+            await self._open()
+            directory = self.store.directory
+            for name in ("vectors.f32", "ids.npy", "meta.json"):
+                path = os.path.join(directory, name)
+                if os.path.exists(path):
+                    os.remove(path)
+            self.store = await asyncio.to_thread(VectorStore, directory, self.embedder.dim)
+            self.index = IVFIndex(self.embedder.dim)
+            self.dirty = set()
+        return await self.sync()
+
+    def stats(self) -> dict:
+        return {
+            "embedder": self.embedder.name if self.embedder else None,
+            "dim": self.embedder.dim if self.embedder else None,
+            "vectors": len(self.store.row_of) if self.store else 0,
+            "pending": len(self.dirty),
+            "index_lists": len(self.index.lists) if self.index else 0,
+            "index_trained_on": self.index.trained_on if self.index else 0,
+            "nprobe": settings.ann_nprobe,
+            "embedded": self.embedded,
+            "queries": self.queries,
+            "last_sync_ms": self.last_sync_ms,
+            "last_query_ms": self.last_query_ms,
+        }
+
+
+semantic_search = SemanticSearch()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_profile_changes(session: Session, flush_context):
+    """Queue candidates whose embedded profile fields changed or that were deleted."""
+    for obj in session.dirty:
+        if isinstance(obj, Candidate) and any(get_history(obj, f).has_changes() for f in PROFILE_FIELDS):
+            semantic_search.dirty.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Candidate):
+            semantic_search.dirty.add(obj.id)
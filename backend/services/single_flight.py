@@ -0,0 +1,73 @@
+"""
+Single Flight – Concurrent callers with the same key share one in-flight computation.
+
+The first caller (the leader) starts the computation as a task; callers
+arriving before it finishes (followers) await that task instead of
+starting their own. Nothing is kept once it finishes, so this removes
+duplicate concurrent work without serving stale results.
+
+  * Failure: the leader's exception is raised to every caller that joined
+    the flight. The key is free again immediately, so the next request
+    retries rather than inheriting the failure.
+  * Cancellation: each caller awaits through a shield, so a cancelled
+    caller (the leader included) leaves without disturbing the others.
+    When the last waiting caller is cancelled, nobody wants the result and
+    the computation itself is cancelled.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self.flights: Dict[Hashable, Flight] = {}
+        self.started = 0
+        self.shared = 0
+        self.failed = 0
+        self.abandoned = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Returns (result, shared): shared is True when another caller's computation was joined."""
+        flight = self.flights.get(key)
+        shared = flight is not None
+        if shared:
+            self.shared += 1
+        else:
+            flight = self.flights[key] = Flight(asyncio.ensure_future(fn()))
+            self.started += 1
+            flight.task.add_done_callback(lambda task: self._land(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()  # last one waiting: no one wants the result any more
+                self.abandoned += 1
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _land(self, key: Hashable, flight: Flight):
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            self.failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.started + self.shared
+        return {
+            "in_flight": len(self.flights),
+            "started": self.started,
+            "coalesced": self.shared,
+            "coalesced_rate": round(self.shared / calls, 4) if calls else None,
+            "failed": self.failed,
+            "abandoned": self.abandoned,
+        }
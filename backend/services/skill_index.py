@@ -0,0 +1,259 @@
+"""
+Skill Index – Normalized skill table and inverted index from skill to candidate ids.
+Kept in sync with Candidate.skills on every ORM flush and answers AND/OR skill
+filters with index-only joins over the posting lists instead of scanning JSON.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import select, insert, delete, update, bindparam, event, and_, or_, false, exists, func, literal
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import get_history
+from database import engine
+from models import Candidate, Skill, CandidateSkill
+from services.query_layer import insert_for
+
+CHUNK = 500
+
+
+def normalize_skill(name: str) -> str:
+    """Lowercase and collapse whitespace so 'Machine  Learning' == 'machine learning'."""
+    return " ".join(str(name).lower().split())[:100]
+
+
+def _chunks(items: Sequence, size: int = CHUNK) -> Iterable[Sequence]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class SkillIndex:
+    """Maintains and queries the skill → candidate inverted index."""
+
+    def __init__(self):
+        self.version = 0  # bumped on every index write so in-memory consumers can refresh
+
+    def _skill_ids(self, connection: Connection, names: Iterable[str]) -> Dict[str, int]:
+        """Map normalized names to skill ids, creating missing skills."""
+        names = list(names)
+        if not names:
+            return {}
+        connection.execute(
+            insert_for(connection.dialect.name, Skill.__table__).on_conflict_do_nothing(),
+            [{"name": n, "candidate_count": 0} for n in names],
+        )
+        ids = {}
+        for chunk in _chunks(names):
+            rows = connection.execute(select(Skill.id, Skill.name).where(Skill.name.in_(chunk)))
+            ids.update({name: skill_id for skill_id, name in rows})
+        return ids
+
+    def index_candidates(
+        self,
+        connection: Connection,
+        candidates: Sequence[Tuple[int, Optional[List[str]]]],
+        replace: bool = True,
+    ):
+        """Write index entries for (candidate_id, skills) pairs.
+
+        With replace=True existing entries for those candidates are removed first;
+        pass replace=False for freshly inserted candidates to skip that lookup.
+        Runs on a sync connection so it works inside ORM flush events and run_sync.
+        """
+        if not candidates:
+            return
+        self.version += 1
+        wanted = {}
+        for candidate_id, skills in candidates:
+            names = {normalize_skill(s) for s in (skills or []) if s}
+            names.discard("")
+            wanted[candidate_id] = names
+
+        deltas: Counter = Counter()
+        if replace:
+            ids = list(wanted)
+            for chunk in _chunks(ids):
+                existing = connection.execute(
+                    select(CandidateSkill.skill_id).where(CandidateSkill.candidate_id.in_(chunk))
+                )
+                for (skill_id,) in existing:
+                    deltas[skill_id] -= 1
+                connection.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id.in_(chunk)))
+
+        skill_ids = self._skill_ids(connection, set().union(*wanted.values()))
+        rows = [
+            {"candidate_id": candidate_id, "skill_id": skill_ids[name]}
+            for candidate_id, names in wanted.items()
+            for name in names
+        ]
+        if rows:
+            connection.execute(insert(CandidateSkill), rows)
+            deltas.update(r["skill_id"] for r in rows)
+
+        changed = [{"skill": skill_id, "delta": d} for skill_id, d in deltas.items() if d]
+        if changed:
+            connection.execute(
+                update(Skill)
+                .where(Skill.id == bindparam("skill"))
+                .values(candidate_count=Skill.candidate_count + bindparam("delta")),
+                changed,
+            )
+
+    async def rebuild(self, batch_size: int = 5000) -> int:
+        """Drop and rebuild the whole index from Candidate.skills."""
+        indexed = 0
+        self.version += 1
+        async with engine.begin() as conn:
+            await conn.execute(delete(CandidateSkill))
+            await conn.execute(update(Skill).values(candidate_count=0))
+            last_id = 0
+            while True:
+                result = await conn.execute(
+                    select(Candidate.id, Candidate.skills)
+                    .where(Candidate.id > last_id)
+                    .order_by(Candidate.id)
+                    .limit(batch_size)
+                )
+                batch = [tuple(r) for r in result.all()]
+                if not batch:
+                    break
+                await conn.run_sync(self.index_candidates, batch, False)
+                indexed += len(batch)
+                last_id = batch[-1][0]
+        return indexed
+
+    async def rebuild_if_empty(self) -> int:
+        """Backfill the index for databases created before it existed."""
+        async with engine.connect() as conn:
+            has_entries = (await conn.execute(select(CandidateSkill.candidate_id).limit(1))).first()
+            has_candidates = (await conn.execute(select(Candidate.id).limit(1))).first()
+        if has_entries or not has_candidates:
+            return 0
+        indexed = await self.rebuild()
+        print(f"✅ Built skill index for {indexed} candidates", flush=True)
+        return indexed
+
+    async def resolve_filter(self, db: AsyncSession, skills: List[str], match_all: bool = True) -> Optional["SkillFilter"]:
+        """Resolve skill names to a filter over the index, or None if no usable names were given."""
+        names = {normalize_skill(s) for s in skills if s and normalize_skill(s)}
+        if not names:
+            return None
+        result = await db.execute(
+            select(Skill.id, Skill.candidate_count).where(Skill.name.in_(names))
+        )
+        known = [(skill_id, count) for skill_id, count in result.all()]
+        if match_all and len(known) < len(names):
+            known = []  # at least one skill nobody has
+        population = (await db.execute(select(func.max(Candidate.id)))).scalar() or 0
+        return SkillFilter(known, match_all, population)
+
+    async def top_skills(self, db: AsyncSession, limit: int = 50) -> List[Dict[str, int]]:
+        """Most common skills by posting list length."""
+        result = await db.execute(
+            select(Skill.name, Skill.candidate_count)
+            .where(Skill.candidate_count > 0)
+            .order_by(Skill.candidate_count.desc())
+            .limit(limit)
+        )
+        return [{"name": name, "count": count} for name, count in result.all()]
+
+
+class SkillFilter:
+    """AND/OR skill filter with a plan chosen from posting list lengths.
+
+    Sparse filters drive from the shortest posting list and probe the others by
+    primary key. Dense filters (a large share of all candidates match) instead walk
+    candidates in the caller's order and probe each skill with EXISTS, so a
+    top-50 page stops after a few hundred probes instead of sorting every match.
+    """
+
+    DENSE_FRACTION = 0.005  # a 50-row page then needs ~10k ordered probes at most
+
+    def __init__(self, skills: List[Tuple[int, int]], match_all: bool, population: int):
+        self.skills = sorted(skills, key=lambda s: s[1])  # (skill_id, candidate_count), rarest first
+        self.match_all = match_all
+        self.population = population
+
+    @property
+    def empty(self) -> bool:
+        return not self.skills
+
+    @property
+    def estimated_fraction(self) -> float:
+        if self.empty or not self.population:
+            return 0.0
+        fractions = [count / self.population for _, count in self.skills]
+        if self.match_all:
+            estimate = 1.0
+            for f in fractions:
+                estimate *= f  # assumes independent skills
+            return estimate
+        return min(1.0, sum(fractions))
+
+    def _ids(self):
+        """Candidate ids matching the filter, computed on the index alone."""
+        if self.match_all:
+            base = aliased(CandidateSkill)
+            ids = select(base.candidate_id).where(base.skill_id == self.skills[0][0])
+            for skill_id, _ in self.skills[1:]:
+                other = aliased(CandidateSkill)
+                ids = ids.join(other, and_(other.candidate_id == base.candidate_id, other.skill_id == skill_id))
+            return ids
+        return (
+            select(CandidateSkill.candidate_id)
+            .where(CandidateSkill.skill_id.in_([skill_id for skill_id, _ in self.skills]))
+            .distinct()
+        )
+
+    @property
+    def clause(self):
+        """WHERE clause on Candidate."""
+        if self.empty:
+            return false()
+        if self.estimated_fraction < self.DENSE_FRACTION:
+            return Candidate.id.in_(self._ids())
+        probes = [
+            exists().where(CandidateSkill.candidate_id == Candidate.id, CandidateSkill.skill_id == skill_id)
+            for skill_id, _ in self.skills
+        ]
+        return and_(*probes) if self.match_all else or_(*probes)
+
+    def count_query(self):
+        """Exact number of matching candidates without touching the candidates table."""
+        if self.empty:
+            return select(literal(0))
+        if len(self.skills) == 1:
+            return select(literal(self.skills[0][1]))
+        return select(func.count()).select_from(self._ids().subquery())
+
+
+skill_index = SkillIndex()
+
+
+@event.listens_for(Session, "before_flush")
+def _unindex_deleted_candidates(session: Session, flush_context, instances):
+    """Drop deleted candidates' postings and counts before their rows go.
+
+    Done ahead of the DELETE because ON DELETE CASCADE (PostgreSQL) would remove
+    the postings in the database, leaving nothing to decrement the counts from.
+    """
+    deleted = [(obj.id, []) for obj in session.deleted if isinstance(obj, Candidate) and obj.id is not None]
+    if deleted:
+        skill_index.index_candidates(session.connection(), deleted, replace=True)
+
+
+@event.listens_for(Session, "after_flush")
+def _index_flushed_candidates(session: Session, flush_context):
+    """Keep the inverted index in step with ORM inserts and updates of candidates."""
+    new, changed = [], []
+    for obj in session.new:
+        if isinstance(obj, Candidate):
+            new.append((obj.id, obj.skills))
+    for obj in session.dirty:
+        if isinstance(obj, Candidate) and get_history(obj, "skills").has_changes():
+            changed.append((obj.id, obj.skills))
+
+    if new or changed:
+        connection = session.connection()
+        skill_index.index_candidates(connection, new, replace=False)
+        skill_index.index_candidates(connection, changed, replace=True)
@@ -0,0 +1,316 @@
+"""
+Sync Scheduler – Locked, incremental, concurrent connector syncs.
+
+Every sync of a connector goes through sync(): it takes the connector's
+lock, reads its cursor (watermark) from Integration.config, pulls only what
+changed since then, and writes the new cursor back before releasing the
+lock, so overlapping requests for the same connector run one after the
+other and never pull the same delta twice. The lock has two parts: an
+asyncio.Lock for callers in this process, then a lease on the integration
+row (claimed with a conditional UPDATE, renewed while the sync runs, taken
+over once SYNC_LEASE_SECONDS pass without renewal) for other processes, so
+a sync job in a `cli.py worker` process and the API's scheduler wait for
+each other and continue from the same cursor. sync_all() runs connectors in
+parallel up to SYNC_CONCURRENCY, and the background loop syncs each
+connector once its interval (SYNC_INTERVAL_SECONDS, or interval_seconds in
+its config) has passed.
+"""
+import asyncio
+import os
+import socket
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from sqlalchemy import or_, select, update
+from config import settings
+from database import async_session
+from models import Integration
+from agents.integration_agent import integration_agent, BaseConnector
+from services.query_layer import dialect_of, insert_for
+from services.rollup_service import utc_naive
+
+LEASE_POLL_SECONDS = 0.25  # how often a caller waiting for another process's sync checks again
+
+
+class ConnectorStats:
+    __slots__ = ("syncs", "failures", "records", "seconds", "last_duration_ms", "last_records", "last_error",
+                 "last_finished")
+
+    def __init__(self):
+        self.syncs = 0
+        self.failures = 0
+        self.records = 0
+        self.seconds = 0.0
+        self.last_duration_ms: Optional[float] = None
+        self.last_records: Optional[int] = None
+        self.last_error: Optional[str] = None
+        self.last_finished: Optional[float] = None  # monotonic
+
+
+def records_per_second(records: int, seconds: float) -> Optional[float]:
+    return round(records / seconds, 1) if seconds > 0 else None
+
+
+class SyncScheduler:
+    def __init__(self):
+        self.locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self.connector_stats: Dict[str, ConnectorStats] = defaultdict(ConnectorStats)
+        self.intervals: Dict[str, float] = {}  # per-connector overrides from Integration.config
+        self.last_synced: Dict[str, float] = {}  # wall-clock seconds of the last successful sync
+        self.sync_all_runs = 0
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+
+    def _connector(self, system_name: str) -> BaseConnector:
+        connector = integration_agent.connectors.get(system_name)
+        if connector is None:
+            raise LookupError(f"System '{system_name}' not found")
+        return connector
+
+    @asynccontextmanager
+    async def _held(self, connector: BaseConnector) -> AsyncIterator[Dict[str, Any]]:
+        """Hold the connector in this process and across processes; yields its persisted config."""
+        async with self.locks[connector.name]:
+            await self._ensure_row(connector)
+            while not await self._claim(connector.name):
+                await asyncio.sleep(LEASE_POLL_SECONDS)
+            renew = asyncio.create_task(self._renew(connector.name))
+            try:
+                async with async_session() as db:
+                    config = (await db.execute(
+                        select(Integration.config).where(Integration.system_name == connector.name)
+                    )).scalar_one()
+                yield dict(config or {})
+            finally:
+                renew.cancel()
+                await self._lease(connector.name, sync_leased_by=None, sync_lease_expires_at=None)
+
+    async def _ensure_row(self, connector: BaseConnector):
+        async with async_session() as db:
+            await db.execute(
+                insert_for(dialect_of(db), Integration).values(
+                    system_name=connector.name,
+                    system_type=connector.system_type,
+                    status=connector.status,
+                    record_count=connector.record_count,
+                    color=connector.color,
+                    config={},
+                ).on_conflict_do_nothing(index_elements=["system_name"])
+            )
+            await db.commit()
+
+    async def _claim(self, system_name: str) -> bool:
+        now = utc_naive(datetime.now(timezone.utc))
+        async with async_session() as db:
+            result = await db.execute(
+                update(Integration)
+                .where(Integration.system_name == system_name, or_(
+                    Integration.sync_leased_by.is_(None),
+                    Integration.sync_leased_by == self.owner,  # left behind by a crashed run of this process
+                    Integration.sync_lease_expires_at < now,
+                ))
+                .values(sync_leased_by=self.owner,
+                        sync_lease_expires_at=now + timedelta(seconds=settings.sync_lease_seconds))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def _renew(self, system_name: str):
+        while True:
+            await asyncio.sleep(settings.sync_lease_seconds / 3)
+            try:
+                expires = utc_naive(datetime.now(timezone.utc)) + timedelta(seconds=settings.sync_lease_seconds)
+                await self._lease(system_name, sync_lease_expires_at=expires)
+            except Exception as e:
+                print(f"⚠️ Sync lease renewal for {system_name} failed: {e}", flush=True)
+
+    async def _lease(self, system_name: str, **values) -> bool:
+        """Update the integration row only while this process holds its lease."""
+        async with async_session() as db:
+            result = await db.execute(
+                update(Integration)
+                .where(Integration.system_name == system_name, Integration.sync_leased_by == self.owner)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def _save(self, connector: BaseConnector, config: Dict[str, Any]):
+        saved = await self._lease(
+            connector.name,
+            status=connector.status,
+            last_sync=connector.last_sync,
+            record_count=connector.record_count,
+            config=config,
+        )
+        if not saved:
+            print(f"⚠️ Lost the sync lease on {connector.name}; its cursor was not saved", flush=True)
+
+    async def sync(self, system_name: str) -> Dict[str, Any]:
+        """Incremental sync of one connector under its lock. Raises LookupError or the connector's error."""
+        connector = self._connector(system_name)
+        stats = self.connector_stats[system_name]
+        async with self._held(connector) as config:
+            started = time.perf_counter()
+            try:
+                result = await integration_agent.sync_system(system_name, config.get("cursor"))
+            except Exception as e:
+                stats.failures += 1
+                stats.last_error = f"{type(e).__name__}: {e}"
+                config["last_error"] = stats.last_error
+                await self._save(connector, config)
+                raise
+            seconds = time.perf_counter() - started
+
+            config["cursor"] = result["cursor"]
+            config["last_run"] = {
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "records": result["new_records"],
+                "duration_ms": round(seconds * 1000, 1),
+            }
+            config.pop("last_error", None)
+            await self._save(connector, config)
+
+        stats.syncs += 1
+        stats.records += result["new_records"]
+        stats.seconds += seconds
+        stats.last_duration_ms = round(seconds * 1000, 1)
+        stats.last_records = result["new_records"]
+        stats.last_error = None
+        stats.last_finished = time.monotonic()
+        self.last_synced[system_name] = time.time()
+        return {
+            **result,
+            "system_name": system_name,
+            "duration_ms": stats.last_duration_ms,
+            "records_per_second": records_per_second(result["new_records"], seconds),
+        }
+
+    async def sync_all(self, systems: Optional[Iterable[str]] = None,
+                       concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """Sync several connectors (default: all) with at most `concurrency` running at once."""
+        names = list(systems) if systems is not None else list(integration_agent.connectors)
+        for name in names:
+            self._connector(name)
+        limit = asyncio.Semaphore(concurrency or settings.sync_concurrency)
+
+        async def one(name: str) -> Dict[str, Any]:
+            async with limit:
+                try:
+                    return await self.sync(name)
+                except Exception as e:
+                    return {"system_name": name, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = await asyncio.gather(*(one(name) for name in names))
+        self.sync_all_runs += 1
+        seconds = time.perf_counter() - started
+        records = sum(r.get("new_records", 0) for r in results)
+        return {
+            "synced": sum(1 for r in results if r.get("status") == "success"),
+            "failed": sum(1 for r in results if r.get("status") == "error"),
+            "new_records": records,
+            "duration_ms": round(seconds * 1000, 1),
+            "records_per_second": records_per_second(records, seconds),
+            "results": results,
+        }
+
+    def interval(self, system_name: str) -> float:
+        return self.intervals.get(system_name, settings.sync_interval_seconds)
+
+    async def set_interval(self, system_name: str, seconds: Optional[float]):
+        """Persist a per-connector schedule; None falls back to SYNC_INTERVAL_SECONDS, 0 disables."""
+        connector = self._connector(system_name)
+        async with self._held(connector) as config:
+            if seconds is None:
+                config.pop("interval_seconds", None)
+                self.intervals.pop(system_name, None)
+            else:
+                config["interval_seconds"] = seconds
+                self.intervals[system_name] = seconds
+            await self._save(connector, config)
+
+    async def restore(self):
+        """Load schedules and last successful sync times so a restart does not resync everything at once."""
+        async with async_session() as db:
+            rows = (await db.execute(select(Integration.system_name, Integration.config))).all()
+        for name, config in rows:
+            config = config or {}
+            if "interval_seconds" in config:
+                self.intervals[name] = config["interval_seconds"]
+            finished = (config.get("last_run") or {}).get("finished_at")
+            if finished:
+                self.last_synced[name] = datetime.fromisoformat(finished).timestamp()
+
+    def due(self, now: float) -> List[str]:
+        due = []
+        for name in integration_agent.connectors:
+            interval = self.interval(name)
+            if interval > 0 and now - self.last_synced.get(name, 0) >= interval and not self.locks[name].locked():
+                due.append(name)
+        return due
+
+    async def _run(self):
+        try:
+            await self.restore()
+        except Exception as e:
+            print(f"⚠️ Could not restore connector schedules: {e}", flush=True)
+        while True:
+            due = self.due(time.time())
+            if due:
+                report = await self.sync_all(due)
+                print(f"🔄 Scheduled sync of {len(due)} connectors: {report['new_records']} new records, "
+                      f"{report['failed']} failed, {report['duration_ms']:.0f}ms", flush=True)
+                for result in report["results"]:
+                    if result.get("status") == "error":
+                        # Retry failing connectors on the next interval, not every tick
+                        self.last_synced[result["system_name"]] = time.time()
+            await asyncio.sleep(settings.sync_tick_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        connectors = {}
+        for name, connector in integration_agent.connectors.items():
+            s = self.connector_stats[name]
+            interval = self.interval(name)
+            last = self.last_synced.get(name)
+            connectors[name] = {
+                "status": connector.status,
+                "running": self.locks[name].locked(),
+                "syncs": s.syncs,
+                "failures": s.failures,
+                "records_pulled": s.records,
+                "last_records": s.last_records,
+                "last_duration_ms": s.last_duration_ms,
+                "records_per_second": records_per_second(s.records, s.seconds),
+                "last_error": s.last_error,
+                "interval_seconds": interval,
+                "next_due_in_seconds": round(max(0.0, last + interval - now), 1) if interval > 0 and last else
+                (0.0 if interval > 0 else None),
+            }
+        return {
+            "concurrency": settings.sync_concurrency,
+            "sync_all_runs": self.sync_all_runs,
+            "scheduler_running": self._task is not None and not self._task.done(),
+            "connectors": connectors,
+        }
+
+
+sync_scheduler = SyncScheduler()
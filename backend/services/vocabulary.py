@@ -0,0 +1,226 @@
+"""
+Vocabulary – Curated skill, job title and location dictionaries for the keyword extractor.
+Keys are canonical display names; values are extra aliases (the lowercased key is always one).
+"""
+
+SKILLS = {
+    # Languages
+    "Python": ["python3", "python 3"],
+    "Java": ["java 8", "java 11", "java 17"],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": ["ts"],
+    "Go": ["golang"],
+    "Rust": [],
+    "C": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    "Ruby": [],
+    "PHP": [],
+    "Scala": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Objective-C": ["objective c", "objc"],
+    "R": [],
+    "Julia": [],
+    "Elixir": [],
+    "Erlang": [],
+    "Haskell": [],
+    "Clojure": [],
+    "Dart": [],
+    "Perl": [],
+    "Lua": [],
+    "Bash": ["shell scripting", "shell script"],
+    "SQL": [],
+    "MATLAB": [],
+    "Solidity": [],
+    # Frontend
+    "React": ["react.js", "reactjs"],
+    "React Native": ["react-native"],
+    "Next.js": ["nextjs", "next js"],
+    "Vue.js": ["vue", "vuejs", "vue js"],
+    "Angular": ["angularjs", "angular.js"],
+    "Svelte": ["sveltekit"],
+    "Redux": [],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "Sass": ["scss"],
+    "Tailwind CSS": ["tailwind", "tailwindcss"],
+    "Webpack": [],
+    "Vite": [],
+    "GraphQL": [],
+    "jQuery": [],
+    # Backend
+    "Node.js": ["node", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring Boot": ["spring", "springboot"],
+    "Ruby on Rails": ["rails", "ror"],
+    "Laravel": [],
+    ".NET": ["dotnet", "asp.net", ".net core"],
+    "gRPC": [],
+    "REST APIs": ["rest", "restful", "rest api", "restful apis"],
+    "Microservices": ["microservice", "micro-services"],
+    "System Design": ["distributed systems"],
+    # Data stores and streaming
+    "PostgreSQL": ["postgres", "psql"],
+    "MySQL": [],
+    "SQLite": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "opensearch"],
+    "Cassandra": [],
+    "DynamoDB": ["dynamo db"],
+    "Snowflake": [],
+    "BigQuery": ["big query"],
+    "Redshift": [],
+    "Kafka": ["apache kafka"],
+    "RabbitMQ": [],
+    "Spark": ["apache spark", "pyspark"],
+    "Hadoop": [],
+    "Airflow": ["apache airflow"],
+    "dbt": [],
+    "Databricks": [],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Looker": [],
+    "ETL": ["elt", "data pipelines"],
+    "Data Warehousing": ["data warehouse"],
+    # Machine learning
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["dl"],
+    "NLP": ["natural language processing"],
+    "Computer Vision": [],
+    "LLMs": ["llm", "large language models", "large language model", "genai", "generative ai"],
+    "PyTorch": ["torch"],
+    "TensorFlow": ["tf", "tensorflow 2"],
+    "Keras": [],
+    "JAX": [],
+    "Scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Hugging Face": ["huggingface", "transformers"],
+    "MLOps": ["ml ops"],
+    "AWS SageMaker": ["sagemaker"],
+    "Reinforcement Learning": ["rl"],
+    "Statistics": ["statistical modeling"],
+    # Cloud and infrastructure
+    "AWS": ["amazon web services"],
+    "GCP": ["google cloud", "google cloud platform"],
+    "Azure": ["microsoft azure"],
+    "Docker": [],
+    "Kubernetes": ["k8s"],
+    "Helm": [],
+    "Terraform": [],
+    "Ansible": [],
+    "Chef": [],
+    "Puppet": [],
+    "CI/CD": ["ci cd", "continuous integration", "continuous delivery"],
+    "Jenkins": [],
+    "GitHub Actions": [],
+    "GitLab CI": [],
+    "Linux": ["unix"],
+    "Nginx": [],
+    "Prometheus": [],
+    "Grafana": [],
+    "Datadog": [],
+    "Serverless": ["aws lambda", "lambda"],
+    "Networking": ["tcp/ip"],
+    "Security": ["cybersecurity", "infosec", "application security"],
+    "Git": [],
+    # Mobile
+    "iOS": [],
+    "Android": [],
+    "Flutter": [],
+    "SwiftUI": [],
+    "Firebase": [],
+    # Design and product
+    "Figma": [],
+    "Sketch": [],
+    "User Research": ["ux research"],
+    "Design Systems": ["design system"],
+    "Prototyping": [],
+    "Product Management": ["product strategy", "roadmapping"],
+    "A/B Testing": ["ab testing", "experimentation"],
+    # Quality
+    "Selenium": [],
+    "Cypress": [],
+    "Playwright": [],
+    "Jest": [],
+    "pytest": [],
+    "Test Automation": ["automated testing"],
+    # Ways of working
+    "Agile": ["scrum", "kanban"],
+    "Leadership": ["people management", "team leadership"],
+}
+
+# Aliases that are also ordinary English words; they only count if the text also writes them in this casing
+EXACT_CASE = {"go": "Go", "r": "R", "c": "C", "swift": "Swift", "spring": "Spring", "express": "Express",
+              "chef": "Chef", "puppet": "Puppet", "dart": "Dart", "julia": "Julia", "rest": "REST",
+              "node": "Node", "lambda": "Lambda", "rl": "RL", "ts": "TS", "tf": "TF",
+              "pm": "PM", "em": "EM", "transformers": "Transformers", "spark": "Spark",
+              "sketch": "Sketch", "looker": "Looker", "helm": "Helm", "rails": "Rails"}
+
+TITLES = {
+    "Software Engineer": ["software developer", "swe", "sde", "software development engineer", "programmer"],
+    "Backend Engineer": ["backend developer", "back-end engineer", "back end engineer", "server engineer"],
+    "Frontend Engineer": ["frontend developer", "front-end engineer", "front end engineer",
+                          "front-end developer", "ui engineer"],
+    "Full Stack Engineer": ["full stack developer", "full-stack engineer", "fullstack engineer",
+                            "full-stack developer", "fullstack developer"],
+    "Machine Learning Engineer": ["ml engineer", "mle", "ai engineer", "deep learning engineer"],
+    "Machine Learning Scientist": ["ml scientist", "ml research scientist", "research scientist",
+                                   "ai researcher", "ml researcher", "applied scientist"],
+    "Data Scientist": [],
+    "Data Engineer": ["big data engineer", "analytics engineer"],
+    "Data Analyst": ["business intelligence analyst", "bi analyst"],
+    "DevOps Engineer": ["devops", "platform engineer", "infrastructure engineer", "cloud engineer"],
+    "Site Reliability Engineer": ["sre"],
+    "Security Engineer": ["security analyst", "application security engineer"],
+    "Mobile Engineer": ["mobile developer"],
+    "iOS Engineer": ["ios developer"],
+    "Android Engineer": ["android developer"],
+    "QA Engineer": ["qa analyst", "test engineer", "sdet", "quality assurance engineer"],
+    "Product Designer": ["ux designer", "ui/ux designer", "ui designer", "interaction designer"],
+    "Product Manager": ["pm", "product owner"],
+    "Engineering Manager": ["em", "software engineering manager", "development manager"],
+    "Technical Lead": ["tech lead", "team lead"],
+    "Solutions Architect": ["software architect", "cloud architect", "solution architect"],
+    "CTO": ["chief technology officer"],
+    "VP of Engineering": ["vp engineering", "head of engineering", "director of engineering"],
+}
+
+SENIORITY = {
+    "Intern": ["internship"],
+    "Junior": ["jr", "entry level", "entry-level"],
+    "Mid-level": ["mid level", "intermediate"],
+    "Senior": ["sr", "snr"],
+    "Staff": [],
+    "Principal": [],
+    "Lead": [],
+}
+
+LOCATIONS = {
+    "Remote": ["fully remote", "remote-first", "work from home", "wfh"],
+    "Hybrid": [],
+    "On-site": ["onsite", "on site", "in office", "in-office"],
+    "San Francisco, CA": ["san francisco", "sf bay area", "bay area"],
+    "New York, NY": ["new york", "nyc", "new york city"],
+    "Seattle, WA": ["seattle"],
+    "Austin, TX": ["austin"],
+    "Boston, MA": ["boston"],
+    "Los Angeles, CA": ["los angeles"],
+    "Chicago, IL": ["chicago"],
+    "Denver, CO": ["denver"],
+    "London, UK": ["london"],
+    "Berlin, Germany": ["berlin"],
+    "Amsterdam, Netherlands": ["amsterdam"],
+    "Paris, France": ["paris"],
+    "Toronto, Canada": ["toronto"],
+    "Bangalore, India": ["bangalore", "bengaluru"],
+    "Hyderabad, India": ["hyderabad"],
+    "Chennai, India": ["chennai"],
+    "Singapore": [],
+    "Sydney, Australia": ["sydney"],
+}
@@ -0,0 +1,37 @@
+import asyncio
+
+from services.import_service import CandidateImporter, iter_records
+
+CSV = (
+    'name,title,email,source\n'
+    'Ana Ruiz,6" monitor guy,ana@x.com,LinkedIn\n'
+    'Ben Cole,Backend Engineer,ben@x.com,LinkedIn\n'
+    'Cy Dunn,"Staff Engineer, ""Platform""",cy@x.com,GitHub\n'
+    'Di Eng,"Designer\nand researcher",di@x.com,GitHub\n'
+    'Ed Fox,Data Scientist,ed@x.com,LinkedIn\n'
+    'Flo Gil,SRE,flo@x.com,LinkedIn\n'
+)
+
+
+def records(text: str, chunk_size: int):
+    async def chunks():
+        data = text.encode()
+        for i in range(0, len(data), chunk_size):
+            yield data[i:i + chunk_size]
+
+    async def collect():
+        return [record async for record in iter_records(chunks(), "csv")]
+
+    return asyncio.run(collect())
+
+
+def test_stray_quote_in_unquoted_cell_does_not_join_rows():
+    for chunk_size in (1, 7, 1 << 20):
+        rows = records(CSV, chunk_size)
+        assert [line for line, _ in rows] == [1, 2, 3, 4, 5, 7, 8]
+        header = rows[0][1].split(",")
+        parsed = [CandidateImporter._parse(text, "csv", header) for _, text in rows[1:]]
+        assert [p["name"] for p in parsed] == ["Ana Ruiz", "Ben Cole", "Cy Dunn", "Di Eng", "Ed Fox", "Flo Gil"]
+        assert parsed[0]["title"] == '6" monitor guy'
+        assert parsed[2]["title"] == 'Staff Engineer, "Platform"'
+        assert parsed[3]["title"] == "Designer\nand researcher"